@@ -8,9 +8,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 from models.position import Position
 from models.enveloppe import EnveloppeType
 from services.eligibility_service import EligibilityService
+from utils.cache import CacheManager
+from utils.single_flight import cle_canonique, vol_unique
 
 router = APIRouter()
 
+# Audits récents, en mémoire du processus seulement (données clients: pas de cache sur disque)
+cache_audits = CacheManager(ttl_seconds=600, max_entrees=512, max_octets=16 * 1024 * 1024)
+
 
 class PortfolioAuditRequest(BaseModel):
     """Requête d'audit de portefeuille"""
@@ -83,9 +88,18 @@ def audit_portfolio(request: PortfolioAuditRequest):
     - Optimisation fiscale et économies potentielles
     - Vérification éligibilité des positions
     - Scoring et recommandations
+    
+    Les audits identiques simultanés sont calculés une seule fois.
     """
-    # Charger l'univers ETF
-    EligibilityService.load_etf_universe()
+    return vol_unique.executer(
+        cle_canonique("audit", request), lambda: _auditer(request), cache=cache_audits
+    )
+
+
+def _auditer(request: PortfolioAuditRequest) -> PortfolioAuditResult:
+    """Calcul de l'audit d'un portefeuille"""
+    # Charger l'univers ETF (et son index) au premier appel
+    EligibilityService.get_index()
     
     # Calcul valorisation
     valeur_totale = 0
@@ -1,22 +1,85 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field, field_validator
 from typing import Dict, List, Optional
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 
 from analytics.backtesting import BacktestEngine, FrequenceReequilibrage
-from analytics.monte_carlo import MonteCarloSimulator
+from analytics.monte_carlo import MonteCarloSimulator, MoteurSimulation, ReductionVariance
+from analytics.monte_carlo_multi_actifs import MonteCarloMultiActifs
+from analytics.monte_carlo_fiscal import MonteCarloFiscal, PocheFiscale
+from analytics.cache_scenarios import cache_scenarios
+from analytics.generateurs_rendements import TypeGenerateur, creer_generateur
+from analytics.index_metriques import registre_index_metriques
+from data.market_data import MarketDataProvider
+from data.price_panel import GestionnairePanneau
+from optimization.asset_allocation import AssetAllocator, StrategieAllocation
+from services.eligibility_service import EligibilityService
+from utils.series import ARROW_DISPONIBLE, MIME_ARROW, encoder_arrow
+from utils.cache import CacheManager
+from utils.cache_partage import CacheAEtages
+from utils.single_flight import cle_canonique, coalescer, vol_unique
 
 router = APIRouter()
 
+# Fournisseur partagé (cache des séries pour le bootstrap historique)
+market_data_provider = MarketDataProvider()
+
+# Panel de prix aligné partagé, reconstruit quand le stockage local change
+gestionnaire_panneau = GestionnairePanneau(market_data_provider.store)
+
+# Résultats coûteux et reproductibles (backtests, Monte Carlo à graine fixe),
+# partagés entre workers et conservés au redémarrage
+cache_resultats = CacheAEtages(CacheManager(ttl_seconds=3600, max_entrees=512, max_octets=256 * 1024 * 1024))
+
 
 class BacktestRequest(BaseModel):
     allocation: Dict[str, float]  # {ticker: poids%}
     date_debut: Optional[str] = None
     date_fin: Optional[str] = None
+    frequence_reequilibrage: str = "trimestriel"  # mensuel, trimestriel, annuel, sur_seuil, jamais
+    frais_transaction: float = 0.001
+    tolerance_pct: Optional[float] = None  # Bande de tolérance (points de %)
+    format_serie: str = "dict"  # dict, compact (float32 base64)
+    nb_points_max: Optional[int] = Field(None, ge=3)  # Sous-échantillonnage LTTB de la courbe
+
+
+class BacktestBatchRequest(BaseModel):
+    allocations: Dict[str, Dict[str, float]] = {}  # {nom: {ticker: poids%}}
+    strategies: List[StrategieAllocation] = []  # Presets, chaque classe représentée par un ETF stocké
+    date_debut: Optional[str] = None
+    date_fin: Optional[str] = None
     frequence_reequilibrage: str = "trimestriel"
     frais_transaction: float = 0.001
+    tolerance_pct: Optional[float] = None
+    seed: Optional[int] = None
+
+
+class WalkForwardRequest(BaseModel):
+    allocation: Dict[str, float]  # {ticker: poids%}
+    horizon_annees: float = 10
+    frequence_departs: str = "mensuel"
+    date_debut: Optional[str] = None
+    date_fin: Optional[str] = None
+    frequence_reequilibrage: str = "trimestriel"
+    frais_transaction: float = 0.001
+    nb_workers: Optional[int] = None
+
+
+class HypotheseRendement(BaseModel):
+    rendement_moyen_annuel: float
+    volatilite_annuelle: float
+
+
+class GenerateurRendementsRequest(BaseModel):
+    type: TypeGenerateur = TypeGenerateur.NORMAL
+    degres_liberte: float = 5.0  # Student
+    ticker: Optional[str] = None  # Bootstrap historique
+    taille_bloc: int = 12  # Bootstrap historique (mois)
+    regimes: Optional[List[HypotheseRendement]] = None  # Markov
+    matrice_transition: Optional[List[List[float]]] = None  # Markov (probabilités mensuelles)
 
 
 class MonteCarloRequest(BaseModel):
@@ -28,49 +91,396 @@ class MonteCarloRequest(BaseModel):
     apports_annuels: float = 0
     retraits_annuels: float = 0
     objectif_capital: Optional[float] = None
+    moteur: MoteurSimulation = MoteurSimulation.VECTORISE
+    taille_lot: Optional[int] = Field(None, ge=100)  # Simulation par lots en mémoire bornée
+    nb_workers: Optional[int] = Field(None, ge=1)  # Processus parallèles (résultat identique quel que soit le nombre)
+    reduction_variance: ReductionVariance = ReductionVariance.AUCUNE
+    generateur: Optional[GenerateurRendementsRequest] = None
+    seed: Optional[int] = None
+    
+    @field_validator("nb_workers")
+    @classmethod
+    def borner_nb_workers(cls, nb_workers: Optional[int]) -> Optional[int]:
+        """Nombre de processus ramené au nombre de cœurs de la machine"""
+        return None if nb_workers is None else min(nb_workers, os.cpu_count() or 1)
+
+
+class MonteCarloSweepRequest(BaseModel):
+    valeur_initiale: float
+    hypotheses_rendement: List[HypotheseRendement]
+    horizons: List[int] = [30]
+    apports_annuels: List[float] = [0]
+    retraits_annuels: List[float] = [0]
+    nb_simulations: int = 10000
+    objectif_capital: Optional[float] = None
+    seed: int = 42
+
+
+class PocheFiscaleRequest(BaseModel):
+    type_enveloppe: str  # pea, cto, av, per
+    valeur: float
+    prix_revient: Optional[float] = None
+    anciennete_annees: float = 0
+    part_apports: float = 0
+
+
+class MonteCarloFiscalRequest(BaseModel):
+    poches: List[PocheFiscaleRequest]
+    rendement_moyen_annuel: float
+    volatilite_annuelle: float
+    nb_annees: int = 30
+    nb_simulations: int = 10000
+    retrait_net_annuel: float = 0
+    apports_annuels: float = 0
+    tmi: float = 30
+    couple: bool = False
+    option_bareme_cto: bool = False
+    seed: Optional[int] = None
+
+
+class MonteCarloPortefeuilleRequest(BaseModel):
+    isins: List[str]  # Univers ordonné (ordre de la covariance)
+    allocation: Dict[str, float]  # {isin: poids%}
+    rendements_moyens_annuels: List[float]
+    covariance_annuelle: List[List[float]]
+    valeur_initiale: float
+    nb_annees: int = 30
+    nb_simulations: int = 5000
+    apports_annuels: float = 0
+    retraits_annuels: float = 0
+    objectif_capital: Optional[float] = None
+    frequence_reequilibrage: str = "annuel"
+    seed: Optional[int] = 42  # Tirages partagés entre variantes d'allocation
+
+
+# Classe d'actifs de l'univers représentant chaque classe des stratégies prédéfinies
+CLASSES_STRATEGIES = {
+    "actions": "actions_monde",
+    "obligations": "obligations_gouvernementales",
+    "or": "or"
+}
+
+
+def _allocation_strategie(strategie: StrategieAllocation, panneau) -> Dict[str, float]:
+    """
+    Allocation cible d'une stratégie prédéfinie, en tickers stockés.
+    
+    Chaque classe (actions, obligations, or) est représentée par le premier
+    ETF de l'univers de sa classe représentative dont les prix sont dans le
+    stockage local; les classes de poids nul sont omises.
+    
+    Raises:
+        ValueError: Aucun ETF stocké pour une classe de poids non nul
+    """
+    index = EligibilityService.get_index()
+    allocation = {}
+    for classe, poids in AssetAllocator.get_allocation_cible(strategie).items():
+        if poids <= 0:
+            continue
+        classe_actif = CLASSES_STRATEGIES[classe]
+        stockes = [etf.ticker for etf in index.filtrer(classe_actif=classe_actif) if etf.ticker in panneau.colonnes]
+        if not stockes:
+            raise ValueError(
+                f"Stratégie {strategie.value}: aucun ETF {classe_actif} dans le stockage local des prix"
+            )
+        allocation[stockes[0]] = allocation.get(stockes[0], 0.0) + poids
+    return allocation
+
+
+def _sources_prix(panneau, tickers: List[str]) -> Dict[str, str]:
+    """Source des prix de chaque ticker: stockage si présent dans le panel, sinon synthétique"""
+    return {ticker: "stockage" if ticker in panneau.colonnes else "synthetique" for ticker in tickers}
+
+
+def _charger_prix(
+    tickers: List[str],
+    date_debut: Optional[str],
+    date_fin: Optional[str],
+    rng=None,
+    panneau=None
+):
+    """
+    Prix historiques depuis le panel aligné du stockage local (aucun accès réseau).
+    
+    Pour démo: les tickers absents du stockage reçoivent des prix synthétiques
+    (mouvement brownien) sur la fenêtre demandée.
+    
+    Args:
+        panneau: Panel à lire (défaut: panel courant); celui de l'empreinte de la requête
+    
+    Returns:
+        Tuple (DataFrame aligné ou {ticker: Series}, {ticker: "stockage" | "synthetique"})
+    """
+    import pandas as pd
+    import numpy as np
+    
+    panneau = panneau if panneau is not None else gestionnaire_panneau.obtenir()
+    sources = _sources_prix(panneau, tickers)
+    stockes = [ticker for ticker in tickers if sources[ticker] == "stockage"]
+    manquants = [ticker for ticker in tickers if sources[ticker] == "synthetique"]
+    
+    # Tous les tickers stockés: fenêtre du panel, sans réalignement
+    fenetre = panneau.dataframe(stockes, date_debut, date_fin)
+    if not manquants:
+        return fenetre, sources
+    
+    prix_historiques = {ticker: fenetre[ticker] for ticker in stockes}
+    
+    rng = rng if rng is not None else np.random.default_rng()
+    debut = pd.to_datetime(date_debut) if date_debut else pd.to_datetime("2020-01-01")
+    fin = pd.to_datetime(date_fin) if date_fin else pd.to_datetime("2024-01-01")
+    dates = pd.date_range(debut, fin, freq='D')
+    
+    prix = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (len(dates), len(manquants))), axis=0))
+    for j, ticker in enumerate(manquants):
+        prix_historiques[ticker] = pd.Series(prix[:, j], index=dates)
+    
+    return prix_historiques, sources
+
+
+def _empreinte_prix(
+    panneau,
+    tickers: List[str],
+    date_debut: Optional[str],
+    date_fin: Optional[str]
+) -> Dict:
+    """
+    Empreinte des prix lus dans le panel pour une fenêtre: bornes et nombre de
+    lignes du calendrier, dernière barre de chaque ticker stocké (None pour un
+    ticker synthétique). Le stockage n'étant qu'étendu, elle identifie les prix
+    effectivement utilisés, y compris le calendrier commun.
+    """
+    import numpy as np
+    
+    debut, fin = panneau.bornes(date_debut, date_fin)
+    calendrier = panneau.calendrier[debut:fin]
+    
+    dernieres_barres = {}
+    for ticker in tickers:
+        colonne = panneau.colonnes.get(ticker)
+        valides = np.flatnonzero(~np.isnan(panneau.prix[debut:fin, colonne])) if colonne is not None else []
+        dernieres_barres[ticker] = int(calendrier[valides[-1]]) if len(valides) else None
+    
+    return {
+        "calendrier": [int(calendrier[0]), int(calendrier[-1]), len(calendrier)] if len(calendrier) else None,
+        "dernieres_barres": dernieres_barres
+    }
+
+
+def _empreinte_stockage(tickers: List[str]) -> Optional[Dict[str, str]]:
+    """
+    Dernière date stockée de chaque ticker lu directement dans le stockage
+    (bootstrap historique): le stockage n'étant qu'étendu, elle identifie les
+    prix utilisés. None si un ticker n'est pas stocké.
+    """
+    store = market_data_provider.store
+    empreinte = {}
+    for ticker in tickers:
+        derniere_date = store.derniere_date(ticker)
+        if derniere_date is None:
+            return None
+        empreinte[ticker] = str(derniere_date.date())
+    return empreinte
+
+
+def _coalescer(nom: str, request: Optional[BaseModel], calculer, cacheable: bool, *contexte):
+    """
+    Calcul partagé par les requêtes identiques simultanées (clé canonique du
+    modèle de requête et du contexte), servi depuis le cache de résultats
+    quand il est reproductible.
+    """
+    return vol_unique.executer(
+        cle_canonique(nom, request, *contexte), calculer, cache=cache_resultats, cacheable=cacheable
+    )
 
 
 @router.post("/backtest")
-def lancer_backtest(request: BacktestRequest):
-    """Lance un backtest complet d'une allocation"""
+def lancer_backtest(request: BacktestRequest, accept: Optional[str] = Header(None)):
+    """
+    Lance un backtest complet d'une allocation.
+    
+    Avec "Accept: application/vnd.apache.arrow.stream", la courbe est renvoyée
+    en flux Arrow IPC (date, valeur float32), les métriques dans les
+    métadonnées du schéma; 406 si pyarrow n'est pas installé.
+    """
+    arrow = accept is not None and MIME_ARROW in accept
+    if arrow and not ARROW_DISPONIBLE:
+        return JSONResponse(
+            status_code=406,
+            content={"success": False, "error": f"Format {MIME_ARROW} indisponible (pyarrow non installé)"}
+        )
+    
     try:
-        engine = BacktestEngine()
+        tickers = list(request.allocation.keys())
+        panneau = gestionnaire_panneau.obtenir()
+        
+        def calculer():
+            engine = BacktestEngine()
+            
+            prix_historiques, sources_prix = _charger_prix(
+                tickers, request.date_debut, request.date_fin, panneau=panneau
+            )
+            
+            # Lancer backtest
+            freq = FrequenceReequilibrage(request.frequence_reequilibrage)
+            
+            resultats = engine.backtester_allocation(
+                allocation=request.allocation,
+                prix_historiques=prix_historiques,
+                date_debut=request.date_debut,
+                date_fin=request.date_fin,
+                frequence_reequilibrage=freq,
+                frais_transaction=request.frais_transaction,
+                tolerance_pct=request.tolerance_pct,
+                format_serie="serie" if arrow else request.format_serie,
+                nb_points_max=request.nb_points_max
+            )
+            return resultats, sources_prix
+        
+        # Prix synthétiques (tirés sans graine): résultat non reproductible, pas de mise en cache
+        sources_prix = _sources_prix(panneau, tickers)
+        cacheable = "synthetique" not in sources_prix.values()
+        empreinte = _empreinte_prix(panneau, tickers, request.date_debut, request.date_fin)
+        resultats, sources_prix = _coalescer("backtest", request, calculer, cacheable, empreinte, sources_prix, arrow)
+        
+        if arrow:
+            # Résultat partagé: ne pas le modifier
+            metadonnees = {
+                "resultats": {cle: valeur for cle, valeur in resultats.items() if cle != "serie_valeurs"},
+                "sources_prix": sources_prix
+            }
+            return Response(content=encoder_arrow(resultats["serie_valeurs"], metadonnees), media_type=MIME_ARROW)
         
-        # Pour démo: générer des données synthétiques
-        # En production: utiliser vraies données via yfinance
-        import pandas as pd
+        return {
+            "success": True,
+            "resultats": resultats,
+            "sources_prix": sources_prix
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/batch")
+def lancer_backtest_batch(request: BacktestBatchRequest):
+    """
+    Backtest de N allocations candidates en une requête: un seul panel de
+    prix aligné, une seule matrice de rendements, courbes par produit matriciel.
+    
+    Les stratégies prédéfinies sont traduites en ETFs stockés (voir
+    CLASSES_STRATEGIES); l'allocation retenue est renvoyée dans "allocations".
+    """
+    try:
         import numpy as np
-        from datetime import datetime, timedelta
-        
-        # Générer données synthétiques
-        date_debut = pd.to_datetime(request.date_debut) if request.date_debut else pd.to_datetime("2020-01-01")
-        date_fin = pd.to_datetime(request.date_fin) if request.date_fin else pd.to_datetime("2024-01-01")
-        
-        dates = pd.date_range(date_debut, date_fin, freq='D')
-        
-        prix_historiques = {}
-        for ticker in request.allocation.keys():
-            # Prix synthétique: brownian motion
-            nb_jours = len(dates)
-            rendements = np.random.normal(0.0003, 0.01, nb_jours)
-            prix = 100 * np.exp(np.cumsum(rendements))
-            prix_historiques[ticker] = pd.Series(prix, index=dates)
-        
-        # Lancer backtest
-        freq = FrequenceReequilibrage(request.frequence_reequilibrage)
-        
-        resultats = engine.backtester_allocation(
-            allocation=request.allocation,
-            prix_historiques=prix_historiques,
-            date_debut=request.date_debut,
-            date_fin=request.date_fin,
-            frequence_reequilibrage=freq,
-            frais_transaction=request.frais_transaction
+        
+        allocations = dict(request.allocations)
+        panneau = gestionnaire_panneau.obtenir()
+        for strategie in request.strategies:
+            allocations[strategie.value] = _allocation_strategie(strategie, panneau)
+        
+        if not allocations:
+            return {"success": False, "error": "Aucune allocation à backtester"}
+        
+        tickers = list(dict.fromkeys(ticker for allocation in allocations.values() for ticker in allocation))
+        
+        def calculer():
+            prix_historiques, sources_prix = _charger_prix(
+                tickers, request.date_debut, request.date_fin, np.random.default_rng(request.seed), panneau
+            )
+            
+            engine = BacktestEngine()
+            resultats = engine.backtester_allocations_lot(
+                allocations=allocations,
+                prix_historiques=prix_historiques,
+                date_debut=request.date_debut,
+                date_fin=request.date_fin,
+                frequence_reequilibrage=FrequenceReequilibrage(request.frequence_reequilibrage),
+                frais_transaction=request.frais_transaction,
+                tolerance_pct=request.tolerance_pct
+            )
+            return resultats, sources_prix
+        
+        # Prix synthétiques reproductibles seulement si une graine est fournie
+        sources_prix = _sources_prix(panneau, tickers)
+        cacheable = "synthetique" not in sources_prix.values() or request.seed is not None
+        empreinte = _empreinte_prix(panneau, tickers, request.date_debut, request.date_fin)
+        resultats, sources_prix = _coalescer(
+            "batch", request, calculer, cacheable, empreinte, sources_prix, allocations
         )
         
         return {
             "success": True,
-            "resultats": resultats
+            "resultats": resultats,
+            "allocations": allocations,
+            "sources_prix": sources_prix
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/walk-forward")
+def lancer_walk_forward(request: WalkForwardRequest):
+    """
+    Backtest walk-forward: distribution des CAGR, max drawdowns et pires années
+    glissantes sur toutes les dates de départ historiques à horizon fixe.
+    """
+    try:
+        tickers = list(request.allocation.keys())
+        panneau = gestionnaire_panneau.obtenir()
+        
+        def calculer():
+            prix_historiques, sources_prix = _charger_prix(
+                tickers, request.date_debut, request.date_fin, panneau=panneau
+            )
+            
+            engine = BacktestEngine()
+            resultats = engine.backtester_walk_forward(
+                allocation=request.allocation,
+                prix_historiques=prix_historiques,
+                horizon_annees=request.horizon_annees,
+                frequence_departs=FrequenceReequilibrage(request.frequence_departs),
+                date_debut=request.date_debut,
+                date_fin=request.date_fin,
+                frequence_reequilibrage=FrequenceReequilibrage(request.frequence_reequilibrage),
+                frais_transaction=request.frais_transaction,
+                nb_workers=request.nb_workers
+            )
+            return resultats, sources_prix
+        
+        sources_prix = _sources_prix(panneau, tickers)
+        cacheable = "synthetique" not in sources_prix.values()
+        empreinte = _empreinte_prix(panneau, tickers, request.date_debut, request.date_fin)
+        resultats, sources_prix = _coalescer("walk-forward", request, calculer, cacheable, empreinte, sources_prix)
+        
+        return {
+            "success": True,
+            "resultats": resultats,
+            "sources_prix": sources_prix
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/metriques/{ticker}")
+def get_metriques_periodes(ticker: str):
+    """
+    Rendement, volatilité, Sharpe et max drawdown 1M / 3M / 6M / 1Y / 3Y / 5Y
+    d'un ticker du stockage local, lus dans l'index de métriques partagé.
+    """
+    try:
+        prix = market_data_provider.store.lire(ticker)
+        if prix.empty:
+            return {"success": False, "error": f"Pas de prix stockés pour {ticker}"}
+        
+        index = registre_index_metriques.obtenir(ticker, prix)
+        
+        return {
+            "success": True,
+            "resultats": {
+                "ticker": ticker,
+                "date_fin": str(prix.index[-1].date()),
+                "drawdown_courant": round(index.drawdown_courant(), 2),
+                "periodes": index.metriques_periodes()
+            }
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -80,63 +490,219 @@ def lancer_backtest(request: BacktestRequest):
 def lancer_monte_carlo(request: MonteCarloRequest):
     """Lance une simulation Monte Carlo"""
     try:
-        simulator = MonteCarloSimulator()
-        
-        resultats = simulator.analyser_simulation_complete(
-            valeur_initiale=request.valeur_initiale,
-            rendement_moyen_annuel=request.rendement_moyen_annuel,
-            volatilite_annuelle=request.volatilite_annuelle,
-            nb_annees=request.nb_annees,
-            nb_simulations=request.nb_simulations,
-            apports_annuels=request.apports_annuels,
-            retraits_annuels=request.retraits_annuels,
-            objectif_capital=request.objectif_capital
-        )
+        def calculer():
+            simulator = MonteCarloSimulator(seed=request.seed, cache_scenarios=cache_scenarios)
+            
+            generateur = None
+            if request.generateur is not None:
+                generateur = creer_generateur(
+                    request.generateur.type,
+                    rendement_moyen_annuel=request.rendement_moyen_annuel,
+                    volatilite_annuelle=request.volatilite_annuelle,
+                    degres_liberte=request.generateur.degres_liberte,
+                    provider=market_data_provider,
+                    ticker=request.generateur.ticker,
+                    taille_bloc=request.generateur.taille_bloc,
+                    regimes=[
+                        (r.rendement_moyen_annuel, r.volatilite_annuelle)
+                        for r in request.generateur.regimes or []
+                    ],
+                    matrice_transition=request.generateur.matrice_transition
+                )
+            
+            resultats = simulator.analyser_simulation_complete(
+                valeur_initiale=request.valeur_initiale,
+                rendement_moyen_annuel=request.rendement_moyen_annuel,
+                volatilite_annuelle=request.volatilite_annuelle,
+                nb_annees=request.nb_annees,
+                nb_simulations=request.nb_simulations,
+                apports_annuels=request.apports_annuels,
+                retraits_annuels=request.retraits_annuels,
+                objectif_capital=request.objectif_capital,
+                moteur=request.moteur,
+                taille_lot=request.taille_lot,
+                nb_workers=request.nb_workers,
+                reduction_variance=request.reduction_variance,
+                generateur=generateur
+            )
+            # Métadonnée propre au calcul: fausse pour une réponse servie depuis le cache de résultats
+            resultats.pop("scenario_depuis_cache", None)
+            return resultats
+        
+        # Reproductible si la graine est fixée (bootstrap: sur les prix stockés)
+        cacheable = request.seed is not None
+        empreinte = None
+        if request.generateur is not None and request.generateur.ticker:
+            empreinte = _empreinte_stockage([request.generateur.ticker])
+            cacheable = cacheable and empreinte is not None
+        
+        resultats = _coalescer("monte-carlo", request, calculer, cacheable, empreinte)
         
         return {
             "success": True,
-            "resultats": resultats
+            "resultats": resultats,
+            "cache_scenarios": cache_scenarios.get_stats()
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
-@router.get("/demo/backtest-60-40")
-def demo_backtest_60_40():
-    """Démo: backtest d'un portefeuille 60/40"""
+@router.post("/monte-carlo/sweep")
+def lancer_monte_carlo_sweep(request: MonteCarloSweepRequest):
+    """
+    Grille de sensibilité Monte Carlo (apports x retraits x horizons x hypothèses)
+    calculée en une seule requête sur un tenseur de chocs partagé.
+    """
     try:
-        engine = BacktestEngine()
+        def calculer():
+            simulator = MonteCarloSimulator(seed=request.seed, cache_scenarios=cache_scenarios)
+            
+            resultats = simulator.analyser_grille_sensibilite(
+                valeur_initiale=request.valeur_initiale,
+                hypotheses_rendement=[
+                    (h.rendement_moyen_annuel, h.volatilite_annuelle)
+                    for h in request.hypotheses_rendement
+                ],
+                horizons=request.horizons,
+                apports_annuels=request.apports_annuels,
+                retraits_annuels=request.retraits_annuels,
+                nb_simulations=request.nb_simulations,
+                objectif_capital=request.objectif_capital
+            )
+            resultats.pop("scenario_depuis_cache", None)
+            return resultats
         
-        # Portfolio 60% actions / 40% obligations
-        allocation = {
-            "EWLD.PA": 60.0,  # Actions monde
-            "AGGH.PA": 40.0   # Obligations
+        resultats = _coalescer("monte-carlo/sweep", request, calculer, request.seed is not None)
+        
+        return {
+            "success": True,
+            "resultats": resultats,
+            "cache_scenarios": cache_scenarios.get_stats()
         }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/monte-carlo/fiscal")
+def lancer_monte_carlo_fiscal(request: MonteCarloFiscalRequest):
+    """
+    Monte Carlo net de fiscalité: poches PEA / AV / CTO / PER suivies par
+    trajectoire (prix de revient, ancienneté), impôt appliqué à chaque retrait.
+    """
+    try:
+        def calculer():
+            simulator = MonteCarloFiscal(seed=request.seed)
+            
+            resultats = simulator.analyser_fiscal(
+                poches=[
+                    PocheFiscale(
+                        type_enveloppe=poche.type_enveloppe,
+                        valeur=poche.valeur,
+                        prix_revient=poche.prix_revient,
+                        anciennete_annees=poche.anciennete_annees,
+                        part_apports=poche.part_apports
+                    )
+                    for poche in request.poches
+                ],
+                rendement_moyen_annuel=request.rendement_moyen_annuel,
+                volatilite_annuelle=request.volatilite_annuelle,
+                nb_annees=request.nb_annees,
+                nb_simulations=request.nb_simulations,
+                retrait_net_annuel=request.retrait_net_annuel,
+                apports_annuels=request.apports_annuels,
+                tmi=request.tmi,
+                couple=request.couple,
+                option_bareme_cto=request.option_bareme_cto
+            )
+            return resultats
         
-        # Générer données synthétiques pour démo
-        import pandas as pd
-        import numpy as np
+        resultats = _coalescer("monte-carlo/fiscal", request, calculer, request.seed is not None)
         
-        dates = pd.date_range("2020-01-01", "2024-01-01", freq='D')
+        return {
+            "success": True,
+            "resultats": resultats
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.post("/monte-carlo/portefeuille")
+def lancer_monte_carlo_portefeuille(request: MonteCarloPortefeuilleRequest):
+    """Lance une simulation Monte Carlo multi-ETFs à rendements corrélés"""
+    try:
+        isins_inconnus = [isin for isin in request.isins if not EligibilityService.get_etf_by_isin(isin)]
+        if isins_inconnus:
+            return {"success": False, "error": f"ISINs absents de l'univers d'ETFs: {isins_inconnus}"}
         
-        # Actions: rendement 7%, volatilité 15%
-        rdt_actions = np.random.normal(0.07/252, 0.15/np.sqrt(252), len(dates))
-        prix_actions = 100 * np.exp(np.cumsum(rdt_actions))
+        def calculer():
+            simulator = MonteCarloMultiActifs(seed=request.seed)
+            
+            resultats = simulator.analyser_portefeuille(
+                allocation=request.allocation,
+                isins=request.isins,
+                rendements_moyens_annuels=request.rendements_moyens_annuels,
+                covariance_annuelle=request.covariance_annuelle,
+                valeur_initiale=request.valeur_initiale,
+                nb_annees=request.nb_annees,
+                nb_simulations=request.nb_simulations,
+                apports_annuels=request.apports_annuels,
+                retraits_annuels=request.retraits_annuels,
+                objectif_capital=request.objectif_capital,
+                frequence_reequilibrage=FrequenceReequilibrage(request.frequence_reequilibrage)
+            )
+            return resultats
         
-        # Obligations: rendement 3%, volatilité 5%
-        rdt_oblig = np.random.normal(0.03/252, 0.05/np.sqrt(252), len(dates))
-        prix_oblig = 100 * np.exp(np.cumsum(rdt_oblig))
+        resultats = _coalescer("monte-carlo/portefeuille", request, calculer, request.seed is not None)
         
-        prix_historiques = {
-            "EWLD.PA": pd.Series(prix_actions, index=dates),
-            "AGGH.PA": pd.Series(prix_oblig, index=dates)
+        return {
+            "success": True,
+            "resultats": resultats
         }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/demo/backtest-60-40")
+def demo_backtest_60_40():
+    """Démo: backtest d'un portefeuille 60/40"""
+    try:
+        def calculer():
+            engine = BacktestEngine()
+            
+            # Portfolio 60% actions / 40% obligations
+            allocation = {
+                "EWLD.PA": 60.0,  # Actions monde
+                "AGGH.PA": 40.0   # Obligations
+            }
+            
+            # Générer données synthétiques pour démo
+            import pandas as pd
+            import numpy as np
+            
+            dates = pd.date_range("2020-01-01", "2024-01-01", freq='D')
+            
+            # Actions: rendement 7%, volatilité 15%
+            rdt_actions = np.random.normal(0.07/252, 0.15/np.sqrt(252), len(dates))
+            prix_actions = 100 * np.exp(np.cumsum(rdt_actions))
+            
+            # Obligations: rendement 3%, volatilité 5%
+            rdt_oblig = np.random.normal(0.03/252, 0.05/np.sqrt(252), len(dates))
+            prix_oblig = 100 * np.exp(np.cumsum(rdt_oblig))
+            
+            prix_historiques = {
+                "EWLD.PA": pd.Series(prix_actions, index=dates),
+                "AGGH.PA": pd.Series(prix_oblig, index=dates)
+            }
+            
+            resultats = engine.backtester_allocation(
+                allocation=allocation,
+                prix_historiques=prix_historiques,
+                frequence_reequilibrage=FrequenceReequilibrage.TRIMESTRIEL
+            )
+            return resultats
         
-        resultats = engine.backtester_allocation(
-            allocation=allocation,
-            prix_historiques=prix_historiques,
-            frequence_reequilibrage=FrequenceReequilibrage.TRIMESTRIEL
-        )
+        # Prix synthétiques tirés à chaque appel: partage des appels simultanés, sans cache
+        resultats = _coalescer("demo/backtest-60-40", None, calculer, False)
         
         return {
             "success": True,
@@ -147,21 +713,27 @@ def demo_backtest_60_40():
         return {"success": False, "error": str(e)}
 
 
+@coalescer(cache_resultats, ttl_seconds=24 * 3600)
+def _simulation_demo() -> dict:
+    """Simulation de démonstration (graine fixe: résultat reproductible, mis en cache)"""
+    simulator = MonteCarloSimulator(seed=42)
+    
+    return simulator.analyser_simulation_complete(
+        valeur_initiale=100000,
+        rendement_moyen_annuel=0.07,
+        volatilite_annuelle=0.15,
+        nb_annees=30,
+        nb_simulations=10000,
+        apports_annuels=5000,
+        retraits_annuels=0
+    )
+
+
 @router.get("/demo/monte-carlo")
 def demo_monte_carlo():
     """Démo: simulation Monte Carlo 30 ans"""
     try:
-        simulator = MonteCarloSimulator(seed=42)
-        
-        resultats = simulator.analyser_simulation_complete(
-            valeur_initiale=100000,
-            rendement_moyen_annuel=0.07,
-            volatilite_annuelle=0.15,
-            nb_annees=30,
-            nb_simulations=10000,
-            apports_annuels=5000,
-            retraits_annuels=0
-        )
+        resultats = _simulation_demo()
         
         return {
             "success": True,
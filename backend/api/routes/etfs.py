@@ -29,34 +29,59 @@ def list_etfs(
     - eligible_pea_only: True pour uniquement les ETFs PEA
     - min_ter/max_ter: Filtres sur les frais
     """
-    # Charger l'univers
-    EligibilityService.load_etf_universe()
-    
-    etfs = list(EligibilityService._etf_cache.values())
-    
     # Filtre par enveloppe
+    env_type = None
     if enveloppe_type:
         try:
             env_type = EnveloppeType(enveloppe_type)
-            etfs = EligibilityService.get_eligible_etfs(env_type)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Type d'enveloppe invalide: {enveloppe_type}")
     
-    # Filtre par classe d'actif
-    if classe_actif:
-        etfs = [etf for etf in etfs if etf.classe_actif.value == classe_actif]
+    # Intersection des bitsets de l'index compilé (univers chargé au premier appel)
+    etfs = EligibilityService.get_index().filtrer(
+        enveloppe=env_type,
+        classe_actif=classe_actif or None,
+        eligible_pea=True if eligible_pea_only else None,
+        min_ter=min_ter,
+        max_ter=max_ter
+    )
     
-    # Filtre PEA uniquement
-    if eligible_pea_only:
-        etfs = [etf for etf in etfs if etf.eligible_pea]
+    return etfs
+
+
+@router.get("/search")
+def search_etfs(
+    q: str = Query(..., min_length=1, description="ISIN, ticker ou nom (partiel, fautes de frappe tolérées)"),
+    limit: int = Query(10, ge=1, le=100, description="Nombre de résultats"),
+    offset: int = Query(0, ge=0, description="Nombre de résultats à sauter"),
+    enveloppe_type: Optional[str] = Query(None, description="Uniquement les ETFs éligibles à cette enveloppe"),
+    classe_actif: Optional[str] = Query(None, description="Filtre par classe d'actif")
+):
+    """
+    Recherche d'ETFs pour l'autocomplétion.
     
-    # Filtre TER
-    if min_ter is not None:
-        etfs = [etf for etf in etfs if etf.ter >= min_ter]
-    if max_ter is not None:
-        etfs = [etf for etf in etfs if etf.ter <= max_ter]
+    Préfixes d'ISIN et de ticker, noms tolérants aux fautes de frappe
+    (index de trigrammes). Résultats classés par pertinence puis paginés.
+    """
+    env_type = None
+    if enveloppe_type:
+        try:
+            env_type = EnveloppeType(enveloppe_type)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Type d'enveloppe invalide: {enveloppe_type}")
     
-    return etfs
+    recherche = EligibilityService.rechercher_etfs(
+        q, limite=limit, decalage=offset, enveloppe_type=env_type, classe_actif=classe_actif
+    )
+    
+    return {
+        "success": True,
+        "query": q,
+        "total": recherche["total"],
+        "limit": limit,
+        "offset": offset,
+        "resultats": recherche["resultats"]
+    }
 
 
 @router.get("/{isin}", response_model=ETF)
@@ -64,7 +89,6 @@ def get_etf_by_isin(isin: str):
     """
     Récupère les détails d'un ETF par son ISIN.
     """
-    EligibilityService.load_etf_universe()
     etf = EligibilityService.get_etf_by_isin(isin)
     
     if not etf:
@@ -140,8 +164,7 @@ def get_etf_recommendations(
     
     Profils: defensif, equilibre, dynamique, agressif
     """
-    EligibilityService.load_etf_universe()
-    etfs = list(EligibilityService._etf_cache.values())
+    etfs = EligibilityService.get_index().etfs
     
     # Filtre par enveloppe si spécifié
     if enveloppe_type:
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Dict, List
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
@@ -11,6 +11,7 @@ from optimization.lifecycle_investing import LifecycleInvestor, StrategieGlidePa
 from optimization.rebalancing import RebalancingEngine
 from optimization.withdrawal import WithdrawalOptimizer
 from optimization.tax_loss_harvesting import TaxLossHarvester
+from analytics.decumulation import SimulateurDecumulation, RegleRetrait, TypeRegleRetrait
 
 router = APIRouter()
 
@@ -43,6 +44,34 @@ class WithdrawalRequest(BaseModel):
     tmi: float
 
 
+class RegleRetraitRequest(BaseModel):
+    type: TypeRegleRetrait
+    taux: float = 0.04
+    seuil_garde_fou: float = 0.20  # Guyton-Klinger
+    ajustement: float = 0.10  # Guyton-Klinger
+    plafond: float = 0.05  # Plancher-plafond
+    plancher: float = 0.025  # Plancher-plafond
+    nom: Optional[str] = None
+
+
+class DecumulationRequest(BaseModel):
+    valeur_initiale: float
+    regles: List[RegleRetraitRequest]
+    nb_annees: int = 30
+    nb_simulations: int = 10000
+    rendement_moyen_annuel: float = 0.05
+    volatilite_annuelle: float = 0.12
+    inflation: float = 0.02
+    nb_workers: int = 1
+    seed: Optional[int] = 42
+    
+    @field_validator("nb_workers")
+    @classmethod
+    def borner_nb_workers(cls, nb_workers: int) -> int:
+        """Nombre de processus ramené entre 1 et le nombre de cœurs de la machine"""
+        return max(1, min(nb_workers, os.cpu_count() or 1))
+
+
 class TLHRequest(BaseModel):
     positions_cto: List[dict]
     gains_annee: float = 0
@@ -181,6 +210,42 @@ def recommandations_retrait(request: WithdrawalRequest):
         return {"success": False, "error": str(e)}
 
 
+@router.post("/withdrawal/decumulation")
+def simuler_decumulation(request: DecumulationRequest):
+    """Compare des règles de retrait dynamiques sur des scénarios Monte Carlo communs"""
+    try:
+        simulateur = SimulateurDecumulation(seed=request.seed)
+        
+        resultats = simulateur.simuler(
+            valeur_initiale=request.valeur_initiale,
+            regles=[
+                RegleRetrait(
+                    type_regle=r.type,
+                    taux=r.taux,
+                    seuil_garde_fou=r.seuil_garde_fou,
+                    ajustement=r.ajustement,
+                    plafond=r.plafond,
+                    plancher=r.plancher,
+                    nom=r.nom
+                )
+                for r in request.regles
+            ],
+            nb_annees=request.nb_annees,
+            nb_simulations=request.nb_simulations,
+            rendement_moyen_annuel=request.rendement_moyen_annuel,
+            volatilite_annuelle=request.volatilite_annuelle,
+            inflation=request.inflation,
+            nb_workers=request.nb_workers
+        )
+        
+        return {
+            "success": True,
+            "resultats": resultats
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
 @router.post("/tax-loss-harvesting")
 def analyser_tlh(request: TLHRequest):
     """Analyse les opportunités de Tax-Loss Harvesting"""
@@ -8,9 +8,22 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
 from providers.comparator import ProviderComparator
 from providers.cost_calculator import CostCalculator
 from providers.recommender import ProviderRecommender
+from utils.cache import CacheManager
+from utils.cache_partage import CacheAEtages
+from utils.single_flight import coalescer
 
 router = APIRouter()
 
+# Comparaisons déterministes (mêmes montants => même résultat): cache borné,
+# partagé entre workers
+cache_comparaisons = CacheAEtages(CacheManager(ttl_seconds=3600, max_entrees=2048, max_octets=32 * 1024 * 1024))
+
+
+@coalescer(cache_comparaisons)
+def _comparer(methode: str, **montants) -> list:
+    """Résultat d'une méthode de ProviderComparator, mis en cache par montants (appels simultanés fusionnés)"""
+    return getattr(ProviderComparator(), methode)(**montants)
+
 
 class ProfilPEA(BaseModel):
     montant_investissement: float = 10000
@@ -33,8 +46,7 @@ class ProfilPER(BaseModel):
 def comparer_pea(montant_annuel: float = 10000):
     """Compare les providers PEA"""
     try:
-        comparator = ProviderComparator()
-        comparaison = comparator.comparer_pea(montant_annuel)
+        comparaison = _comparer("comparer_pea", montant_investissement_annuel=montant_annuel)
         
         return {
             "success": True,
@@ -48,8 +60,7 @@ def comparer_pea(montant_annuel: float = 10000):
 def comparer_cto(montant_annuel: float = 10000):
     """Compare les providers CTO"""
     try:
-        comparator = ProviderComparator()
-        comparaison = comparator.comparer_cto(montant_annuel)
+        comparaison = _comparer("comparer_cto", montant_investissement_annuel=montant_annuel)
         
         return {
             "success": True,
@@ -63,8 +74,7 @@ def comparer_cto(montant_annuel: float = 10000):
 def comparer_av(montant: float = 50000):
     """Compare les contrats Assurance-Vie"""
     try:
-        comparator = ProviderComparator()
-        comparaison = comparator.comparer_av(montant)
+        comparaison = _comparer("comparer_av", montant_investi=montant)
         
         return {
             "success": True,
@@ -78,8 +88,7 @@ def comparer_av(montant: float = 50000):
 def comparer_per(montant: float = 30000):
     """Compare les PER"""
     try:
-        comparator = ProviderComparator()
-        comparaison = comparator.comparer_per(montant)
+        comparaison = _comparer("comparer_per", montant_investi=montant)
         
         return {
             "success": True,
@@ -98,8 +107,8 @@ def comparer_tous(
 ):
     """Comparaison complète de tous les providers"""
     try:
-        comparator = ProviderComparator()
-        comparaison = comparator.comparaison_complete(
+        comparaison = _comparer(
+            "comparaison_complete",
             montant_pea=montant_pea,
             montant_cto=montant_cto,
             montant_av=montant_av,
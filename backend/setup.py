@@ -18,4 +18,7 @@ setup(
         "numpy>=1.26.3",
         "scipy>=1.11.4",
     ],
+    extras_require={
+        "arrow": ["pyarrow>=14.0.1"],
+    },
 )
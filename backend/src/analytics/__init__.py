@@ -3,6 +3,7 @@ from analytics.monte_carlo import MonteCarloSimulator
 from analytics.risk_metrics import RiskMetrics
 from analytics.drawdown_analysis import DrawdownAnalyzer
 from analytics.performance import PerformanceAnalyzer
+from analytics.index_metriques import IndexMetriques
 
 __all__ = [
     "BacktestEngine",
@@ -10,4 +11,5 @@ __all__ = [
     "RiskMetrics",
     "DrawdownAnalyzer",
     "PerformanceAnalyzer",
+    "IndexMetriques",
 ]
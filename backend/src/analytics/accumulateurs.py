@@ -0,0 +1,239 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class SketchQuantiles:
+    """
+    Sketch de quantiles fusionnable à erreur relative garantie (type DDSketch).
+    
+    Chaque colonne (année de projection) possède son histogramme de buckets
+    logarithmiques: le bucket k couvre ]gamma^(k-1), gamma^k] avec
+    gamma = (1 + alpha) / (1 - alpha). Le quantile estimé est à moins de
+    alpha (en relatif) de la vraie valeur d'ordre correspondante.
+    
+    Les comptes sont entiers: la fusion de deux sketches est exacte et ne
+    dépend pas de l'ordre des lots.
+    """
+    
+    def __init__(
+        self,
+        nb_colonnes: int,
+        erreur_relative: float = 0.005,
+        valeur_min: float = 1e-6,
+        valeur_max: float = 1e15
+    ):
+        """
+        Args:
+            nb_colonnes: Nombre de colonnes suivies (ex: nb_annees + 1)
+            erreur_relative: Erreur relative maximale alpha (0.005 = 0.5%)
+            valeur_min: Plus petite valeur strictement positive indexée
+            valeur_max: Plus grande valeur indexée (au-delà: dernier bucket)
+        """
+        self.nb_colonnes = nb_colonnes
+        self.erreur_relative = erreur_relative
+        self.valeur_min = valeur_min
+        self.valeur_max = valeur_max
+        
+        self.gamma = (1 + erreur_relative) / (1 - erreur_relative)
+        self._log_gamma = np.log(self.gamma)
+        self._index_min = int(np.ceil(np.log(valeur_min) / self._log_gamma))
+        self.nb_buckets = int(np.ceil(np.log(valeur_max) / self._log_gamma)) - self._index_min + 1
+        
+        self.comptes = np.zeros((nb_colonnes, self.nb_buckets), dtype=np.int64)
+        self.comptes_zero = np.zeros(nb_colonnes, dtype=np.int64)
+        self.nb_valeurs = 0
+    
+    def ajouter(self, valeurs: np.ndarray):
+        """
+        Ajoute un lot de valeurs (nb_lignes x nb_colonnes), valeurs >= 0.
+        """
+        nb_lignes = valeurs.shape[0]
+        positives = valeurs > 0
+        
+        self.comptes_zero += nb_lignes - positives.sum(axis=0)
+        
+        lignes, colonnes = np.nonzero(positives)
+        if len(lignes) > 0:
+            v = np.clip(valeurs[lignes, colonnes], self.valeur_min, self.valeur_max)
+            index = np.ceil(np.log(v) / self._log_gamma).astype(np.int64) - self._index_min
+            np.clip(index, 0, self.nb_buckets - 1, out=index)
+            
+            index_plat = colonnes * self.nb_buckets + index
+            self.comptes += np.bincount(
+                index_plat,
+                minlength=self.nb_colonnes * self.nb_buckets
+            ).reshape(self.nb_colonnes, self.nb_buckets)
+        
+        self.nb_valeurs += nb_lignes
+    
+    def fusionner(self, autre: "SketchQuantiles"):
+        """Fusionne un autre sketch de mêmes paramètres dans celui-ci"""
+        if (autre.nb_colonnes != self.nb_colonnes or
+                autre.erreur_relative != self.erreur_relative or
+                autre.nb_buckets != self.nb_buckets):
+            raise ValueError("Sketches incompatibles (paramètres différents)")
+        
+        self.comptes += autre.comptes
+        self.comptes_zero += autre.comptes_zero
+        self.nb_valeurs += autre.nb_valeurs
+    
+    def quantiles(self, percentile: float) -> np.ndarray:
+        """
+        Estime un percentile (0-100) pour chaque colonne.
+        
+        Returns:
+            Array (nb_colonnes,) des valeurs estimées
+        """
+        if self.nb_valeurs == 0:
+            return np.zeros(self.nb_colonnes)
+        
+        rang = percentile / 100 * (self.nb_valeurs - 1)
+        
+        # Rang au-delà des zéros, rapporté aux buckets positifs
+        rang_positif = rang - self.comptes_zero
+        cumul = np.cumsum(self.comptes, axis=1)
+        index = (cumul > rang_positif[:, np.newaxis]).argmax(axis=1)
+        
+        # Représentant du bucket: milieu harmonique 2 * gamma^k / (gamma + 1)
+        k = index + self._index_min
+        estimations = 2 * np.exp(k * self._log_gamma) / (self.gamma + 1)
+        
+        return np.where(rang_positif < 0, 0.0, estimations)
+    
+    def bornes(self, estimation: np.ndarray) -> tuple:
+        """Intervalle garanti [v / (1 + alpha), v / (1 - alpha)] autour d'une estimation"""
+        return (
+            estimation / (1 + self.erreur_relative),
+            estimation / (1 - self.erreur_relative)
+        )
+
+
+class AccumulateurTrajectoires:
+    """
+    Accumule par lots les statistiques de trajectoires annuelles Monte Carlo.
+    
+    Conserve en mémoire bornée:
+    - Un sketch de quantiles par année
+    - Les compteurs succès / objectif / ruine par année
+    - Moyenne et variance par lot, min et max par année
+    
+    Toutes les fusions sont indépendantes de l'ordre: comptes entiers pour le
+    sketch et les compteurs, moments conservés par numéro de lot et combinés
+    (formule de Chan) dans l'ordre des lots. Le résultat ne dépend donc pas de
+    la répartition des lots entre workers.
+    """
+    
+    def __init__(
+        self,
+        nb_annees: int,
+        valeur_initiale: float,
+        objectif: Optional[float] = None,
+        erreur_relative: float = 0.005
+    ):
+        nb_colonnes = nb_annees + 1
+        
+        self.valeur_initiale = valeur_initiale
+        self.objectif = objectif if objectif is not None else valeur_initiale
+        self.sketch = SketchQuantiles(nb_colonnes, erreur_relative=erreur_relative)
+        
+        self.nb_maintien = np.zeros(nb_colonnes, dtype=np.int64)
+        self.nb_objectif = np.zeros(nb_colonnes, dtype=np.int64)
+        self.nb_ruine = np.zeros(nb_colonnes, dtype=np.int64)
+        
+        self.minimum = np.full(nb_colonnes, np.inf)
+        self.maximum = np.full(nb_colonnes, -np.inf)
+        
+        # {index_lot: (nb, moyenne, m2)}
+        self.moments_lots: Dict[int, tuple] = {}
+    
+    def ajouter_lot(self, trajectoires_annuelles: np.ndarray, index_lot: Optional[int] = None):
+        """
+        Ajoute un lot de trajectoires annuelles (nb_simulations_lot x nb_annees+1).
+        
+        Args:
+            trajectoires_annuelles: Valeurs annuelles du lot
+            index_lot: Numéro global du lot (défaut: lot suivant)
+        """
+        if index_lot is None:
+            index_lot = max(self.moments_lots, default=-1) + 1
+        if index_lot in self.moments_lots:
+            raise ValueError(f"Lot {index_lot} déjà agrégé")
+        
+        self.sketch.ajouter(trajectoires_annuelles)
+        
+        self.nb_maintien += np.sum(trajectoires_annuelles >= self.valeur_initiale, axis=0)
+        self.nb_objectif += np.sum(trajectoires_annuelles >= self.objectif, axis=0)
+        self.nb_ruine += np.sum(trajectoires_annuelles < self.valeur_initiale * 0.1, axis=0)
+        
+        moyenne_lot = trajectoires_annuelles.mean(axis=0)
+        self.moments_lots[index_lot] = (
+            trajectoires_annuelles.shape[0],
+            moyenne_lot,
+            ((trajectoires_annuelles - moyenne_lot) ** 2).sum(axis=0)
+        )
+        
+        self.minimum = np.minimum(self.minimum, trajectoires_annuelles.min(axis=0))
+        self.maximum = np.maximum(self.maximum, trajectoires_annuelles.max(axis=0))
+    
+    def fusionner(self, autre: "AccumulateurTrajectoires"):
+        """Fusionne un autre accumulateur (ex: calculé par un autre worker)"""
+        lots_communs = self.moments_lots.keys() & autre.moments_lots.keys()
+        if lots_communs:
+            raise ValueError(f"Lots agrégés deux fois: {sorted(lots_communs)}")
+        
+        self.sketch.fusionner(autre.sketch)
+        
+        self.nb_maintien += autre.nb_maintien
+        self.nb_objectif += autre.nb_objectif
+        self.nb_ruine += autre.nb_ruine
+        
+        self.moments_lots.update(autre.moments_lots)
+        
+        self.minimum = np.minimum(self.minimum, autre.minimum)
+        self.maximum = np.maximum(self.maximum, autre.maximum)
+    
+    def _moments(self) -> tuple:
+        """Combine les moments des lots dans l'ordre des lots (formule de Chan)"""
+        nb = 0
+        moyenne = np.zeros(self.sketch.nb_colonnes)
+        m2 = np.zeros(self.sketch.nb_colonnes)
+        
+        for index_lot in sorted(self.moments_lots):
+            nb_lot, moyenne_lot, m2_lot = self.moments_lots[index_lot]
+            nb_total = nb + nb_lot
+            delta = moyenne_lot - moyenne
+            moyenne = moyenne + delta * nb_lot / nb_total
+            m2 = m2 + m2_lot + delta ** 2 * nb * nb_lot / nb_total
+            nb = nb_total
+        
+        return nb, moyenne, m2
+    
+    @property
+    def nb(self) -> int:
+        return sum(nb_lot for nb_lot, _, _ in self.moments_lots.values())
+    
+    @property
+    def moyenne(self) -> np.ndarray:
+        return self._moments()[1]
+    
+    def ecart_type(self) -> np.ndarray:
+        """Écart-type (population) par année"""
+        nb, _, m2 = self._moments()
+        return np.sqrt(m2 / nb) if nb > 0 else np.zeros_like(m2)
+    
+    def calculer_percentiles(self, percentiles: List[int] = [10, 25, 50, 75, 90]) -> Dict[int, np.ndarray]:
+        """Percentiles estimés par année (même format que MonteCarloSimulator.calculer_percentiles)"""
+        return {p: self.sketch.quantiles(p) for p in percentiles}
+    
+    def calculer_probabilites(self) -> Dict[str, float]:
+        """Probabilités finales (même format que MonteCarloSimulator.calculer_probabilite_succes)"""
+        nb, moyenne, _ = self._moments()
+        mediane = self.sketch.quantiles(50)[-1]
+        
+        return {
+            "prob_maintien_capital": round(self.nb_maintien[-1] / nb * 100, 1),
+            "prob_atteindre_objectif": round(self.nb_objectif[-1] / nb * 100, 1),
+            "prob_ruine": round(self.nb_ruine[-1] / nb * 100, 1),
+            "valeur_mediane_finale": round(mediane, 2),
+            "valeur_moyenne_finale": round(moyenne[-1], 2)
+        }
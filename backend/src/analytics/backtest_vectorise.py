@@ -0,0 +1,396 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from analytics.backtesting import FrequenceReequilibrage
+
+
+class NoyauBacktest:
+    """
+    Noyau vectorisé de backtest d'une allocation rééquilibrée.
+    
+    Travaille sur une matrice contiguë (jours x actifs) de rendements float64.
+    Entre deux rééquilibrages les poids dérivent avec les prix: la valeur du
+    segment est V_debut * (G[t] / G[debut]) . w, où G est le produit cumulé des
+    (1 + r) par actif. Aucune boucle Python par jour ni par segment: les
+    valeurs de début de segment sont le produit cumulé des multiplicateurs de
+    fin de segment (croissance x (1 - frais x rotation)).
+    """
+    
+    # Périodes pandas des rééquilibrages calendaires
+    PERIODES = {
+        FrequenceReequilibrage.MENSUEL: "M",
+        FrequenceReequilibrage.TRIMESTRIEL: "Q",
+        FrequenceReequilibrage.ANNUEL: "Y",
+    }
+    
+    # Repli pour un index non daté (jours ouvrés)
+    PAS_JOURS = {
+        FrequenceReequilibrage.MENSUEL: 21,
+        FrequenceReequilibrage.TRIMESTRIEL: 63,
+        FrequenceReequilibrage.ANNUEL: 252,
+    }
+    
+    # Fenêtres traitées par bloc (mémoire bornée: bloc x jours x actifs)
+    TAILLE_BLOC_FENETRES = 64
+    
+    @staticmethod
+    def debuts_fenetres(index: pd.Index, frequence: FrequenceReequilibrage) -> np.ndarray:
+        """
+        Dates de départ glissantes: premier jour de chaque mois / trimestre / année.
+        
+        Args:
+            index: Dates des valeurs (un élément par jour)
+            frequence: Pas entre deux départs (JAMAIS: départ unique au premier jour)
+        
+        Returns:
+            Indices des jours de départ
+        """
+        frequence = FrequenceReequilibrage(frequence)
+        if frequence == FrequenceReequilibrage.SUR_SEUIL:
+            raise ValueError("Pas de départ calendaire requis (mensuel, trimestriel, annuel ou jamais)")
+        if frequence == FrequenceReequilibrage.JAMAIS or len(index) == 0:
+            return np.zeros(min(len(index), 1), dtype=np.int64)
+        
+        if isinstance(index, pd.DatetimeIndex):
+            periodes = index.to_period(NoyauBacktest.PERIODES[frequence]).asi8
+            return np.flatnonzero(np.concatenate(([True], periodes[1:] != periodes[:-1])))
+        
+        return np.arange(0, len(index), NoyauBacktest.PAS_JOURS[frequence])
+    
+    @staticmethod
+    def masque_reequilibrage(index: pd.Index, frequence: FrequenceReequilibrage) -> np.ndarray:
+        """
+        Jours de rééquilibrage: dernier jour de chaque mois / trimestre / année.
+        
+        Args:
+            index: Dates des rendements (un élément par jour)
+            frequence: Fréquence de rééquilibrage
+        
+        Returns:
+            Array booléen (nb_jours,), True si rééquilibrage à la clôture du jour
+        """
+        frequence = FrequenceReequilibrage(frequence)
+        masque = np.zeros(len(index), dtype=bool)
+        
+        if frequence in (FrequenceReequilibrage.JAMAIS, FrequenceReequilibrage.SUR_SEUIL) or len(index) < 2:
+            return masque
+        
+        if isinstance(index, pd.DatetimeIndex):
+            periodes = index.to_period(NoyauBacktest.PERIODES[frequence]).asi8
+            masque[:-1] = periodes[1:] != periodes[:-1]
+        else:
+            pas = NoyauBacktest.PAS_JOURS[frequence]
+            masque[pas - 1:-1:pas] = True
+        
+        return masque
+    
+    @staticmethod
+    def masque_bandes(
+        rendements: np.ndarray,
+        poids: np.ndarray,
+        tolerance_pct: float,
+        controles: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Rééquilibrages sur bande de tolérance (même règle que RebalancingEngine.besoin_reequilibrage).
+        
+        Après chaque remise à la cible, les poids dérivés sont évalués en bloc
+        sur les jours suivants; le premier jour de contrôle où un écart dépasse
+        strictement la tolérance déclenche le rééquilibrage suivant. Le coût
+        est proportionnel au nombre de rééquilibrages, pas au nombre de jours.
+        
+        Args:
+            rendements: Rendements quotidiens (nb_jours x nb_actifs)
+            poids: Poids cibles (nb_actifs,), somme 1
+            tolerance_pct: Écart maximal toléré par actif, en points de pourcentage
+            controles: Masque (nb_jours,) des jours où la bande est contrôlée (défaut: tous)
+        
+        Returns:
+            Array booléen (nb_jours,), True si rééquilibrage à la clôture du jour
+        """
+        rendements = np.ascontiguousarray(rendements, dtype=np.float64)
+        poids = np.asarray(poids, dtype=np.float64)
+        nb_jours = rendements.shape[0]
+        masque = np.zeros(nb_jours, dtype=bool)
+        if controles is None:
+            controles = np.ones(nb_jours, dtype=bool)
+        
+        croissances = np.empty((nb_jours + 1, rendements.shape[1]))
+        croissances[0] = 1.0
+        np.cumprod(rendements + 1.0, axis=0, out=croissances[1:])
+        
+        tolerance = tolerance_pct / 100
+        reference = 0  # Indice de valeur de la dernière remise à la cible
+        debut = 1
+        taille = 256
+        
+        while debut <= nb_jours:
+            fin = min(debut + taille, nb_jours + 1)
+            relatives = croissances[debut:fin] / croissances[reference]
+            derives = relatives * poids / (relatives @ poids)[:, np.newaxis]
+            depassements = (np.abs(derives - poids).max(axis=1) > tolerance) & controles[debut - 1:fin - 1]
+            
+            if depassements.any():
+                jour = debut + int(np.argmax(depassements))
+                masque[jour - 1] = True
+                reference, debut, taille = jour, jour + 1, 256
+            else:
+                debut, taille = fin, taille * 2
+        
+        return masque
+    
+    @staticmethod
+    def plan_reequilibrage(
+        index: pd.Index,
+        rendements: np.ndarray,
+        poids: np.ndarray,
+        frequence: FrequenceReequilibrage,
+        tolerance_pct: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Calendrier des rééquilibrages d'une allocation.
+        
+        - Sans tolérance: fins de mois / trimestre / année du calendrier réel
+        - Avec tolérance: bande contrôlée à ces mêmes dates (sur_seuil: chaque jour)
+        
+        Args:
+            index: Dates des rendements (un élément par jour)
+            rendements: Rendements quotidiens (nb_jours x nb_actifs)
+            poids: Poids cibles (nb_actifs,)
+            frequence: Fréquence de rééquilibrage ou de contrôle
+            tolerance_pct: Tolérance d'écart (points de %), None pour un rééquilibrage systématique
+        
+        Returns:
+            Array booléen (nb_jours,), True si rééquilibrage à la clôture du jour
+        """
+        frequence = FrequenceReequilibrage(frequence)
+        
+        if frequence == FrequenceReequilibrage.SUR_SEUIL:
+            if tolerance_pct is None:
+                raise ValueError("Le rééquilibrage sur seuil nécessite une tolérance (tolerance_pct)")
+            return NoyauBacktest.masque_bandes(rendements, poids, tolerance_pct)
+        
+        calendrier = NoyauBacktest.masque_reequilibrage(index, frequence)
+        if tolerance_pct is None or not calendrier.any():
+            return calendrier
+        
+        return NoyauBacktest.masque_bandes(rendements, poids, tolerance_pct, controles=calendrier)
+    
+    @staticmethod
+    def simuler(
+        rendements: np.ndarray,
+        poids: np.ndarray,
+        reequilibrages: np.ndarray,
+        frais_transaction: float = 0.0,
+        valeur_initiale: float = 100.0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Valeurs d'un portefeuille à poids dérivants, remis à la cible aux dates de rééquilibrage.
+        
+        Args:
+            rendements: Rendements quotidiens (nb_jours x nb_actifs)
+            poids: Poids cibles (nb_actifs,), somme 1
+            reequilibrages: Masque booléen (nb_jours,) des rééquilibrages
+            frais_transaction: Frais proportionnels au montant échangé
+            valeur_initiale: Valeur avant le premier jour
+        
+        Returns:
+            Dict avec valeurs (nb_jours + 1,), poids_finaux, rotations et frais par rééquilibrage
+        """
+        resultat = NoyauBacktest.simuler_lot(
+            rendements, np.asarray(poids, dtype=np.float64)[np.newaxis, :],
+            reequilibrages, frais_transaction, valeur_initiale
+        )
+        
+        return {
+            "valeurs": resultat["valeurs"][:, 0],
+            "poids_finaux": resultat["poids_finaux"][0],
+            "rotations": resultat["rotations"][:, 0],
+            "frais": resultat["frais"][:, 0]
+        }
+    
+    @staticmethod
+    def simuler_lot(
+        rendements: np.ndarray,
+        poids: np.ndarray,
+        reequilibrages: np.ndarray,
+        frais_transaction: float = 0.0,
+        valeur_initiale: float = 100.0
+    ) -> Dict[str, np.ndarray]:
+        """
+        Simule K allocations en une passe sur la même matrice de rendements.
+        
+        Les croissances cumulées par actif sont calculées une fois; chaque
+        courbe de valeur est ensuite un produit matriciel avec la matrice des
+        poids (nb_actifs x K).
+        
+        Args:
+            rendements: Rendements quotidiens (nb_jours x nb_actifs)
+            poids: Poids cibles (K x nb_actifs), chaque ligne de somme 1
+            reequilibrages: Masque booléen (nb_jours,) des rééquilibrages
+            frais_transaction: Frais proportionnels au montant échangé
+            valeur_initiale: Valeur avant le premier jour
+        
+        Returns:
+            Dict avec valeurs (nb_jours + 1, K), poids_finaux (K x nb_actifs),
+            rotations et frais payés (nb_reequilibrages x K)
+        """
+        rendements = np.ascontiguousarray(rendements, dtype=np.float64)
+        poids = np.atleast_2d(np.asarray(poids, dtype=np.float64))
+        nb_jours = rendements.shape[0]
+        
+        # Croissances cumulées, ligne 0 = valeur initiale
+        croissances = np.empty((nb_jours + 1, rendements.shape[1]))
+        croissances[0] = 1.0
+        np.cumprod(rendements + 1.0, axis=0, out=croissances[1:])
+        
+        # Débuts de segment (indices dans croissances) et segment de chaque ligne
+        fins = np.flatnonzero(reequilibrages[:nb_jours]) + 1
+        debuts = np.concatenate(([0], fins))
+        segments = np.repeat(np.arange(len(debuts)), np.diff(np.append(debuts, nb_jours + 1)))
+        
+        relatives = croissances / croissances[debuts][segments]
+        croissance_segment = relatives @ poids.T
+        
+        # Fin de segment: poids dérivés, rotation et frais du rééquilibrage
+        relatives_fin = croissances[fins] / croissances[debuts[:-1]]
+        croissance_fin = relatives_fin @ poids.T
+        poids_derives = relatives_fin[:, np.newaxis, :] * poids / croissance_fin[:, :, np.newaxis]
+        rotations = np.abs(poids_derives - poids).sum(axis=2)
+        
+        multiplicateurs = croissance_fin * (1 - frais_transaction * rotations)
+        valeurs_debut = valeur_initiale * np.concatenate(
+            (np.ones((1, poids.shape[0])), np.cumprod(multiplicateurs, axis=0))
+        )
+        
+        # Frais sur le notionnel échangé: valeur avant frais x taux x rotation
+        frais = valeurs_debut[1:] * frais_transaction * rotations / (1 - frais_transaction * rotations)
+        
+        valeurs = valeurs_debut[segments] * croissance_segment
+        poids_finaux = relatives[-1] * poids / croissance_segment[-1][:, np.newaxis]
+        
+        return {
+            "valeurs": valeurs,
+            "poids_finaux": poids_finaux,
+            "rotations": rotations,
+            "frais": frais
+        }
+    
+    @staticmethod
+    def simuler_fenetres(
+        rendements: np.ndarray,
+        poids: np.ndarray,
+        reequilibrages: np.ndarray,
+        debuts: np.ndarray,
+        nb_jours_fenetre: int,
+        frais_transaction: float = 0.0,
+        nb_jours_pire_periode: int = 252,
+        nb_workers: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Walk-forward: la même allocation lancée à chaque date de départ, sur un horizon fixe.
+        
+        Les rééquilibrages étant calendaires, les segments entre deux dates de
+        rééquilibrage sont communs à toutes les fenêtres: croissances cumulées,
+        valeurs de segment et multiplicateurs de fin de segment sont calculés
+        une fois sur la matrice partagée. Seul le premier segment (du départ au
+        premier rééquilibrage) est propre à chaque fenêtre. Les fenêtres sont
+        traitées par blocs, répartis sur un pool de threads.
+        
+        Args:
+            rendements: Rendements quotidiens (nb_jours x nb_actifs)
+            poids: Poids cibles (nb_actifs,), somme 1
+            reequilibrages: Masque booléen (nb_jours,) des rééquilibrages
+            debuts: Indices de valeur de départ (0 = avant le premier rendement)
+            nb_jours_fenetre: Nombre de rendements quotidiens par fenêtre
+            frais_transaction: Frais proportionnels au montant échangé
+            nb_jours_pire_periode: Durée de la sous-période glissante la plus défavorable
+            nb_workers: Threads (défaut: 1)
+        
+        Returns:
+            Dict avec, par fenêtre: multiplicateurs (valeur finale / initiale),
+            max_drawdowns et pires_periodes (fractions négatives)
+        """
+        rendements = np.ascontiguousarray(rendements, dtype=np.float64)
+        poids = np.asarray(poids, dtype=np.float64)
+        debuts = np.asarray(debuts, dtype=np.int64)
+        nb_jours = rendements.shape[0]
+        
+        if np.any(debuts + nb_jours_fenetre > nb_jours) or np.any(debuts < 0):
+            raise ValueError("Fenêtre hors de la matrice de rendements")
+        
+        croissances = np.empty((nb_jours + 1, rendements.shape[1]))
+        croissances[0] = 1.0
+        np.cumprod(rendements + 1.0, axis=0, out=croissances[1:])
+        
+        # Segments globaux entre rééquilibrages calendaires
+        fins = np.flatnonzero(reequilibrages[:nb_jours]) + 1
+        debuts_segments = np.concatenate(([0], fins))
+        segments = np.repeat(np.arange(len(debuts_segments)), np.diff(np.append(debuts_segments, nb_jours + 1)))
+        croissance_segment = (croissances / croissances[debuts_segments][segments]) @ poids
+        
+        relatives_fin = croissances[fins] / croissances[debuts_segments[:-1]]
+        croissance_fin = relatives_fin @ poids
+        rotations = np.abs(relatives_fin * poids / croissance_fin[:, np.newaxis] - poids).sum(axis=1)
+        # cumul[k] = multiplicateur du début du segment 0 au début du segment k
+        cumul = np.concatenate(([1.0], np.cumprod(croissance_fin * (1 - frais_transaction * rotations))))
+        
+        def traiter_bloc(bloc: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            """Valeurs finales, max drawdowns et pires périodes d'un bloc de fenêtres"""
+            lignes = bloc[:, np.newaxis] + np.arange(nb_jours_fenetre + 1)
+            segment_depart = segments[bloc]
+            
+            # Premier segment, propre à la fenêtre: G[t] . (w / G[depart])
+            ponderation = poids / croissances[bloc]
+            valeurs = np.einsum("fjn,fn->fj", croissances[lignes], ponderation)
+            
+            # Premier rééquilibrage après le départ, frais sur les poids dérivés
+            suivant = np.minimum(segment_depart + 1, len(debuts_segments) - 1)
+            premier_reeq = np.where(segment_depart + 1 < len(debuts_segments), debuts_segments[suivant], nb_jours + 1)
+            a_reequilibrer = premier_reeq <= bloc + nb_jours_fenetre
+            
+            if np.any(a_reequilibrer):
+                fin_premier = np.minimum(premier_reeq, nb_jours)
+                relatives = croissances[fin_premier] / croissances[bloc]
+                croissance = relatives @ poids
+                rotation = np.abs(relatives * poids / croissance[:, np.newaxis] - poids).sum(axis=1)
+                multiplicateur = croissance * (1 - frais_transaction * rotation)
+                
+                # Segments suivants: valeurs de segment globales
+                suite = multiplicateur[:, np.newaxis] * cumul[segments[lignes]] / cumul[suivant][:, np.newaxis]
+                suite *= croissance_segment[lignes]
+                valeurs = np.where(lignes >= premier_reeq[:, np.newaxis], suite, valeurs)
+            
+            maximum_courant = np.maximum.accumulate(valeurs, axis=1)
+            max_drawdowns = (valeurs / maximum_courant).min(axis=1) - 1
+            
+            if nb_jours_pire_periode <= nb_jours_fenetre:
+                pires = (valeurs[:, nb_jours_pire_periode:] / valeurs[:, :-nb_jours_pire_periode]).min(axis=1) - 1
+            else:
+                pires = valeurs[:, -1] / valeurs[:, 0] - 1
+            
+            return valeurs[:, -1], max_drawdowns, pires
+        
+        blocs = [
+            debuts[i:i + NoyauBacktest.TAILLE_BLOC_FENETRES]
+            for i in range(0, len(debuts), NoyauBacktest.TAILLE_BLOC_FENETRES)
+        ]
+        
+        nb_workers = max(1, min(nb_workers or 1, len(blocs)))
+        if nb_workers == 1:
+            resultats = [traiter_bloc(bloc) for bloc in blocs]
+        else:
+            with ThreadPoolExecutor(max_workers=nb_workers) as pool:
+                resultats = list(pool.map(traiter_bloc, blocs))
+        
+        if not resultats:
+            vide = np.empty(0)
+            return {"multiplicateurs": vide, "max_drawdowns": vide, "pires_periodes": vide}
+        
+        return {
+            "multiplicateurs": np.concatenate([r[0] for r in resultats]),
+            "max_drawdowns": np.concatenate([r[1] for r in resultats]),
+            "pires_periodes": np.concatenate([r[2] for r in resultats])
+        }
@@ -1,14 +1,17 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from enum import Enum
 
+from utils.series import sous_echantillonner, encoder_serie_compacte
+
 
 class FrequenceReequilibrage(str, Enum):
     MENSUEL = "mensuel"
     TRIMESTRIEL = "trimestriel"
     ANNUEL = "annuel"
+    SUR_SEUIL = "sur_seuil"
     JAMAIS = "jamais"
 
 
@@ -24,6 +27,9 @@ class BacktestEngine:
     - Support rééquilibrage périodique
     """
     
+    # Arrondis de la table de métriques des backtests par lot (défaut: 2)
+    DECIMALES_LOT = {"pct_annees_positives": 1, "nb_reequilibrages": 0, "frais_payes": 4}
+    
     def __init__(self):
         self.data_cache = {}
     
@@ -144,65 +150,58 @@ class BacktestEngine:
     def backtester_allocation(
         self,
         allocation: Dict[str, float],
-        prix_historiques: Dict[str, pd.Series],
+        prix_historiques: Union[Dict[str, pd.Series], pd.DataFrame],
         date_debut: Optional[str] = None,
         date_fin: Optional[str] = None,
         frequence_reequilibrage: FrequenceReequilibrage = FrequenceReequilibrage.TRIMESTRIEL,
-        frais_transaction: float = 0.001
+        frais_transaction: float = 0.001,
+        tolerance_pct: Optional[float] = None,
+        format_serie: str = "dict",
+        nb_points_max: Optional[int] = None
     ) -> dict:
         """
         Backtest complet d'une allocation.
         
         Args:
             allocation: Dict {ticker: poids%}
-            prix_historiques: Dict {ticker: Series de prix}
+            prix_historiques: Dict {ticker: Series de prix} ou DataFrame aligné (une colonne par ticker)
             date_debut: Date de début (format YYYY-MM-DD)
             date_fin: Date de fin (format YYYY-MM-DD)
-            frequence_reequilibrage: Fréquence de rééquilibrage
-            frais_transaction: Frais de transaction (%)
+            frequence_reequilibrage: Fréquence de rééquilibrage (ou de contrôle de la bande)
+            frais_transaction: Frais de transaction, proportionnels au montant échangé
+            tolerance_pct: Bande de tolérance (points de %): rééquilibrage seulement si un
+                           écart la dépasse (sur_seuil: contrôle quotidien)
+            format_serie: Format de serie_valeurs: "dict" ({date: valeur}), "compact"
+                          (début + fréquence + float32 base64) ou "serie" (pd.Series)
+            nb_points_max: Sous-échantillonnage LTTB de serie_valeurs, au moins 3 (métriques sur la série complète)
         
         Returns:
             Dict avec toutes les métriques de performance
         """
-        # Créer DataFrame de prix alignés
-        df_prix = pd.DataFrame(prix_historiques)
-        
-        if date_debut:
-            df_prix = df_prix[df_prix.index >= date_debut]
-        if date_fin:
-            df_prix = df_prix[df_prix.index <= date_fin]
-        
-        # Calculer rendements quotidiens
-        rendements = df_prix.pct_change().dropna()
-        
-        # Simuler portefeuille avec rééquilibrage
-        valeur_portefeuille = [100.0]  # Valeur initiale normalisée
-        
-        for i in range(1, len(rendements)):
-            # Rendement pondéré du jour
-            rendement_jour = sum(
-                allocation.get(ticker, 0) / 100 * rendements[ticker].iloc[i]
-                for ticker in allocation.keys()
-                if ticker in rendements.columns
-            )
-            
-            # Appliquer rendement
-            nouvelle_valeur = valeur_portefeuille[-1] * (1 + rendement_jour)
-            
-            # Simuler rééquilibrage périodique avec frais
-            if self._doit_reequilibrer(i, frequence_reequilibrage):
-                nouvelle_valeur *= (1 - frais_transaction)
-            
-            valeur_portefeuille.append(nouvelle_valeur)
+        if format_serie not in ("dict", "compact", "serie"):
+            raise ValueError(f"Format de série inconnu: {format_serie}")
+        if nb_points_max is not None and nb_points_max < 3:
+            raise ValueError("nb_points_max doit être au moins 3 (extrémités et un point intermédiaire)")
+        
+        index, rendements = self._preparer_rendements(prix_historiques, date_debut, date_fin)
+        rendements, poids = self._matrice_poids([allocation], list(prix_historiques.keys()), rendements)
+        
+        # Simuler portefeuille à poids dérivants, rééquilibré selon le calendrier réel
+        from analytics.backtest_vectorise import NoyauBacktest
+        reequilibrages = NoyauBacktest.plan_reequilibrage(
+            index[1:], rendements, poids[0], frequence_reequilibrage, tolerance_pct
+        )
+        simulation = NoyauBacktest.simuler(rendements, poids[0], reequilibrages, frais_transaction)
+        valeur_portefeuille = simulation["valeurs"]
         
         # Créer série de valeurs
-        serie_valeurs = pd.Series(valeur_portefeuille, index=df_prix.index[:len(valeur_portefeuille)])
+        serie_valeurs = pd.Series(valeur_portefeuille, index=index)
         
         # Calculer rendements du portefeuille
         rendements_ptf = serie_valeurs.pct_change().dropna()
         
         # Calculer métriques
-        nb_annees = len(df_prix) / 252
+        nb_annees = len(index) / 252
         cagr = self.calculer_cagr(100.0, valeur_portefeuille[-1], nb_annees)
         volatilite = self.calculer_volatilite(rendements_ptf)
         sharpe = self.calculer_sharpe_ratio(rendements_ptf)
@@ -220,8 +219,15 @@ class BacktestEngine:
         rendements_annuels = serie_valeurs.resample('Y').last().pct_change().dropna()
         stats_annees = self.analyser_annees(rendements_annuels)
         
+        # Série renvoyée: éventuellement réduite pour l'affichage, puis encodée
+        serie_renvoyee = sous_echantillonner(serie_valeurs, nb_points_max)
+        if format_serie == "compact":
+            serie_renvoyee = encoder_serie_compacte(serie_renvoyee)
+        elif format_serie == "dict":
+            serie_renvoyee = serie_renvoyee.to_dict()
+        
         return {
-            "valeur_finale": valeur_portefeuille[-1],
+            "valeur_finale": float(valeur_portefeuille[-1]),
             "cagr": round(cagr, 2),
             "volatilite": round(volatilite, 2),
             "sharpe_ratio": round(sharpe, 2),
@@ -234,18 +240,309 @@ class BacktestEngine:
             "pire_annee": round(stats_annees["pire_annee"], 2),
             "pct_annees_positives": round(stats_annees["pct_annees_positives"], 1),
             "nb_annees": round(nb_annees, 1),
-            "serie_valeurs": serie_valeurs.to_dict(),
+            "nb_reequilibrages": int(reequilibrages.sum()),
+            "rotation_cumulee": round(float(simulation["rotations"].sum() * 100), 2),
+            "frais_payes": round(float(simulation["frais"].sum()), 4),
+            "serie_valeurs": serie_renvoyee,
             "drawdown_details": dd_details
         }
     
-    def _doit_reequilibrer(self, jour_index: int, frequence: FrequenceReequilibrage) -> bool:
-        """Détermine si rééquilibrage nécessaire selon fréquence"""
-        if frequence == FrequenceReequilibrage.JAMAIS:
-            return False
-        elif frequence == FrequenceReequilibrage.MENSUEL:
-            return jour_index % 21 == 0  # ~21 jours ouvrés par mois
-        elif frequence == FrequenceReequilibrage.TRIMESTRIEL:
-            return jour_index % 63 == 0  # ~63 jours ouvrés par trimestre
-        elif frequence == FrequenceReequilibrage.ANNUEL:
-            return jour_index % 252 == 0  # ~252 jours ouvrés par an
-        return False
+    def backtester_allocations_lot(
+        self,
+        allocations: Dict[str, Dict[str, float]],
+        prix_historiques: Union[Dict[str, pd.Series], pd.DataFrame],
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None,
+        frequence_reequilibrage: FrequenceReequilibrage = FrequenceReequilibrage.TRIMESTRIEL,
+        frais_transaction: float = 0.001,
+        tolerance_pct: Optional[float] = None
+    ) -> dict:
+        """
+        Backtest de N allocations en une passe sur un panel de prix partagé.
+        
+        La matrice de rendements est calculée une seule fois; les courbes de
+        valeur sont obtenues par produit matriciel avec la matrice des poids
+        et les métriques sont calculées colonne par colonne en numpy. Avec une
+        bande de tolérance, les dates de rééquilibrage dépendent de chaque
+        allocation: les courbes sont alors simulées allocation par allocation.
+        
+        Args:
+            allocations: Dict {nom: {ticker: poids%}}
+            prix_historiques: Dict {ticker: Series de prix} ou DataFrame aligné (une colonne par ticker)
+            date_debut: Date de début (format YYYY-MM-DD)
+            date_fin: Date de fin (format YYYY-MM-DD)
+            frequence_reequilibrage: Fréquence de rééquilibrage (ou de contrôle de la bande)
+            frais_transaction: Frais de transaction, proportionnels au montant échangé
+            tolerance_pct: Bande de tolérance (points de %)
+        
+        Returns:
+            Dict avec nb_allocations, nb_annees et la table des métriques par allocation
+        """
+        from analytics.backtest_vectorise import NoyauBacktest
+        
+        noms = list(allocations.keys())
+        index, rendements = self._preparer_rendements(prix_historiques, date_debut, date_fin)
+        rendements, poids = self._matrice_poids(
+            [allocations[nom] for nom in noms], list(prix_historiques.keys()), rendements
+        )
+        
+        frequence_reequilibrage = FrequenceReequilibrage(frequence_reequilibrage)
+        if tolerance_pct is None and frequence_reequilibrage != FrequenceReequilibrage.SUR_SEUIL:
+            reequilibrages = NoyauBacktest.masque_reequilibrage(index[1:], frequence_reequilibrage)
+            simulation = NoyauBacktest.simuler_lot(rendements, poids, reequilibrages, frais_transaction)
+            valeurs = simulation["valeurs"]
+            nb_reequilibrages = np.full(len(noms), reequilibrages.sum())
+            frais_payes = simulation["frais"].sum(axis=0)
+        else:
+            valeurs = np.empty((len(index), len(noms)))
+            nb_reequilibrages = np.empty(len(noms))
+            frais_payes = np.empty(len(noms))
+            for k in range(len(noms)):
+                reequilibrages = NoyauBacktest.plan_reequilibrage(
+                    index[1:], rendements, poids[k], frequence_reequilibrage, tolerance_pct
+                )
+                simulation = NoyauBacktest.simuler(rendements, poids[k], reequilibrages, frais_transaction)
+                valeurs[:, k] = simulation["valeurs"]
+                nb_reequilibrages[k] = reequilibrages.sum()
+                frais_payes[k] = simulation["frais"].sum()
+        
+        nb_annees = len(index) / 252
+        metriques = self._metriques_lot(valeurs, index, nb_annees)
+        metriques["nb_reequilibrages"] = nb_reequilibrages
+        metriques["frais_payes"] = frais_payes
+        
+        return {
+            "nb_allocations": len(noms),
+            "nb_annees": round(nb_annees, 1),
+            "metriques": {
+                nom: {
+                    cle: round(float(colonne[k]), self.DECIMALES_LOT.get(cle, 2))
+                    for cle, colonne in metriques.items()
+                }
+                for k, nom in enumerate(noms)
+            }
+        }
+    
+    def backtester_walk_forward(
+        self,
+        allocation: Dict[str, float],
+        prix_historiques: Union[Dict[str, pd.Series], pd.DataFrame],
+        horizon_annees: float = 10,
+        frequence_departs: FrequenceReequilibrage = FrequenceReequilibrage.MENSUEL,
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None,
+        frequence_reequilibrage: FrequenceReequilibrage = FrequenceReequilibrage.TRIMESTRIEL,
+        frais_transaction: float = 0.001,
+        nb_workers: Optional[int] = None
+    ) -> dict:
+        """
+        Backtest walk-forward: l'allocation est lancée à chaque date de départ
+        glissante et suivie sur un horizon fixe.
+        
+        Répond à « quel aurait été le pire résultat à 10 ans historiquement »
+        en une passe sur la matrice de rendements partagée.
+        
+        Args:
+            allocation: Dict {ticker: poids%}
+            prix_historiques: Dict {ticker: Series de prix} ou DataFrame aligné
+            horizon_annees: Horizon de chaque fenêtre (années de 252 jours ouvrés)
+            frequence_departs: Pas entre deux départs (mensuel, trimestriel, annuel)
+            date_debut: Date de début de l'historique (format YYYY-MM-DD)
+            date_fin: Date de fin de l'historique (format YYYY-MM-DD)
+            frequence_reequilibrage: Fréquence de rééquilibrage
+            frais_transaction: Frais de transaction, proportionnels au montant échangé
+            nb_workers: Threads de calcul des fenêtres
+        
+        Returns:
+            Dict avec distributions de CAGR, max drawdown et pire année glissante,
+            pire / meilleure fenêtre et détail par fenêtre
+        """
+        from analytics.backtest_vectorise import NoyauBacktest
+        
+        if FrequenceReequilibrage(frequence_reequilibrage) == FrequenceReequilibrage.SUR_SEUIL:
+            raise ValueError("Le walk-forward nécessite un rééquilibrage calendaire (segments partagés)")
+        
+        index, rendements = self._preparer_rendements(prix_historiques, date_debut, date_fin)
+        rendements, poids = self._matrice_poids([allocation], list(prix_historiques.keys()), rendements)
+        
+        nb_jours_fenetre = int(round(horizon_annees * 252))
+        if nb_jours_fenetre < 1 or nb_jours_fenetre > len(rendements):
+            raise ValueError(
+                f"Historique insuffisant: {len(rendements)} jours pour un horizon de {horizon_annees} ans"
+            )
+        
+        debuts = NoyauBacktest.debuts_fenetres(index, frequence_departs)
+        debuts = debuts[debuts + nb_jours_fenetre <= len(rendements)]
+        
+        reequilibrages = NoyauBacktest.masque_reequilibrage(index[1:], frequence_reequilibrage)
+        fenetres = NoyauBacktest.simuler_fenetres(
+            rendements, poids[0], reequilibrages, debuts, nb_jours_fenetre,
+            frais_transaction=frais_transaction, nb_workers=nb_workers
+        )
+        
+        cagr = (fenetres["multiplicateurs"] ** (252 / nb_jours_fenetre) - 1) * 100
+        max_drawdowns = fenetres["max_drawdowns"] * 100
+        pires_periodes = fenetres["pires_periodes"] * 100
+        
+        dates_debut = index[debuts]
+        dates_fin = index[debuts + nb_jours_fenetre]
+        
+        def fenetre(k: int) -> dict:
+            """Détail d'une fenêtre"""
+            return {
+                "date_debut": str(dates_debut[k].date()) if hasattr(dates_debut[k], 'date') else str(dates_debut[k]),
+                "date_fin": str(dates_fin[k].date()) if hasattr(dates_fin[k], 'date') else str(dates_fin[k]),
+                "cagr": round(float(cagr[k]), 2),
+                "max_drawdown": round(float(max_drawdowns[k]), 2),
+                "pire_annee_glissante": round(float(pires_periodes[k]), 2)
+            }
+        
+        return {
+            "nb_fenetres": len(debuts),
+            "horizon_annees": horizon_annees,
+            "cagr": self._distribution(cagr),
+            "max_drawdown": self._distribution(max_drawdowns),
+            "pire_annee_glissante": self._distribution(pires_periodes),
+            "pct_fenetres_positives": round(float((cagr > 0).mean() * 100), 1),
+            "pire_fenetre": fenetre(int(np.argmin(cagr))),
+            "meilleure_fenetre": fenetre(int(np.argmax(cagr))),
+            "fenetres": [fenetre(k) for k in range(len(debuts))]
+        }
+    
+    @staticmethod
+    def _distribution(valeurs: np.ndarray) -> Dict[str, float]:
+        """Résumé d'une distribution (min, percentiles, max, moyenne)"""
+        p5, p25, p50, p75, p95 = np.percentile(valeurs, [5, 25, 50, 75, 95])
+        return {
+            "min": round(float(valeurs.min()), 2),
+            "p5": round(float(p5), 2),
+            "p25": round(float(p25), 2),
+            "p50": round(float(p50), 2),
+            "p75": round(float(p75), 2),
+            "p95": round(float(p95), 2),
+            "max": round(float(valeurs.max()), 2),
+            "moyenne": round(float(valeurs.mean()), 2)
+        }
+    
+    @staticmethod
+    def _preparer_rendements(
+        prix_historiques: Union[Dict[str, pd.Series], pd.DataFrame],
+        date_debut: Optional[str],
+        date_fin: Optional[str]
+    ) -> Tuple[pd.Index, np.ndarray]:
+        """
+        Aligne les prix et renvoie l'index des dates et la matrice (jours x actifs) des rendements.
+        
+        Un DataFrame déjà aligné (ex: fenêtre du panel de prix partagé) est
+        utilisé tel quel; les bornes de dates sont résolues par recherche
+        dichotomique sur l'index trié.
+        """
+        if isinstance(prix_historiques, pd.DataFrame):
+            df_prix = prix_historiques
+        else:
+            df_prix = pd.DataFrame(prix_historiques)
+        
+        if not df_prix.index.is_monotonic_increasing:
+            df_prix = df_prix.sort_index()
+        
+        if date_debut or date_fin:
+            debut = df_prix.index.searchsorted(pd.Timestamp(date_debut), side="left") if date_debut else 0
+            fin = df_prix.index.searchsorted(pd.Timestamp(date_fin), side="right") if date_fin else len(df_prix)
+            df_prix = df_prix.iloc[debut:fin]
+        
+        df_prix = df_prix.dropna()
+        return df_prix.index, df_prix.pct_change().to_numpy(dtype=np.float64)[1:]
+    
+    @staticmethod
+    def _matrice_poids(
+        allocations: List[Dict[str, float]],
+        tickers: List[str],
+        rendements: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Matrice des poids cibles (K x actifs).
+        
+        La part non allouée (ou allouée à un ticker sans prix) reste en
+        liquidités: une colonne de rendement nul est alors ajoutée.
+        """
+        poids = np.array([[allocation.get(ticker, 0) / 100 for ticker in tickers] for allocation in allocations])
+        liquidites = 1.0 - poids.sum(axis=1)
+        
+        if np.any(np.abs(liquidites) > 1e-12):
+            rendements = np.column_stack([rendements, np.zeros(len(rendements))])
+            poids = np.column_stack([poids, liquidites])
+        
+        return rendements, poids
+    
+    def _metriques_lot(self, valeurs: np.ndarray, index: pd.Index, nb_annees: float) -> Dict[str, np.ndarray]:
+        """
+        Métriques de performance par colonne d'une matrice de valeurs (jours x K).
+        
+        Mêmes définitions que les calculs unitaires (écart-type non biaisé,
+        percentile linéaire, drawdown sur le maximum courant).
+        """
+        rendements = valeurs[1:] / valeurs[:-1] - 1
+        nb_jours = len(rendements)
+        taux_sans_risque = 0.02
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cagr = np.where(
+                nb_annees > 0, ((valeurs[-1] / valeurs[0]) ** (1 / nb_annees) - 1) * 100, 0.0
+            )
+            
+            moyenne = rendements.mean(axis=0) * 252
+            ecart_type = rendements.std(axis=0, ddof=1) * np.sqrt(252)
+            volatilite = ecart_type * 100
+            sharpe = np.where(ecart_type > 0, (moyenne - taux_sans_risque) / ecart_type, 0.0)
+            
+            # Downside deviation: écart-type des seuls rendements négatifs
+            negatifs = rendements < 0
+            nb_negatifs = negatifs.sum(axis=0)
+            somme = np.where(negatifs, rendements, 0.0).sum(axis=0)
+            moyenne_negatifs = somme / nb_negatifs
+            ecarts = np.where(negatifs, rendements - moyenne_negatifs, 0.0)
+            downside = np.sqrt((ecarts ** 2).sum(axis=0) / (nb_negatifs - 1)) * np.sqrt(252)
+            sortino = np.where(
+                nb_negatifs == 0, np.inf,
+                np.where(downside > 0, (moyenne - taux_sans_risque) / downside, 0.0)
+            )
+            
+            # Maximum drawdown sur le maximum courant
+            maximum_courant = np.maximum.accumulate(valeurs, axis=0)
+            max_dd = ((valeurs - maximum_courant) / maximum_courant).min(axis=0) * 100
+            calmar = np.where(max_dd != 0, np.abs(cagr / max_dd), 0.0)
+            
+            # VaR / CVaR 95%
+            seuil = np.percentile(rendements, 5, axis=0)
+            pires = rendements <= seuil
+            var_95 = seuil * 100
+            cvar_95 = np.where(pires, rendements, 0.0).sum(axis=0) / pires.sum(axis=0) * 100
+        
+        if nb_jours < 2:
+            volatilite = sharpe = sortino = var_95 = cvar_95 = np.zeros(valeurs.shape[1])
+        
+        # Analyse par année
+        rendements_annuels = (
+            pd.DataFrame(valeurs, index=index).resample('Y').last().pct_change().dropna().to_numpy()
+        )
+        if len(rendements_annuels) > 0:
+            meilleure_annee = rendements_annuels.max(axis=0) * 100
+            pire_annee = rendements_annuels.min(axis=0) * 100
+            pct_annees_positives = (rendements_annuels > 0).mean(axis=0) * 100
+        else:
+            meilleure_annee = pire_annee = pct_annees_positives = np.zeros(valeurs.shape[1])
+        
+        return {
+            "valeur_finale": valeurs[-1],
+            "cagr": cagr,
+            "volatilite": volatilite,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+            "calmar_ratio": calmar,
+            "max_drawdown": max_dd,
+            "var_95": var_95,
+            "cvar_95": cvar_95,
+            "meilleure_annee": meilleure_annee,
+            "pire_annee": pire_annee,
+            "pct_annees_positives": pct_annees_positives
+        }
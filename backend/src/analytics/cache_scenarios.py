@@ -0,0 +1,171 @@
+import numpy as np
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+
+class CacheScenarios:
+    """
+    Cache LRU de scénarios de rendements simulés, borné en octets.
+    
+    Permet les nombres aléatoires communs: des simulations qui ne diffèrent que
+    par les flux (apports, retraits, objectif) réutilisent exactement les mêmes
+    tirages, ce qui réduit la variance des comparaisons et évite de régénérer.
+    
+    Une matrice plus grande que le budget n'est pas conservée: on stocke à la
+    place l'état compact du générateur (quelques centaines d'octets), qui
+    permet de reproduire les mêmes tirages à la demande. Pour ces scénarios,
+    generateur() évite de construire la matrice: l'appelant tire les blocs au
+    fil de l'eau depuis un générateur repositionné sur cet état.
+    """
+    
+    # Taille forfaitaire comptée pour un état de générateur
+    TAILLE_ETAT_COMPACT = 512
+    
+    def __init__(self, budget_octets: int = 256 * 1024 * 1024):
+        """
+        Args:
+            budget_octets: Taille maximale cumulée des matrices en cache
+        """
+        self.budget_octets = budget_octets
+        self._entrees: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._octets = 0
+        self._verrou = threading.Lock()
+        
+        self.hits = 0
+        self.hits_compacts = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def obtenir_ou_generer(
+        self,
+        cle: Hashable,
+        seed: int,
+        generer: Callable[[np.random.Generator], np.ndarray]
+    ) -> Tuple[np.ndarray, bool]:
+        """
+        Retourne la matrice de scénarios associée à la clé.
+        
+        Args:
+            cle: Clé du scénario (doit inclure la seed)
+            seed: Graine du générateur si la matrice doit être (re)générée
+            generer: Fonction tirant la matrice à partir d'un générateur neuf
+        
+        Returns:
+            Tuple (matrice en lecture seule, True si servie depuis le cache)
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None:
+                self._entrees.move_to_end(cle)
+                if isinstance(entree, np.ndarray):
+                    self.hits += 1
+                    return entree, True
+                self.hits_compacts += 1
+            else:
+                self.misses += 1
+        
+        if entree is not None:
+            # Entrée compacte: régénérer les mêmes tirages depuis l'état sauvegardé
+            rng = np.random.default_rng()
+            rng.bit_generator.state = entree
+            matrice = generer(rng)
+            matrice.setflags(write=False)
+            return matrice, True
+        
+        rng = np.random.default_rng(seed)
+        etat_initial = rng.bit_generator.state
+        matrice = generer(rng)
+        matrice.setflags(write=False)
+        
+        self._stocker(cle, matrice, etat_initial)
+        return matrice, False
+    
+    def tient_dans_budget(self, nb_octets: int) -> bool:
+        """Indique si une matrice de nb_octets peut être conservée en cache"""
+        return nb_octets <= self.budget_octets
+    
+    def generateur(self, cle: Hashable, seed: int) -> Tuple[np.random.Generator, bool]:
+        """
+        Générateur neuf positionné au début des tirages d'un scénario, sans matrice.
+        
+        Pour les scénarios hors budget: seul l'état compact du générateur est
+        conservé, l'appelant tire ensuite les blocs un par un (mêmes tirages
+        que la matrice complète remplie dans l'ordre).
+        
+        Args:
+            cle: Clé du scénario (doit inclure la seed)
+            seed: Graine du générateur si l'état n'est pas en cache
+        
+        Returns:
+            Tuple (générateur, True si l'état était en cache)
+        """
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if isinstance(entree, dict):
+                self._entrees.move_to_end(cle)
+                self.hits_compacts += 1
+            else:
+                entree = None
+                self.misses += 1
+        
+        rng = np.random.default_rng(seed)
+        if entree is not None:
+            rng.bit_generator.state = entree
+            return rng, True
+        
+        if self.TAILLE_ETAT_COMPACT <= self.budget_octets:
+            self._inserer(cle, rng.bit_generator.state, self.TAILLE_ETAT_COMPACT)
+        return rng, False
+    
+    def _stocker(self, cle: Hashable, matrice: np.ndarray, etat_initial: dict):
+        if matrice.nbytes <= self.budget_octets:
+            entree, taille = matrice, matrice.nbytes
+        elif self.TAILLE_ETAT_COMPACT <= self.budget_octets:
+            entree, taille = etat_initial, self.TAILLE_ETAT_COMPACT
+        else:
+            return
+        self._inserer(cle, entree, taille)
+    
+    def _inserer(self, cle: Hashable, entree: object, taille: int):
+        with self._verrou:
+            ancienne = self._entrees.pop(cle, None)
+            if ancienne is not None:
+                self._octets -= self._taille(ancienne)
+            
+            self._entrees[cle] = entree
+            self._octets += taille
+            
+            while self._octets > self.budget_octets:
+                _, evincee = self._entrees.popitem(last=False)
+                self._octets -= self._taille(evincee)
+                self.evictions += 1
+    
+    def _taille(self, entree: object) -> int:
+        return entree.nbytes if isinstance(entree, np.ndarray) else self.TAILLE_ETAT_COMPACT
+    
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)"""
+        with self._verrou:
+            self._entrees.clear()
+            self._octets = 0
+    
+    def __len__(self) -> int:
+        return len(self._entrees)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Compteurs du cache"""
+        with self._verrou:
+            return {
+                "hits": self.hits,
+                "hits_compacts": self.hits_compacts,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "nb_entrees": len(self._entrees),
+                "octets": self._octets,
+                "budget_octets": self.budget_octets
+            }
+
+
+# Instance partagée par les routes Monte Carlo
+cache_scenarios = CacheScenarios()
@@ -0,0 +1,386 @@
+import numpy as np
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from analytics.accumulateurs import SketchQuantiles
+from analytics.generateurs_rendements import GenerateurRendements
+
+
+class TypeRegleRetrait(str, Enum):
+    FIXE = "fixe"  # Montant initial indexé sur l'inflation (règle des 4%)
+    POURCENTAGE_CONSTANT = "pourcentage_constant"
+    GUYTON_KLINGER = "guyton_klinger"
+    PLANCHER_PLAFOND = "plancher_plafond"
+
+
+class RegleRetrait:
+    """
+    Règle de retrait annuel en phase de décumulation.
+    
+    - FIXE: retrait initial (taux x capital) indexé chaque année sur l'inflation
+    - POURCENTAGE_CONSTANT: taux x valeur du portefeuille en début d'année
+    - GUYTON_KLINGER: retrait indexé avec garde-fous; pas d'indexation après
+      une année négative si le taux courant dépasse le taux initial, baisse de
+      `ajustement` si le taux courant dépasse taux x (1 + seuil_garde_fou),
+      hausse de `ajustement` s'il passe sous taux x (1 - seuil_garde_fou)
+    - PLANCHER_PLAFOND: taux x valeur, borné d'une année sur l'autre (en
+      termes réels) entre -plancher et +plafond
+    """
+    
+    def __init__(
+        self,
+        type_regle: TypeRegleRetrait,
+        taux: float = 0.04,
+        seuil_garde_fou: float = 0.20,
+        ajustement: float = 0.10,
+        plafond: float = 0.05,
+        plancher: float = 0.025,
+        nom: Optional[str] = None
+    ):
+        """
+        Args:
+            type_regle: Type de règle
+            taux: Taux de retrait initial (décimal, ex: 0.04)
+            seuil_garde_fou: Écart relatif au taux initial déclenchant un garde-fou (Guyton-Klinger)
+            ajustement: Baisse / hausse appliquée par un garde-fou (Guyton-Klinger)
+            plafond: Hausse réelle maximale d'une année sur l'autre (plancher-plafond)
+            plancher: Baisse réelle maximale d'une année sur l'autre (plancher-plafond)
+            nom: Libellé de la règle dans les résultats
+        """
+        self.type_regle = TypeRegleRetrait(type_regle)
+        self.taux = taux
+        self.seuil_garde_fou = seuil_garde_fou
+        self.ajustement = ajustement
+        self.plafond = plafond
+        self.plancher = plancher
+        self.nom = nom or f"{self.type_regle.value}_{taux * 100:g}%"
+
+
+class SimulateurDecumulation:
+    """
+    Simulation Monte Carlo de la phase de retraits (risque de séquence).
+    
+    Toutes les règles sont évaluées sur les mêmes scénarios de marché, dans
+    des matrices (nb_regles x nb_trajectoires): chaque famille de règles est
+    mise à jour sur ses lignes, et les garde-fous par des masques booléens,
+    sans branchement par trajectoire. Le calcul est annuel (retrait en début
+    d'année puis rendement de l'année).
+    
+    Les trajectoires sont traitées par lots (graines SeedSequence) et les
+    statistiques agrégées dans des accumulateurs fusionnables: mémoire bornée
+    et résultat identique quel que soit le nombre de workers.
+    """
+    
+    TAILLE_LOT_DEFAUT = 100000
+    
+    # Baisse du retrait réel (vs retrait initial) considérée comme un échec de niveau de vie
+    SEUIL_BAISSE_RETRAIT = 0.75
+    
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+    
+    def simuler(
+        self,
+        valeur_initiale: float,
+        regles: List[RegleRetrait],
+        nb_annees: int = 30,
+        nb_simulations: int = 10000,
+        rendement_moyen_annuel: float = 0.05,
+        volatilite_annuelle: float = 0.12,
+        inflation: float = 0.02,
+        generateur: Optional[GenerateurRendements] = None,
+        taille_lot: Optional[int] = None,
+        nb_workers: int = 1
+    ) -> Dict[str, any]:
+        """
+        Compare des règles de retrait sur des scénarios de marché communs.
+        
+        Args:
+            valeur_initiale: Capital en début de retraite
+            regles: Règles de retrait à comparer
+            nb_annees: Durée de la phase de retraits
+            nb_simulations: Nombre de trajectoires
+            rendement_moyen_annuel: Espérance du rendement annuel (décimal)
+            volatilite_annuelle: Volatilité annuelle (décimal)
+            inflation: Inflation annuelle (indexation des retraits)
+            generateur: Générateur de rendements mensuels (optionnel); par défaut
+                rendement annuel lognormal de mêmes espérance et volatilité
+            taille_lot: Trajectoires par lot (défaut TAILLE_LOT_DEFAUT)
+            nb_workers: Nombre de processus
+        
+        Returns:
+            Dict {nom_regle: statistiques} et paramètres
+        
+        Raises:
+            ValueError: Aucune règle, ou noms de règles en double
+        """
+        if not regles:
+            raise ValueError("Au moins une règle de retrait est requise")
+        _verifier_noms_uniques([regle.nom for regle in regles])
+        
+        taille_lot = taille_lot or self.TAILLE_LOT_DEFAUT
+        nb_lots = -(-nb_simulations // taille_lot)
+        graines = np.random.SeedSequence(self.seed).spawn(nb_lots)
+        
+        lots = [
+            (index_lot, min(taille_lot, nb_simulations - index_lot * taille_lot), graines[index_lot])
+            for index_lot in range(nb_lots)
+        ]
+        
+        parametres = {
+            "valeur_initiale": valeur_initiale,
+            "regles": regles,
+            "nb_annees": nb_annees,
+            "rendement_moyen_annuel": rendement_moyen_annuel,
+            "volatilite_annuelle": volatilite_annuelle,
+            "inflation": inflation,
+            "generateur": generateur,
+            "seuil_baisse_retrait": self.SEUIL_BAISSE_RETRAIT
+        }
+        
+        nb_workers = max(1, min(nb_workers, nb_lots))
+        if nb_workers == 1:
+            accumulateur = _simuler_lots_decumulation(parametres, lots)
+        else:
+            repartition = [list(groupe) for groupe in np.array_split(np.arange(nb_lots), nb_workers)]
+            with ProcessPoolExecutor(max_workers=nb_workers) as pool:
+                partiels = list(pool.map(
+                    _simuler_lots_decumulation,
+                    [parametres] * nb_workers,
+                    [[lots[i] for i in groupe] for groupe in repartition]
+                ))
+            accumulateur = partiels[0]
+            for partiel in partiels[1:]:
+                accumulateur.fusionner(partiel)
+        
+        return {
+            "parametres": {
+                "valeur_initiale": valeur_initiale,
+                "nb_annees": nb_annees,
+                "nb_simulations": nb_simulations,
+                "rendement_moyen_annuel": rendement_moyen_annuel * 100,
+                "volatilite_annuelle": volatilite_annuelle * 100,
+                "inflation": inflation * 100
+            },
+            "regles": accumulateur.resultats()
+        }
+
+
+def _verifier_noms_uniques(noms: List[str]) -> None:
+    """Les noms de règles sont les clés des résultats: un doublon en écraserait un autre"""
+    doublons = sorted({nom for nom in noms if noms.count(nom) > 1})
+    if doublons:
+        raise ValueError(f"Noms de règles de retrait en double: {doublons}")
+
+
+class AccumulateurDecumulation:
+    """
+    Statistiques fusionnables par règle: compteurs et sketch de quantiles
+    (colonnes: valeur finale, retraits cumulés réels, retrait réel minimal).
+    """
+    
+    NB_MESURES = 3
+    
+    def __init__(self, noms: List[str]):
+        """
+        Args:
+            noms: Noms des règles, dans l'ordre des lignes (uniques: clés des résultats)
+        
+        Raises:
+            ValueError: Noms de règles en double
+        """
+        _verifier_noms_uniques(noms)
+        
+        self.noms = list(noms)
+        nb_regles = len(noms)
+        self.nb_regles = nb_regles
+        self.nb = 0
+        self.nb_succes = np.zeros(nb_regles, dtype=np.int64)
+        self.nb_baisse_retrait = np.zeros(nb_regles, dtype=np.int64)
+        self.sketch = SketchQuantiles(nb_regles * self.NB_MESURES)
+    
+    def ajouter(
+        self,
+        valeurs_finales: np.ndarray,
+        retraits_cumules: np.ndarray,
+        retrait_minimal: np.ndarray,
+        succes: np.ndarray,
+        baisse_retrait: np.ndarray
+    ):
+        """Ajoute un lot (tableaux nb_regles x nb_trajectoires)"""
+        self.nb += valeurs_finales.shape[1]
+        self.nb_succes += succes.sum(axis=1)
+        self.nb_baisse_retrait += baisse_retrait.sum(axis=1)
+        self.sketch.ajouter(np.concatenate([valeurs_finales, retraits_cumules, retrait_minimal]).T)
+    
+    def fusionner(self, autre: "AccumulateurDecumulation"):
+        self.nb += autre.nb
+        self.nb_succes += autre.nb_succes
+        self.nb_baisse_retrait += autre.nb_baisse_retrait
+        self.sketch.fusionner(autre.sketch)
+    
+    def resultats(self) -> Dict[str, dict]:
+        """Statistiques par règle"""
+        quantiles = {p: self.sketch.quantiles(p).reshape(self.NB_MESURES, self.nb_regles) for p in (10, 50, 90)}
+        
+        resultats = {}
+        for i, nom in enumerate(self.noms):
+            resultats[nom] = {
+                "prob_succes": round(self.nb_succes[i] / self.nb * 100, 1),
+                "prob_baisse_retrait": round(self.nb_baisse_retrait[i] / self.nb * 100, 1),
+                "valeur_finale": {f"p{p}": round(q[0, i], 2) for p, q in quantiles.items()},
+                "retraits_cumules_reels": {f"p{p}": round(q[1, i], 2) for p, q in quantiles.items()},
+                "retrait_reel_minimal": {f"p{p}": round(q[2, i], 2) for p, q in quantiles.items()}
+            }
+        
+        return resultats
+
+
+def _tirer_croissances(
+    parametres: dict,
+    rng: np.random.Generator,
+    nb_simulations: int,
+    etat=None
+) -> Tuple[np.ndarray, object]:
+    """Facteurs de croissance annuels (nb_simulations,) d'une année"""
+    generateur = parametres["generateur"]
+    
+    if generateur is not None:
+        rendements, etat = generateur.tirer_bloc(rng, nb_simulations, 12, etat)
+        rendements += 1.0
+        np.maximum(rendements, 0.0, out=rendements)
+        return rendements.prod(axis=1), etat
+    
+    # Lognormale: E[G] = 1 + mu, écart-type de G = sigma
+    mu = parametres["rendement_moyen_annuel"]
+    sigma = parametres["volatilite_annuelle"]
+    s2 = np.log(1 + sigma ** 2 / (1 + mu) ** 2)
+    croissances = rng.standard_normal(nb_simulations)
+    croissances *= np.sqrt(s2)
+    croissances += np.log(1 + mu) - s2 / 2
+    return np.exp(croissances, out=croissances), None
+
+
+def _simuler_lots_decumulation(
+    parametres: dict,
+    lots: List[Tuple[int, int, np.random.SeedSequence]]
+) -> AccumulateurDecumulation:
+    """
+    Simule une liste de lots (index, taille, graine) pour toutes les règles.
+    
+    Les lignes sont regroupées par famille de règles (tranches contiguës):
+    chaque mise à jour travaille sur des vues, sans copie.
+    Fonction de module pour pouvoir être exécutée dans un processus worker.
+    """
+    regles = parametres["regles"]
+    nb_regles = len(regles)
+    accumulateur = AccumulateurDecumulation([regle.nom for regle in regles])
+    
+    # Ordre interne: règles triées par famille; ordre_origine[i] = ligne de la règle i
+    familles = list(TypeRegleRetrait)
+    ordre = sorted(range(nb_regles), key=lambda i: familles.index(regles[i].type_regle))
+    ordre_origine = np.argsort(ordre)
+    regles_triees = [regles[i] for i in ordre]
+    
+    tranches = {}
+    debut = 0
+    for famille in familles:
+        fin = debut + sum(1 for regle in regles_triees if regle.type_regle == famille)
+        tranches[famille] = slice(debut, fin)
+        debut = fin
+    
+    def colonne(attribut: str, famille: TypeRegleRetrait) -> np.ndarray:
+        return np.array(
+            [getattr(regle, attribut) for regle in regles_triees[tranches[famille]]], dtype=float
+        )[:, np.newaxis]
+    
+    taux = np.array([regle.taux for regle in regles_triees])[:, np.newaxis]
+    
+    pct = tranches[TypeRegleRetrait.POURCENTAGE_CONSTANT]
+    
+    gk = tranches[TypeRegleRetrait.GUYTON_KLINGER]
+    taux_gk = taux[gk]
+    borne_haute_gk = taux_gk * (1 + colonne("seuil_garde_fou", TypeRegleRetrait.GUYTON_KLINGER))
+    borne_basse_gk = taux_gk * (1 - colonne("seuil_garde_fou", TypeRegleRetrait.GUYTON_KLINGER))
+    ajustement_gk = colonne("ajustement", TypeRegleRetrait.GUYTON_KLINGER)
+    
+    pp = tranches[TypeRegleRetrait.PLANCHER_PLAFOND]
+    plancher_pp = 1 - colonne("plancher", TypeRegleRetrait.PLANCHER_PLAFOND)
+    plafond_pp = 1 + colonne("plafond", TypeRegleRetrait.PLANCHER_PLAFOND)
+    
+    valeur_initiale = parametres["valeur_initiale"]
+    indexation = 1 + parametres["inflation"]
+    
+    for _, nb_lot, graine in lots:
+        rng = np.random.default_rng(graine)
+        
+        valeurs = np.full((nb_regles, nb_lot), float(valeur_initiale))
+        retraits = np.repeat(taux * valeur_initiale, nb_lot, axis=1)
+        verses = np.empty((nb_regles, nb_lot))
+        retraits_cumules = np.zeros((nb_regles, nb_lot))
+        retrait_minimal = np.full((nb_regles, nb_lot), np.inf)
+        succes = np.ones((nb_regles, nb_lot), dtype=bool)
+        croissances_precedentes = None
+        etat = None
+        
+        for annee in range(parametres["nb_annees"]):
+            if annee > 0:
+                retraits_precedents_gk = retraits[gk].copy()
+                
+                # Fixe (et base des autres règles): indexation sur l'inflation
+                retraits *= indexation
+                
+                # Pourcentage constant: sur la valeur courante
+                np.multiply(valeurs[pct], taux[pct], out=retraits[pct])
+                
+                if gk.stop > gk.start:
+                    valeurs_gk = valeurs[gk]
+                    retraits_gk = retraits[gk]
+                    taux_courant = np.divide(
+                        retraits_gk, valeurs_gk,
+                        out=np.full_like(retraits_gk, np.inf), where=valeurs_gk > 0
+                    )
+                    
+                    # Pas d'indexation après une année négative si le taux courant dépasse le taux initial
+                    gel = (croissances_precedentes < 1.0) & (taux_courant > taux_gk)
+                    np.copyto(retraits_gk, retraits_precedents_gk, where=gel)
+                    np.divide(taux_courant, indexation, out=taux_courant, where=gel)
+                    
+                    # Garde-fous: préservation du capital / prospérité
+                    retraits_gk *= np.where(
+                        taux_courant > borne_haute_gk, 1 - ajustement_gk,
+                        np.where(taux_courant < borne_basse_gk, 1 + ajustement_gk, 1.0)
+                    )
+                
+                if pp.stop > pp.start:
+                    # Bornes autour du retrait précédent indexé (variation réelle bornée)
+                    retraits_pp = retraits[pp]
+                    borne_basse = retraits_pp * plancher_pp
+                    borne_haute = retraits_pp * plafond_pp
+                    np.multiply(valeurs[pp], taux[pp], out=retraits_pp)
+                    np.clip(retraits_pp, borne_basse, borne_haute, out=retraits_pp)
+            
+            np.minimum(retraits, valeurs, out=verses)
+            succes &= valeurs >= retraits
+            
+            croissances, etat = _tirer_croissances(parametres, rng, nb_lot, etat)
+            valeurs -= verses
+            valeurs *= croissances
+            croissances_precedentes = croissances
+            
+            # Montants versés en euros constants
+            verses *= indexation ** -annee
+            retraits_cumules += verses
+            np.minimum(retrait_minimal, verses, out=retrait_minimal)
+        
+        retraits_initiaux = taux * valeur_initiale
+        accumulateur.ajouter(
+            valeurs_finales=valeurs[ordre_origine],
+            retraits_cumules=retraits_cumules[ordre_origine],
+            retrait_minimal=retrait_minimal[ordre_origine],
+            succes=succes[ordre_origine],
+            baisse_retrait=(retrait_minimal < parametres["seuil_baisse_retrait"] * retraits_initiaux)[ordre_origine]
+        )
+    
+    return accumulateur
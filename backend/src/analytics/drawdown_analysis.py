@@ -1,11 +1,131 @@
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
 from typing import Tuple, Dict
 
 
+def _date(idx) -> str:
+    """Date au format YYYY-MM-DD (ou représentation brute hors index de dates)"""
+    return str(idx.date()) if hasattr(idx, 'date') else str(idx)
+
+
+def _jours(debut, fin) -> int:
+    """Nombre de jours calendaires entre deux dates (0 hors index de dates)"""
+    return (fin - debut).days if hasattr(fin, 'date') else 0
+
+
+def calculer_episodes(valeurs: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Table des épisodes de drawdown en un seul passage vectorisé, O(n).
+    
+    Un épisode commence au premier jour sous le plus haut historique et se
+    termine au premier jour où la valeur revient au niveau du pic.
+    
+    Args:
+        valeurs: Valeurs du portefeuille (1-D)
+    
+    Returns:
+        Dict de tableaux (une entrée par épisode, ordre chronologique, positions dans la série):
+        pics, debuts, creux, recuperations (-1 si non récupéré), profondeurs (%),
+        ainsi que drawdowns (%) de toute la série
+    """
+    valeurs = np.asarray(valeurs, dtype=np.float64)
+    n = len(valeurs)
+    positions = np.arange(n)
+    
+    plus_hauts = np.maximum.accumulate(valeurs)
+    drawdowns = (valeurs - plus_hauts) / plus_hauts * 100
+    sous_eau = drawdowns < 0
+    
+    # Position de la première atteinte du plus haut courant
+    nouveau_plus_haut = np.ones(n, dtype=bool)
+    nouveau_plus_haut[1:] = valeurs[1:] > plus_hauts[:-1]
+    position_pic = np.maximum.accumulate(np.where(nouveau_plus_haut, positions, 0))
+    
+    transitions = np.diff(sous_eau.astype(np.int8))
+    debuts = np.flatnonzero(transitions == 1) + 1
+    fins = np.flatnonzero(transitions == -1) + 1
+    
+    recuperations = np.full(len(debuts), -1, dtype=np.int64)
+    recuperations[:len(fins)] = fins
+    
+    creux = np.empty(0, dtype=np.int64)
+    if len(debuts):
+        # Numéro d'épisode de chaque position; hors épisode le drawdown est nul
+        marqueurs = np.zeros(n, dtype=np.int64)
+        marqueurs[debuts] = 1
+        episode = np.cumsum(marqueurs) - 1
+        
+        minima = np.minimum.reduceat(drawdowns, debuts)
+        candidats = np.flatnonzero(sous_eau & (drawdowns == minima[episode]))
+        _, premiers = np.unique(episode[candidats], return_index=True)
+        creux = candidats[premiers]
+    
+    return {
+        "pics": position_pic[debuts],
+        "debuts": debuts,
+        "creux": creux,
+        "recuperations": recuperations,
+        "profondeurs": drawdowns[creux],
+        "drawdowns": drawdowns
+    }
+
+
+class _MemoEpisodes:
+    """Tables d'épisodes mémoïsées par empreinte de série (LRU borné)"""
+    
+    def __init__(self, taille_max: int = 256):
+        self.taille_max = taille_max
+        self._entrees: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+        self._verrou = threading.Lock()
+    
+    @staticmethod
+    def empreinte(serie_valeurs: pd.Series) -> str:
+        """Empreinte des valeurs et de l'index de la série"""
+        empreinte = hashlib.blake2b(digest_size=16)
+        empreinte.update(np.ascontiguousarray(serie_valeurs.to_numpy(dtype=np.float64)).tobytes())
+        if isinstance(serie_valeurs.index, pd.DatetimeIndex):
+            empreinte.update(serie_valeurs.index.asi8.tobytes())
+        else:
+            empreinte.update(pd.util.hash_pandas_object(serie_valeurs.index, index=False).to_numpy().tobytes())
+        return empreinte.hexdigest()
+    
+    def obtenir(self, serie_valeurs: pd.Series) -> Dict[str, np.ndarray]:
+        """Table des épisodes de la série (calculée au premier appel)"""
+        cle = self.empreinte(serie_valeurs)
+        with self._verrou:
+            table = self._entrees.get(cle)
+            if table is not None:
+                self._entrees.move_to_end(cle)
+                return table
+        
+        table = calculer_episodes(serie_valeurs.to_numpy(dtype=np.float64))
+        for tableau in table.values():
+            tableau.setflags(write=False)
+        
+        with self._verrou:
+            self._entrees[cle] = table
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+        return table
+    
+    def vider(self) -> None:
+        """Vide le cache"""
+        with self._verrou:
+            self._entrees.clear()
+
+
+memo_episodes = _MemoEpisodes()
+
+
 class DrawdownAnalyzer:
     """
     Analyse des drawdowns (baisses de valeur) d'un portefeuille.
+    
+    Toutes les analyses sont servies depuis la table des épisodes
+    (calculer_episodes), calculée une fois par série puis mémoïsée.
     """
     
     @staticmethod
@@ -22,46 +142,33 @@ class DrawdownAnalyzer:
         if len(serie_valeurs) < 2:
             return 0.0, {}
         
-        # Calculer running maximum
-        running_max = serie_valeurs.expanding().max()
-        
-        # Calculer drawdown à chaque point
-        drawdown = (serie_valeurs - running_max) / running_max * 100
+        table = memo_episodes.obtenir(serie_valeurs)
         
-        # Trouver maximum drawdown
-        max_dd = drawdown.min()
-        idx_max_dd = drawdown.idxmin()
-        
-        # Trouver le pic avant le max drawdown
-        mask_avant_creux = serie_valeurs.index <= idx_max_dd
-        idx_pic = serie_valeurs[mask_avant_creux].idxmax()
-        
-        # Trouver la récupération (si elle existe)
-        valeur_pic = serie_valeurs[idx_pic]
-        mask_apres_creux = serie_valeurs.index > idx_max_dd
-        serie_apres = serie_valeurs[mask_apres_creux]
-        
-        idx_recuperation = None
-        duree_recuperation = None
+        if len(table["debuts"]):
+            k = int(np.argmin(table["profondeurs"]))
+            max_dd = table["profondeurs"][k]
+            pic, creux, recuperation = table["pics"][k], table["creux"][k], table["recuperations"][k]
+        else:
+            # Aucune baisse: pic et creux au premier point, récupéré dès le suivant
+            max_dd = table["drawdowns"][0]
+            pic, creux, recuperation = 0, 0, 1
         
-        if len(serie_apres) > 0:
-            recuperations = serie_apres[serie_apres >= valeur_pic]
-            if len(recuperations) > 0:
-                idx_recuperation = recuperations.index[0]
-                duree_recuperation = (idx_recuperation - idx_pic).days
+        index = serie_valeurs.index
+        valeurs = serie_valeurs.to_numpy()
+        idx_pic, idx_creux = index[pic], index[creux]
         
         details = {
             "max_drawdown_pct": round(max_dd, 2),
-            "date_pic": str(idx_pic.date()) if hasattr(idx_pic, 'date') else str(idx_pic),
-            "date_creux": str(idx_max_dd.date()) if hasattr(idx_max_dd, 'date') else str(idx_max_dd),
-            "valeur_pic": round(serie_valeurs[idx_pic], 2),
-            "valeur_creux": round(serie_valeurs[idx_max_dd], 2),
-            "duree_chute_jours": (idx_max_dd - idx_pic).days if hasattr(idx_max_dd, 'date') else 0,
+            "date_pic": _date(idx_pic),
+            "date_creux": _date(idx_creux),
+            "valeur_pic": round(valeurs[pic], 2),
+            "valeur_creux": round(valeurs[creux], 2),
+            "duree_chute_jours": _jours(idx_pic, idx_creux),
         }
         
-        if idx_recuperation:
-            details["date_recuperation"] = str(idx_recuperation.date()) if hasattr(idx_recuperation, 'date') else str(idx_recuperation)
-            details["duree_recuperation_jours"] = duree_recuperation
+        if recuperation >= 0:
+            details["date_recuperation"] = _date(index[recuperation])
+            details["duree_recuperation_jours"] = _jours(idx_pic, index[recuperation])
         else:
             details["recuperation"] = "Non récupéré"
         
@@ -75,9 +182,45 @@ class DrawdownAnalyzer:
         Returns:
             Série des drawdowns (%)
         """
-        running_max = serie_valeurs.expanding().max()
-        drawdown = (serie_valeurs - running_max) / running_max * 100
-        return drawdown
+        drawdowns = memo_episodes.obtenir(serie_valeurs)["drawdowns"]
+        return pd.Series(drawdowns.copy(), index=serie_valeurs.index, name=serie_valeurs.name)
+    
+    @staticmethod
+    def tableau_episodes(serie_valeurs: pd.Series) -> pd.DataFrame:
+        """
+        Table complète des épisodes de drawdown, en ordre chronologique.
+        
+        Returns:
+            DataFrame: date_pic, date_creux, date_recuperation (NaT si non récupéré),
+            drawdown_pct, valeur_pic, valeur_creux, duree_chute_jours,
+            duree_recuperation_jours (pic -> récupération, NaN si non récupéré)
+            et jours_sous_eau (nombre d'observations sous le pic)
+        """
+        table = memo_episodes.obtenir(serie_valeurs)
+        index = serie_valeurs.index
+        valeurs = serie_valeurs.to_numpy(dtype=np.float64)
+        pics, creux, recuperations = table["pics"], table["creux"], table["recuperations"]
+        recupere = recuperations >= 0
+        
+        if isinstance(index, pd.DatetimeIndex):
+            jours = index.asi8 // (86400 * 10**9)
+        else:
+            jours = np.arange(len(index))
+        
+        fins = np.where(recupere, recuperations, len(index))
+        date_recuperation = pd.Series(index[np.where(recupere, recuperations, 0)]).where(recupere)
+        
+        return pd.DataFrame({
+            "date_pic": index[pics],
+            "date_creux": index[creux],
+            "date_recuperation": date_recuperation.to_numpy(),
+            "drawdown_pct": table["profondeurs"],
+            "valeur_pic": valeurs[pics],
+            "valeur_creux": valeurs[creux],
+            "duree_chute_jours": jours[creux] - jours[pics],
+            "duree_recuperation_jours": np.where(recupere, jours[np.where(recupere, recuperations, 0)] - jours[pics], np.nan),
+            "jours_sous_eau": fins - table["debuts"]
+        })
     
     @staticmethod
     def identifier_tous_drawdowns(
@@ -94,45 +237,21 @@ class DrawdownAnalyzer:
         Returns:
             Liste de dicts avec détails de chaque drawdown
         """
-        drawdowns_serie = DrawdownAnalyzer.calculer_serie_drawdowns(serie_valeurs)
-        
-        # Identifier périodes de drawdown
-        en_drawdown = drawdowns_serie < 0
-        
-        # Trouver débuts et fins de périodes
-        changements = en_drawdown.astype(int).diff()
-        debuts_dd = changements[changements == 1].index
-        fins_dd = changements[changements == -1].index
+        table = memo_episodes.obtenir(serie_valeurs)
+        index = serie_valeurs.index
         
         tous_drawdowns = []
         
-        for debut in debuts_dd:
-            # Trouver la fin correspondante
-            fins_possibles = fins_dd[fins_dd > debut]
-            
-            if len(fins_possibles) > 0:
-                fin = fins_possibles[0]
-            else:
-                fin = serie_valeurs.index[-1]
-            
-            # Extraire la période
-            periode = drawdowns_serie[debut:fin]
+        for k in np.flatnonzero(table["profondeurs"] < seuil_pct):
+            idx_pic = index[table["pics"][k]]
+            idx_creux = index[table["creux"][k]]
             
-            if len(periode) > 0:
-                dd_min = periode.min()
-                
-                if dd_min < seuil_pct:
-                    idx_creux = periode.idxmin()
-                    
-                    # Trouver pic avant
-                    idx_pic = serie_valeurs[:debut].idxmax()
-                    
-                    tous_drawdowns.append({
-                        "drawdown_pct": round(dd_min, 2),
-                        "date_pic": str(idx_pic.date()) if hasattr(idx_pic, 'date') else str(idx_pic),
-                        "date_creux": str(idx_creux.date()) if hasattr(idx_creux, 'date') else str(idx_creux),
-                        "duree_jours": (idx_creux - idx_pic).days if hasattr(idx_creux, 'date') else 0
-                    })
+            tous_drawdowns.append({
+                "drawdown_pct": round(table["profondeurs"][k], 2),
+                "date_pic": _date(idx_pic),
+                "date_creux": _date(idx_creux),
+                "duree_jours": _jours(idx_pic, idx_creux)
+            })
         
         # Trier par drawdown (plus important en premier)
         tous_drawdowns.sort(key=lambda x: x["drawdown_pct"])
@@ -0,0 +1,312 @@
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from enum import Enum
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from utils.cache import CacheManager
+
+
+class TypeGenerateur(str, Enum):
+    NORMAL = "normal"
+    STUDENT = "student"
+    BOOTSTRAP = "bootstrap"
+    MARKOV = "markov"
+
+
+class GenerateurRendements(ABC):
+    """
+    Interface des générateurs de rendements mensuels du moteur Monte Carlo.
+    
+    Un générateur émet des blocs (nb_simulations x nb_mois) de rendements
+    mensuels, entièrement vectorisés sur les trajectoires. Un état optionnel
+    (régime courant, bloc bootstrap en cours...) est transmis d'un bloc au
+    suivant: le moteur tire une année à la fois sans matérialiser l'horizon.
+    
+    Toute l'aléa provient du générateur numpy passé en argument: aucun état
+    aléatoire n'est conservé dans l'instance, qui peut donc être partagée
+    entre simulations et envoyée aux workers.
+    """
+    
+    type_generateur: Optional[TypeGenerateur] = None
+    
+    @abstractmethod
+    def tirer_bloc(
+        self,
+        rng: np.random.Generator,
+        nb_simulations: int,
+        nb_mois: int,
+        etat: Any = None
+    ) -> Tuple[np.ndarray, Any]:
+        """
+        Tire un bloc de rendements mensuels.
+        
+        Args:
+            rng: Générateur aléatoire de la simulation
+            nb_simulations: Nombre de trajectoires
+            nb_mois: Nombre de mois du bloc
+            etat: État retourné par le bloc précédent (None au premier bloc)
+        
+        Returns:
+            Tuple (rendements (nb_simulations x nb_mois), nouvel état)
+        """
+
+
+class GenerateurNormal(GenerateurRendements):
+    """
+    Rendements mensuels gaussiens i.i.d. (modèle historique du simulateur).
+    """
+    
+    type_generateur = TypeGenerateur.NORMAL
+    
+    def __init__(self, rendement_moyen_annuel: float, volatilite_annuelle: float):
+        self.rendement_mensuel = rendement_moyen_annuel / 12
+        self.volatilite_mensuelle = volatilite_annuelle / np.sqrt(12)
+    
+    def tirer_bloc(self, rng, nb_simulations, nb_mois, etat=None):
+        rendements = rng.normal(
+            loc=self.rendement_mensuel,
+            scale=self.volatilite_mensuelle,
+            size=(nb_simulations, nb_mois)
+        )
+        return rendements, None
+
+
+class GenerateurStudent(GenerateurRendements):
+    """
+    Rendements mensuels à queues épaisses (loi de Student).
+    
+    La loi t est remise à l'échelle pour conserver la volatilité demandée:
+    écart-type = volatilite_mensuelle pour tout degrés_liberte > 2.
+    """
+    
+    type_generateur = TypeGenerateur.STUDENT
+    
+    def __init__(
+        self,
+        rendement_moyen_annuel: float,
+        volatilite_annuelle: float,
+        degres_liberte: float = 5.0
+    ):
+        if degres_liberte <= 2:
+            raise ValueError("degres_liberte doit être > 2 (variance finie)")
+        
+        self.degres_liberte = degres_liberte
+        self.rendement_mensuel = rendement_moyen_annuel / 12
+        self.echelle = volatilite_annuelle / np.sqrt(12) * np.sqrt((degres_liberte - 2) / degres_liberte)
+    
+    def tirer_bloc(self, rng, nb_simulations, nb_mois, etat=None):
+        rendements = rng.standard_t(self.degres_liberte, size=(nb_simulations, nb_mois))
+        rendements *= self.echelle
+        rendements += self.rendement_mensuel
+        return rendements, None
+
+
+class GenerateurBootstrap(GenerateurRendements):
+    """
+    Bootstrap historique par blocs (circulaire) de rendements mensuels.
+    
+    Les trajectoires avancent au même rythme: la position dans le bloc est
+    commune à toutes, seul le début de bloc est propre à chaque trajectoire.
+    Un bloc de tirage se ramène donc à un seul indexage
+    buffer[debuts[:, colonne] + decalage], avec des tableaux colonne/decalage
+    précalculés par (phase, nb_mois). Le buffer est prolongé de taille_bloc - 1
+    mois (repli circulaire) pour éviter tout modulo.
+    """
+    
+    type_generateur = TypeGenerateur.BOOTSTRAP
+    
+    # Rendements mensuels historiques par (ticker, période, dernière date stockée), en lecture seule
+    _cache_series = CacheManager(ttl_seconds=24 * 3600, max_entrees=256, max_octets=32 * 1024 * 1024)
+    
+    def __init__(self, rendements_mensuels: np.ndarray, taille_bloc: int = 12):
+        """
+        Args:
+            rendements_mensuels: Historique de rendements mensuels (décimal)
+            taille_bloc: Longueur des blocs tirés (mois), préserve l'autocorrélation
+        """
+        rendements_mensuels = np.asarray(rendements_mensuels, dtype=float)
+        if len(rendements_mensuels) < 2:
+            raise ValueError("Historique de rendements insuffisant pour le bootstrap")
+        if taille_bloc < 1:
+            raise ValueError("taille_bloc doit être >= 1")
+        
+        self.taille_bloc = min(taille_bloc, len(rendements_mensuels))
+        self.nb_observations = len(rendements_mensuels)
+        
+        self.buffer = np.concatenate([rendements_mensuels, rendements_mensuels[:self.taille_bloc - 1]])
+        self.buffer.setflags(write=False)
+    
+    @classmethod
+    def depuis_market_data(
+        cls,
+        provider,
+        ticker: str,
+        periode: str = "max",
+        taille_bloc: int = 12
+    ) -> "GenerateurBootstrap":
+        """
+        Construit le générateur depuis les prix d'un MarketDataProvider.
+        
+        Les rendements mensuels (clôtures de fin de mois) sont mis en cache au
+        niveau processus (cache borné), sous une clé incluant la dernière date
+        stockée du ticker: quand le stockage local s'étend, l'historique est relu.
+        """
+        store = getattr(provider, "store", None)
+        derniere_date = store.derniere_date(ticker) if store is not None else None
+        cle = (ticker, periode, str(derniere_date) if derniere_date is not None else None)
+        
+        rendements = cls._cache_series.get(cle)
+        if rendements is None:
+            prix = provider.telecharger_prix_historiques(ticker, periode=periode)
+            if prix.empty:
+                raise ValueError(f"Pas de données historiques pour {ticker}")
+            
+            rendements = rendements_mensuels(prix)
+            rendements.setflags(write=False)
+            cls._cache_series.set(cle, rendements)
+        
+        return cls(rendements, taille_bloc=taille_bloc)
+    
+    def tirer_bloc(self, rng, nb_simulations, nb_mois, etat=None):
+        # État: (mois écoulés, début du bloc en cours par trajectoire)
+        mois_ecoules, debut_courant = etat if etat is not None else (0, None)
+        phase = mois_ecoules % self.taille_bloc
+        
+        colonnes, decalages, nb_nouveaux = _index_bootstrap(phase, nb_mois, self.taille_bloc)
+        
+        nouveaux = rng.integers(0, self.nb_observations, size=(nb_simulations, nb_nouveaux))
+        if phase > 0:
+            debuts = np.concatenate([debut_courant[:, np.newaxis], nouveaux], axis=1)
+        else:
+            debuts = nouveaux
+        
+        rendements = self.buffer[debuts[:, colonnes] + decalages]
+        
+        return rendements, (mois_ecoules + nb_mois, debuts[:, colonnes[-1]])
+
+
+class GenerateurMarkov(GenerateurRendements):
+    """
+    Modèle à changements de régimes markoviens (ex: expansion / crise).
+    
+    Chaque régime a ses propres rendement et volatilité; le régime de chaque
+    trajectoire évolue mensuellement selon la matrice de transition. Le
+    régime initial est tiré selon la loi stationnaire de la chaîne.
+    """
+    
+    type_generateur = TypeGenerateur.MARKOV
+    
+    def __init__(
+        self,
+        regimes: List[Tuple[float, float]],
+        matrice_transition: List[List[float]]
+    ):
+        """
+        Args:
+            regimes: Liste de (rendement_moyen_annuel, volatilite_annuelle) par régime
+            matrice_transition: Probabilités mensuelles P[i][j] de passer de i à j
+        """
+        matrice = np.asarray(matrice_transition, dtype=float)
+        nb_regimes = len(regimes)
+        
+        if matrice.shape != (nb_regimes, nb_regimes):
+            raise ValueError("La matrice de transition doit être carrée de taille nb_regimes")
+        if np.any(matrice < 0) or not np.allclose(matrice.sum(axis=1), 1.0):
+            raise ValueError("Chaque ligne de la matrice de transition doit sommer à 1")
+        
+        self.rendements_mensuels = np.array([mu for mu, _ in regimes]) / 12
+        self.volatilites_mensuelles = np.array([sigma for _, sigma in regimes]) / np.sqrt(12)
+        self.transitions_cumulees = np.cumsum(matrice, axis=1)
+        self.loi_stationnaire = loi_stationnaire(matrice)
+    
+    def tirer_bloc(self, rng, nb_simulations, nb_mois, etat=None):
+        if etat is None:
+            etat = np.searchsorted(
+                np.cumsum(self.loi_stationnaire),
+                rng.random(nb_simulations),
+                side="right"
+            )
+            np.minimum(etat, len(self.loi_stationnaire) - 1, out=etat)
+        
+        uniformes = rng.random((nb_simulations, nb_mois))
+        chocs = rng.standard_normal((nb_simulations, nb_mois))
+        regimes = np.empty((nb_simulations, nb_mois), dtype=np.int64)
+        
+        regime = etat
+        for mois in range(nb_mois):
+            # Transition: premier état j tel que u < P[i, 0] + ... + P[i, j]
+            regime = (self.transitions_cumulees[regime] <= uniformes[:, mois, np.newaxis]).sum(axis=1)
+            np.minimum(regime, len(self.loi_stationnaire) - 1, out=regime)
+            regimes[:, mois] = regime
+        
+        rendements = self.rendements_mensuels[regimes] + self.volatilites_mensuelles[regimes] * chocs
+        return rendements, regime
+
+
+def rendements_mensuels(prix: pd.Series) -> np.ndarray:
+    """Rendements mensuels (dernier prix de chaque mois) d'une série de prix"""
+    prix_mensuels = prix.groupby([prix.index.year, prix.index.month]).last()
+    return prix_mensuels.pct_change().dropna().to_numpy(dtype=float)
+
+
+def loi_stationnaire(matrice_transition: np.ndarray) -> np.ndarray:
+    """Loi stationnaire d'une chaîne de Markov (vecteur propre à gauche de valeur 1)"""
+    valeurs, vecteurs = np.linalg.eig(matrice_transition.T)
+    vecteur = np.real(vecteurs[:, np.argmin(np.abs(valeurs - 1))])
+    return vecteur / vecteur.sum()
+
+
+@lru_cache(maxsize=256)
+def _index_bootstrap(phase: int, nb_mois: int, taille_bloc: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Tableaux d'indexage d'un bloc bootstrap débutant à la position `phase`.
+    
+    Returns:
+        Tuple (colonne du début de bloc pour chaque mois, décalage dans le
+        bloc pour chaque mois, nombre de nouveaux blocs à tirer)
+    """
+    positions = phase + np.arange(nb_mois)
+    colonnes = positions // taille_bloc
+    decalages = positions % taille_bloc
+    nb_nouveaux = int(colonnes[-1]) + 1 - (1 if phase > 0 else 0)
+    
+    colonnes.setflags(write=False)
+    decalages.setflags(write=False)
+    return colonnes, decalages, nb_nouveaux
+
+
+def creer_generateur(
+    type_generateur: TypeGenerateur,
+    rendement_moyen_annuel: float,
+    volatilite_annuelle: float,
+    degres_liberte: float = 5.0,
+    provider=None,
+    ticker: Optional[str] = None,
+    taille_bloc: int = 12,
+    regimes: Optional[List[Tuple[float, float]]] = None,
+    matrice_transition: Optional[List[List[float]]] = None
+) -> GenerateurRendements:
+    """
+    Construit un générateur de rendements à partir de ses paramètres.
+    
+    Returns:
+        Instance de GenerateurRendements
+    """
+    type_generateur = TypeGenerateur(type_generateur)
+    
+    if type_generateur == TypeGenerateur.STUDENT:
+        return GenerateurStudent(rendement_moyen_annuel, volatilite_annuelle, degres_liberte)
+    
+    if type_generateur == TypeGenerateur.BOOTSTRAP:
+        if provider is None or not ticker:
+            raise ValueError("Le bootstrap historique nécessite un ticker")
+        return GenerateurBootstrap.depuis_market_data(provider, ticker, taille_bloc=taille_bloc)
+    
+    if type_generateur == TypeGenerateur.MARKOV:
+        if not regimes or matrice_transition is None:
+            raise ValueError("Le modèle markovien nécessite des régimes et une matrice de transition")
+        return GenerateurMarkov(regimes, matrice_transition)
+    
+    return GenerateurNormal(rendement_moyen_annuel, volatilite_annuelle)
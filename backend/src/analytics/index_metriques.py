@@ -0,0 +1,312 @@
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+# Fenêtres glissantes en jours ouvrés (mêmes conventions que PerformanceAnalyzer)
+PERIODES = {
+    "1M": 21,
+    "3M": 63,
+    "6M": 126,
+    "1Y": 252,
+    "3Y": 756,
+    "5Y": 1260
+}
+
+
+def _fusionner(
+    max_g: np.ndarray, min_g: np.ndarray, dd_g: np.ndarray,
+    max_d: np.ndarray, min_d: np.ndarray, dd_d: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fusion (gauche puis droite) de nœuds (maximum, minimum, pire drawdown).
+    
+    Le pire drawdown de l'union est soit interne à un côté, soit un pic à
+    gauche suivi d'un creux à droite: min_droite / max_gauche - 1.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        traverse = np.where(np.isfinite(max_g) & np.isfinite(min_d), min_d / max_g - 1, 0.0)
+    return np.maximum(max_g, max_d), np.minimum(min_g, min_d), np.minimum(np.minimum(dd_g, dd_d), traverse)
+
+
+class IndexMetriques:
+    """
+    Index incrémental des métriques d'une série de valeurs (prix ou portefeuille).
+    
+    - Sommes préfixes des rendements et des rendements au carré: rendement,
+      volatilité et Sharpe de n'importe quelle fenêtre en O(1)
+    - Arbre de segments (maximum, minimum, pire drawdown): max drawdown de
+      n'importe quelle fenêtre en O(log n)
+    - Ajout des nouvelles valeurs en O(k log n), sans recalcul de l'historique
+    """
+    
+    TAUX_SANS_RISQUE = 0.02
+    
+    def __init__(self, valeurs, dates: Optional[pd.Index] = None):
+        """
+        Args:
+            valeurs: Valeurs de la série (array ou Series)
+            dates: Dates associées (défaut: index de la Series)
+        """
+        if isinstance(valeurs, pd.Series):
+            dates = valeurs.index if dates is None else dates
+            valeurs = valeurs.to_numpy(dtype=np.float64)
+        
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        self.n = 0
+        self.dates = pd.Index(dates) if dates is not None else None
+        self._construire(valeurs, capacite=max(1, len(valeurs)))
+    
+    def _construire(self, valeurs: np.ndarray, capacite: int) -> None:
+        """(Re)construit toutes les structures pour une capacité donnée"""
+        taille = 1 << int(np.ceil(np.log2(max(capacite, 1))))
+        self._taille = taille
+        self.n = len(valeurs)
+        
+        self._valeurs = np.empty(taille)
+        self._valeurs[:self.n] = valeurs
+        
+        # Sommes préfixes: _s1[t] = somme des rendements 1..t (rendement t = v[t] / v[t-1] - 1)
+        self._s1 = np.zeros(taille)
+        self._s2 = np.zeros(taille)
+        if self.n > 1:
+            rendements = valeurs[1:] / valeurs[:-1] - 1
+            np.cumsum(rendements, out=self._s1[1:self.n])
+            np.cumsum(rendements ** 2, out=self._s2[1:self.n])
+        
+        # Arbre de segments implicite: feuilles en [taille, 2 x taille)
+        self._max = np.full(2 * taille, -np.inf)
+        self._min = np.full(2 * taille, np.inf)
+        self._dd = np.zeros(2 * taille)
+        self._max[taille:taille + self.n] = valeurs
+        self._min[taille:taille + self.n] = valeurs
+        self._mettre_a_jour_parents(taille, taille + self.n)
+    
+    def _mettre_a_jour_parents(self, debut: int, fin: int) -> None:
+        """Recalcule, niveau par niveau, les ancêtres des feuilles [debut, fin)"""
+        debut, fin = debut // 2, (fin - 1) // 2 + 1
+        while debut >= 1:
+            noeuds = np.arange(debut, fin)
+            gauche, droite = 2 * noeuds, 2 * noeuds + 1
+            self._max[noeuds], self._min[noeuds], self._dd[noeuds] = _fusionner(
+                self._max[gauche], self._min[gauche], self._dd[gauche],
+                self._max[droite], self._min[droite], self._dd[droite]
+            )
+            if debut == 1:
+                break
+            debut, fin = debut // 2, (fin - 1) // 2 + 1
+    
+    def ajouter(self, valeurs, dates: Optional[pd.Index] = None) -> None:
+        """
+        Ajoute de nouvelles valeurs en fin de série.
+        
+        Args:
+            valeurs: Nouvelles valeurs (array ou Series)
+            dates: Dates associées (défaut: index de la Series)
+        """
+        if isinstance(valeurs, pd.Series):
+            dates = valeurs.index if dates is None else dates
+            valeurs = valeurs.to_numpy(dtype=np.float64)
+        
+        valeurs = np.asarray(valeurs, dtype=np.float64)
+        k = len(valeurs)
+        if k == 0:
+            return
+        
+        if self.dates is not None and dates is not None:
+            self.dates = self.dates.append(pd.Index(dates))
+        
+        if self.n + k > self._taille:
+            self._construire(np.concatenate([self._valeurs[:self.n], valeurs]), capacite=2 * (self.n + k))
+            return
+        
+        debut = self.n
+        self._valeurs[debut:debut + k] = valeurs
+        self.n += k
+        
+        # Prolonger les sommes préfixes
+        if self.n > 1:
+            premier = max(debut, 1)
+            rendements = self._valeurs[premier:self.n] / self._valeurs[premier - 1:self.n - 1] - 1
+            base_s1 = self._s1[premier - 1]
+            base_s2 = self._s2[premier - 1]
+            self._s1[premier:self.n] = base_s1 + np.cumsum(rendements)
+            self._s2[premier:self.n] = base_s2 + np.cumsum(rendements ** 2)
+        
+        feuilles = self._taille + debut
+        self._max[feuilles:feuilles + k] = valeurs
+        self._min[feuilles:feuilles + k] = valeurs
+        self._mettre_a_jour_parents(feuilles, feuilles + k)
+    
+    @property
+    def valeurs(self) -> np.ndarray:
+        """Valeurs de la série (vue)"""
+        return self._valeurs[:self.n]
+    
+    def _bornes(self, debut: int, fin: Optional[int]) -> Tuple[int, int]:
+        """Normalise une fenêtre [debut, fin] d'indices inclus (négatifs acceptés)"""
+        fin = self.n - 1 if fin is None else (fin + self.n if fin < 0 else fin)
+        debut = debut + self.n if debut < 0 else debut
+        if not 0 <= debut <= fin < self.n:
+            raise IndexError(f"Fenêtre [{debut}, {fin}] hors de la série ({self.n} valeurs)")
+        return debut, fin
+    
+    def rendement(self, debut: int, fin: Optional[int] = None) -> float:
+        """Rendement (%) entre les valeurs debut et fin incluses, O(1)"""
+        debut, fin = self._bornes(debut, fin)
+        return (self._valeurs[fin] / self._valeurs[debut] - 1) * 100
+    
+    def moments(self, debut: int, fin: Optional[int] = None) -> Tuple[int, float, float]:
+        """
+        Nombre, moyenne et écart-type (non biaisé) des rendements quotidiens de la fenêtre, O(1).
+        """
+        debut, fin = self._bornes(debut, fin)
+        nb = fin - debut
+        if nb == 0:
+            return 0, 0.0, 0.0
+        
+        somme = self._s1[fin] - self._s1[debut]
+        somme_carres = self._s2[fin] - self._s2[debut]
+        moyenne = somme / nb
+        if nb < 2:
+            return nb, moyenne, 0.0
+        
+        variance = max(somme_carres - nb * moyenne ** 2, 0.0) / (nb - 1)
+        return nb, moyenne, float(np.sqrt(variance))
+    
+    def volatilite(self, debut: int, fin: Optional[int] = None) -> float:
+        """Volatilité annualisée (%) de la fenêtre, O(1)"""
+        nb, _, ecart_type = self.moments(debut, fin)
+        return ecart_type * np.sqrt(252) * 100 if nb >= 2 else 0.0
+    
+    def sharpe(self, debut: int, fin: Optional[int] = None, taux_sans_risque: Optional[float] = None) -> float:
+        """Sharpe Ratio annualisé de la fenêtre, O(1)"""
+        taux_sans_risque = self.TAUX_SANS_RISQUE if taux_sans_risque is None else taux_sans_risque
+        nb, moyenne, ecart_type = self.moments(debut, fin)
+        if nb < 2 or ecart_type == 0:
+            return 0.0
+        return (moyenne * 252 - taux_sans_risque) / (ecart_type * np.sqrt(252))
+    
+    def max_drawdown(self, debut: int, fin: Optional[int] = None) -> float:
+        """Maximum drawdown (%) de la fenêtre, O(log n)"""
+        debut, fin = self._bornes(debut, fin)
+        
+        gauche = debut + self._taille
+        droite = fin + self._taille + 1
+        noeuds_gauche = []
+        noeuds_droite = []
+        while gauche < droite:
+            if gauche & 1:
+                noeuds_gauche.append(gauche)
+                gauche += 1
+            if droite & 1:
+                droite -= 1
+                noeuds_droite.append(droite)
+            gauche //= 2
+            droite //= 2
+        
+        maximum, pire = -np.inf, 0.0
+        for noeud in noeuds_gauche + noeuds_droite[::-1]:
+            if np.isfinite(maximum):
+                pire = min(pire, self._min[noeud] / maximum - 1)
+            pire = min(pire, self._dd[noeud])
+            maximum = max(maximum, self._max[noeud])
+        
+        return float(pire) * 100
+    
+    def drawdown_courant(self) -> float:
+        """Drawdown (%) de la dernière valeur par rapport au plus haut historique"""
+        if self.n == 0:
+            return 0.0
+        return (self._valeurs[self.n - 1] / self._max[1] - 1) * 100
+    
+    def analyser_periodes(self) -> Dict:
+        """
+        Performances 1M, 3M, 6M, 1Y, 3Y, 5Y (format de PerformanceAnalyzer.analyser_periodes).
+        """
+        return {
+            nom: round(self.rendement(-nb_jours), 2) if self.n > nb_jours else None
+            for nom, nb_jours in PERIODES.items()
+        }
+    
+    def metriques_periodes(self) -> Dict:
+        """
+        Rendement, volatilité, Sharpe et max drawdown sur chaque fenêtre glissante.
+        
+        Returns:
+            Dict {periode: {rendement, volatilite, sharpe_ratio, max_drawdown} | None}
+        """
+        resultats = {}
+        
+        for nom, nb_jours in PERIODES.items():
+            if self.n > nb_jours:
+                debut = self.n - nb_jours
+                resultats[nom] = {
+                    "rendement": round(self.rendement(debut), 2),
+                    "volatilite": round(self.volatilite(debut), 2),
+                    "sharpe_ratio": round(self.sharpe(debut), 2),
+                    "max_drawdown": round(self.max_drawdown(debut), 2)
+                }
+            else:
+                resultats[nom] = None
+        
+        return resultats
+
+
+class RegistreIndexMetriques:
+    """
+    Index de métriques partagés au niveau processus, par série (ticker) ou
+    par portefeuille enregistré.
+    
+    Quand la série fournie prolonge celle déjà indexée (même dernière date et
+    même dernière valeur), seules les nouvelles valeurs sont ajoutées; sinon
+    l'index est reconstruit. Au-delà de taille_max séries, les index les moins
+    récemment utilisés sont supprimés (LRU).
+    """
+    
+    def __init__(self, taille_max: int = 256):
+        self.taille_max = taille_max
+        self._index: "OrderedDict[str, IndexMetriques]" = OrderedDict()
+        self._verrou = threading.Lock()
+    
+    def obtenir(self, cle: str, serie_valeurs: pd.Series) -> IndexMetriques:
+        """
+        Index à jour pour une série.
+        
+        Args:
+            cle: Identifiant de la série (ticker, id de portefeuille)
+            serie_valeurs: Série complète des valeurs, indexée par date
+        """
+        with self._verrou:
+            index = self._index.get(cle)
+            
+            if index is not None and index.dates is not None and 0 < index.n <= len(serie_valeurs):
+                dernier = index.n - 1
+                if (
+                    serie_valeurs.index[dernier] == index.dates[dernier]
+                    and serie_valeurs.iloc[dernier] == index.valeurs[dernier]
+                ):
+                    index.ajouter(serie_valeurs.iloc[index.n:])
+                    self._index.move_to_end(cle)
+                    return index
+            
+            index = IndexMetriques(serie_valeurs)
+            self._index[cle] = index
+            self._index.move_to_end(cle)
+            while len(self._index) > self.taille_max:
+                self._index.popitem(last=False)
+            return index
+    
+    def invalider(self, cle: Optional[str] = None) -> None:
+        """Supprime un index (ou tous)"""
+        with self._verrou:
+            if cle is None:
+                self._index.clear()
+            else:
+                self._index.pop(cle, None)
+
+
+# Registre partagé du processus
+registre_index_metriques = RegistreIndexMetriques()
@@ -1,7 +1,34 @@
+import os
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional
+import warnings
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from scipy.stats import norm, qmc
+
+from analytics.accumulateurs import AccumulateurTrajectoires
+from analytics.cache_scenarios import CacheScenarios
+from analytics.generateurs_rendements import GenerateurRendements, GenerateurNormal, TypeGenerateur
+
+
+class MoteurSimulation(str, Enum):
+    ITERATIF = "iteratif"
+    VECTORISE = "vectorise"
+
+
+class SortieSimulation(str, Enum):
+    COMPLETE = "complete"
+    ANNUELLE = "annuelle"
+
+
+class ReductionVariance(str, Enum):
+    AUCUNE = "aucune"
+    ANTITHETIQUE = "antithetique"
+    SOBOL = "sobol"
+    HALTON = "halton"
+    VARIABLE_CONTROLE = "variable_controle"
 
 
 class MonteCarloSimulator:
@@ -15,11 +42,33 @@ class MonteCarloSimulator:
     - Percentiles: 10%, 25%, 50%, 75%, 90%
     - Probabilité de succès (capital préservé)
     - Données pour fan chart
+    - Exécution par lots, en parallèle sur plusieurs processus
+    - Réduction de variance: variables antithétiques, quasi-aléatoire
+      (Sobol/Halton brouillés), variable de contrôle lognormale
+    - Générateurs de rendements interchangeables (normal, Student, bootstrap
+      historique, régimes markoviens)
+    
+    Chaque instance possède son propre générateur (np.random.Generator): aucun
+    état global n'est partagé entre requêtes concurrentes.
     """
     
-    def __init__(self, seed: Optional[int] = None):
-        if seed:
-            np.random.seed(seed)
+    # Taille de lot par défaut en mode parallèle
+    TAILLE_LOT_DEFAUT = 10000
+    
+    # Réplications indépendantes (brouillages) en quasi-aléatoire, pour l'erreur standard
+    NB_REPLICATIONS_QMC = 8
+    
+    def __init__(self, seed: Optional[int] = None, cache_scenarios: Optional[CacheScenarios] = None):
+        """
+        Args:
+            seed: Graine du générateur (reproductibilité)
+            cache_scenarios: Cache de rendements simulés; avec une seed, le moteur
+                vectorisé réutilise les tirages de toute simulation de mêmes
+                (seed, nb_simulations, nb_annees, rendement, volatilité)
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.cache_scenarios = cache_scenarios
     
     def simuler_trajectoires(
         self,
@@ -29,7 +78,11 @@ class MonteCarloSimulator:
         nb_annees: int,
         nb_simulations: int = 10000,
         apports_annuels: float = 0.0,
-        retraits_annuels: float = 0.0
+        retraits_annuels: float = 0.0,
+        moteur: MoteurSimulation = MoteurSimulation.ITERATIF,
+        sortie: SortieSimulation = SortieSimulation.COMPLETE,
+        reduction_variance: ReductionVariance = ReductionVariance.AUCUNE,
+        generateur: Optional[GenerateurRendements] = None
     ) -> Dict[str, any]:
         """
         Simule des trajectoires de portefeuille avec Monte Carlo.
@@ -42,6 +95,12 @@ class MonteCarloSimulator:
             nb_simulations: Nombre de simulations
             apports_annuels: Apports annuels
             retraits_annuels: Retraits annuels
+            moteur: Boucle mensuelle (iteratif) ou blocs annuels vectorisés (vectorise)
+            sortie: Trajectoires mensuelles complètes ou valeurs annuelles uniquement
+                (sortie annuelle disponible avec le moteur vectorisé)
+            reduction_variance: Technique de réduction de variance (moteur vectorisé)
+            generateur: Générateur de rendements mensuels (moteur vectorisé);
+                par défaut loi normale (rendement_moyen_annuel, volatilite_annuelle)
         
         Returns:
             Dict avec trajectoires et statistiques
@@ -51,12 +110,79 @@ class MonteCarloSimulator:
         rendement_mensuel = rendement_moyen_annuel / 12
         volatilite_mensuelle = volatilite_annuelle / np.sqrt(12)
         
+        moteur = MoteurSimulation(moteur)
+        sortie = SortieSimulation(sortie)
+        reduction_variance = ReductionVariance(reduction_variance)
+        
+        if generateur is not None:
+            if moteur != MoteurSimulation.VECTORISE:
+                raise ValueError("Un générateur de rendements nécessite le moteur vectorisé")
+            if reduction_variance != ReductionVariance.AUCUNE:
+                raise ValueError("La réduction de variance nécessite le générateur normal")
+        
+        if moteur == MoteurSimulation.VECTORISE:
+            rendements = None
+            rng = self.rng
+            depuis_cache = False
+            groupes = None
+            controle = None
+            
+            if reduction_variance != ReductionVariance.AUCUNE:
+                chocs, groupes = self._tirer_chocs_reduits(
+                    nb_annees, nb_simulations, reduction_variance
+                )
+                if reduction_variance == ReductionVariance.VARIABLE_CONTROLE:
+                    # exp(sigma * somme des chocs) est lognormal d'espérance connue
+                    controle = np.exp(volatilite_mensuelle * chocs.sum(axis=(0, 2)))
+                rendements = chocs
+                rendements *= volatilite_mensuelle
+                rendements += rendement_mensuel
+            elif generateur is None and self.cache_scenarios is not None and self.seed is not None:
+                # Tirages (nb_annees x nb_simulations x 12): même séquence que
+                # les blocs annuels successifs d'un générateur neuf
+                cle = (self.seed, nb_simulations, nb_annees, rendement_moyen_annuel, volatilite_annuelle)
+                if self.cache_scenarios.tient_dans_budget(nb_annees * nb_simulations * 12 * 8):
+                    rendements, depuis_cache = self.cache_scenarios.obtenir_ou_generer(
+                        cle=cle,
+                        seed=self.seed,
+                        generer=lambda rng: rng.normal(
+                            loc=rendement_mensuel,
+                            scale=volatilite_mensuelle,
+                            size=(nb_annees, nb_simulations, 12)
+                        )
+                    )
+                else:
+                    # Hors budget: aucune matrice complète, blocs annuels tirés au fil de l'eau
+                    rng, depuis_cache = self.cache_scenarios.generateur(cle, self.seed)
+            
+            resultats = self._simuler_par_blocs_annuels(
+                valeur_initiale=valeur_initiale,
+                generateur=generateur or GenerateurNormal(rendement_moyen_annuel, volatilite_annuelle),
+                nb_annees=nb_annees,
+                nb_simulations=nb_simulations,
+                flux_annuel=apports_annuels - retraits_annuels,
+                sortie_complete=(sortie == SortieSimulation.COMPLETE),
+                rng=rng,
+                rendements=rendements
+            )
+            resultats["scenario_depuis_cache"] = depuis_cache
+            resultats["reduction_variance"] = reduction_variance.value
+            resultats["groupes_variance"] = groupes
+            resultats["controle"] = controle
+            resultats["esperance_controle"] = np.exp(volatilite_mensuelle ** 2 * nb_periodes / 2)
+            return resultats
+        
+        if sortie == SortieSimulation.ANNUELLE:
+            raise ValueError("La sortie annuelle seule nécessite le moteur vectorisé")
+        if reduction_variance != ReductionVariance.AUCUNE:
+            raise ValueError("La réduction de variance nécessite le moteur vectorisé")
+        
         # Matrice de simulations (simulations x périodes)
         trajectoires = np.zeros((nb_simulations, nb_periodes + 1))
         trajectoires[:, 0] = valeur_initiale
         
         # Génerer rendements aléatoires
-        rendements_aleatoires = np.random.normal(
+        rendements_aleatoires = self.rng.normal(
             loc=rendement_mensuel,
             scale=volatilite_mensuelle,
             size=(nb_simulations, nb_periodes)
@@ -85,6 +211,115 @@ class MonteCarloSimulator:
             "nb_annees": nb_annees
         }
     
+    def _tirer_chocs_reduits(
+        self,
+        nb_annees: int,
+        nb_simulations: int,
+        reduction_variance: ReductionVariance
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Chocs normaux centrés réduits (nb_annees x nb_simulations x 12).
+        
+        Returns:
+            Tuple (chocs, groupes): groupes associe chaque trajectoire à un
+            groupe indépendant (paire antithétique, réplication quasi-aléatoire)
+            pour le calcul des erreurs standard; None si tirages indépendants
+        """
+        if reduction_variance == ReductionVariance.ANTITHETIQUE:
+            if nb_simulations % 2:
+                raise ValueError("Le mode antithétique nécessite un nombre pair de simulations")
+            nb_paires = nb_simulations // 2
+            chocs = self.rng.standard_normal(size=(nb_annees, nb_paires, 12))
+            groupes = np.tile(np.arange(nb_paires), 2)
+            return np.concatenate([chocs, -chocs], axis=1), groupes
+        
+        if reduction_variance in (ReductionVariance.SOBOL, ReductionVariance.HALTON):
+            nb_replications = min(self.NB_REPLICATIONS_QMC, nb_simulations)
+            dimension = nb_annees * 12
+            moteur_qmc = qmc.Sobol if reduction_variance == ReductionVariance.SOBOL else qmc.Halton
+            
+            blocs = []
+            tailles = [len(b) for b in np.array_split(np.arange(nb_simulations), nb_replications)]
+            for taille in tailles:
+                sequence = moteur_qmc(d=dimension, scramble=True, seed=self.rng)
+                with warnings.catch_warnings():
+                    # Sobol: équilibre optimal pour une puissance de 2 seulement
+                    warnings.simplefilter("ignore", UserWarning)
+                    points = sequence.random(taille)
+                np.clip(points, 1e-12, 1 - 1e-12, out=points)
+                blocs.append(norm.ppf(points).reshape(taille, nb_annees, 12).transpose(1, 0, 2))
+            
+            groupes = np.repeat(np.arange(nb_replications), tailles)
+            return np.ascontiguousarray(np.concatenate(blocs, axis=1)), groupes
+        
+        return self.rng.standard_normal(size=(nb_annees, nb_simulations, 12)), None
+    
+    def _simuler_par_blocs_annuels(
+        self,
+        valeur_initiale: float,
+        generateur: GenerateurRendements,
+        nb_annees: int,
+        nb_simulations: int,
+        flux_annuel: float,
+        sortie_complete: bool,
+        rng: np.random.Generator,
+        rendements: Optional[np.ndarray] = None
+    ) -> Dict[str, any]:
+        """
+        Moteur vectorisé: une itération par année au lieu d'une par mois.
+        
+        Les flux n'interviennent qu'en fin d'année: à l'intérieur d'un bloc de
+        12 mois la valeur est le produit cumulé des facteurs (1 + r), bornés à 0
+        pour reproduire le plancher mensuel (une valeur nulle le reste jusqu'au
+        flux suivant). Le flux annuel est ensuite ajouté puis borné à 0.
+        
+        Seul le bloc de rendements de l'année en cours (nb_simulations x 12) est
+        alloué; la matrice mensuelle n'est construite qu'en sortie complète.
+        Les blocs sont tirés par le générateur (son état est transmis d'une
+        année à la suivante). Des rendements pré-tirés (nb_annees x
+        nb_simulations x 12), par exemple issus du cache de scénarios,
+        remplacent les tirages.
+        """
+        trajectoires_annuelles = np.empty((nb_simulations, nb_annees + 1))
+        trajectoires_annuelles[:, 0] = valeur_initiale
+        
+        trajectoires = None
+        if sortie_complete:
+            trajectoires = np.empty((nb_simulations, nb_annees * 12 + 1))
+            trajectoires[:, 0] = valeur_initiale
+        
+        valeurs = trajectoires_annuelles[:, 0].copy()
+        etat = None
+        
+        for annee in range(nb_annees):
+            if rendements is not None:
+                facteurs = rendements[annee] + 1.0
+            else:
+                facteurs, etat = generateur.tirer_bloc(rng, nb_simulations, 12, etat)
+                facteurs += 1.0
+            np.maximum(facteurs, 0.0, out=facteurs)
+            
+            if sortie_complete:
+                bloc = trajectoires[:, annee * 12 + 1:(annee + 1) * 12 + 1]
+                np.cumprod(facteurs, axis=1, out=bloc)
+                bloc *= valeurs[:, np.newaxis]
+                valeurs = bloc[:, -1] + flux_annuel
+            else:
+                valeurs = valeurs * np.cumprod(facteurs, axis=1)[:, -1] + flux_annuel
+            
+            np.maximum(valeurs, 0.0, out=valeurs)
+            
+            if sortie_complete:
+                bloc[:, -1] = valeurs
+            trajectoires_annuelles[:, annee + 1] = valeurs
+        
+        return {
+            "trajectoires_completes": trajectoires,
+            "trajectoires_annuelles": trajectoires_annuelles,
+            "nb_simulations": nb_simulations,
+            "nb_annees": nb_annees
+        }
+    
     def calculer_percentiles(
         self,
         trajectoires_annuelles: np.ndarray,
@@ -160,12 +395,20 @@ class MonteCarloSimulator:
         nb_annees = trajectoires_annuelles.shape[1]
         percentiles_data = self.calculer_percentiles(trajectoires_annuelles, percentiles)
         
+        return self._construire_fan_chart(percentiles_data, nb_annees)
+    
+    def _construire_fan_chart(
+        self,
+        percentiles_data: Dict[int, np.ndarray],
+        nb_annees: int
+    ) -> List[dict]:
+        """Met en forme les percentiles par année pour le fan chart"""
         fan_chart_data = []
         
         for annee in range(nb_annees):
             point = {"annee": annee}
             
-            for p in percentiles:
+            for p in percentiles_data:
                 point[f"p{p}"] = round(percentiles_data[p][annee], 2)
             
             fan_chart_data.append(point)
@@ -181,43 +424,140 @@ class MonteCarloSimulator:
         nb_simulations: int = 10000,
         apports_annuels: float = 0.0,
         retraits_annuels: float = 0.0,
-        objectif_capital: Optional[float] = None
+        objectif_capital: Optional[float] = None,
+        moteur: MoteurSimulation = MoteurSimulation.VECTORISE,
+        taille_lot: Optional[int] = None,
+        nb_workers: Optional[int] = None,
+        reduction_variance: ReductionVariance = ReductionVariance.AUCUNE,
+        generateur: Optional[GenerateurRendements] = None
     ) -> dict:
         """
         Analyse Monte Carlo complète avec toutes les statistiques.
         
+        Seules les valeurs annuelles sont nécessaires: avec le moteur vectorisé
+        la matrice mensuelle n'est jamais construite.
+        
+        Args:
+            taille_lot: Si renseigné, simule par lots de cette taille et agrège
+                dans des accumulateurs fusionnables (mémoire bornée, percentiles
+                estimés par sketch avec erreur relative garantie)
+            nb_workers: Nombre de processus: active le mode par lots (taille_lot
+                par défaut TAILLE_LOT_DEFAUT), répartis sur un pool de processus
+                si > 1. Pour une seed donnée, le résultat est identique quel que
+                soit nb_workers.
+            reduction_variance: Technique de réduction de variance (mode exact,
+                moteur vectorisé); les erreurs standard sont toujours rapportées
+            generateur: Générateur de rendements (défaut: loi normale)
+        
         Returns:
             Dict complet avec résultats simulation
         """
-        # Lancer simulations
-        resultats_simulation = self.simuler_trajectoires(
-            valeur_initiale=valeur_initiale,
-            rendement_moyen_annuel=rendement_moyen_annuel,
-            volatilite_annuelle=volatilite_annuelle,
-            nb_annees=nb_annees,
-            nb_simulations=nb_simulations,
-            apports_annuels=apports_annuels,
-            retraits_annuels=retraits_annuels
-        )
-        
-        trajectoires_annuelles = resultats_simulation["trajectoires_annuelles"]
-        
-        # Calculer percentiles
-        percentiles_data = self.calculer_percentiles(trajectoires_annuelles)
-        
-        # Probabilités de succès
-        proba_succes = self.calculer_probabilite_succes(
-            trajectoires_annuelles,
-            objectif=objectif_capital
-        )
+        precision_percentiles = None
+        scenario_depuis_cache = None
         
-        # Fan chart data
-        fan_chart = self.generer_fan_chart_data(trajectoires_annuelles)
+        if nb_workers is not None and not taille_lot:
+            taille_lot = self.TAILLE_LOT_DEFAUT
         
-        # Statistiques finales
-        valeurs_finales = trajectoires_annuelles[:, -1]
+        if taille_lot:
+            if ReductionVariance(reduction_variance) != ReductionVariance.AUCUNE:
+                raise ValueError("La réduction de variance n'est pas disponible en mode par lots")
+            
+            accumulateur = self._simuler_par_lots(
+                valeur_initiale=valeur_initiale,
+                rendement_moyen_annuel=rendement_moyen_annuel,
+                volatilite_annuelle=volatilite_annuelle,
+                nb_annees=nb_annees,
+                nb_simulations=nb_simulations,
+                apports_annuels=apports_annuels,
+                retraits_annuels=retraits_annuels,
+                objectif_capital=objectif_capital,
+                taille_lot=taille_lot,
+                nb_workers=nb_workers or 1,
+                generateur=generateur
+            )
+            
+            percentiles_data = accumulateur.calculer_percentiles()
+            proba_succes = accumulateur.calculer_probabilites()
+            fan_chart = self._construire_fan_chart(percentiles_data, nb_annees + 1)
+            
+            ecarts_types = accumulateur.ecart_type()
+            statistiques_finales = {
+                "valeur_min": round(accumulateur.minimum[-1], 2),
+                "valeur_max": round(accumulateur.maximum[-1], 2),
+                "valeur_mediane": proba_succes["valeur_mediane_finale"],
+                "valeur_moyenne": round(accumulateur.moyenne[-1], 2),
+                "ecart_type": round(ecarts_types[-1], 2)
+            }
+            
+            erreur_relative = accumulateur.sketch.erreur_relative
+            precision_percentiles = {}
+            for p, valeurs in percentiles_data.items():
+                borne_basse, borne_haute = accumulateur.sketch.bornes(valeurs[-1])
+                precision_percentiles[f"p{p}"] = {
+                    "erreur_relative_max_pct": round(erreur_relative * 100, 2),
+                    "borne_basse": round(borne_basse, 2),
+                    "borne_haute": round(borne_haute, 2)
+                }
+            
+            erreurs_standard = {}
+            for nom, nb_evenements in (
+                ("prob_maintien_capital", accumulateur.nb_maintien[-1]),
+                ("prob_ruine", accumulateur.nb_ruine[-1])
+            ):
+                p = nb_evenements / accumulateur.nb
+                erreurs_standard[nom] = round(np.sqrt(p * (1 - p) / accumulateur.nb) * 100, 2)
+        else:
+            # Lancer simulations
+            resultats_simulation = self.simuler_trajectoires(
+                valeur_initiale=valeur_initiale,
+                rendement_moyen_annuel=rendement_moyen_annuel,
+                volatilite_annuelle=volatilite_annuelle,
+                nb_annees=nb_annees,
+                nb_simulations=nb_simulations,
+                apports_annuels=apports_annuels,
+                retraits_annuels=retraits_annuels,
+                moteur=moteur,
+                sortie=(
+                    SortieSimulation.ANNUELLE
+                    if MoteurSimulation(moteur) == MoteurSimulation.VECTORISE
+                    else SortieSimulation.COMPLETE
+                ),
+                reduction_variance=reduction_variance,
+                generateur=generateur
+            )
+            
+            trajectoires_annuelles = resultats_simulation["trajectoires_annuelles"]
+            scenario_depuis_cache = resultats_simulation.get("scenario_depuis_cache")
+            
+            # Calculer percentiles
+            percentiles_data = self.calculer_percentiles(trajectoires_annuelles)
+            
+            # Probabilités de succès
+            proba_succes = self.calculer_probabilite_succes(
+                trajectoires_annuelles,
+                objectif=objectif_capital
+            )
+            
+            # Estimations (ajustées en variable de contrôle) et erreurs standard
+            erreurs_standard = {}
+            for nom, estimation in self.calculer_erreurs_standard(resultats_simulation).items():
+                proba_succes[nom] = estimation["estimation"]
+                erreurs_standard[nom] = estimation["erreur_standard"]
+            
+            # Fan chart data
+            fan_chart = self._construire_fan_chart(percentiles_data, trajectoires_annuelles.shape[1])
+            
+            # Statistiques finales
+            valeurs_finales = trajectoires_annuelles[:, -1]
+            statistiques_finales = {
+                "valeur_min": round(np.min(valeurs_finales), 2),
+                "valeur_max": round(np.max(valeurs_finales), 2),
+                "valeur_mediane": round(np.median(valeurs_finales), 2),
+                "valeur_moyenne": round(np.mean(valeurs_finales), 2),
+                "ecart_type": round(np.std(valeurs_finales), 2)
+            }
         
-        return {
+        resultats = {
             "parametres": {
                 "valeur_initiale": valeur_initiale,
                 "rendement_moyen_annuel": rendement_moyen_annuel * 100,
@@ -225,7 +565,9 @@ class MonteCarloSimulator:
                 "nb_annees": nb_annees,
                 "nb_simulations": nb_simulations,
                 "apports_annuels": apports_annuels,
-                "retraits_annuels": retraits_annuels
+                "retraits_annuels": retraits_annuels,
+                "reduction_variance": ReductionVariance(reduction_variance).value,
+                "generateur": (generateur.type_generateur if generateur else TypeGenerateur.NORMAL).value
             },
             "percentiles": {
                 "p10": round(percentiles_data[10][-1], 2),
@@ -235,13 +577,294 @@ class MonteCarloSimulator:
                 "p90": round(percentiles_data[90][-1], 2)
             },
             "probabilites": proba_succes,
-            "statistiques_finales": {
-                "valeur_min": round(np.min(valeurs_finales), 2),
-                "valeur_max": round(np.max(valeurs_finales), 2),
-                "valeur_mediane": round(np.median(valeurs_finales), 2),
-                "valeur_moyenne": round(np.mean(valeurs_finales), 2),
-                "ecart_type": round(np.std(valeurs_finales), 2)
-            },
+            "erreurs_standard": erreurs_standard,
+            "statistiques_finales": statistiques_finales,
             "fan_chart_data": fan_chart,
             "nb_simulations_reussies": nb_simulations
         }
+        
+        if precision_percentiles is not None:
+            resultats["precision_percentiles"] = precision_percentiles
+        if scenario_depuis_cache is not None and self.cache_scenarios is not None:
+            resultats["scenario_depuis_cache"] = scenario_depuis_cache
+        
+        return resultats
+    
+    def calculer_erreurs_standard(self, resultats_simulation: Dict[str, any]) -> Dict[str, Dict[str, float]]:
+        """
+        Probabilités finales de maintien du capital et de ruine avec leur
+        erreur standard, selon la technique de réduction de variance utilisée.
+        
+        - Tirages indépendants: écart-type de l'indicatrice / sqrt(n)
+        - Antithétique / quasi-aléatoire: dispersion des moyennes par groupe
+          indépendant (paire, réplication)
+        - Variable de contrôle: estimateur ajusté p - beta * (moyenne(C) - E[C])
+        
+        Args:
+            resultats_simulation: Retour de simuler_trajectoires
+        
+        Returns:
+            Dict {nom: {"estimation": %, "erreur_standard": points de %}}
+        """
+        trajectoires_annuelles = resultats_simulation["trajectoires_annuelles"]
+        valeur_initiale = trajectoires_annuelles[0, 0]
+        valeurs_finales = trajectoires_annuelles[:, -1]
+        
+        indicatrices = {
+            "prob_maintien_capital": valeurs_finales >= valeur_initiale,
+            "prob_ruine": valeurs_finales < valeur_initiale * 0.1
+        }
+        
+        resultats = {}
+        for nom, indicatrice in indicatrices.items():
+            estimation, erreur = _estimer_moyenne(
+                indicatrice.astype(float),
+                groupes=resultats_simulation.get("groupes_variance"),
+                controle=resultats_simulation.get("controle"),
+                esperance_controle=resultats_simulation.get("esperance_controle")
+            )
+            resultats[nom] = {
+                "estimation": round(estimation * 100, 1),
+                "erreur_standard": round(erreur * 100, 2)
+            }
+        
+        return resultats
+    
+    def analyser_grille_sensibilite(
+        self,
+        valeur_initiale: float,
+        hypotheses_rendement: List[Tuple[float, float]],
+        horizons: List[int],
+        apports_annuels: List[float] = [0.0],
+        retraits_annuels: List[float] = [0.0],
+        nb_simulations: int = 10000,
+        objectif_capital: Optional[float] = None
+    ) -> dict:
+        """
+        Évalue une grille de sensibilité en une passe vectorisée.
+        
+        Toutes les cellules partagent le même tenseur de chocs normaux centrés
+        réduits (nb_annees_max x nb_simulations x 12): les rendements d'une
+        hypothèse sont mu/12 + sigma/sqrt(12) * Z, et toutes les combinaisons
+        apport x retrait sont propagées ensemble, année par année.
+        Pour une seed donnée, chaque cellule reproduit exactement
+        simuler_trajectoires (moteur vectorisé) avec les mêmes paramètres.
+        
+        Args:
+            valeur_initiale: Capital initial
+            hypotheses_rendement: Liste de (rendement_moyen_annuel, volatilite_annuelle)
+            horizons: Horizons (années) auxquels lire les résultats
+            apports_annuels: Valeurs d'apports annuels de la grille
+            retraits_annuels: Valeurs de retraits annuels de la grille
+            nb_simulations: Nombre de simulations par cellule
+            objectif_capital: Seuil de succès (défaut: capital initial)
+        
+        Returns:
+            Dict avec axes et heatmaps [hypothèse][horizon][apport][retrait]
+        
+        Raises:
+            ValueError: Aucun horizon, ou horizon nul ou négatif
+        """
+        if not horizons or min(horizons) <= 0:
+            raise ValueError("Les horizons doivent être des entiers strictement positifs")
+        
+        horizons = sorted(set(horizons))
+        nb_annees_max = horizons[-1]
+        seuil_succes = objectif_capital if objectif_capital is not None else valeur_initiale
+        
+        def generer(rng: np.random.Generator) -> np.ndarray:
+            return rng.standard_normal(size=(nb_annees_max, nb_simulations, 12))
+        
+        if self.cache_scenarios is not None and self.seed is not None:
+            chocs, depuis_cache = self.cache_scenarios.obtenir_ou_generer(
+                cle=("normales", self.seed, nb_simulations, nb_annees_max),
+                seed=self.seed,
+                generer=generer
+            )
+        else:
+            generateur = np.random.default_rng(self.seed) if self.seed is not None else self.rng
+            chocs, depuis_cache = generer(generateur), False
+        
+        # Flux de chaque cellule (apport - retrait), aplatis
+        flux = np.subtract.outer(
+            np.asarray(apports_annuels, dtype=float),
+            np.asarray(retraits_annuels, dtype=float)
+        ).ravel()
+        forme_cellules = (len(apports_annuels), len(retraits_annuels))
+        
+        prob_succes = []
+        valeurs_medianes = []
+        
+        for rendement_moyen_annuel, volatilite_annuelle in hypotheses_rendement:
+            rendement_mensuel = rendement_moyen_annuel / 12
+            volatilite_mensuelle = volatilite_annuelle / np.sqrt(12)
+            
+            valeurs = np.full((len(flux), nb_simulations), float(valeur_initiale))
+            prob_hypothese = []
+            medianes_hypothese = []
+            
+            for annee in range(nb_annees_max):
+                facteurs = rendement_mensuel + volatilite_mensuelle * chocs[annee]
+                facteurs += 1.0
+                np.maximum(facteurs, 0.0, out=facteurs)
+                croissance = np.cumprod(facteurs, axis=1)[:, -1]
+                
+                valeurs *= croissance
+                valeurs += flux[:, np.newaxis]
+                np.maximum(valeurs, 0.0, out=valeurs)
+                
+                if annee + 1 in horizons:
+                    prob = np.mean(valeurs >= seuil_succes, axis=1) * 100
+                    mediane = np.median(valeurs, axis=1)
+                    prob_hypothese.append(np.round(prob, 1).reshape(forme_cellules).tolist())
+                    medianes_hypothese.append(np.round(mediane, 2).reshape(forme_cellules).tolist())
+            
+            prob_succes.append(prob_hypothese)
+            valeurs_medianes.append(medianes_hypothese)
+        
+        return {
+            "axes": {
+                "hypotheses_rendement": [
+                    {"rendement_moyen_annuel": mu * 100, "volatilite_annuelle": sigma * 100}
+                    for mu, sigma in hypotheses_rendement
+                ],
+                "horizons": horizons,
+                "apports_annuels": list(apports_annuels),
+                "retraits_annuels": list(retraits_annuels)
+            },
+            "prob_succes": prob_succes,
+            "valeur_mediane_finale": valeurs_medianes,
+            "seuil_succes": seuil_succes,
+            "nb_simulations": nb_simulations,
+            "nb_cellules": len(hypotheses_rendement) * len(horizons) * len(flux),
+            "scenario_depuis_cache": depuis_cache
+        }
+    
+    def _simuler_par_lots(
+        self,
+        valeur_initiale: float,
+        rendement_moyen_annuel: float,
+        volatilite_annuelle: float,
+        nb_annees: int,
+        nb_simulations: int,
+        apports_annuels: float,
+        retraits_annuels: float,
+        objectif_capital: Optional[float],
+        taille_lot: int,
+        nb_workers: int = 1,
+        generateur: Optional[GenerateurRendements] = None
+    ) -> AccumulateurTrajectoires:
+        """
+        Simule nb_simulations trajectoires par lots de taille_lot.
+        
+        Chaque lot (sortie annuelle du moteur vectorisé) alimente l'accumulateur
+        puis est libéré: la mémoire dépend de taille_lot, pas de nb_simulations.
+        
+        Chaque lot a son propre flux aléatoire, issu de SeedSequence(seed).spawn():
+        le découpage en lots ne dépend que de nb_simulations et taille_lot, et les
+        accumulateurs fusionnent indépendamment de l'ordre, d'où un résultat
+        identique pour 1 ou N workers. Le nombre de processus est borné par le
+        nombre de lots et par le nombre de cœurs de la machine.
+        """
+        nb_lots = -(-nb_simulations // taille_lot)
+        graines = np.random.SeedSequence(self.seed).spawn(nb_lots)
+        
+        lots = [
+            (index_lot, min(taille_lot, nb_simulations - index_lot * taille_lot), graines[index_lot])
+            for index_lot in range(nb_lots)
+        ]
+        
+        parametres = {
+            "valeur_initiale": valeur_initiale,
+            "generateur": generateur or GenerateurNormal(rendement_moyen_annuel, volatilite_annuelle),
+            "nb_annees": nb_annees,
+            "apports_annuels": apports_annuels,
+            "retraits_annuels": retraits_annuels,
+            "objectif_capital": objectif_capital
+        }
+        
+        nb_workers = max(1, min(nb_workers, nb_lots, os.cpu_count() or 1))
+        if nb_workers == 1:
+            return _simuler_lots(parametres, lots)
+        
+        # Lots contigus par worker
+        repartition = [list(groupe) for groupe in np.array_split(np.arange(nb_lots), nb_workers)]
+        
+        with ProcessPoolExecutor(max_workers=nb_workers) as pool:
+            partiels = list(pool.map(
+                _simuler_lots,
+                [parametres] * nb_workers,
+                [[lots[i] for i in groupe] for groupe in repartition]
+            ))
+        
+        accumulateur = partiels[0]
+        for partiel in partiels[1:]:
+            accumulateur.fusionner(partiel)
+        
+        return accumulateur
+
+
+def _simuler_lots(
+    parametres: dict,
+    lots: List[Tuple[int, int, np.random.SeedSequence]]
+) -> AccumulateurTrajectoires:
+    """
+    Simule une liste de lots (index, taille, graine) et les agrège.
+    
+    Fonction de module pour pouvoir être exécutée dans un processus worker.
+    """
+    accumulateur = AccumulateurTrajectoires(
+        nb_annees=parametres["nb_annees"],
+        valeur_initiale=parametres["valeur_initiale"],
+        objectif=parametres["objectif_capital"]
+    )
+    
+    simulateur = MonteCarloSimulator()
+    
+    for index_lot, nb_lot, graine in lots:
+        lot = simulateur._simuler_par_blocs_annuels(
+            valeur_initiale=parametres["valeur_initiale"],
+            generateur=parametres["generateur"],
+            nb_annees=parametres["nb_annees"],
+            nb_simulations=nb_lot,
+            flux_annuel=parametres["apports_annuels"] - parametres["retraits_annuels"],
+            sortie_complete=False,
+            rng=np.random.default_rng(graine)
+        )
+        accumulateur.ajouter_lot(lot["trajectoires_annuelles"], index_lot=index_lot)
+    
+    return accumulateur
+
+
+def _estimer_moyenne(
+    valeurs: np.ndarray,
+    groupes: Optional[np.ndarray] = None,
+    controle: Optional[np.ndarray] = None,
+    esperance_controle: Optional[float] = None
+) -> Tuple[float, float]:
+    """
+    Estimation d'une moyenne et de son erreur standard.
+    
+    Args:
+        valeurs: Valeurs par trajectoire
+        groupes: Groupe indépendant de chaque trajectoire (optionnel)
+        controle: Variable de contrôle par trajectoire (optionnel)
+        esperance_controle: Espérance exacte de la variable de contrôle
+    
+    Returns:
+        Tuple (estimation, erreur standard)
+    """
+    nb = len(valeurs)
+    
+    if controle is not None:
+        covariance = np.cov(valeurs, controle)
+        beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 0.0
+        ajustees = valeurs - beta * (controle - esperance_controle)
+        return float(ajustees.mean()), float(ajustees.std(ddof=1) / np.sqrt(nb))
+    
+    if groupes is not None:
+        nb_groupes = int(groupes.max()) + 1
+        moyennes = np.bincount(groupes, weights=valeurs, minlength=nb_groupes) / np.bincount(groupes, minlength=nb_groupes)
+        return float(valeurs.mean()), float(moyennes.std(ddof=1) / np.sqrt(nb_groupes))
+    
+    return float(valeurs.mean()), float(valeurs.std(ddof=1) / np.sqrt(nb))
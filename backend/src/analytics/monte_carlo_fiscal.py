@@ -0,0 +1,441 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from analytics.monte_carlo import MonteCarloSimulator
+from analytics.generateurs_rendements import GenerateurRendements, GenerateurNormal
+from legal.fiscal_rules import FiscalRules
+from models.enveloppe import EnveloppeType
+
+
+class PocheFiscale:
+    """
+    Poche d'une enveloppe fiscale dans la projection Monte Carlo.
+    """
+    
+    def __init__(
+        self,
+        type_enveloppe: EnveloppeType,
+        valeur: float,
+        prix_revient: Optional[float] = None,
+        anciennete_annees: float = 0.0,
+        part_apports: float = 0.0
+    ):
+        """
+        Args:
+            type_enveloppe: PEA, CTO, AV ou PER
+            valeur: Valeur actuelle de la poche
+            prix_revient: Versements nets (défaut: valeur, pas de plus-value latente)
+            anciennete_annees: Ancienneté fiscale de l'enveloppe
+            part_apports: Part des apports annuels versée dans cette poche (0-1)
+        """
+        self.type_enveloppe = EnveloppeType(type_enveloppe)
+        self.valeur = valeur
+        self.prix_revient = valeur if prix_revient is None else prix_revient
+        self.anciennete_annees = anciennete_annees
+        self.part_apports = part_apports
+
+
+class MonteCarloFiscal(MonteCarloSimulator):
+    """
+    Projection Monte Carlo nette de fiscalité, par enveloppe.
+    
+    Chaque trajectoire suit, pour chaque poche (PEA / AV / CTO / PER), la
+    valeur, le prix de revient et l'ancienneté. Le besoin de retrait annuel
+    est exprimé en net: il est couvert en puisant dans les poches par coût
+    fiscal croissant (ordre propre à chaque trajectoire), avec gross-up exact
+    de l'impôt via les règles vectorisées de FiscalRules.
+    
+    Règles modélisées:
+    - Prix de revient réduit au prorata des retraits
+    - PEA: plafond de versements (excédent d'apports vers le CTO); un retrait
+      avant 5 ans clôture le plan (liquidation imposée, net réinvesti en CTO)
+    - AV > 8 ans: abattement annuel (4,600€ / 9,200€ couple)
+    - PER: sortie en capital (versements au barème, plus-values à 30%)
+    """
+    
+    # Pénalité d'ordre: un PEA de moins de 5 ans n'est utilisé qu'en dernier recours
+    PENALITE_CLOTURE_PEA = 1.0
+    
+    def simuler_fiscal(
+        self,
+        poches: List[PocheFiscale],
+        rendement_moyen_annuel: float,
+        volatilite_annuelle: float,
+        nb_annees: int,
+        nb_simulations: int = 10000,
+        retrait_net_annuel: float = 0.0,
+        apports_annuels: float = 0.0,
+        tmi: float = 30,
+        couple: bool = False,
+        option_bareme_cto: bool = False,
+        generateur: Optional[GenerateurRendements] = None
+    ) -> Dict[str, any]:
+        """
+        Simule les poches avec et sans fiscalité sur les mêmes scénarios.
+        
+        Args:
+            poches: Poches fiscales du client
+            rendement_moyen_annuel: Rendement moyen annuel attendu (décimal)
+            volatilite_annuelle: Volatilité annuelle (décimal)
+            nb_annees: Horizon de projection
+            nb_simulations: Nombre de simulations
+            retrait_net_annuel: Besoin de retrait annuel, net d'impôts
+            apports_annuels: Apports annuels (répartis selon part_apports)
+            tmi: Tranche marginale d'imposition (%)
+            couple: Abattement AV couple
+            option_bareme_cto: Option barème IR pour le CTO (défaut flat tax)
+            generateur: Générateur de rendements mensuels (défaut: loi normale)
+        
+        Returns:
+            Dict avec tableaux par trajectoire (net et avant impôts)
+        """
+        if not poches:
+            raise ValueError("Au moins une poche fiscale est requise")
+        
+        # Facteurs de croissance annuels communs aux deux passes (nb_annees x nb_simulations)
+        generateur = generateur or GenerateurNormal(rendement_moyen_annuel, volatilite_annuelle)
+        croissances = np.empty((nb_annees, nb_simulations))
+        etat = None
+        for annee in range(nb_annees):
+            rendements, etat = generateur.tirer_bloc(self.rng, nb_simulations, 12, etat)
+            rendements += 1.0
+            np.maximum(rendements, 0.0, out=rendements)
+            croissances[annee] = rendements.prod(axis=1)
+        
+        parametres = dict(
+            poches=poches,
+            croissances=croissances,
+            retrait_net_annuel=retrait_net_annuel,
+            apports_annuels=apports_annuels,
+            tmi=tmi,
+            couple=couple,
+            option_bareme_cto=option_bareme_cto
+        )
+        
+        return {
+            "net": self._simuler_poches(**parametres, appliquer_fiscalite=True),
+            "avant_impots": self._simuler_poches(**parametres, appliquer_fiscalite=False),
+            "nb_simulations": nb_simulations,
+            "nb_annees": nb_annees
+        }
+    
+    def _simuler_poches(
+        self,
+        poches: List[PocheFiscale],
+        croissances: np.ndarray,
+        retrait_net_annuel: float,
+        apports_annuels: float,
+        tmi: float,
+        couple: bool,
+        option_bareme_cto: bool,
+        appliquer_fiscalite: bool
+    ) -> Dict[str, np.ndarray]:
+        """
+        Boucle annuelle sur les poches (nb_poches x nb_simulations).
+        
+        Ordre annuel: rendement, apports, retrait net en fin d'année.
+        """
+        types = [poche.type_enveloppe for poche in poches]
+        if EnveloppeType.CTO not in types:
+            # CTO implicite: excédent d'apports PEA et liquidation d'un PEA clôturé
+            poches = poches + [PocheFiscale(EnveloppeType.CTO, 0.0)]
+            types.append(EnveloppeType.CTO)
+        
+        nb_annees, nb_simulations = croissances.shape
+        nb_poches = len(poches)
+        cto = types.index(EnveloppeType.CTO)
+        pea = types.index(EnveloppeType.PEA) if EnveloppeType.PEA in types else None
+        
+        def colonne(attribut: str) -> np.ndarray:
+            return np.repeat(
+                np.array([getattr(poche, attribut) for poche in poches], dtype=float)[:, np.newaxis],
+                nb_simulations, axis=1
+            )
+        
+        valeurs = colonne("valeur")
+        prix_revient = colonne("prix_revient")
+        anciennetes = colonne("anciennete_annees")
+        parts_apports = [poche.part_apports for poche in poches]
+        
+        versements_pea = prix_revient[pea].copy() if pea is not None else None
+        pea_ouvert = np.ones(nb_simulations, dtype=bool)
+        
+        abattement_annuel = 9200 if couple else 4600
+        fiscalite = dict(tmi=tmi, couple=couple, option_bareme_cto=option_bareme_cto)
+        
+        succes = np.ones(nb_simulations, dtype=bool)
+        impots_cumules = np.zeros(nb_simulations)
+        retraits_bruts_cumules = np.zeros(nb_simulations)
+        
+        for annee in range(nb_annees):
+            valeurs *= croissances[annee]
+            
+            # Apports (plafond de versements PEA, excédent vers le CTO)
+            for p, part in enumerate(parts_apports):
+                if part <= 0 or apports_annuels <= 0:
+                    continue
+                montant = apports_annuels * part
+                if p == pea:
+                    capacite = np.maximum(FiscalRules.PLAFOND_PEA - versements_pea, 0.0) * pea_ouvert
+                    vers_pea = np.minimum(montant, capacite)
+                    versements_pea += vers_pea
+                    valeurs[pea] += vers_pea
+                    prix_revient[pea] += vers_pea
+                    valeurs[cto] += montant - vers_pea
+                    prix_revient[cto] += montant - vers_pea
+                else:
+                    valeurs[p] += montant
+                    prix_revient[p] += montant
+            
+            # Retrait net: poches par coût fiscal croissant, trajectoire par trajectoire
+            besoin = np.full(nb_simulations, float(retrait_net_annuel))
+            abattement = np.full(nb_simulations, float(abattement_annuel))
+            
+            if retrait_net_annuel > 0:
+                fractions_pv = np.divide(
+                    np.maximum(valeurs - prix_revient, 0.0), valeurs,
+                    out=np.zeros_like(valeurs), where=valeurs > 0
+                )
+                if appliquer_fiscalite:
+                    couts = np.stack([
+                        _cout_marginal(types[p], fractions_pv[p], anciennetes[p], **fiscalite)
+                        for p in range(nb_poches)
+                    ])
+                else:
+                    couts = np.zeros_like(valeurs)
+                couts[valeurs <= 0] = np.inf
+                ordre = np.argsort(couts, axis=0, kind="stable")
+                
+                for rang in range(nb_poches):
+                    for p in range(nb_poches):
+                        masque = (ordre[rang] == p) & (besoin > 0) & (valeurs[p] > 0)
+                        if not masque.any():
+                            continue
+                        
+                        idx = np.flatnonzero(masque)
+                        valeur = valeurs[p, idx]
+                        fraction_pv = fractions_pv[p, idx]
+                        anciennete = anciennetes[p, idx]
+                        
+                        if appliquer_fiscalite:
+                            brut = np.minimum(
+                                _brut_pour_net(types[p], besoin[idx], fraction_pv, anciennete, abattement[idx], **fiscalite),
+                                valeur
+                            )
+                            impot = _impot(types[p], brut, fraction_pv, anciennete, abattement[idx], **fiscalite)
+                        else:
+                            brut = np.minimum(besoin[idx], valeur)
+                            impot = np.zeros_like(brut)
+                        
+                        if types[p] == EnveloppeType.ASSURANCE_VIE:
+                            abattement[idx] = np.maximum(abattement[idx] - brut * fraction_pv, 0.0)
+                        
+                        besoin[idx] = np.maximum(besoin[idx] - (brut - impot), 0.0)
+                        prix_revient[p, idx] *= 1 - brut / valeur
+                        valeurs[p, idx] = valeur - brut
+                        impots_cumules[idx] += impot
+                        retraits_bruts_cumules[idx] += brut
+                        
+                        if p == pea and appliquer_fiscalite:
+                            # Retrait avant 5 ans: clôture, reliquat liquidé et réinvesti en CTO
+                            cloture = idx[(anciennete < 5) & (brut > 0)]
+                            if len(cloture):
+                                reste = valeurs[p, cloture]
+                                impot_reste = FiscalRules.calculer_impot_pea_retrait_vectorise(
+                                    reste * fractions_pv[p, cloture], anciennetes[p, cloture], tmi
+                                )
+                                valeurs[cto, cloture] += reste - impot_reste
+                                prix_revient[cto, cloture] += reste - impot_reste
+                                valeurs[p, cloture] = 0.0
+                                prix_revient[p, cloture] = 0.0
+                                impots_cumules[cloture] += impot_reste
+                                pea_ouvert[cloture] = False
+            
+            succes &= besoin <= retrait_net_annuel * 1e-9
+            anciennetes += 1
+        
+        # Valeur nette de liquidation à l'horizon
+        valeurs_finales_nettes = valeurs.sum(axis=0)
+        if appliquer_fiscalite:
+            fractions_pv = np.divide(
+                np.maximum(valeurs - prix_revient, 0.0), valeurs,
+                out=np.zeros_like(valeurs), where=valeurs > 0
+            )
+            for p in range(nb_poches):
+                valeurs_finales_nettes -= _impot(
+                    types[p], valeurs[p], fractions_pv[p], anciennetes[p],
+                    np.full(nb_simulations, float(abattement_annuel)), **fiscalite
+                )
+        
+        return {
+            "succes": succes,
+            "valeurs_finales_brutes": valeurs.sum(axis=0),
+            "valeurs_finales_nettes": valeurs_finales_nettes,
+            "valeurs_finales_par_poche": {
+                types[p].value: valeurs[p] for p in range(nb_poches)
+            },
+            "impots_cumules": impots_cumules,
+            "retraits_bruts_cumules": retraits_bruts_cumules
+        }
+    
+    def analyser_fiscal(
+        self,
+        poches: List[PocheFiscale],
+        rendement_moyen_annuel: float,
+        volatilite_annuelle: float,
+        nb_annees: int = 30,
+        nb_simulations: int = 10000,
+        retrait_net_annuel: float = 0.0,
+        apports_annuels: float = 0.0,
+        tmi: float = 30,
+        couple: bool = False,
+        option_bareme_cto: bool = False,
+        generateur: Optional[GenerateurRendements] = None
+    ) -> dict:
+        """
+        Analyse Monte Carlo nette de fiscalité.
+        
+        Returns:
+            Dict avec probabilités de succès net / avant impôts et distributions
+        """
+        simulation = self.simuler_fiscal(
+            poches=poches,
+            rendement_moyen_annuel=rendement_moyen_annuel,
+            volatilite_annuelle=volatilite_annuelle,
+            nb_annees=nb_annees,
+            nb_simulations=nb_simulations,
+            retrait_net_annuel=retrait_net_annuel,
+            apports_annuels=apports_annuels,
+            tmi=tmi,
+            couple=couple,
+            option_bareme_cto=option_bareme_cto,
+            generateur=generateur
+        )
+        
+        net = simulation["net"]
+        avant_impots = simulation["avant_impots"]
+        
+        def percentiles(valeurs: np.ndarray) -> Dict[str, float]:
+            return {f"p{p}": round(float(np.percentile(valeurs, p)), 2) for p in (10, 25, 50, 75, 90)}
+        
+        retraits_bruts = net["retraits_bruts_cumules"]
+        taux_moyen = net["impots_cumules"].sum() / retraits_bruts.sum() if retraits_bruts.sum() > 0 else 0.0
+        
+        return {
+            "parametres": {
+                "poches": [
+                    {
+                        "type_enveloppe": poche.type_enveloppe.value,
+                        "valeur": poche.valeur,
+                        "prix_revient": poche.prix_revient,
+                        "anciennete_annees": poche.anciennete_annees,
+                        "part_apports": poche.part_apports
+                    }
+                    for poche in poches
+                ],
+                "rendement_moyen_annuel": rendement_moyen_annuel * 100,
+                "volatilite_annuelle": volatilite_annuelle * 100,
+                "nb_annees": nb_annees,
+                "nb_simulations": nb_simulations,
+                "retrait_net_annuel": retrait_net_annuel,
+                "apports_annuels": apports_annuels,
+                "tmi": tmi
+            },
+            "probabilites": {
+                "prob_succes_net": round(float(net["succes"].mean()) * 100, 1),
+                "prob_succes_avant_impots": round(float(avant_impots["succes"].mean()) * 100, 1)
+            },
+            "valeur_finale_nette": percentiles(net["valeurs_finales_nettes"]),
+            "valeur_finale_avant_impots": percentiles(avant_impots["valeurs_finales_brutes"]),
+            "impots_cumules": percentiles(net["impots_cumules"]),
+            "taux_imposition_moyen_retraits": round(float(taux_moyen) * 100, 2),
+            "valeur_finale_mediane_par_poche": {
+                enveloppe: round(float(np.median(valeurs)), 2)
+                for enveloppe, valeurs in net["valeurs_finales_par_poche"].items()
+            }
+        }
+
+
+def _taux_av(anciennete: np.ndarray, tmi: float) -> np.ndarray:
+    """Taux de prélèvement IR d'un rachat AV selon l'ancienneté (hors abattement)"""
+    return np.where(anciennete < 4, min(35, tmi) / 100, np.where(anciennete < 8, min(15, tmi) / 100, 0.075))
+
+
+def _cout_marginal(
+    type_enveloppe: EnveloppeType,
+    fraction_pv: np.ndarray,
+    anciennete: np.ndarray,
+    tmi: float,
+    couple: bool,
+    option_bareme_cto: bool
+) -> np.ndarray:
+    """Impôt par euro retiré (clé d'ordre des poches)"""
+    ps = FiscalRules.PRELEVEMENTS_SOCIAUX
+    
+    if type_enveloppe == EnveloppeType.PEA:
+        avant_5_ans = anciennete < 5
+        return fraction_pv * (ps + tmi / 100 * avant_5_ans) + MonteCarloFiscal.PENALITE_CLOTURE_PEA * avant_5_ans
+    if type_enveloppe == EnveloppeType.ASSURANCE_VIE:
+        return fraction_pv * (ps + _taux_av(anciennete, tmi))
+    if type_enveloppe == EnveloppeType.PER:
+        return (1 - fraction_pv) * tmi / 100 + fraction_pv * FiscalRules.FLAT_TAX
+    
+    taux_cto = (tmi / 100 + ps) if option_bareme_cto else FiscalRules.FLAT_TAX
+    return fraction_pv * taux_cto
+
+
+def _brut_pour_net(
+    type_enveloppe: EnveloppeType,
+    besoin_net: np.ndarray,
+    fraction_pv: np.ndarray,
+    anciennete: np.ndarray,
+    abattement: np.ndarray,
+    tmi: float,
+    couple: bool,
+    option_bareme_cto: bool
+) -> np.ndarray:
+    """
+    Retrait brut couvrant exactement un besoin net.
+    
+    L'impôt est linéaire dans le montant retiré (taux = coût marginal), sauf
+    l'AV > 8 ans: 7.5% uniquement sur la plus-value au-delà de l'abattement.
+    """
+    if type_enveloppe == EnveloppeType.ASSURANCE_VIE:
+        ps = FiscalRules.PRELEVEMENTS_SOCIAUX
+        taux = fraction_pv * (ps + _taux_av(anciennete, tmi))
+        brut = besoin_net / (1 - taux)
+        
+        # > 8 ans: sous l'abattement seuls les PS s'appliquent
+        brut_abattu = besoin_net / (1 - fraction_pv * ps)
+        brut_au_dela = (besoin_net - 0.075 * abattement) / (1 - fraction_pv * (ps + 0.075))
+        brut_8_ans = np.where(brut_abattu * fraction_pv <= abattement, brut_abattu, brut_au_dela)
+        return np.where(anciennete >= 8, brut_8_ans, brut)
+    
+    taux = _cout_marginal(type_enveloppe, fraction_pv, anciennete, tmi, couple, option_bareme_cto)
+    if type_enveloppe == EnveloppeType.PEA:
+        taux = taux - MonteCarloFiscal.PENALITE_CLOTURE_PEA * (anciennete < 5)
+    return besoin_net / (1 - taux)
+
+
+def _impot(
+    type_enveloppe: EnveloppeType,
+    brut: np.ndarray,
+    fraction_pv: np.ndarray,
+    anciennete: np.ndarray,
+    abattement: np.ndarray,
+    tmi: float,
+    couple: bool,
+    option_bareme_cto: bool
+) -> np.ndarray:
+    """Impôt d'un retrait brut, via les règles vectorisées de FiscalRules"""
+    plus_value = brut * fraction_pv
+    
+    if type_enveloppe == EnveloppeType.PEA:
+        return FiscalRules.calculer_impot_pea_retrait_vectorise(plus_value, anciennete, tmi)
+    if type_enveloppe == EnveloppeType.ASSURANCE_VIE:
+        return FiscalRules.calculer_impot_av_vectorise(
+            plus_value, anciennete, tmi, couple=couple, abattement_disponible=abattement
+        )
+    if type_enveloppe == EnveloppeType.PER:
+        return FiscalRules.calculer_impot_per_vectorise(brut, plus_value, tmi)
+    return FiscalRules.calculer_impot_cto_vectorise(plus_value, tmi, option_bareme=option_bareme_cto)
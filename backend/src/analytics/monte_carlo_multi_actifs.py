@@ -0,0 +1,300 @@
+import numpy as np
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from analytics.monte_carlo import MonteCarloSimulator
+from analytics.cache_scenarios import CacheScenarios
+from analytics.backtesting import FrequenceReequilibrage
+
+
+class MonteCarloMultiActifs(MonteCarloSimulator):
+    """
+    Simulation Monte Carlo d'un portefeuille multi-ETFs à rendements corrélés.
+    
+    Fonctionnalités:
+    - Univers d'ISINs avec rendements moyens et matrice de covariance annuels
+    - Rendements mensuels corrélés: mu / 12 + Z . L^T, L = Cholesky(covariance / 12)
+    - Poches par actif qui dérivent entre deux rééquilibrages périodiques
+    - Facteur de Cholesky et tirages mis en cache au niveau processus: les
+      variantes d'allocation sur un même univers et un même horizon réutilisent
+      les mêmes rendements simulés (nombres aléatoires communs)
+    """
+    
+    # Nombre de facteurs de Cholesky conservés en cache
+    TAILLE_CACHE_CHOLESKY = 32
+    
+    _cache_cholesky: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+    _verrou_cache = threading.Lock()
+    
+    # Tenseurs de rendements corrélés, bornés en octets
+    _cache_rendements = CacheScenarios(budget_octets=512 * 1024 * 1024)
+    
+    PAS_REEQUILIBRAGE_MOIS = {
+        FrequenceReequilibrage.MENSUEL: 1,
+        FrequenceReequilibrage.TRIMESTRIEL: 3,
+        FrequenceReequilibrage.ANNUEL: 12,
+    }
+    
+    @classmethod
+    def _cache_get(cls, cache: OrderedDict, cle: tuple) -> Optional[np.ndarray]:
+        with cls._verrou_cache:
+            valeur = cache.get(cle)
+            if valeur is not None:
+                cache.move_to_end(cle)
+            return valeur
+    
+    @classmethod
+    def _cache_set(cls, cache: OrderedDict, cle: tuple, valeur: np.ndarray, taille_max: int):
+        with cls._verrou_cache:
+            cache[cle] = valeur
+            cache.move_to_end(cle)
+            while len(cache) > taille_max:
+                cache.popitem(last=False)
+    
+    @classmethod
+    def vider_caches(cls):
+        """Vide les caches Cholesky et tirages"""
+        with cls._verrou_cache:
+            cls._cache_cholesky.clear()
+        cls._cache_rendements.clear()
+    
+    @classmethod
+    def facteur_cholesky(cls, isins: List[str], covariance_annuelle: np.ndarray) -> np.ndarray:
+        """
+        Facteur de Cholesky (triangulaire inférieur) de la covariance mensuelle.
+        
+        Args:
+            isins: Univers ordonné d'ISINs
+            covariance_annuelle: Matrice de covariance annuelle (n x n)
+        
+        Returns:
+            Matrice L telle que L . L^T = covariance_annuelle / 12
+        """
+        covariance_annuelle = np.ascontiguousarray(covariance_annuelle, dtype=float)
+        cle = (tuple(isins), covariance_annuelle.tobytes())
+        
+        facteur = cls._cache_get(cls._cache_cholesky, cle)
+        if facteur is not None:
+            return facteur
+        
+        if covariance_annuelle.shape != (len(isins), len(isins)):
+            raise ValueError("La matrice de covariance doit être carrée de taille nb_isins")
+        if not np.allclose(covariance_annuelle, covariance_annuelle.T):
+            raise ValueError("La matrice de covariance doit être symétrique")
+        
+        try:
+            facteur = np.linalg.cholesky(covariance_annuelle / 12)
+        except np.linalg.LinAlgError:
+            raise ValueError("La matrice de covariance n'est pas définie positive")
+        
+        facteur.setflags(write=False)
+        cls._cache_set(cls._cache_cholesky, cle, facteur, cls.TAILLE_CACHE_CHOLESKY)
+        return facteur
+    
+    def tirer_rendements_correles(
+        self,
+        isins: List[str],
+        rendements_moyens_annuels: List[float],
+        covariance_annuelle: np.ndarray,
+        nb_annees: int,
+        nb_simulations: int
+    ) -> np.ndarray:
+        """
+        Rendements mensuels corrélés (nb_simulations x nb_mois x nb_actifs).
+        
+        Avec une seed, le tenseur est mis en cache (lecture seule) et partagé
+        par toutes les allocations évaluées sur le même univers et horizon.
+        """
+        rendements_moyens = np.ascontiguousarray(rendements_moyens_annuels, dtype=float)
+        covariance_annuelle = np.ascontiguousarray(covariance_annuelle, dtype=float)
+        
+        if len(rendements_moyens) != len(isins):
+            raise ValueError("Un rendement moyen attendu par ISIN")
+        
+        facteur = self.facteur_cholesky(isins, covariance_annuelle)
+        
+        def generer(rng: np.random.Generator) -> np.ndarray:
+            chocs = rng.standard_normal((nb_simulations, nb_annees * 12, len(isins)))
+            rendements = chocs @ facteur.T
+            rendements += rendements_moyens / 12
+            return rendements
+        
+        if self.seed is None:
+            return generer(self.rng)
+        
+        rendements, _ = self._cache_rendements.obtenir_ou_generer(
+            cle=(
+                self.seed, nb_simulations, nb_annees, tuple(isins),
+                rendements_moyens.tobytes(), covariance_annuelle.tobytes()
+            ),
+            seed=self.seed,
+            generer=generer
+        )
+        return rendements
+    
+    def simuler_portefeuille(
+        self,
+        allocation: Dict[str, float],
+        isins: List[str],
+        rendements_moyens_annuels: List[float],
+        covariance_annuelle: np.ndarray,
+        valeur_initiale: float,
+        nb_annees: int,
+        nb_simulations: int = 5000,
+        apports_annuels: float = 0.0,
+        retraits_annuels: float = 0.0,
+        frequence_reequilibrage: FrequenceReequilibrage = FrequenceReequilibrage.ANNUEL
+    ) -> Dict[str, any]:
+        """
+        Simule les poches d'un portefeuille multi-actifs.
+        
+        Args:
+            allocation: Dict {isin: poids%}, ISINs de l'univers (absents = 0%)
+            isins: Univers ordonné d'ISINs (ordre de la covariance)
+            rendements_moyens_annuels: Rendement moyen annuel par ISIN (décimal)
+            covariance_annuelle: Covariance annuelle des rendements (n x n)
+            valeur_initiale: Capital initial
+            nb_annees: Horizon de projection
+            nb_simulations: Nombre de simulations
+            apports_annuels: Apports annuels (investis selon l'allocation cible)
+            retraits_annuels: Retraits annuels (prélevés au prorata des poches)
+            frequence_reequilibrage: Fréquence de retour à l'allocation cible
+        
+        Returns:
+            Dict avec trajectoires annuelles et poids finaux moyens
+        """
+        inconnus = set(allocation) - set(isins)
+        if inconnus:
+            raise ValueError(f"ISINs hors univers: {sorted(inconnus)}")
+        
+        poids = np.array([allocation.get(isin, 0.0) for isin in isins], dtype=float) / 100
+        if poids.sum() <= 0:
+            raise ValueError("Allocation vide")
+        poids /= poids.sum()
+        
+        rendements = self.tirer_rendements_correles(
+            isins, rendements_moyens_annuels, covariance_annuelle, nb_annees, nb_simulations
+        )
+        
+        nb_mois = nb_annees * 12
+        flux_annuel = apports_annuels - retraits_annuels
+        frequence_reequilibrage = FrequenceReequilibrage(frequence_reequilibrage)
+        if frequence_reequilibrage == FrequenceReequilibrage.SUR_SEUIL:
+            raise ValueError("Rééquilibrage sur seuil non supporté par la simulation mensuelle")
+        pas = self.PAS_REEQUILIBRAGE_MOIS.get(frequence_reequilibrage)
+        
+        # Fins de période: rééquilibrages et fins d'année (flux)
+        bornes = set(range(12, nb_mois + 1, 12))
+        if pas:
+            bornes.update(range(pas, nb_mois + 1, pas))
+        bornes = sorted(bornes)
+        
+        poches = np.outer(np.full(nb_simulations, float(valeur_initiale)), poids)
+        trajectoires_annuelles = np.empty((nb_simulations, nb_annees + 1))
+        trajectoires_annuelles[:, 0] = valeur_initiale
+        
+        debut = 0
+        for fin in bornes:
+            # Croissance des poches sur la période (facteurs bornés à 0)
+            facteurs = 1.0 + rendements[:, debut:fin, :]
+            np.maximum(facteurs, 0.0, out=facteurs)
+            poches *= facteurs.prod(axis=1)
+            
+            if fin % 12 == 0:
+                if flux_annuel >= 0:
+                    poches += flux_annuel * poids
+                else:
+                    total = poches.sum(axis=1, keepdims=True)
+                    part_retiree = np.divide(
+                        -flux_annuel, total,
+                        out=np.ones_like(total), where=total > 0
+                    )
+                    poches *= np.maximum(1.0 - part_retiree, 0.0)
+            
+            if pas and fin % pas == 0:
+                poches = poches.sum(axis=1, keepdims=True) * poids
+            
+            if fin % 12 == 0:
+                trajectoires_annuelles[:, fin // 12] = poches.sum(axis=1)
+            
+            debut = fin
+        
+        totaux = poches.sum(axis=1, keepdims=True)
+        poids_finaux = np.divide(poches, totaux, out=np.zeros_like(poches), where=totaux > 0)
+        
+        return {
+            "trajectoires_annuelles": trajectoires_annuelles,
+            "poids_finaux_moyens": {
+                isin: round(float(p) * 100, 2)
+                for isin, p in zip(isins, poids_finaux.mean(axis=0))
+            },
+            "nb_simulations": nb_simulations,
+            "nb_annees": nb_annees
+        }
+    
+    def analyser_portefeuille(
+        self,
+        allocation: Dict[str, float],
+        isins: List[str],
+        rendements_moyens_annuels: List[float],
+        covariance_annuelle: np.ndarray,
+        valeur_initiale: float,
+        nb_annees: int = 30,
+        nb_simulations: int = 5000,
+        apports_annuels: float = 0.0,
+        retraits_annuels: float = 0.0,
+        objectif_capital: Optional[float] = None,
+        frequence_reequilibrage: FrequenceReequilibrage = FrequenceReequilibrage.ANNUEL
+    ) -> dict:
+        """
+        Analyse Monte Carlo complète d'un portefeuille multi-actifs.
+        
+        Returns:
+            Dict au format de analyser_simulation_complete + poids finaux moyens
+        """
+        simulation = self.simuler_portefeuille(
+            allocation=allocation,
+            isins=isins,
+            rendements_moyens_annuels=rendements_moyens_annuels,
+            covariance_annuelle=covariance_annuelle,
+            valeur_initiale=valeur_initiale,
+            nb_annees=nb_annees,
+            nb_simulations=nb_simulations,
+            apports_annuels=apports_annuels,
+            retraits_annuels=retraits_annuels,
+            frequence_reequilibrage=frequence_reequilibrage
+        )
+        
+        trajectoires_annuelles = simulation["trajectoires_annuelles"]
+        percentiles_data = self.calculer_percentiles(trajectoires_annuelles)
+        valeurs_finales = trajectoires_annuelles[:, -1]
+        
+        return {
+            "parametres": {
+                "valeur_initiale": valeur_initiale,
+                "allocation": allocation,
+                "nb_annees": nb_annees,
+                "nb_simulations": nb_simulations,
+                "apports_annuels": apports_annuels,
+                "retraits_annuels": retraits_annuels,
+                "frequence_reequilibrage": FrequenceReequilibrage(frequence_reequilibrage).value
+            },
+            "percentiles": {
+                f"p{p}": round(valeurs[-1], 2) for p, valeurs in percentiles_data.items()
+            },
+            "probabilites": self.calculer_probabilite_succes(
+                trajectoires_annuelles,
+                objectif=objectif_capital
+            ),
+            "statistiques_finales": {
+                "valeur_min": round(np.min(valeurs_finales), 2),
+                "valeur_max": round(np.max(valeurs_finales), 2),
+                "valeur_mediane": round(np.median(valeurs_finales), 2),
+                "valeur_moyenne": round(np.mean(valeurs_finales), 2),
+                "ecart_type": round(np.std(valeurs_finales), 2)
+            },
+            "poids_finaux_moyens": simulation["poids_finaux_moyens"],
+            "fan_chart_data": self._construire_fan_chart(percentiles_data, nb_annees + 1),
+            "nb_simulations_reussies": nb_simulations
+        }
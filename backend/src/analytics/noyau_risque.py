@@ -0,0 +1,168 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+class NoyauRisque:
+    """
+    Noyau fusionné des métriques de risque sur des rendements alignés.
+    
+    Entrée: tableau (jours,) pour un portefeuille ou (jours x portefeuilles)
+    pour un lot, même convention que NoyauBacktest.simuler_lot. En deux passes:
+    - moyenne, puis moments centrés d'ordre 2 à 4 et co-moments avec le
+      benchmark à partir des mêmes écarts à la moyenne
+    - quantiles par np.partition (sélection partielle en O(n), sans tri
+      complet) pour tous les niveaux de confiance à la fois
+    
+    Les conventions sont celles de RiskMetrics: percentile à interpolation
+    linéaire, skewness et kurtosis ajustés (comme pandas), écarts-types non
+    biaisés.
+    """
+    
+    NIVEAUX = (0.95, 0.99)
+    
+    @staticmethod
+    def _positions_quantiles(nb: int, niveaux: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rangs inférieurs, supérieurs et poids d'interpolation des percentiles (1 - niveau)"""
+        rangs = (nb - 1) * (1 - np.asarray(niveaux, dtype=np.float64))
+        bas = np.floor(rangs).astype(np.int64)
+        haut = np.minimum(bas + 1, nb - 1)
+        return bas, haut, rangs - bas
+    
+    @staticmethod
+    def calculer(
+        rendements: np.ndarray,
+        rendements_benchmark: Optional[np.ndarray] = None,
+        niveaux: Tuple[float, ...] = NIVEAUX
+    ) -> Dict[str, np.ndarray]:
+        """
+        Toutes les métriques de risque en un appel.
+        
+        Args:
+            rendements: Rendements quotidiens alignés, (jours,) ou (jours x portefeuilles), sans NaN
+            rendements_benchmark: Rendements du benchmark alignés, (jours,) ou même forme
+            niveaux: Niveaux de confiance des VaR / CVaR
+        
+        Returns:
+            Dict {var_XX, cvar_XX, skewness, kurtosis[, beta, tracking_error,
+            information_ratio]}: scalaires pour une entrée 1-D, tableaux (portefeuilles,) sinon.
+            VaR, CVaR et tracking error en %, kurtosis non excédentaire.
+        """
+        rendements = np.asarray(rendements, dtype=np.float64)
+        une_serie = rendements.ndim == 1
+        if une_serie:
+            rendements = rendements[:, None]
+        nb, nb_portefeuilles = rendements.shape
+        
+        resultats = {}
+        
+        # Quantiles: une seule sélection partielle pour tous les niveaux
+        if nb >= 2:
+            bas, haut, poids = NoyauRisque._positions_quantiles(nb, niveaux)
+            selection = np.partition(rendements, np.unique(np.concatenate([bas, haut])), axis=0)
+            seuils = selection[bas] + poids[:, None] * (selection[haut] - selection[bas])
+        
+        for i, niveau in enumerate(niveaux):
+            suffixe = f"{round(niveau * 100):d}"
+            if nb < 2:
+                resultats[f"var_{suffixe}"] = np.zeros(nb_portefeuilles)
+                resultats[f"cvar_{suffixe}"] = np.zeros(nb_portefeuilles)
+                continue
+            
+            pires = rendements <= seuils[i]
+            nb_pires = pires.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                moyenne_pires = np.where(pires, rendements, 0.0).sum(axis=0) / nb_pires
+            resultats[f"var_{suffixe}"] = seuils[i] * 100
+            resultats[f"cvar_{suffixe}"] = np.where(nb_pires > 0, moyenne_pires * 100, 0.0)
+        
+        # Moments centrés à partir des mêmes écarts
+        moyenne = rendements.mean(axis=0)
+        ecarts = rendements - moyenne
+        carres = ecarts * ecarts
+        m2 = carres.sum(axis=0)
+        m3 = (carres * ecarts).sum(axis=0)
+        m4 = (carres * carres).sum(axis=0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if nb >= 3:
+                skewness = np.sqrt(nb * (nb - 1)) / (nb - 2) * (m3 / nb) / (m2 / nb) ** 1.5
+            else:
+                skewness = np.zeros(nb_portefeuilles)
+            if nb >= 4:
+                kurtosis = (
+                    nb * (nb + 1) * (nb - 1) * m4 / ((nb - 2) * (nb - 3) * m2 ** 2)
+                    - 3 * (nb - 1) ** 2 / ((nb - 2) * (nb - 3))
+                ) + 3
+            else:
+                kurtosis = np.full(nb_portefeuilles, 3.0)
+        resultats["skewness"] = np.where(m2 > 0, skewness, 0.0)
+        resultats["kurtosis"] = np.where(m2 > 0, kurtosis, 3.0)
+        
+        # Co-moments avec le benchmark
+        if rendements_benchmark is not None:
+            resultats.update(NoyauRisque.co_moments(rendements, rendements_benchmark, moyenne, ecarts))
+        
+        if une_serie:
+            return {cle: float(valeur[0]) for cle, valeur in resultats.items()}
+        return resultats
+    
+    @staticmethod
+    def co_moments(
+        rendements: np.ndarray,
+        rendements_benchmark: np.ndarray,
+        moyenne: Optional[np.ndarray] = None,
+        ecarts: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Beta, tracking error (%) et information ratio face au benchmark.
+        
+        Args:
+            rendements: Rendements alignés (jours x portefeuilles)
+            rendements_benchmark: Rendements du benchmark, (jours,) ou même forme
+            moyenne, ecarts: Moyenne et écarts à la moyenne déjà calculés (optionnels)
+        
+        Returns:
+            Dict {beta, tracking_error, information_ratio} de tableaux (portefeuilles,)
+        """
+        rendements = np.asarray(rendements, dtype=np.float64)
+        if rendements.ndim == 1:
+            rendements = rendements[:, None]
+        nb, nb_portefeuilles = rendements.shape
+        
+        benchmark = np.asarray(rendements_benchmark, dtype=np.float64)
+        if benchmark.ndim == 1:
+            benchmark = benchmark[:, None]
+        if benchmark.shape[0] != nb:
+            raise ValueError("Rendements et benchmark doivent être alignés (même nombre de jours)")
+        
+        if nb < 2:
+            return {
+                "beta": np.ones(nb_portefeuilles),
+                "tracking_error": np.zeros(nb_portefeuilles),
+                "information_ratio": np.zeros(nb_portefeuilles)
+            }
+        
+        if moyenne is None:
+            moyenne = rendements.mean(axis=0)
+            ecarts = rendements - moyenne
+        moyenne_bm = benchmark.mean(axis=0)
+        ecarts_bm = benchmark - moyenne_bm
+        ecarts_relatifs = ecarts - ecarts_bm
+        
+        covariance = (ecarts * ecarts_bm).sum(axis=0) / (nb - 1)
+        variance_bm = (ecarts_bm * ecarts_bm).sum(axis=0) / (nb - 1)
+        ecart_type_relatif = np.sqrt((ecarts_relatifs * ecarts_relatifs).sum(axis=0) / (nb - 1))
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            beta = np.where(variance_bm != 0, covariance / variance_bm, 1.0)
+            information_ratio = np.where(
+                ecart_type_relatif != 0,
+                (moyenne - moyenne_bm) * 252 / (ecart_type_relatif * np.sqrt(252)),
+                0.0
+            )
+        
+        return {
+            "beta": np.broadcast_to(beta, (nb_portefeuilles,)),
+            "tracking_error": np.broadcast_to(ecart_type_relatif * np.sqrt(252) * 100, (nb_portefeuilles,)),
+            "information_ratio": np.broadcast_to(information_ratio, (nb_portefeuilles,))
+        }
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional
 
+from analytics.index_metriques import registre_index_metriques
+
 
 class PerformanceAnalyzer:
     """
@@ -37,13 +39,22 @@ class PerformanceAnalyzer:
         return rendements.std() * np.sqrt(252) * 100
     
     @staticmethod
-    def analyser_periodes(serie_valeurs: pd.Series) -> Dict:
+    def analyser_periodes(serie_valeurs: pd.Series, cle: Optional[str] = None) -> Dict:
         """
         Analyse les performances sur différentes périodes.
         
+        Args:
+            serie_valeurs: Série temporelle des valeurs
+            cle: Identifiant de la série (ticker, portefeuille). Si fourni, les
+                 performances sont lues dans l'index de métriques partagé,
+                 prolongé des seules nouvelles valeurs
+        
         Returns:
             Dict avec performances 1M, 3M, 6M, 1Y, 3Y, 5Y
         """
+        if cle is not None:
+            return registre_index_metriques.obtenir(cle, serie_valeurs).analyser_periodes()
+        
         valeur_actuelle = serie_valeurs.iloc[-1]
         date_actuelle = serie_valeurs.index[-1]
         
@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+from analytics.noyau_risque import NoyauRisque
 
 
 class RiskMetrics:
@@ -8,6 +10,22 @@ class RiskMetrics:
     Calcul des métriques de risque avancées.
     """
     
+    # Métriques et décimales de l'analyse complète
+    DECIMALES = {
+        "var_95": 2, "cvar_95": 2, "var_99": 2, "cvar_99": 2,
+        "skewness": 2, "kurtosis": 2,
+        "beta": 2, "tracking_error": 2, "information_ratio": 2
+    }
+    
+    @staticmethod
+    def _aligner(rendements_actif: pd.Series, rendements_benchmark: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Rendements alignés sur les dates communes, sans NaN (tableaux contigus)"""
+        actif, benchmark = rendements_actif.align(rendements_benchmark, join="inner")
+        actif = actif.to_numpy(dtype=np.float64)
+        benchmark = benchmark.to_numpy(dtype=np.float64)
+        valides = ~(np.isnan(actif) | np.isnan(benchmark))
+        return actif[valides], benchmark[valides]
+    
     @staticmethod
     def calculer_var(
         rendements: pd.Series,
@@ -57,22 +75,12 @@ class RiskMetrics:
         if len(rendements_actif) < 2 or len(rendements_marche) < 2:
             return 1.0
         
-        # Aligner les séries
-        df = pd.DataFrame({
-            'actif': rendements_actif,
-            'marche': rendements_marche
-        }).dropna()
-        
-        if len(df) < 2:
-            return 1.0
-        
-        covariance = df['actif'].cov(df['marche'])
-        variance_marche = df['marche'].var()
+        actif, marche = RiskMetrics._aligner(rendements_actif, rendements_marche)
         
-        if variance_marche == 0:
+        if len(actif) < 2:
             return 1.0
         
-        return covariance / variance_marche
+        return float(NoyauRisque.co_moments(actif, marche)["beta"][0])
     
     @staticmethod
     def calculer_tracking_error(
@@ -84,18 +92,12 @@ class RiskMetrics:
         
         TE = volatilité de (Rendements actif - Rendements benchmark)
         """
-        df = pd.DataFrame({
-            'actif': rendements_actif,
-            'benchmark': rendements_benchmark
-        }).dropna()
+        actif, benchmark = RiskMetrics._aligner(rendements_actif, rendements_benchmark)
         
-        if len(df) < 2:
+        if len(actif) < 2:
             return 0.0
         
-        ecarts = df['actif'] - df['benchmark']
-        tracking_error = ecarts.std() * np.sqrt(252) * 100
-        
-        return tracking_error
+        return float(NoyauRisque.co_moments(actif, benchmark)["tracking_error"][0])
     
     @staticmethod
     def calculer_information_ratio(
@@ -107,24 +109,12 @@ class RiskMetrics:
         
         IR = (Rendement actif - Rendement benchmark) / Tracking Error
         """
-        df = pd.DataFrame({
-            'actif': rendements_actif,
-            'benchmark': rendements_benchmark
-        }).dropna()
+        actif, benchmark = RiskMetrics._aligner(rendements_actif, rendements_benchmark)
         
-        if len(df) < 2:
+        if len(actif) < 2:
             return 0.0
         
-        rendement_actif_annuel = df['actif'].mean() * 252
-        rendement_benchmark_annuel = df['benchmark'].mean() * 252
-        
-        ecarts = df['actif'] - df['benchmark']
-        tracking_error = ecarts.std() * np.sqrt(252)
-        
-        if tracking_error == 0:
-            return 0.0
-        
-        return (rendement_actif_annuel - rendement_benchmark_annuel) / tracking_error
+        return float(NoyauRisque.co_moments(actif, benchmark)["information_ratio"][0])
     
     @staticmethod
     def calculer_skewness(rendements: pd.Series) -> float:
@@ -163,20 +153,51 @@ class RiskMetrics:
         Returns:
             Dict avec toutes les métriques de risque
         """
-        resultats = {
-            "var_95": round(RiskMetrics.calculer_var(rendements, 0.95), 2),
-            "cvar_95": round(RiskMetrics.calculer_cvar(rendements, 0.95), 2),
-            "var_99": round(RiskMetrics.calculer_var(rendements, 0.99), 2),
-            "cvar_99": round(RiskMetrics.calculer_cvar(rendements, 0.99), 2),
-            "skewness": round(RiskMetrics.calculer_skewness(rendements), 2),
-            "kurtosis": round(RiskMetrics.calculer_kurtosis(rendements), 2)
-        }
+        valeurs = rendements.dropna().to_numpy(dtype=np.float64)
+        metriques = NoyauRisque.calculer(valeurs)
         
         if rendements_benchmark is not None and len(rendements_benchmark) > 0:
-            resultats.update({
-                "beta": round(RiskMetrics.calculer_beta(rendements, rendements_benchmark), 2),
-                "tracking_error": round(RiskMetrics.calculer_tracking_error(rendements, rendements_benchmark), 2),
-                "information_ratio": round(RiskMetrics.calculer_information_ratio(rendements, rendements_benchmark), 2)
+            actif, benchmark = RiskMetrics._aligner(rendements, rendements_benchmark)
+            metriques.update({
+                cle: float(valeur[0]) for cle, valeur in NoyauRisque.co_moments(actif, benchmark).items()
             })
         
-        return resultats
+        return {cle: round(valeur, RiskMetrics.DECIMALES[cle]) for cle, valeur in metriques.items()}
+    
+    @staticmethod
+    def analyse_risque_lot(
+        rendements: pd.DataFrame,
+        rendements_benchmark: Optional[pd.Series] = None
+    ) -> Dict[str, Dict]:
+        """
+        Analyse de risque complète de nombreux portefeuilles en un seul appel du noyau.
+        
+        Args:
+            rendements: Rendements quotidiens, une colonne par portefeuille (mêmes dates).
+                        Les lignes entièrement vides (ex: première ligne de pct_change)
+                        sont ignorées
+            rendements_benchmark: Rendements du benchmark (optionnel)
+        
+        Returns:
+            Dict {portefeuille: métriques}, format de analyse_risque_complete
+        
+        Raises:
+            ValueError: Rendement manquant pour une partie seulement des portefeuilles
+                        (historiques de longueurs différentes: à analyser séparément)
+        """
+        rendements = rendements.dropna(how="all")
+        incomplets = rendements.columns[rendements.isna().any()].tolist()
+        if incomplets:
+            raise ValueError(f"Rendements manquants pour les portefeuilles: {incomplets}")
+        
+        benchmark = None
+        if rendements_benchmark is not None and len(rendements_benchmark) > 0:
+            rendements, benchmark = rendements.align(rendements_benchmark.dropna(), join="inner", axis=0)
+            benchmark = benchmark.to_numpy(dtype=np.float64)
+        
+        metriques = NoyauRisque.calculer(rendements.to_numpy(dtype=np.float64), benchmark)
+        
+        return {
+            nom: {cle: round(float(valeurs[k]), RiskMetrics.DECIMALES[cle]) for cle, valeurs in metriques.items()}
+            for k, nom in enumerate(rendements.columns)
+        }
@@ -1,4 +1,9 @@
 from data.market_data import MarketDataProvider
 from data.isin_database import ISINDatabase
+from data.price_store import PriceStore
+from data.price_panel import PanneauPrix, GestionnairePanneau
+from data.index_univers import IndexUnivers
+from data.recherche_univers import IndexRecherche
 
-__all__ = ["MarketDataProvider", "ISINDatabase"]
+__all__ = ["MarketDataProvider", "ISINDatabase", "PriceStore", "PanneauPrix", "GestionnairePanneau",
+           "IndexUnivers", "IndexRecherche"]
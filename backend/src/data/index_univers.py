@@ -0,0 +1,160 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+
+# Pas des points de contrôle des préfixes TER (bitsets cumulés tous les N rangs)
+PAS_PREFIXES = 64
+
+
+def _cle(valeur: Any) -> Any:
+    """Enums ramenés à leur valeur"""
+    return getattr(valeur, "value", valeur)
+
+
+def _valeur(etf: Any, champ: str) -> Any:
+    """Valeur d'un champ d'ETF (modèle ETF ou dict issu de universe.json)"""
+    return _cle(etf.get(champ) if isinstance(etf, dict) else getattr(etf, champ, None))
+
+
+class IndexUnivers:
+    """
+    Index compilé de l'univers d'ETFs pour le filtrage multi-critères.
+    
+    Construit une fois au chargement de l'univers:
+    - un bitset (entier Python, bit i = i-ème ETF) par valeur de classe_actif,
+      type_distribution, emetteur, eligible_pea et eligible_opcvm_actions_is
+    - un bitset par enveloppe éligible (règles fournies par l'appelant)
+    - les TER triés, avec des bitsets cumulés par rang pour les requêtes
+      d'intervalle (bisect puis au plus PAS_PREFIXES bits à compléter)
+    
+    Toute combinaison de filtres se résout par intersection de bitsets; les
+    résultats conservent l'ordre de l'univers. L'index est immuable: il est
+    reconstruit quand l'univers est rechargé.
+    """
+    
+    CHAMPS = ("classe_actif", "type_distribution", "emetteur", "eligible_pea", "eligible_opcvm_actions_is")
+    
+    def __init__(
+        self,
+        etfs: Sequence[Any],
+        enveloppes: Optional[Dict[str, Callable[[Any], bool]]] = None
+    ):
+        """
+        Args:
+            etfs: Univers d'ETFs (modèles ETF ou dicts)
+            enveloppes: Dict {type d'enveloppe: prédicat d'éligibilité} (optionnel)
+        """
+        self.etfs = list(etfs)
+        self.tous = (1 << len(self.etfs)) - 1
+        
+        self.bitsets: Dict[str, Dict[Any, int]] = {champ: {} for champ in self.CHAMPS}
+        for position, etf in enumerate(self.etfs):
+            bit = 1 << position
+            for champ, valeurs in self.bitsets.items():
+                valeur = _valeur(etf, champ)
+                valeurs[valeur] = valeurs.get(valeur, 0) | bit
+        
+        self.enveloppes: Dict[str, int] = {}
+        for enveloppe, est_eligible in (enveloppes or {}).items():
+            self.enveloppes[_cle(enveloppe)] = sum(
+                1 << position for position, etf in enumerate(self.etfs) if est_eligible(etf)
+            )
+        
+        # TER triés (tri stable) et bitsets cumulés tous les PAS_PREFIXES rangs
+        self._ordre_ter = sorted(range(len(self.etfs)), key=lambda position: float(_valeur(self.etfs[position], "ter")))
+        self._ters = [float(_valeur(self.etfs[position], "ter")) for position in self._ordre_ter]
+        self._prefixes = [0]
+        cumul = 0
+        for rang, position in enumerate(self._ordre_ter, start=1):
+            cumul |= 1 << position
+            if rang % PAS_PREFIXES == 0:
+                self._prefixes.append(cumul)
+    
+    def __len__(self) -> int:
+        return len(self.etfs)
+    
+    def _prefixe(self, rang: int) -> int:
+        """Bitset des ETFs de rang TER < rang"""
+        bloc, reste = divmod(rang, PAS_PREFIXES)
+        bitset = self._prefixes[bloc]
+        debut = bloc * PAS_PREFIXES
+        for position in self._ordre_ter[debut:debut + reste]:
+            bitset |= 1 << position
+        return bitset
+    
+    def bitset_ter(self, min_ter: Optional[float] = None, max_ter: Optional[float] = None) -> int:
+        """Bitset des ETFs tels que min_ter <= ter <= max_ter (bornes optionnelles)"""
+        bas = bisect_left(self._ters, min_ter) if min_ter is not None else 0
+        haut = bisect_right(self._ters, max_ter) if max_ter is not None else len(self._ters)
+        if haut <= bas:
+            return 0
+        return self._prefixe(haut) & ~self._prefixe(bas)
+    
+    def bitset(
+        self,
+        enveloppe: Optional[Any] = None,
+        min_ter: Optional[float] = None,
+        max_ter: Optional[float] = None,
+        **egalites: Any
+    ) -> int:
+        """
+        Bitset des ETFs satisfaisant tous les critères.
+        
+        Args:
+            enveloppe: Type d'enveloppe (EnveloppeType ou valeur)
+            min_ter, max_ter: Bornes incluses du TER
+            **egalites: Critères d'égalité sur CHAMPS (None = pas de filtre)
+        
+        Returns:
+            Bitset (une valeur inconnue donne un ensemble vide)
+        
+        Raises:
+            ValueError: Champ non indexé ou enveloppe sans règle d'éligibilité
+        """
+        bitset = self.tous
+        
+        if enveloppe is not None:
+            enveloppe = _cle(enveloppe)
+            if enveloppe not in self.enveloppes:
+                raise ValueError(f"Enveloppe non indexée: {enveloppe}")
+            bitset &= self.enveloppes[enveloppe]
+        
+        for champ, valeur in egalites.items():
+            if champ not in self.bitsets:
+                raise ValueError(f"Champ non indexé: {champ}")
+            if valeur is not None:
+                bitset &= self.bitsets[champ].get(_cle(valeur), 0)
+        
+        if min_ter is not None or max_ter is not None:
+            bitset &= self.bitset_ter(min_ter, max_ter)
+        
+        return bitset
+    
+    def positions(self, bitset: int) -> np.ndarray:
+        """Positions (croissantes) des bits à 1"""
+        if not bitset:
+            return np.empty(0, dtype=np.int64)
+        octets = np.frombuffer(bitset.to_bytes((bitset.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(octets, bitorder="little"))
+    
+    def filtrer(self, **criteres: Any) -> List[Any]:
+        """
+        ETFs satisfaisant tous les critères, dans l'ordre de l'univers.
+        
+        Args:
+            **criteres: Mêmes critères que bitset()
+        
+        Returns:
+            Liste d'ETFs
+        """
+        etfs = self.etfs
+        return [etfs[position] for position in self.positions(self.bitset(**criteres)).tolist()]
+    
+    def compter(self, **criteres: Any) -> int:
+        """Nombre d'ETFs satisfaisant tous les critères"""
+        return self.bitset(**criteres).bit_count()
+    
+    def valeurs(self, champ: str) -> List[Any]:
+        """Valeurs distinctes d'un champ indexé (ordre de première apparition)"""
+        return list(self.bitsets[champ])
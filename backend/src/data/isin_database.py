@@ -2,12 +2,17 @@ import json
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from data.index_univers import IndexUnivers
+from data.recherche_univers import IndexRecherche
+
 
 class ISINDatabase:
     """
     Base de données des ETFs avec ISIN.
     
-    Gère l'univers d'ETFs disponibles.
+    Gère l'univers d'ETFs disponibles. Les filtres par critères et la
+    recherche texte sont servis par les index (IndexUnivers, IndexRecherche)
+    construits au chargement.
     """
     
     def __init__(self, data_file: str = "data/etfs/universe.json"):
@@ -15,6 +20,8 @@ class ISINDatabase:
         self.etfs = self._load_etfs()
         self.isin_index = {etf["isin"]: etf for etf in self.etfs}
         self.ticker_index = {etf["ticker"]: etf for etf in self.etfs}
+        self.index = IndexUnivers(self.etfs)
+        self.index_recherche = IndexRecherche(self.etfs)
     
     def _load_etfs(self) -> List[dict]:
         """Charge la base d'ETFs depuis JSON"""
@@ -42,57 +49,45 @@ class ISINDatabase:
         Recherche des ETFs selon critères.
         
         Args:
-            query: Recherche texte (nom, ticker, ISIN)
+            query: Recherche texte (préfixe d'ISIN ou de ticker, nom tolérant aux fautes)
             eligible_pea: Filtrer par éligibilité PEA
             classe_actif: Filtrer par classe d'actifs
             type_distribution: Filtrer par type (capitalisant/distributif)
         
         Returns:
-            Liste d'ETFs correspondants
+            Liste d'ETFs correspondants (par pertinence si query, sinon dans l'ordre de l'univers)
         """
-        resultats = self.etfs.copy()
-        
-        # Filtre texte
-        if query:
-            query_lower = query.lower()
-            resultats = [
-                etf for etf in resultats
-                if (query_lower in etf["nom"].lower() or
-                    query_lower in etf["ticker"].lower() or
-                    query_lower in etf["isin"].lower())
-            ]
-        
-        # Filtre éligibilité PEA
-        if eligible_pea is not None:
-            resultats = [etf for etf in resultats if etf["eligible_pea"] == eligible_pea]
-        
-        # Filtre classe d'actifs
-        if classe_actif:
-            resultats = [etf for etf in resultats if etf["classe_actif"] == classe_actif]
-        
-        # Filtre type distribution
-        if type_distribution:
-            resultats = [etf for etf in resultats if etf["type_distribution"] == type_distribution]
+        # Filtres par critères: intersection des bitsets de l'index
+        criteres = {
+            "eligible_pea": eligible_pea,
+            "classe_actif": classe_actif or None,
+            "type_distribution": type_distribution or None
+        }
+        if not query:
+            return self.index.filtrer(**criteres)
         
-        return resultats
+        # Recherche texte restreinte aux ETFs retenus
+        positions = self.index.positions(self.index.bitset(**criteres))
+        recherche = self.index_recherche.rechercher(query, limite=None, positions=positions)
+        return [resultat["etf"] for resultat in recherche["resultats"]]
     
     def get_etfs_pea(self) -> List[dict]:
         """Retourne tous les ETFs éligibles PEA"""
-        return [etf for etf in self.etfs if etf["eligible_pea"]]
+        return self.index.filtrer(eligible_pea=True)
     
     def get_etfs_by_classe(self, classe_actif: str) -> List[dict]:
         """Retourne les ETFs d'une classe d'actifs"""
-        return [etf for etf in self.etfs if etf["classe_actif"] == classe_actif]
+        return self.index.filtrer(classe_actif=classe_actif)
     
     def get_stats_universe(self) -> Dict:
         """Statistiques sur l'univers d'ETFs"""
         return {
             "nb_total": len(self.etfs),
-            "nb_eligible_pea": len([e for e in self.etfs if e["eligible_pea"]]),
-            "nb_opcvm_actions_is": len([e for e in self.etfs if e["eligible_opcvm_actions_is"]]),
-            "nb_capitalisants": len([e for e in self.etfs if e["type_distribution"] == "capitalisant"]),
-            "classes_actifs": list(set(e["classe_actif"] for e in self.etfs)),
-            "emetteurs": list(set(e["emetteur"] for e in self.etfs)),
+            "nb_eligible_pea": self.index.compter(eligible_pea=True),
+            "nb_opcvm_actions_is": self.index.compter(eligible_opcvm_actions_is=True),
+            "nb_capitalisants": self.index.compter(type_distribution="capitalisant"),
+            "classes_actifs": self.index.valeurs("classe_actif"),
+            "emetteurs": self.index.valeurs("emetteur"),
             "ter_moyen": round(sum(e["ter"] for e in self.etfs) / len(self.etfs), 2) if self.etfs else 0
         }
     
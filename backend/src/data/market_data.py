@@ -1,18 +1,27 @@
+import os
 import yfinance as yf
 import pandas as pd
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from data.price_store import PriceStore
+
 
 class MarketDataProvider:
     """
     Fournisseur de données de marché via yfinance.
     
-    Télécharge prix historiques pour backtesting et analyse.
+    Télécharge prix historiques pour backtesting et analyse. Les séries sont
+    persistées dans le stockage local (PriceStore): seules les barres
+    postérieures à la dernière date stockée sont téléchargées. En mode hors
+    ligne (MARKET_DATA_OFFLINE=1), seul le stockage local est lu.
     """
     
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, store: Optional[PriceStore] = None, hors_ligne: Optional[bool] = None):
+        self.store = store if store is not None else PriceStore()
+        if hors_ligne is None:
+            hors_ligne = os.getenv('MARKET_DATA_OFFLINE', '0').lower() in ('1', 'true', 'oui')
+        self.hors_ligne = hors_ligne
     
     def telecharger_prix_historiques(
         self,
@@ -33,33 +42,87 @@ class MarketDataProvider:
         Returns:
             Série pandas des prix de clôture ajustés
         """
-        cache_key = f"{ticker}_{date_debut}_{date_fin}_{periode}"
+        if not self.hors_ligne:
+            self._mettre_a_jour_store(ticker, date_debut, date_fin, periode)
         
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        if date_debut is None and date_fin is None:
+            date_debut = self._debut_periode(ticker, periode)
+        
+        return self.store.lire(ticker, date_debut, date_fin)
+    
+    def _mettre_a_jour_store(
+        self,
+        ticker: str,
+        date_debut: Optional[str],
+        date_fin: Optional[str],
+        periode: str
+    ) -> None:
+        """Télécharge les barres manquantes et les ajoute au stockage local"""
+        derniere = self.store.derniere_date(ticker)
+        hier = pd.Timestamp.today().normalize() - timedelta(days=1)
+        
+        # Stockage à jour pour la fenêtre demandée
+        if derniere is not None and (derniere >= hier or (date_fin and derniere >= pd.Timestamp(date_fin))):
+            return
         
         try:
             etf = yf.Ticker(ticker)
             
-            if date_debut and date_fin:
+            if derniere is not None:
+                hist = etf.history(start=(derniere + timedelta(days=1)).strftime("%Y-%m-%d"))
+            elif date_debut and date_fin:
                 hist = etf.history(start=date_debut, end=date_fin)
             else:
                 hist = etf.history(period=periode)
             
             if hist.empty:
-                print(f"Pas de données pour {ticker}")
-                return pd.Series()
+                if derniere is None:
+                    print(f"Pas de données pour {ticker}")
+                return
             
             # Prix de clôture ajusté
-            prix = hist["Close"]
-            
-            self.cache[cache_key] = prix
-            
-            return prix
+            self.store.ajouter(ticker, hist["Close"])
         
         except Exception as e:
             print(f"Erreur téléchargement {ticker}: {e}")
-            return pd.Series()
+    
+    def _debut_periode(self, ticker: str, periode: str) -> Optional[str]:
+        """Date de début d'une période yfinance ("6mo", "5y", "max") relative à la dernière barre"""
+        derniere = self.store.derniere_date(ticker)
+        if derniere is None or periode == "max":
+            return None
+        if periode == "ytd":
+            return f"{derniere.year}-01-01"
+        
+        unites = {"d": "days", "mo": "months", "y": "years"}
+        for suffixe, unite in unites.items():
+            if periode.endswith(suffixe) and periode[:-len(suffixe)].isdigit():
+                debut = derniere - pd.DateOffset(**{unite: int(periode[:-len(suffixe)])})
+                return debut.strftime("%Y-%m-%d")
+        
+        return None
+    
+    def prix_stockes(
+        self,
+        tickers: List[str],
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None
+    ) -> Dict[str, pd.Series]:
+        """
+        Lit les prix depuis le seul stockage local (aucun accès réseau).
+        
+        Returns:
+            Dict {ticker: Series} des tickers présents dans le stockage
+        """
+        prix_dict = {}
+        
+        for ticker in tickers:
+            prix = self.store.lire(ticker, date_debut, date_fin)
+            
+            if not prix.empty:
+                prix_dict[ticker] = prix
+        
+        return prix_dict
     
     def telecharger_multiple_tickers(
         self,
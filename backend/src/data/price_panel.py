@@ -0,0 +1,174 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from data.price_store import PriceStore, date_en_jour
+
+
+class PanneauPrix:
+    """
+    Panel de prix aligné et immuable: un calendrier, une matrice 2-D, un index ticker -> colonne.
+    
+    - calendrier: int64 (nb_jours,), jours depuis 1970-01-01, union des dates stockées
+    - prix: float64 (nb_jours x nb_tickers), NaN quand un ticker n'a pas de barre
+    
+    Les bornes de dates sont résolues par searchsorted sur le calendrier: la
+    tranche de lignes est une vue. Une sélection de colonnes contiguës reste
+    une vue; sinon seule la fenêtre demandée est copiée.
+    """
+    
+    def __init__(self, calendrier: np.ndarray, prix: np.ndarray, tickers: List[str], version: int = 0):
+        self.calendrier = calendrier
+        self.prix = prix
+        self.tickers = list(tickers)
+        self.colonnes: Dict[str, int] = {ticker: j for j, ticker in enumerate(self.tickers)}
+        self.version = version
+        
+        # Instantané partagé entre requêtes: lecture seule
+        self.calendrier.setflags(write=False)
+        self.prix.setflags(write=False)
+    
+    @classmethod
+    def depuis_store(cls, store: PriceStore, tickers: Optional[List[str]] = None, version: int = 0) -> "PanneauPrix":
+        """
+        Construit le panel aligné depuis le stockage local.
+        
+        Args:
+            store: Stockage des prix
+            tickers: Tickers à charger (défaut: tous les tickers stockés)
+            version: Version du stockage au moment de la construction
+        """
+        tickers = store.tickers() if tickers is None else tickers
+        series = [store.lire_tableaux(ticker) for ticker in tickers]
+        
+        if not series:
+            return cls(np.empty(0, dtype=np.int64), np.empty((0, 0)), [], version)
+        
+        calendrier = np.unique(np.concatenate([dates for dates, _ in series]))
+        prix = np.full((len(calendrier), len(tickers)), np.nan)
+        
+        for j, (dates, valeurs) in enumerate(series):
+            prix[np.searchsorted(calendrier, dates), j] = valeurs
+        
+        return cls(calendrier, prix, tickers, version)
+    
+    def bornes(self, date_debut: Optional[str] = None, date_fin: Optional[str] = None) -> Tuple[int, int]:
+        """Indices [debut, fin) des lignes comprises entre date_debut et date_fin incluses"""
+        debut = 0
+        fin = len(self.calendrier)
+        if date_debut:
+            debut = int(np.searchsorted(self.calendrier, date_en_jour(date_debut), side="left"))
+        if date_fin:
+            fin = int(np.searchsorted(self.calendrier, date_en_jour(date_fin), side="right"))
+        return debut, fin
+    
+    def extraire(
+        self,
+        tickers: List[str],
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fenêtre (dates, prix) pour une liste de tickers.
+        
+        Args:
+            tickers: Tickers demandés (tous présents dans le panel)
+            date_debut: Date de début incluse (format YYYY-MM-DD)
+            date_fin: Date de fin incluse (format YYYY-MM-DD)
+        
+        Returns:
+            Tuple (calendrier de la fenêtre, matrice nb_jours x len(tickers))
+        """
+        absents = [ticker for ticker in tickers if ticker not in self.colonnes]
+        if absents:
+            raise KeyError(f"Tickers absents du panel de prix: {absents}")
+        
+        debut, fin = self.bornes(date_debut, date_fin)
+        indices = [self.colonnes[ticker] for ticker in tickers]
+        
+        # Colonnes contiguës croissantes: vue, sinon sélection sur la seule fenêtre
+        if indices and indices == list(range(indices[0], indices[0] + len(indices))):
+            matrice = self.prix[debut:fin, indices[0]:indices[0] + len(indices)]
+        else:
+            matrice = self.prix[debut:fin].take(indices, axis=1)
+        
+        return self.calendrier[debut:fin], matrice
+    
+    def dataframe(
+        self,
+        tickers: List[str],
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Fenêtre sous forme de DataFrame (index de dates, une colonne par ticker), sans réalignement"""
+        dates, matrice = self.extraire(tickers, date_debut, date_fin)
+        index = pd.DatetimeIndex(dates.astype("datetime64[D]").astype("datetime64[ns]"))
+        return pd.DataFrame(matrice, index=index, columns=list(tickers), copy=False)
+
+
+class GestionnairePanneau:
+    """
+    Panel de prix partagé au niveau processus.
+    
+    Le panel courant est un instantané immuable: une requête qui l'a obtenu
+    le lit jusqu'au bout sans verrou. Quand le stockage change, un nouveau
+    panel est construit à part puis publié par simple remplacement de
+    référence, si bien qu'aucune requête ne voit un panel à moitié mis à jour.
+    
+    Les ajouts de ce processus sont vus immédiatement (version du stockage);
+    ceux des autres processus (commande d'import, autres workers) par la
+    signature des fichiers sur disque, contrôlée au plus une fois par
+    intervalle_controle secondes.
+    """
+    
+    def __init__(self, store: Optional[PriceStore] = None, intervalle_controle: float = 1.0):
+        """
+        Args:
+            store: Stockage des prix (défaut: stockage local par défaut)
+            intervalle_controle: Délai minimal en secondes entre deux contrôles des fichiers
+        """
+        self.store = store if store is not None else PriceStore()
+        self.intervalle_controle = intervalle_controle
+        self._panneau: Optional[PanneauPrix] = None
+        self._signature: Optional[Tuple] = None
+        self._prochain_controle = 0.0
+        self._verrou = threading.Lock()
+    
+    def _a_jour(self, panneau: Optional[PanneauPrix]) -> bool:
+        """Indique si le panel reflète le stockage (version, puis fichiers si le contrôle est dû)"""
+        if panneau is None or panneau.version != self.store.version:
+            return False
+        if time.monotonic() < self._prochain_controle:
+            return True
+        
+        self._prochain_controle = time.monotonic() + self.intervalle_controle
+        return self.store.signature() == self._signature
+    
+    def obtenir(self) -> PanneauPrix:
+        """Panel courant, reconstruit si le stockage a été modifié depuis sa construction"""
+        panneau = self._panneau
+        if panneau is not None and panneau.version == self.store.version and time.monotonic() < self._prochain_controle:
+            return panneau
+        
+        with self._verrou:
+            panneau = self._panneau
+            if not self._a_jour(panneau):
+                panneau = self._construire()
+            return panneau
+    
+    def rafraichir(self) -> PanneauPrix:
+        """Reconstruit le panel sans attendre le prochain contrôle des fichiers"""
+        with self._verrou:
+            return self._construire()
+    
+    def _construire(self) -> PanneauPrix:
+        """Construit un nouveau panel puis le publie atomiquement"""
+        # Signature relevée avant la lecture: un ajout concurrent sera vu au contrôle suivant
+        version = self.store.version
+        self._signature = self.store.signature()
+        self._prochain_controle = time.monotonic() + self.intervalle_controle
+        panneau = PanneauPrix.depuis_store(self.store, version=version)
+        self._panneau = panneau
+        return panneau
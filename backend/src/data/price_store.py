@@ -0,0 +1,302 @@
+import argparse
+import os
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou inter-processus
+    fcntl = None
+
+
+class PriceStore:
+    """
+    Stockage local et colonnaire des prix de clôture, un jeu de fichiers par ticker.
+    
+    Format (append-only, lu en mémoire mappée):
+    - <ticker>.dates: int64, dates en jours depuis 1970-01-01, strictement croissantes
+    - <ticker>.close: float64, prix de clôture alignés sur les dates
+    
+    Les lectures renvoient des vues contiguës sur les fichiers mappés (aucune
+    copie, aucun accès réseau). Les écritures n'ajoutent que les barres
+    postérieures à la dernière date stockée; elles sont sérialisées entre
+    threads et entre processus (workers, commande d'import) par un verrou
+    fcntl sur <ticker>.lock.
+    """
+    
+    EXTENSION_DATES = ".dates"
+    EXTENSION_PRIX = ".close"
+    EXTENSION_VERROU = ".lock"
+    
+    def __init__(self, repertoire: Optional[str] = None):
+        """
+        Args:
+            repertoire: Répertoire du stockage (défaut: $PRICE_STORE_DIR ou data/prices)
+        """
+        if repertoire is None:
+            repertoire = os.getenv(
+                'PRICE_STORE_DIR',
+                str(Path(__file__).resolve().parents[3] / "data" / "prices")
+            )
+        self.repertoire = Path(repertoire)
+        self._verrou = threading.Lock()
+        # {ticker: (taille fichier prix, dates mappées, prix mappés)}
+        self._mappings: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+        # Incrémentée à chaque ajout (invalidation des panels construits)
+        self.version = 0
+    
+    def _chemins(self, ticker: str) -> Tuple[Path, Path]:
+        """Chemins des fichiers dates / prix d'un ticker"""
+        nom = ticker.replace("/", "_")
+        return (
+            self.repertoire / f"{nom}{self.EXTENSION_DATES}",
+            self.repertoire / f"{nom}{self.EXTENSION_PRIX}"
+        )
+    
+    @contextmanager
+    def _verrou_fichier(self, ticker: str) -> Iterator[None]:
+        """Verrou exclusif inter-processus d'un ticker (fichier <ticker>.lock)"""
+        self.repertoire.mkdir(parents=True, exist_ok=True)
+        chemin = self.repertoire / f"{ticker.replace('/', '_')}{self.EXTENSION_VERROU}"
+        with open(chemin, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    
+    def contient(self, ticker: str) -> bool:
+        """Indique si le ticker a au moins une barre stockée"""
+        return len(self._charger(ticker)[0]) > 0
+    
+    def tickers(self) -> List[str]:
+        """Liste des tickers stockés"""
+        if not self.repertoire.exists():
+            return []
+        return sorted(chemin.stem for chemin in self.repertoire.glob(f"*{self.EXTENSION_PRIX}"))
+    
+    def signature(self) -> Tuple[Tuple[str, int, int], ...]:
+        """
+        État sur disque des fichiers de prix: (ticker, taille, mtime en ns) par ticker.
+        
+        Change à chaque ajout, y compris par un autre processus (commande
+        d'import, autre worker), contrairement à version qui ne compte que
+        les ajouts de cette instance.
+        """
+        if not self.repertoire.exists():
+            return ()
+        etats = []
+        for chemin in self.repertoire.glob(f"*{self.EXTENSION_PRIX}"):
+            try:
+                etat = chemin.stat()
+            except FileNotFoundError:
+                continue
+            etats.append((chemin.stem, etat.st_size, etat.st_mtime_ns))
+        return tuple(sorted(etats))
+    
+    def derniere_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Date de la dernière barre stockée (None si ticker absent)"""
+        dates, _ = self._charger(ticker)
+        if len(dates) == 0:
+            return None
+        return pd.Timestamp(int(dates[-1]), unit="D")
+    
+    def _charger(self, ticker: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mappe les fichiers d'un ticker en mémoire (mapping réutilisé tant
+        que le fichier n'a pas grossi).
+        """
+        chemin_dates, chemin_prix = self._chemins(ticker)
+        
+        if not chemin_prix.exists() or not chemin_dates.exists():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        
+        taille = chemin_prix.stat().st_size
+        mapping = self._mappings.get(ticker)
+        if mapping is not None and mapping[0] == taille:
+            return mapping[1], mapping[2]
+        
+        if taille == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        
+        dates = np.memmap(chemin_dates, dtype=np.int64, mode="r")
+        prix = np.memmap(chemin_prix, dtype=np.float64, mode="r")
+        
+        # Écriture interrompue: on ne garde que les barres complètes
+        nb_barres = min(len(dates), len(prix))
+        dates, prix = dates[:nb_barres], prix[:nb_barres]
+        
+        self._mappings[ticker] = (taille, dates, prix)
+        return dates, prix
+    
+    def lire_tableaux(
+        self,
+        ticker: str,
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tranche contiguë [date_debut, date_fin] sans copie.
+        
+        Args:
+            ticker: Ticker
+            date_debut: Date de début incluse (format YYYY-MM-DD)
+            date_fin: Date de fin incluse (format YYYY-MM-DD)
+        
+        Returns:
+            Tuple (dates en jours depuis 1970-01-01, prix) en vues sur les fichiers mappés
+        """
+        dates, prix = self._charger(ticker)
+        
+        debut = 0
+        fin = len(dates)
+        if date_debut:
+            debut = int(np.searchsorted(dates, date_en_jour(date_debut), side="left"))
+        if date_fin:
+            fin = int(np.searchsorted(dates, date_en_jour(date_fin), side="right"))
+        
+        return dates[debut:fin], prix[debut:fin]
+    
+    def lire(
+        self,
+        ticker: str,
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None
+    ) -> pd.Series:
+        """
+        Série de prix de clôture indexée par date.
+        
+        Returns:
+            Série pandas (vide si le ticker n'est pas stocké)
+        """
+        dates, prix = self.lire_tableaux(ticker, date_debut, date_fin)
+        index = pd.DatetimeIndex(dates.astype("datetime64[D]").astype("datetime64[ns]"))
+        return pd.Series(prix, index=index, name=ticker, copy=False)
+    
+    def ajouter(self, ticker: str, prix: pd.Series) -> int:
+        """
+        Ajoute les barres postérieures à la dernière date stockée.
+        
+        Args:
+            ticker: Ticker
+            prix: Série de prix de clôture indexée par date
+        
+        Returns:
+            Nombre de barres ajoutées
+        """
+        prix = prix.dropna()
+        if prix.empty:
+            return 0
+        
+        index = pd.DatetimeIndex(prix.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        
+        jours = index.normalize().asi8 // (86400 * 10**9)
+        valeurs = prix.to_numpy(dtype=np.float64)
+        
+        # Tri puis dernière valeur par jour
+        ordre = np.argsort(jours, kind="stable")
+        jours, valeurs = jours[ordre], valeurs[ordre]
+        dernier_du_jour = np.append(jours[1:] != jours[:-1], True)
+        jours, valeurs = jours[dernier_du_jour], valeurs[dernier_du_jour]
+        
+        with self._verrou, self._verrou_fichier(ticker):
+            chemin_dates, chemin_prix = self._chemins(ticker)
+            
+            # Écriture interrompue d'un autre processus: tronquer aux barres complètes
+            if chemin_dates.exists() and chemin_prix.exists():
+                nb_barres = min(chemin_dates.stat().st_size // 8, chemin_prix.stat().st_size // 8)
+                for chemin, taille in ((chemin_dates, 8 * nb_barres), (chemin_prix, 8 * nb_barres)):
+                    if chemin.stat().st_size != taille:
+                        os.truncate(chemin, taille)
+                        self._mappings.pop(ticker, None)
+            
+            # Dernière date relue sur disque (un autre processus a pu ajouter des barres)
+            dates_existantes, _ = self._charger(ticker)
+            if len(dates_existantes) > 0:
+                nouvelles = jours > dates_existantes[-1]
+                jours, valeurs = jours[nouvelles], valeurs[nouvelles]
+            
+            if len(jours) == 0:
+                return 0
+            
+            # Dates en premier: une barre n'est lisible qu'une fois son prix écrit
+            with open(chemin_dates, "ab") as f:
+                f.write(np.ascontiguousarray(jours, dtype=np.int64).tobytes())
+            with open(chemin_prix, "ab") as f:
+                f.write(np.ascontiguousarray(valeurs, dtype=np.float64).tobytes())
+            
+            self._mappings.pop(ticker, None)
+            self.version += 1
+        
+        return len(jours)
+    
+    def importer_csv(
+        self,
+        chemin: str,
+        ticker: Optional[str] = None,
+        colonne_date: str = "Date",
+        colonne_prix: Optional[str] = None
+    ) -> int:
+        """
+        Importe un export CSV (format Yahoo Finance: Date, ..., Close / Adj Close).
+        
+        Args:
+            chemin: Fichier CSV
+            ticker: Ticker (défaut: nom du fichier sans extension)
+            colonne_date: Colonne des dates
+            colonne_prix: Colonne des prix (défaut: Adj Close si présente, sinon Close)
+        
+        Returns:
+            Nombre de barres ajoutées
+        """
+        ticker = ticker or Path(chemin).stem
+        df = pd.read_csv(chemin)
+        
+        if colonne_prix is None:
+            colonne_prix = "Adj Close" if "Adj Close" in df.columns else "Close"
+        
+        dates = pd.to_datetime(df[colonne_date], utc=True).dt.tz_localize(None)
+        prix = pd.Series(pd.to_numeric(df[colonne_prix], errors="coerce").to_numpy(), index=dates)
+        
+        return self.ajouter(ticker, prix)
+
+
+def date_en_jour(date: str) -> int:
+    """Date YYYY-MM-DD en jours depuis 1970-01-01"""
+    return int(np.datetime64(pd.Timestamp(date).date(), "D").astype(np.int64))
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    """
+    Import hors ligne de fichiers CSV dans le stockage local.
+    
+    Usage:
+        python -m data.price_store fichier.csv [...] [--ticker T] [--repertoire DIR]
+    """
+    parser = argparse.ArgumentParser(description="Import CSV dans le stockage local des prix")
+    parser.add_argument("fichiers", nargs="+", help="Fichiers CSV (ticker = nom du fichier)")
+    parser.add_argument("--ticker", help="Ticker (un seul fichier)")
+    parser.add_argument("--repertoire", help="Répertoire du stockage")
+    parser.add_argument("--colonne-date", default="Date")
+    parser.add_argument("--colonne-prix", default=None)
+    args = parser.parse_args(arguments)
+    
+    if args.ticker and len(args.fichiers) > 1:
+        parser.error("--ticker n'est utilisable qu'avec un seul fichier")
+    
+    store = PriceStore(args.repertoire)
+    for fichier in args.fichiers:
+        nb_barres = store.importer_csv(fichier, args.ticker, args.colonne_date, args.colonne_prix)
+        print(f"{args.ticker or Path(fichier).stem}: {nb_barres} barres ajoutées")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Set
+import re
+import unicodedata
+import numpy as np
+
+
+# Part minimale des trigrammes de la requête présents dans le nom
+SEUIL_SIMILARITE = 0.4
+
+_NON_ALPHANUMERIQUE = re.compile(r"[^0-9a-z]+")
+
+
+def normaliser_texte(texte: str) -> str:
+    """Minuscules sans accents, séparateurs ramenés à un espace"""
+    decompose = unicodedata.normalize("NFKD", texte or "")
+    sans_accents = "".join(c for c in decompose if not unicodedata.combining(c))
+    return _NON_ALPHANUMERIQUE.sub(" ", sans_accents.lower()).strip()
+
+
+def trigrammes(texte: str, saisie: bool = False) -> Set[str]:
+    """
+    Trigrammes distincts d'un texte normalisé, mot par mot.
+    
+    Chaque mot est complété de deux espaces devant et d'un derrière (comme
+    pg_trgm). En saisie, le dernier mot n'est pas complété à droite: il peut
+    être un préfixe en cours de frappe.
+    """
+    mots = texte.split()
+    resultats = set()
+    for i, mot in enumerate(mots):
+        fin = "" if saisie and i == len(mots) - 1 else " "
+        mot = "  " + mot + fin
+        resultats.update(mot[j:j + 3] for j in range(len(mot) - 2))
+    return resultats
+
+
+def _champ(etf: Any, nom: str) -> Any:
+    """Champ d'un ETF (modèle ETF ou dict issu de universe.json)"""
+    return etf.get(nom) if isinstance(etf, dict) else getattr(etf, nom, None)
+
+
+def _cle_code(texte: str) -> str:
+    """Forme normalisée d'un ISIN ou d'un ticker pour la recherche par préfixe"""
+    return re.sub(r"\s+", "", (texte or "").upper())
+
+
+class _IndexPrefixes:
+    """Codes triés (ISIN ou tickers) pour l'autocomplétion par préfixe"""
+    
+    def __init__(self, codes: Sequence[str]):
+        ordre = sorted(range(len(codes)), key=lambda position: codes[position])
+        self.codes = [codes[position] for position in ordre]
+        self.positions = np.asarray(ordre, dtype=np.int64)
+        self.longueurs = np.asarray([max(len(code), 1) for code in self.codes], dtype=np.float64)
+    
+    def scores(self, prefixe: str, scores: np.ndarray) -> None:
+        """Score 2 + part du code saisie (3 pour une correspondance exacte), en place"""
+        debut = bisect_left(self.codes, prefixe)
+        fin = bisect_left(self.codes, prefixe + "\uffff", debut)
+        if fin > debut:
+            positions = self.positions[debut:fin]
+            scores[positions] = np.maximum(scores[positions], 2.0 + len(prefixe) / self.longueurs[debut:fin])
+
+
+class IndexRecherche:
+    """
+    Index de recherche plein texte de l'univers d'ETFs (autocomplétion).
+    
+    Construit une fois au chargement:
+    - ISIN et tickers triés: autocomplétion par préfixe (bisect)
+    - index inversé des trigrammes des noms (sans accents ni casse):
+      correspondance tolérante aux fautes de frappe
+    
+    Classement: ISIN ou ticker exact (3), préfixe d'ISIN ou de ticker
+    (2 à 3 selon la part du code saisie), puis nom (part des trigrammes de
+    la requête présents dans le nom, au moins SEUIL_SIMILARITE). À score
+    égal, les noms les plus spécifiques (plus forte part de leurs
+    trigrammes couverte) passent devant, puis l'ordre de l'univers.
+    """
+    
+    def __init__(self, etfs: Sequence[Any]):
+        """
+        Args:
+            etfs: Univers d'ETFs (modèles ETF ou dicts), même ordre que IndexUnivers
+        """
+        self.etfs = list(etfs)
+        
+        self._isins = _IndexPrefixes([_cle_code(_champ(etf, "isin")) for etf in self.etfs])
+        self._tickers = _IndexPrefixes([_cle_code(_champ(etf, "ticker")) for etf in self.etfs])
+        
+        listes: Dict[str, List[int]] = {}
+        nb_trigrammes = np.zeros(len(self.etfs), dtype=np.float64)
+        for position, etf in enumerate(self.etfs):
+            trigrammes_nom = trigrammes(normaliser_texte(_champ(etf, "nom")))
+            nb_trigrammes[position] = len(trigrammes_nom)
+            for trigramme in trigrammes_nom:
+                listes.setdefault(trigramme, []).append(position)
+        
+        self._listes: Dict[str, np.ndarray] = {
+            trigramme: np.asarray(positions, dtype=np.int32) for trigramme, positions in listes.items()
+        }
+        self._nb_trigrammes = np.maximum(nb_trigrammes, 1.0)
+    
+    def __len__(self) -> int:
+        return len(self.etfs)
+    
+    def rechercher(
+        self,
+        requete: str,
+        limite: Optional[int] = 10,
+        decalage: int = 0,
+        positions: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        Recherche classée et paginée.
+        
+        Args:
+            requete: Texte saisi (ISIN, ticker ou nom, éventuellement partiel ou mal orthographié)
+            limite: Nombre maximal de résultats (None = tous)
+            decalage: Nombre de résultats à sauter (pagination)
+            positions: Positions autorisées dans l'univers (ex: IndexUnivers.positions), None = toutes
+        
+        Returns:
+            Dict {total, resultats: [{etf, score}]} par pertinence décroissante
+        """
+        nb = len(self.etfs)
+        scores = np.zeros(nb, dtype=np.float64)
+        couverture = np.zeros(nb, dtype=np.float64)
+        
+        # Noms: part des trigrammes de la requête présents (dernier mot en préfixe)
+        trigrammes_requete = trigrammes(normaliser_texte(requete), saisie=True)
+        if trigrammes_requete and nb:
+            listes = [self._listes[t] for t in trigrammes_requete if t in self._listes]
+            if listes:
+                communs = np.bincount(np.concatenate(listes), minlength=nb).astype(np.float64)
+                similarite = communs / len(trigrammes_requete)
+                retenus = similarite >= SEUIL_SIMILARITE
+                scores = np.where(retenus, similarite, 0.0)
+                couverture = np.where(retenus, communs / self._nb_trigrammes, 0.0)
+        
+        # Codes: préfixes d'ISIN et de ticker
+        code = _cle_code(requete)
+        if code:
+            self._isins.scores(code, scores)
+            self._tickers.scores(code, scores)
+        
+        if positions is not None:
+            autorises = np.zeros(nb, dtype=bool)
+            autorises[positions] = True
+            scores[~autorises] = 0.0
+        
+        candidats = np.flatnonzero(scores > 0)
+        ordre = candidats[np.lexsort((candidats, -couverture[candidats], -scores[candidats]))]
+        fin = None if limite is None else decalage + limite
+        page = ordre[decalage:fin].tolist()
+        
+        return {
+            "total": int(len(candidats)),
+            "resultats": [
+                {"etf": self.etfs[position], "score": round(float(scores[position]), 4)}
+                for position in page
+            ]
+        }
@@ -1,3 +1,4 @@
+import numpy as np
 from typing import Dict, List
 from models.enveloppe import EnveloppeType
 
@@ -217,3 +218,92 @@ class FiscalRules:
                 "regime": "Flat tax 30%",
                 "reference_legale": "CGI Art. 200 A"
             }
+    
+    # Versions vectorisées (tableaux de trajectoires Monte Carlo): mêmes règles que
+    # les fonctions scalaires, les moins-values ne génèrent pas d'impôt négatif
+    
+    @staticmethod
+    def calculer_impot_pea_retrait_vectorise(
+        plus_value: np.ndarray,
+        anciennete_annees: np.ndarray,
+        tmi: float
+    ) -> np.ndarray:
+        """
+        Impôt total d'un retrait PEA (cf. calculer_fiscalite_pea_retrait).
+        
+        Returns:
+            Array des impôts (IR si <5 ans + PS)
+        """
+        plus_value = np.maximum(plus_value, 0.0)
+        taux = FiscalRules.PRELEVEMENTS_SOCIAUX + np.where(np.asarray(anciennete_annees) < 5, tmi / 100, 0.0)
+        return plus_value * taux
+    
+    @staticmethod
+    def calculer_impot_av_vectorise(
+        plus_value: np.ndarray,
+        anciennete_annees: np.ndarray,
+        tmi: float,
+        couple: bool = False,
+        abattement_disponible: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Impôt total d'un rachat Assurance-Vie (cf. calculer_fiscalite_av).
+        
+        Args:
+            abattement_disponible: Abattement annuel restant par trajectoire
+                (défaut: abattement complet 4,600€ / 9,200€ couple)
+        
+        Returns:
+            Array des impôts (prélèvement selon ancienneté + PS)
+        """
+        plus_value = np.maximum(plus_value, 0.0)
+        anciennete_annees = np.asarray(anciennete_annees)
+        if abattement_disponible is None:
+            abattement_disponible = 9200 if couple else 4600
+        
+        taux_prelevement = np.where(
+            anciennete_annees < 4, min(35, tmi) / 100,
+            np.where(anciennete_annees < 8, min(15, tmi) / 100, 0.0)
+        )
+        pv_imposable_8_ans = np.maximum(plus_value - abattement_disponible, 0.0)
+        impot_ir = np.where(
+            anciennete_annees < 8,
+            plus_value * taux_prelevement,
+            pv_imposable_8_ans * 0.075
+        )
+        
+        return impot_ir + plus_value * FiscalRules.PRELEVEMENTS_SOCIAUX
+    
+    @staticmethod
+    def calculer_impot_cto_vectorise(
+        plus_value: np.ndarray,
+        tmi: float,
+        option_bareme: bool = False
+    ) -> np.ndarray:
+        """
+        Impôt total sur plus-values CTO (cf. calculer_fiscalite_cto).
+        
+        Returns:
+            Array des impôts (flat tax 30% ou barème IR + PS)
+        """
+        taux = (tmi / 100 + FiscalRules.PRELEVEMENTS_SOCIAUX) if option_bareme else FiscalRules.FLAT_TAX
+        return np.maximum(plus_value, 0.0) * taux
+    
+    @staticmethod
+    def calculer_impot_per_vectorise(
+        montant_retrait: np.ndarray,
+        plus_value: np.ndarray,
+        tmi: float
+    ) -> np.ndarray:
+        """
+        Impôt total d'une sortie en capital PER (versements déduits).
+        
+        Règles (CGI Art. 158, 5-b quinquies et 200 A):
+        - Part versements: barème IR (TMI), sans PS
+        - Part plus-values: flat tax 30%
+        
+        Returns:
+            Array des impôts
+        """
+        plus_value = np.clip(plus_value, 0.0, montant_retrait)
+        return (montant_retrait - plus_value) * (tmi / 100) + plus_value * FiscalRules.FLAT_TAX
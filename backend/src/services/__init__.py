@@ -1,3 +1,3 @@
-from .eligibility_service import EligibilityService
+from services.eligibility_service import EligibilityService
 
 __all__ = ["EligibilityService"]
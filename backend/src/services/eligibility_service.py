@@ -3,10 +3,13 @@ from typing import Dict, List
 import json
 from pathlib import Path
 import os
+import threading
 
 from models.etf import ETF
 from models.enveloppe import EnveloppeType
 from models.enveloppe_isin_mapping import EligibiliteResult
+from data.index_univers import IndexUnivers
+from data.recherche_univers import IndexRecherche
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -27,6 +30,13 @@ class EligibilityService:
     # Cache des ETFs chargés depuis universe.json
     _etf_cache: Dict[str, ETF] = {}
     
+    # Index compilés de l'univers, reconstruits quand la version du cache change
+    _index: IndexUnivers = None
+    _index_recherche: IndexRecherche = None
+    _version: int = 0
+    _version_index: int = -1
+    _verrou_index = threading.RLock()
+    
     @classmethod
     def load_etf_universe(cls, universe_path: str = None) -> None:
         """Charge l'univers d'ETFs depuis JSON"""
@@ -54,15 +64,97 @@ class EligibilityService:
                     logger.error(f"Could not find ETF universe in any of: {possible_paths}")
                     return
         
-        try:
-            with open(universe_path, 'r', encoding='utf-8') as f:
-                etfs_data = json.load(f)
-                for etf_data in etfs_data:
-                    etf = ETF(**etf_data)
-                    cls._etf_cache[etf.isin] = etf
-            logger.info(f"Loaded {len(cls._etf_cache)} ETFs from {universe_path}")
-        except Exception as e:
-            logger.error(f"Could not load ETF universe: {e}", exc_info=True)
+        with cls._verrou_index:
+            try:
+                with open(universe_path, 'r', encoding='utf-8') as f:
+                    etfs_data = json.load(f)
+                    for etf_data in etfs_data:
+                        etf = ETF(**etf_data)
+                        cls._etf_cache[etf.isin] = etf
+                logger.info(f"Loaded {len(cls._etf_cache)} ETFs from {universe_path}")
+            except Exception as e:
+                logger.error(f"Could not load ETF universe: {e}", exc_info=True)
+            
+            cls.invalider_index()
+            cls._indexer()
+    
+    @classmethod
+    def invalider_index(cls) -> None:
+        """
+        Signale une modification de _etf_cache: les index seront reconstruits
+        au prochain accès. À appeler après toute modification directe du cache.
+        """
+        with cls._verrou_index:
+            cls._version += 1
+    
+    @classmethod
+    def _indexer(cls) -> None:
+        """
+        Compile les index de l'univers (filtres et recherche, même ordre d'ETFs)
+        s'ils ne correspondent pas à la version courante du cache.
+        L'éligibilité par enveloppe suit check_eligibility.
+        """
+        with cls._verrou_index:
+            if cls._index is not None and cls._version_index == cls._version:
+                return
+            
+            index = IndexUnivers(
+                cls._etf_cache.values(),
+                enveloppes={
+                    env_type: (lambda etf, env_type=env_type: cls.check_eligibility(etf.isin, env_type).eligible)
+                    for env_type in EnveloppeType
+                }
+            )
+            cls._index, cls._index_recherche = index, IndexRecherche(index.etfs)
+            cls._version_index = cls._version
+    
+    @classmethod
+    def _obtenir_index(cls):
+        """Index de filtres et de recherche de la même version (chargés au premier appel)"""
+        if not cls._etf_cache:
+            cls.load_etf_universe()
+        
+        with cls._verrou_index:
+            cls._indexer()
+            return cls._index, cls._index_recherche
+    
+    @classmethod
+    def get_index(cls) -> IndexUnivers:
+        """
+        Index compilé de l'univers, chargé au premier appel.
+        
+        Reconstruit quand le cache d'ETFs a changé (load_etf_universe, invalider_index).
+        """
+        return cls._obtenir_index()[0]
+    
+    @classmethod
+    def rechercher_etfs(
+        cls,
+        requete: str,
+        limite: int = 10,
+        decalage: int = 0,
+        enveloppe_type: EnveloppeType = None,
+        classe_actif: str = None
+    ) -> Dict:
+        """
+        Recherche plein texte (ISIN, ticker, nom) classée et paginée.
+        
+        Args:
+            requete: Texte saisi, éventuellement partiel ou mal orthographié
+            limite: Nombre de résultats par page
+            decalage: Nombre de résultats à sauter
+            enveloppe_type: Uniquement les ETFs éligibles à cette enveloppe (optionnel)
+            classe_actif: Filtre optionnel par classe d'actif
+        
+        Returns:
+            Dict {total, resultats: [{etf, score}]}
+        """
+        index, index_recherche = cls._obtenir_index()
+        positions = None
+        if enveloppe_type is not None or classe_actif:
+            positions = index.positions(index.bitset(enveloppe=enveloppe_type, classe_actif=classe_actif or None))
+        
+        return index_recherche.rechercher(requete, limite=limite, decalage=decalage, positions=positions)
     
     @classmethod
     def get_etf_by_isin(cls, isin: str) -> ETF:
@@ -224,37 +316,10 @@ class EligibilityService:
         Returns:
             Liste des ETFs éligibles
         """
-        if not cls._etf_cache:
-            cls.load_etf_universe()
-        
-        eligible_etfs = []
-        
-        for etf in cls._etf_cache.values():
-            # Filtre par classe d'actif si spécifié
-            if classe_actif and etf.classe_actif.value != classe_actif:
-                continue
-            
-            # Vérification d'éligibilité
-            eligibility = cls.check_eligibility(
-                isin=etf.isin,
-                enveloppe_type=enveloppe_type,
-                is_societe_is=is_societe_is
-            )
-            
-            if eligibility.eligible:
-                eligible_etfs.append(etf)
-        
-        return eligible_etfs
+        return cls.get_index().filtrer(enveloppe=enveloppe_type, classe_actif=classe_actif or None)
     
     @classmethod
     def get_etf_count_by_enveloppe(cls) -> Dict[str, int]:
         """Retourne le nombre d'ETFs éligibles par type d'enveloppe"""
-        if not cls._etf_cache:
-            cls.load_etf_universe()
-        
-        counts = {}
-        for env_type in EnveloppeType:
-            eligible = cls.get_eligible_etfs(env_type)
-            counts[env_type.value] = len(eligible)
-        
-        return counts
+        index = cls.get_index()
+        return {env_type.value: index.compter(enveloppe=env_type) for env_type in EnveloppeType}
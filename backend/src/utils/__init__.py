@@ -1,4 +1,4 @@
 from utils.fiscal import FiscalUtils
-from utils.cache import CacheManager
+from utils.cache import CacheManager, cached
 
-__all__ = ["FiscalUtils", "CacheManager"]
+__all__ = ["FiscalUtils", "CacheManager", "cached"]
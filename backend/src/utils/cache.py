@@ -1,84 +1,376 @@
-from typing import Any, Optional
-from datetime import datetime, timedelta
+from typing import Any, Callable, Hashable, Optional
+from collections import OrderedDict
+import functools
+import hashlib
+import inspect
 import json
+import sys
+import threading
+import time
+
+
+# Nombre d'entrées examinées à chaque éviction LFU (LFU approché par échantillon)
+ECHANTILLON_LFU = 8
+
+
+def taille_approximative(valeur: Any, profondeur: int = 3) -> int:
+    """
+    Taille mémoire approximative d'une valeur, en octets.
+    
+    Tableaux numpy et objets pandas: taille des données; conteneurs: parcours
+    des éléments sur quelques niveaux; sinon sys.getsizeof.
+    """
+    nbytes = getattr(valeur, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    
+    memory_usage = getattr(valeur, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(index=True)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except TypeError:
+            pass
+    
+    taille = sys.getsizeof(valeur)
+    if profondeur > 0:
+        if isinstance(valeur, dict):
+            taille += sum(
+                taille_approximative(cle, profondeur - 1) + taille_approximative(element, profondeur - 1)
+                for cle, element in valeur.items()
+            )
+        elif isinstance(valeur, (list, tuple, set, frozenset)):
+            taille += sum(taille_approximative(element, profondeur - 1) for element in valeur)
+    return taille
+
+
+class _Entree:
+    __slots__ = ("valeur", "expire_a", "taille", "frequence")
+    
+    def __init__(self, valeur: Any, expire_a: float, taille: int):
+        self.valeur = valeur
+        self.expire_a = expire_a
+        self.taille = taille
+        self.frequence = 1
+
+
+class _Segment:
+    """Portion du cache protégée par son propre verrou"""
+    
+    def __init__(self, max_entrees: int, politique: str):
+        self.max_entrees = max_entrees
+        self.politique = politique
+        self.entrees: "OrderedDict[Hashable, _Entree]" = OrderedDict()
+        self.octets = 0
+        self.verrou = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def retirer(self, cle: Hashable) -> Optional[_Entree]:
+        entree = self.entrees.pop(cle, None)
+        if entree is not None:
+            self.octets -= entree.taille
+        return entree
+    
+    def _victime(self, protegee: Hashable, maintenant: float) -> Optional[Hashable]:
+        """Entrée à évincer selon la politique (jamais protegee), None si aucune candidate"""
+        if self.politique == "lfu":
+            # Parmi les plus anciennement utilisées, la moins fréquente (à égalité la plus ancienne)
+            victime, plus_faible = None, None
+            for i, (cle, entree) in enumerate(self.entrees.items()):
+                if i >= ECHANTILLON_LFU:
+                    break
+                if cle == protegee:
+                    continue
+                if entree.expire_a <= maintenant:
+                    return cle
+                if plus_faible is None or entree.frequence < plus_faible:
+                    victime, plus_faible = cle, entree.frequence
+            return victime
+        
+        for cle in self.entrees:
+            if cle != protegee:
+                return cle
+        return None
+    
+    def evincer_une(self, protegee: Hashable, maintenant: float) -> bool:
+        """Évince une entrée (autre que protegee); False si aucune candidate"""
+        victime = self._victime(protegee, maintenant)
+        if victime is None:
+            return False
+        
+        entree = self.retirer(victime)
+        if entree.expire_a <= maintenant:
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        return True
+    
+    def evincer(self, protegee: Hashable) -> None:
+        """
+        Évince jusqu'à respecter la borne en entrées du segment (entrées expirées
+        de l'échantillon en priorité), sans jamais évincer l'entrée qui vient
+        d'être insérée.
+        """
+        maintenant = time.monotonic()
+        while len(self.entrees) > self.max_entrees:
+            if not self.evincer_une(protegee, maintenant):
+                break
 
 
 class CacheManager:
     """
-    Gestionnaire de cache simple pour données de marché et calculs.
+    Cache borné et thread-safe pour données de marché et calculs.
+    
+    - Bornes en nombre d'entrées et en octets (taille approximative des valeurs)
+    - Éviction LRU ou LFU (approché par échantillon des entrées les plus anciennes)
+    - TTL sur horloge monotone, expiration à la lecture et à l'éviction
+    - Verrous par segment: les routes synchrones exécutées dans le pool de
+      threads de FastAPI ne se bloquent pas sur un verrou global. Les segments
+      se partagent la borne en entrées; le budget en octets est global (une
+      entrée peut occuper jusqu'à max_octets), l'éviction se faisant dans les
+      segments les plus chargés
+    - Compteurs hits / misses / évictions / expirations
+    
+    Les valeurs sont partagées entre appelants: elles doivent être traitées en
+    lecture seule.
     """
     
-    def __init__(self, ttl_seconds: int = 3600):
+    POLITIQUES = ("lru", "lfu")
+    
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_entrees: int = 10000,
+        max_octets: int = 64 * 1024 * 1024,
+        politique: str = "lru",
+        nb_segments: int = 16
+    ):
         """
         Args:
             ttl_seconds: Time To Live du cache en secondes (défaut: 1h)
+            max_entrees: Nombre maximal d'entrées
+            max_octets: Taille maximale approximative des valeurs
+            politique: "lru" ou "lfu"
+            nb_segments: Nombre de segments (verrous indépendants)
         """
-        self.cache = {}
+        if politique not in self.POLITIQUES:
+            raise ValueError(f"Politique d'éviction inconnue: {politique}")
+        
         self.ttl_seconds = ttl_seconds
+        self.max_entrees = max_entrees
+        self.max_octets = max_octets
+        self.politique = politique
+        
+        nb_segments = max(1, min(nb_segments, max_entrees))
+        self._segments = [_Segment(-(-max_entrees // nb_segments), politique) for _ in range(nb_segments)]
     
-    def get(self, key: str) -> Optional[Any]:
+    def _segment(self, key: Hashable) -> _Segment:
+        return self._segments[hash(key) % len(self._segments)]
+    
+    def get(self, key: Hashable, default: Any = None) -> Optional[Any]:
         """
         Récupère une valeur du cache.
         
         Returns:
-            Valeur si présente et valide, None sinon
+            Valeur si présente et valide, default sinon
         """
-        if key not in self.cache:
-            return None
-        
-        entry = self.cache[key]
-        
-        # Vérifier expiration
-        if datetime.now() > entry["expires_at"]:
-            del self.cache[key]
-            return None
-        
-        return entry["value"]
+        segment = self._segment(key)
+        with segment.verrou:
+            entree = segment.entrees.get(key)
+            if entree is None:
+                segment.misses += 1
+                return default
+            
+            # Vérifier expiration
+            if entree.expire_a <= time.monotonic():
+                segment.retirer(key)
+                segment.expirations += 1
+                segment.misses += 1
+                return default
+            
+            segment.entrees.move_to_end(key)
+            entree.frequence += 1
+            segment.hits += 1
+            return entree.valeur
     
-    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[int] = None, taille: Optional[int] = None) -> bool:
         """
         Stocke une valeur dans le cache.
         
         Args:
-            key: Clé unique
+            key: Clé unique (hashable)
             value: Valeur à stocker
             ttl_seconds: TTL spécifique (optionnel)
+            taille: Taille en octets si connue (défaut: estimation)
+        
+        Returns:
+            False si la valeur dépasse à elle seule max_octets (non stockée)
         """
         ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        taille = taille if taille is not None else taille_approximative(value)
+        segment = self._segment(key)
+        
+        with segment.verrou:
+            segment.retirer(key)
+            if taille > self.max_octets:
+                return False
+            
+            segment.entrees[key] = _Entree(value, time.monotonic() + ttl, taille)
+            segment.octets += taille
+            segment.evincer(key)
         
-        self.cache[key] = {
-            "value": value,
-            "expires_at": datetime.now() + timedelta(seconds=ttl)
-        }
+        self._respecter_budget(key)
+        return True
     
-    def delete(self, key: str):
+    def _respecter_budget(self, protegee: Hashable) -> None:
+        """Évince dans les segments les plus chargés jusqu'à respecter le budget global en octets"""
+        while sum(segment.octets for segment in self._segments) > self.max_octets:
+            for segment in sorted(self._segments, key=lambda s: s.octets, reverse=True):
+                with segment.verrou:
+                    if segment.evincer_une(protegee, time.monotonic()):
+                        break
+            else:
+                return
+    
+    def delete(self, key: Hashable):
         """Supprime une entrée du cache"""
-        if key in self.cache:
-            del self.cache[key]
+        segment = self._segment(key)
+        with segment.verrou:
+            segment.retirer(key)
     
     def clear(self):
-        """Vide tout le cache"""
-        self.cache.clear()
+        """Vide tout le cache (les compteurs sont conservés)"""
+        for segment in self._segments:
+            with segment.verrou:
+                segment.entrees.clear()
+                segment.octets = 0
+    
+    def __len__(self) -> int:
+        return sum(len(segment.entrees) for segment in self._segments)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        segment = self._segment(key)
+        with segment.verrou:
+            entree = segment.entrees.get(key)
+            return entree is not None and entree.expire_a > time.monotonic()
     
     def get_stats(self) -> dict:
-        """Statistiques du cache"""
-        return {
-            "nb_entries": len(self.cache),
-            "keys": list(self.cache.keys())
-        }
+        """Statistiques du cache (compteurs agrégés, sans la liste des clés)"""
+        stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "nb_entries": 0, "octets": 0}
+        for segment in self._segments:
+            with segment.verrou:
+                stats["hits"] += segment.hits
+                stats["misses"] += segment.misses
+                stats["evictions"] += segment.evictions
+                stats["expirations"] += segment.expirations
+                stats["nb_entries"] += len(segment.entrees)
+                stats["octets"] += segment.octets
+        
+        total = stats["hits"] + stats["misses"]
+        stats["taux_hit"] = round(stats["hits"] / total, 4) if total else 0.0
+        stats.update({
+            "max_entrees": self.max_entrees,
+            "max_octets": self.max_octets,
+            "politique": self.politique,
+            "nb_segments": len(self._segments)
+        })
+        return stats
     
     def cleanup_expired(self):
         """Nettoie les entrées expirées"""
-        now = datetime.now()
-        expired_keys = [
-            key for key, entry in self.cache.items()
-            if now > entry["expires_at"]
-        ]
+        now = time.monotonic()
+        nb_expirees = 0
+        for segment in self._segments:
+            with segment.verrou:
+                expired_keys = [key for key, entree in segment.entrees.items() if entree.expire_a <= now]
+                for key in expired_keys:
+                    segment.retirer(key)
+                segment.expirations += len(expired_keys)
+                nb_expirees += len(expired_keys)
         
-        for key in expired_keys:
-            del self.cache[key]
+        return nb_expirees
+
+
+def normaliser(valeur: Any) -> Any:
+    """Forme JSON stable d'un argument (modèles pydantic, enums, conteneurs)"""
+    if hasattr(valeur, "model_dump"):
+        return normaliser(valeur.model_dump())
+    if hasattr(valeur, "dict") and hasattr(valeur, "__fields__"):
+        return normaliser(valeur.dict())
+    if hasattr(valeur, "value") and hasattr(type(valeur), "__members__"):
+        return normaliser(valeur.value)
+    if isinstance(valeur, dict):
+        return {str(cle): normaliser(element) for cle, element in sorted(valeur.items(), key=lambda e: str(e[0]))}
+    if isinstance(valeur, (list, tuple)):
+        return [normaliser(element) for element in valeur]
+    if isinstance(valeur, (set, frozenset)):
+        return sorted((normaliser(element) for element in valeur), key=repr)
+    if valeur is None or isinstance(valeur, (str, int, float, bool)):
+        return valeur
+    return repr(valeur)
+
+
+def cle_arguments(fonction: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Clé de cache dérivée des arguments: f(1) et f(x=1) donnent la même clé,
+    les valeurs par défaut sont incluses.
+    """
+    try:
+        liaison = inspect.signature(fonction).bind(*args, **kwargs)
+        liaison.apply_defaults()
+        arguments = dict(liaison.arguments)
+    except (TypeError, ValueError):
+        arguments = {"args": args, "kwargs": kwargs}
+    
+    contenu = json.dumps(
+        [fonction.__module__, fonction.__qualname__, normaliser(arguments)],
+        sort_keys=True, default=repr
+    )
+    return hashlib.blake2b(contenu.encode(), digest_size=16).hexdigest()
+
+
+def cached(
+    cache: Optional[CacheManager] = None,
+    ttl_seconds: Optional[int] = None,
+    cle: Optional[Callable[..., Hashable]] = None
+):
+    """
+    Décorateur de mise en cache du résultat d'une fonction.
+    
+    Args:
+        cache: Cache utilisé (défaut: global_cache)
+        ttl_seconds: TTL spécifique
+        cle: Fonction (mêmes arguments) donnant la clé (défaut: dérivée des arguments)
+    
+    Exemple:
+        @cached(ttl_seconds=600)
+        def comparer(type_compte: str, montant: float) -> dict: ...
+    """
+    def decorateur(fonction: Callable) -> Callable:
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            cible = cache if cache is not None else global_cache
+            cle_cache = cle(*args, **kwargs) if cle is not None else cle_arguments(fonction, args, kwargs)
+            
+            manquant = object()
+            valeur = cible.get(cle_cache, manquant)
+            if valeur is not manquant:
+                return valeur
+            
+            valeur = fonction(*args, **kwargs)
+            cible.set(cle_cache, valeur, ttl_seconds)
+            return valeur
         
-        return len(expired_keys)
+        enveloppe.cache_cle = lambda *args, **kwargs: (
+            cle(*args, **kwargs) if cle is not None else cle_arguments(fonction, args, kwargs)
+        )
+        return enveloppe
+    
+    return decorateur
 
 
 # Instance globale de cache
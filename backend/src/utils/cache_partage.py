@@ -0,0 +1,286 @@
+from typing import Any, Hashable, Optional, Tuple
+from pathlib import Path
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from utils.cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+
+class CachePartage:
+    """
+    Cache de résultats partagé entre les workers d'un même hôte.
+    
+    Fichier SQLite en mode WAL (lectures concurrentes sans blocage, un seul
+    écrivain à la fois), lu via mmap; valeurs sérialisées en pickle protocole 5.
+    Les entrées survivent au redémarrage: un worker froid sert immédiatement
+    les résultats déjà calculés par les autres.
+    
+    - TTL sur horloge murale (comparable entre processus)
+    - Taille bornée: au-delà du budget, les entrées les plus anciennes sont supprimées
+    - Une erreur d'accès au fichier dégrade en absence de cache, jamais en erreur de route
+    
+    Le fichier ne doit être accessible en écriture qu'au service (désérialisation pickle).
+    """
+    
+    # Contrôle du budget tous les N écritures
+    PERIODE_CONTROLE = 32
+    
+    def __init__(
+        self,
+        chemin: Optional[str] = None,
+        ttl_seconds: int = 24 * 3600,
+        max_octets: int = 512 * 1024 * 1024
+    ):
+        """
+        Args:
+            chemin: Fichier SQLite (défaut: $SHARED_CACHE_PATH ou data/cache/resultats.sqlite)
+            ttl_seconds: TTL par défaut en secondes (défaut: 24h)
+            max_octets: Taille maximale cumulée des valeurs sérialisées
+        """
+        if chemin is None:
+            chemin = os.getenv(
+                'SHARED_CACHE_PATH',
+                str(Path(__file__).resolve().parents[3] / "data" / "cache" / "resultats.sqlite")
+            )
+        self.chemin = Path(chemin)
+        self.ttl_seconds = ttl_seconds
+        self.max_octets = max_octets
+        
+        self._connexions = threading.local()
+        self._verrou = threading.Lock()
+        self._nb_ecritures = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.ecritures = 0
+        self.evictions = 0
+        self.erreurs = 0
+    
+    def _connexion(self) -> sqlite3.Connection:
+        """Connexion du thread courant (créée et initialisée au premier accès)"""
+        connexion = getattr(self._connexions, "connexion", None)
+        if connexion is None:
+            self.chemin.parent.mkdir(parents=True, exist_ok=True)
+            connexion = sqlite3.connect(str(self.chemin), timeout=30, isolation_level=None)
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("PRAGMA synchronous=NORMAL")
+            connexion.execute("PRAGMA mmap_size=268435456")
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS entrees ("
+                "cle TEXT PRIMARY KEY, valeur BLOB NOT NULL, "
+                "expire_a REAL NOT NULL, taille INTEGER NOT NULL, cree_a REAL NOT NULL)"
+            )
+            connexion.execute("CREATE INDEX IF NOT EXISTS entrees_cree_a ON entrees (cree_a)")
+            self._connexions.connexion = connexion
+        return connexion
+    
+    @staticmethod
+    def _cle(key: Hashable) -> str:
+        return key if isinstance(key, str) else repr(key)
+    
+    def _compter(self, compteur: str) -> None:
+        with self._verrou:
+            setattr(self, compteur, getattr(self, compteur) + 1)
+    
+    def get(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        """
+        Récupère une valeur du cache partagé.
+        
+        Returns:
+            Valeur si présente et valide, default sinon
+        """
+        return self.get_avec_expiration(key, default)[0]
+    
+    def get_avec_expiration(self, key: Hashable, default: Any = None) -> Tuple[Any, Optional[float]]:
+        """
+        Récupère une valeur du cache partagé avec son instant d'expiration.
+        
+        Returns:
+            Tuple (valeur, expire_a en secondes epoch) si présente et valide,
+            (default, None) sinon
+        """
+        try:
+            ligne = self._connexion().execute(
+                "SELECT valeur, expire_a FROM entrees WHERE cle = ?", (self._cle(key),)
+            ).fetchone()
+            if ligne is None or ligne[1] <= time.time():
+                self._compter("misses")
+                return default, None
+            valeur = pickle.loads(ligne[0])
+        except (sqlite3.Error, OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Cache partagé illisible ({key}): {e}")
+            self._compter("erreurs")
+            return default, None
+        
+        self._compter("hits")
+        return valeur, ligne[1]
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[int] = None, taille: Optional[int] = None) -> bool:
+        """
+        Stocke une valeur dans le cache partagé.
+        
+        Args:
+            key: Clé unique (hashable)
+            value: Valeur à stocker (sérialisable par pickle)
+            ttl_seconds: TTL spécifique (optionnel)
+            taille: Ignoré (la taille sérialisée fait foi), pour l'interface de CacheManager
+        
+        Returns:
+            False si la valeur n'est pas sérialisable, trop grosse ou si l'écriture échoue
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        try:
+            donnees = pickle.dumps(value, protocol=5)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Valeur non sérialisable pour le cache partagé ({key}): {e}")
+            return False
+        
+        if len(donnees) > self.max_octets:
+            return False
+        
+        maintenant = time.time()
+        try:
+            self._connexion().execute(
+                "INSERT OR REPLACE INTO entrees (cle, valeur, expire_a, taille, cree_a) VALUES (?, ?, ?, ?, ?)",
+                (self._cle(key), donnees, maintenant + ttl, len(donnees), maintenant)
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Écriture impossible dans le cache partagé ({key}): {e}")
+            self._compter("erreurs")
+            return False
+        
+        with self._verrou:
+            self.ecritures += 1
+            self._nb_ecritures += 1
+            controler = self._nb_ecritures % self.PERIODE_CONTROLE == 0
+        if controler:
+            self.appliquer_budget()
+        return True
+    
+    def appliquer_budget(self) -> int:
+        """
+        Supprime les entrées expirées puis, si le budget est dépassé, les plus anciennes.
+        
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        try:
+            connexion = self._connexion()
+            nb = connexion.execute("DELETE FROM entrees WHERE expire_a <= ?", (time.time(),)).rowcount
+            nb_evincees = connexion.execute(
+                "DELETE FROM entrees WHERE cle IN ("
+                "SELECT cle FROM (SELECT cle, SUM(taille) OVER (ORDER BY cree_a DESC, cle) AS cumul FROM entrees) "
+                "WHERE cumul > ?)",
+                (self.max_octets,)
+            ).rowcount
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Nettoyage du cache partagé impossible: {e}")
+            self._compter("erreurs")
+            return 0
+        
+        with self._verrou:
+            self.evictions += nb_evincees
+        return nb + nb_evincees
+    
+    def delete(self, key: Hashable):
+        """Supprime une entrée du cache"""
+        try:
+            self._connexion().execute("DELETE FROM entrees WHERE cle = ?", (self._cle(key),))
+        except (sqlite3.Error, OSError):
+            self._compter("erreurs")
+    
+    def clear(self):
+        """Vide tout le cache partagé (pour tous les workers)"""
+        try:
+            self._connexion().execute("DELETE FROM entrees")
+        except (sqlite3.Error, OSError):
+            self._compter("erreurs")
+    
+    def cleanup_expired(self):
+        """Nettoie les entrées expirées"""
+        try:
+            return self._connexion().execute("DELETE FROM entrees WHERE expire_a <= ?", (time.time(),)).rowcount
+        except (sqlite3.Error, OSError):
+            self._compter("erreurs")
+            return 0
+    
+    def get_stats(self) -> dict:
+        """Statistiques du cache partagé (compteurs du processus courant)"""
+        try:
+            nb_entrees, octets = self._connexion().execute(
+                "SELECT COUNT(*), COALESCE(SUM(taille), 0) FROM entrees"
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            nb_entrees, octets = None, None
+        
+        with self._verrou:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "ecritures": self.ecritures,
+                "evictions": self.evictions,
+                "erreurs": self.erreurs,
+                "nb_entries": nb_entrees,
+                "octets": octets,
+                "max_octets": self.max_octets,
+                "chemin": str(self.chemin)
+            }
+
+
+class CacheAEtages:
+    """
+    Cache à deux étages: cache mémoire du processus devant le cache partagé.
+    
+    Lecture: mémoire, puis fichier partagé (l'entrée trouvée est remontée en
+    mémoire jusqu'à son expiration dans le fichier partagé). Écriture: les deux étages. Même interface que CacheManager,
+    utilisable avec le décorateur @cached.
+    """
+    
+    def __init__(self, local: CacheManager, partage: Optional[CachePartage] = None):
+        """
+        Args:
+            local: Cache mémoire du processus
+            partage: Cache partagé entre workers (défaut: cache_partage)
+        """
+        self.local = local
+        self.partage = partage if partage is not None else cache_partage
+    
+    def get(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        manquant = object()
+        valeur = self.local.get(key, manquant)
+        if valeur is not manquant:
+            return valeur
+        
+        valeur, expire_a = self.partage.get_avec_expiration(key, manquant)
+        if valeur is manquant:
+            return default
+        
+        # Remontée en mémoire pour la durée de vie restante de l'entrée partagée
+        self.local.set(key, valeur, ttl_seconds=max(0.0, expire_a - time.time()))
+        return valeur
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[int] = None, taille: Optional[int] = None) -> bool:
+        stocke_local = self.local.set(key, value, ttl_seconds, taille)
+        stocke_partage = self.partage.set(key, value, ttl_seconds)
+        return stocke_local or stocke_partage
+    
+    def delete(self, key: Hashable):
+        self.local.delete(key)
+        self.partage.delete(key)
+    
+    def clear(self):
+        self.local.clear()
+        self.partage.clear()
+    
+    def get_stats(self) -> dict:
+        return {"local": self.local.get_stats(), "partage": self.partage.get_stats()}
+
+
+# Cache partagé par tous les workers de l'hôte (fichier ouvert au premier accès)
+cache_partage = CachePartage()
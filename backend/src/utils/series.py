@@ -0,0 +1,157 @@
+import base64
+import json
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+try:
+    import pyarrow as pa
+    ARROW_DISPONIBLE = True
+except ImportError:
+    pa = None
+    ARROW_DISPONIBLE = False
+
+
+# Type MIME du flux Arrow IPC (négociation de contenu)
+MIME_ARROW = "application/vnd.apache.arrow.stream"
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, nb_points: int) -> np.ndarray:
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets.
+    
+    Conserve le premier et le dernier point; dans chaque seau intermédiaire,
+    garde le point formant le plus grand triangle avec le point retenu
+    précédent et la moyenne du seau suivant. Préserve pics et creux, ce qui
+    convient au tracé d'une courbe de valeur.
+    
+    Args:
+        x: Abscisses croissantes
+        y: Ordonnées
+        nb_points: Nombre de points à conserver (>= 3)
+    
+    Returns:
+        Indices des points conservés, croissants
+    """
+    n = len(y)
+    if nb_points >= n or nb_points < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # Bornes des nb_points - 2 seaux intermédiaires sur [1, n - 1)
+    bornes = np.floor(np.linspace(1, n - 1, nb_points - 1)).astype(np.int64)
+    indices = np.empty(nb_points, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    precedent = 0
+    for k in range(nb_points - 2):
+        debut, fin = bornes[k], bornes[k + 1]
+        suivant_debut = fin
+        suivant_fin = bornes[k + 2] if k + 2 < len(bornes) else n
+        x_moyen = x[suivant_debut:suivant_fin].mean()
+        y_moyen = y[suivant_debut:suivant_fin].mean()
+        
+        aires = np.abs(
+            (x[precedent] - x_moyen) * (y[debut:fin] - y[precedent])
+            - (x[precedent] - x[debut:fin]) * (y_moyen - y[precedent])
+        )
+        precedent = debut + int(np.argmax(aires))
+        indices[k + 1] = precedent
+    
+    return indices
+
+
+def sous_echantillonner(serie: pd.Series, nb_points: Optional[int]) -> pd.Series:
+    """Série réduite à nb_points par LTTB (inchangée si nb_points est None ou suffisant)"""
+    if not nb_points or nb_points >= len(serie):
+        return serie
+    
+    if isinstance(serie.index, pd.DatetimeIndex):
+        x = serie.index.asi8.astype(np.float64)
+    else:
+        x = np.arange(len(serie), dtype=np.float64)
+    
+    return serie.iloc[lttb_indices(x, serie.to_numpy(dtype=np.float64), nb_points)]
+
+
+def encoder_serie_compacte(serie: pd.Series) -> Dict:
+    """
+    Encode une série datée: date de début + fréquence + valeurs float32 en base64.
+    
+    Quand l'index n'a pas de fréquence régulière (jours fériés, sous-échantillonnage),
+    les décalages en jours depuis le début sont joints en int32 base64.
+    
+    Returns:
+        Dict {debut, frequence, nb_points, dtype, valeurs[, decalages_jours]}
+    """
+    valeurs = np.ascontiguousarray(serie.to_numpy(dtype=np.float32))
+    encodage = {
+        "debut": None,
+        "frequence": None,
+        "nb_points": len(valeurs),
+        "dtype": "float32",
+        "valeurs": base64.b64encode(valeurs.tobytes()).decode("ascii")
+    }
+    
+    if len(serie) == 0 or not isinstance(serie.index, pd.DatetimeIndex):
+        return encodage
+    
+    encodage["debut"] = str(serie.index[0].date())
+    frequence = pd.infer_freq(serie.index) if len(serie) >= 3 else None
+    
+    if frequence is not None:
+        encodage["frequence"] = frequence
+    else:
+        decalages = ((serie.index.asi8 - serie.index.asi8[0]) // (86400 * 10**9)).astype(np.int32)
+        encodage["decalages_jours"] = base64.b64encode(decalages.tobytes()).decode("ascii")
+    
+    return encodage
+
+
+def decoder_serie_compacte(encodage: Dict) -> pd.Series:
+    """Inverse de encoder_serie_compacte (valeurs en float32)"""
+    valeurs = np.frombuffer(base64.b64decode(encodage["valeurs"]), dtype=np.float32)
+    
+    if encodage.get("debut") is None:
+        return pd.Series(valeurs)
+    
+    if "decalages_jours" in encodage:
+        decalages = np.frombuffer(base64.b64decode(encodage["decalages_jours"]), dtype=np.int32)
+        index = pd.Timestamp(encodage["debut"]) + pd.to_timedelta(decalages, unit="D")
+    else:
+        index = pd.date_range(encodage["debut"], periods=len(valeurs), freq=encodage["frequence"])
+    
+    return pd.Series(valeurs, index=index)
+
+
+def encoder_arrow(serie: pd.Series, metadonnees: Optional[Dict] = None) -> bytes:
+    """
+    Flux Arrow IPC: colonnes date (date32) et valeur (float32).
+    
+    Args:
+        serie: Série datée
+        metadonnees: Dict sérialisé en JSON dans les métadonnées du schéma (ex: métriques)
+    
+    Returns:
+        Octets du flux
+    
+    Raises:
+        RuntimeError: si pyarrow n'est pas installé
+    """
+    if not ARROW_DISPONIBLE:
+        raise RuntimeError("pyarrow n'est pas installé: format Arrow indisponible")
+    
+    table = pa.table({
+        "date": pa.array(serie.index.values.astype("datetime64[D]"), type=pa.date32()),
+        "valeur": pa.array(serie.to_numpy(dtype=np.float32), type=pa.float32())
+    })
+    if metadonnees:
+        table = table.replace_schema_metadata({"metadonnees": json.dumps(metadonnees, default=str)})
+    
+    puits = pa.BufferOutputStream()
+    with pa.ipc.new_stream(puits, table.schema) as flux:
+        flux.write_table(table)
+    return puits.getvalue().to_pybytes()
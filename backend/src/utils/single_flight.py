@@ -0,0 +1,138 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+from concurrent.futures import Future
+import functools
+import hashlib
+import json
+import threading
+
+from utils.cache import CacheManager, cle_arguments, normaliser
+
+
+def cle_canonique(*parties: Any) -> str:
+    """
+    Empreinte canonique d'une requête: modèles pydantic, enums et conteneurs
+    normalisés (clés triées), si bien que deux requêtes équivalentes ont la même clé.
+    """
+    contenu = json.dumps(normaliser(list(parties)), sort_keys=True, default=repr)
+    return hashlib.blake2b(contenu.encode(), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """
+    Fusion des calculs identiques simultanés (single-flight).
+    
+    Le premier appelant d'une clé exécute le calcul; les appels concurrents de
+    même clé attendent ce calcul en cours et reçoivent le même résultat (ou la
+    même exception) au lieu de le relancer. Conçu pour les routes synchrones
+    exécutées dans le pool de threads de FastAPI.
+    
+    Avec un cache de résultats, celui-ci est consulté avant tout calcul et
+    alimenté par le seul appelant qui calcule.
+    """
+    
+    def __init__(self):
+        self._en_cours: Dict[Hashable, Future] = {}
+        self._verrou = threading.Lock()
+        
+        self.calculs = 0
+        self.partages = 0
+        self.hits_cache = 0
+    
+    def executer(
+        self,
+        cle: Hashable,
+        fonction: Callable[[], Any],
+        cache: Optional[CacheManager] = None,
+        ttl_seconds: Optional[int] = None,
+        cacheable: bool = True
+    ) -> Any:
+        """
+        Résultat de fonction() pour la clé, calculé une seule fois pour les appels simultanés.
+        
+        Args:
+            cle: Clé canonique de la requête
+            fonction: Calcul sans argument
+            cache: Cache de résultats (optionnel, CacheManager ou CacheAEtages)
+            ttl_seconds: TTL du résultat en cache
+            cacheable: False si le résultat ne doit pas être mis en cache (ex: tirages non reproductibles)
+        
+        Returns:
+            Résultat partagé (à traiter en lecture seule)
+        """
+        manquant = object()
+        if cache is not None and cacheable:
+            valeur = cache.get(cle, manquant)
+            if valeur is not manquant:
+                with self._verrou:
+                    self.hits_cache += 1
+                return valeur
+        
+        with self._verrou:
+            futur = self._en_cours.get(cle)
+            meneur = futur is None
+            if meneur:
+                futur = Future()
+                self._en_cours[cle] = futur
+                self.calculs += 1
+            else:
+                self.partages += 1
+        
+        if not meneur:
+            return futur.result()
+        
+        try:
+            valeur = fonction()
+        except BaseException as e:
+            futur.set_exception(e)
+            raise
+        else:
+            if cache is not None and cacheable:
+                cache.set(cle, valeur, ttl_seconds)
+            futur.set_result(valeur)
+            return valeur
+        finally:
+            with self._verrou:
+                self._en_cours.pop(cle, None)
+    
+    def get_stats(self) -> dict:
+        """Compteurs: calculs lancés, appels ayant partagé un calcul en cours, hits du cache"""
+        with self._verrou:
+            return {
+                "calculs": self.calculs,
+                "partages": self.partages,
+                "hits_cache": self.hits_cache,
+                "en_cours": len(self._en_cours)
+            }
+
+
+# Instance partagée par les routes
+vol_unique = SingleFlight()
+
+
+def coalescer(
+    cache: Optional[CacheManager] = None,
+    ttl_seconds: Optional[int] = None,
+    vol: Optional[SingleFlight] = None
+):
+    """
+    Décorateur: comme @cached, avec fusion des appels simultanés de mêmes arguments.
+    
+    Args:
+        cache: Cache de résultats (optionnel)
+        ttl_seconds: TTL spécifique
+        vol: Instance de SingleFlight (défaut: vol_unique)
+    """
+    def decorateur(fonction: Callable) -> Callable:
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            cible = vol if vol is not None else vol_unique
+            return cible.executer(
+                cle_arguments(fonction, args, kwargs),
+                lambda: fonction(*args, **kwargs),
+                cache=cache,
+                ttl_seconds=ttl_seconds
+            )
+        
+        return enveloppe
+    
+    return decorateur
@@ -0,0 +1,228 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import time
+import numpy as np
+import pandas as pd
+from analytics.backtesting import BacktestEngine, FrequenceReequilibrage
+from analytics.backtest_vectorise import NoyauBacktest
+from optimization.rebalancing import RebalancingEngine
+
+
+def _simuler_boucle(rendements, poids, reequilibrages, frais):
+    """Référence naïve jour par jour, poids dérivants"""
+    positions = poids * 100.0
+    valeurs = [100.0]
+    for t in range(len(rendements)):
+        positions = positions * (1 + rendements[t])
+        valeur = positions.sum()
+        if reequilibrages[t]:
+            rotation = np.abs(positions / valeur - poids).sum()
+            valeur *= 1 - frais * rotation
+            positions = poids * valeur
+        valeurs.append(positions.sum())
+    return np.array(valeurs)
+
+
+class TestNoyauBacktest:
+    """
+    Tests du noyau vectorisé de backtest.
+    
+    Vérifie:
+    - Équivalence avec une boucle quotidienne à poids dérivants
+    - Dates de rééquilibrage calendaires
+    - Frais proportionnels à la rotation
+    """
+    
+    def test_equivalence_boucle(self):
+        """Valeurs identiques à la simulation jour par jour"""
+        rng = np.random.default_rng(0)
+        dates = pd.bdate_range("2015-01-01", periods=1500)
+        rendements = rng.normal(0.0003, 0.01, (len(dates), 4))
+        poids = np.array([0.4, 0.3, 0.2, 0.1])
+        masque = NoyauBacktest.masque_reequilibrage(dates, FrequenceReequilibrage.MENSUEL)
+        
+        resultat = NoyauBacktest.simuler(rendements, poids, masque, frais_transaction=0.002)
+        reference = _simuler_boucle(rendements, poids, masque, 0.002)
+        
+        assert np.allclose(resultat["valeurs"], reference, rtol=1e-12)
+        assert len(resultat["rotations"]) == masque.sum()
+    
+    def test_masque_calendaire(self):
+        """Rééquilibrage le dernier jour ouvré de chaque trimestre"""
+        dates = pd.bdate_range("2020-01-01", "2020-12-31")
+        masque = NoyauBacktest.masque_reequilibrage(dates, FrequenceReequilibrage.TRIMESTRIEL)
+        
+        # Le dernier jour de la série n'est pas un rééquilibrage
+        assert list(dates[masque].strftime("%Y-%m-%d")) == ["2020-03-31", "2020-06-30", "2020-09-30"]
+        assert not NoyauBacktest.masque_reequilibrage(dates, FrequenceReequilibrage.JAMAIS).any()
+    
+    def test_sans_rotation_sans_frais(self):
+        """Actifs identiques: les poids ne dérivent pas, aucun frais prélevé"""
+        rendements = np.tile(np.linspace(-0.01, 0.01, 300)[:, np.newaxis], (1, 2))
+        masque = NoyauBacktest.masque_reequilibrage(pd.RangeIndex(300), FrequenceReequilibrage.MENSUEL)
+        
+        avec_frais = NoyauBacktest.simuler(rendements, np.array([0.5, 0.5]), masque, 0.01)
+        sans_frais = NoyauBacktest.simuler(rendements, np.array([0.5, 0.5]), masque, 0.0)
+        
+        assert np.allclose(avec_frais["valeurs"], sans_frais["valeurs"])
+        assert np.allclose(avec_frais["rotations"], 0.0)
+    
+    def test_performance_25_ans(self):
+        """25 ans quotidiens x 8 ETF en quelques millisecondes"""
+        rng = np.random.default_rng(1)
+        dates = pd.bdate_range("2000-01-03", periods=6300)
+        rendements = rng.normal(0.0003, 0.01, (len(dates), 8))
+        poids = np.full(8, 1 / 8)
+        masque = NoyauBacktest.masque_reequilibrage(dates, FrequenceReequilibrage.TRIMESTRIEL)
+        
+        debut = time.perf_counter()
+        for _ in range(10):
+            NoyauBacktest.simuler(rendements, poids, masque, 0.001)
+        duree_ms = (time.perf_counter() - debut) * 100
+        
+        assert duree_ms < 5.0
+    
+    def test_allocation_partielle_liquidites(self):
+        """La part non allouée reste en liquidités"""
+        dates = pd.bdate_range("2021-01-01", periods=260)
+        prix = pd.Series(100 * 1.001 ** np.arange(len(dates)), index=dates)
+        
+        resultats = BacktestEngine().backtester_allocation(
+            allocation={"ETF": 50.0},
+            prix_historiques={"ETF": prix},
+            frequence_reequilibrage=FrequenceReequilibrage.JAMAIS,
+            frais_transaction=0.0
+        )
+        
+        attendu = 50.0 + 50.0 * 1.001 ** (len(dates) - 1)
+        assert abs(resultats["valeur_finale"] - attendu) < 1e-9
+
+
+class TestReequilibrageBandes:
+    """Tests du rééquilibrage sur bande de tolérance et des frais sur rotation"""
+    
+    def test_bande_identique_besoin_reequilibrage(self):
+        """Mêmes dates que RebalancingEngine.besoin_reequilibrage évalué jour par jour"""
+        rng = np.random.default_rng(6)
+        rendements = rng.normal(0.0003, 0.012, (1500, 3))
+        poids = np.array([0.5, 0.3, 0.2])
+        cible = {str(j): poids[j] * 100 for j in range(3)}
+        
+        masque = NoyauBacktest.masque_bandes(rendements, poids, 5.0)
+        
+        positions = poids.copy()
+        attendu = np.zeros(len(rendements), dtype=bool)
+        for t in range(len(rendements)):
+            positions = positions * (1 + rendements[t])
+            actuelle = {str(j): positions[j] / positions.sum() * 100 for j in range(3)}
+            if RebalancingEngine.besoin_reequilibrage(actuelle, cible, 5.0):
+                attendu[t] = True
+                positions = poids * positions.sum()
+        
+        assert attendu.sum() > 3
+        assert np.array_equal(masque, attendu)
+    
+    def test_bande_controlee_aux_dates_calendaires(self):
+        """Avec une fréquence, la bande n'est contrôlée qu'aux fins de période"""
+        rng = np.random.default_rng(7)
+        dates = pd.bdate_range("2010-01-01", periods=2000)
+        rendements = rng.normal(0.0003, 0.012, (2000, 2))
+        poids = np.array([0.6, 0.4])
+        
+        calendrier = NoyauBacktest.masque_reequilibrage(dates, FrequenceReequilibrage.MENSUEL)
+        plan = NoyauBacktest.plan_reequilibrage(dates, rendements, poids, FrequenceReequilibrage.MENSUEL, 3.0)
+        
+        assert 0 < plan.sum() < calendrier.sum()
+        assert not (plan & ~calendrier).any()
+        with pytest.raises(ValueError):
+            NoyauBacktest.plan_reequilibrage(dates, rendements, poids, FrequenceReequilibrage.SUR_SEUIL)
+    
+    def test_frais_sur_notionnel_echange(self):
+        """Frais payés = taux x notionnel échangé à chaque rééquilibrage"""
+        rendements = np.array([[0.10, 0.0], [0.0, 0.0]])
+        resultat = NoyauBacktest.simuler(rendements, np.array([0.5, 0.5]), np.array([True, False]), 0.01)
+        
+        # 55 / 50 -> échange de 2.5 dans chaque sens: notionnel 5, frais 0.05
+        assert resultat["rotations"][0] == pytest.approx(5 / 105)
+        assert resultat["frais"][0] == pytest.approx(0.05)
+        assert resultat["valeurs"][-1] == pytest.approx(105 - 0.05)
+
+
+class TestBacktestLot:
+    """Tests du backtest de N allocations en une passe"""
+    
+    def test_lot_identique_aux_backtests_unitaires(self):
+        """Chaque ligne de la table correspond au backtest unitaire"""
+        rng = np.random.default_rng(2)
+        dates = pd.bdate_range("2018-01-01", periods=1000)
+        prix_historiques = {
+            ticker: pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates)))), index=dates)
+            for ticker in ["ACTIONS", "OBLIGATIONS", "OR"]
+        }
+        allocations = {
+            "defensif": {"ACTIONS": 30.0, "OBLIGATIONS": 65.0, "OR": 5.0},
+            "equilibre": {"ACTIONS": 60.0, "OBLIGATIONS": 35.0, "OR": 5.0},
+            "partiel": {"ACTIONS": 50.0}
+        }
+        
+        engine = BacktestEngine()
+        resultats = engine.backtester_allocations_lot(allocations, prix_historiques, frais_transaction=0.002)
+        
+        assert resultats["nb_allocations"] == 3
+        for nom, allocation in allocations.items():
+            unitaire = engine.backtester_allocation(allocation, prix_historiques, frais_transaction=0.002)
+            for cle, valeur in resultats["metriques"][nom].items():
+                assert abs(round(unitaire[cle], 2) - valeur) < 0.011, (nom, cle)
+
+
+class TestWalkForward:
+    """Tests du backtest walk-forward à départs glissants"""
+    
+    def test_fenetres_identiques_backtests_individuels(self):
+        """Chaque fenêtre égale un backtest lancé à sa date de départ"""
+        rng = np.random.default_rng(4)
+        dates = pd.bdate_range("2005-01-03", periods=2001)
+        rendements = rng.normal(0.0003, 0.01, (2000, 3))
+        poids = np.array([0.5, 0.3, 0.2])
+        masque = NoyauBacktest.masque_reequilibrage(dates[1:], FrequenceReequilibrage.TRIMESTRIEL)
+        debuts = NoyauBacktest.debuts_fenetres(dates, FrequenceReequilibrage.MENSUEL)
+        debuts = debuts[debuts + 756 <= 2000]
+        
+        resultat = NoyauBacktest.simuler_fenetres(
+            rendements, poids, masque, debuts, 756, frais_transaction=0.003, nb_workers=2
+        )
+        
+        for k, debut in enumerate(debuts):
+            valeurs = NoyauBacktest.simuler(
+                rendements[debut:debut + 756], poids, masque[debut:debut + 756], 0.003, 1.0
+            )["valeurs"]
+            max_dd = (valeurs / np.maximum.accumulate(valeurs)).min() - 1
+            assert resultat["multiplicateurs"][k] == pytest.approx(valeurs[-1], rel=1e-12)
+            assert resultat["max_drawdowns"][k] == pytest.approx(max_dd, abs=1e-12)
+    
+    def test_walk_forward_moteur(self):
+        """Distribution et pire fenêtre cohérentes avec le détail par fenêtre"""
+        rng = np.random.default_rng(5)
+        dates = pd.bdate_range("2000-01-03", periods=2600)
+        prix_historiques = {
+            ticker: pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates)))), index=dates)
+            for ticker in ["ACTIONS", "OBLIGATIONS"]
+        }
+        
+        resultats = BacktestEngine().backtester_walk_forward(
+            {"ACTIONS": 60.0, "OBLIGATIONS": 40.0}, prix_historiques, horizon_annees=5
+        )
+        
+        cagrs = [f["cagr"] for f in resultats["fenetres"]]
+        assert resultats["nb_fenetres"] == len(cagrs) > 40
+        assert resultats["pire_fenetre"]["cagr"] == min(cagrs) == resultats["cagr"]["min"]
+        assert resultats["fenetres"][1]["date_debut"] == "2000-02-01"
+        
+        with pytest.raises(ValueError):
+            BacktestEngine().backtester_walk_forward({"ACTIONS": 100.0}, prix_historiques, horizon_annees=20)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,124 @@
+import sys
+sys.path.append("backend/src")
+
+import threading
+import pytest
+import numpy as np
+from unittest.mock import patch
+from utils.cache import CacheManager, cached, cle_arguments
+
+
+class TestCacheManager:
+    """
+    Tests du cache borné.
+    
+    Vérifie:
+    - Bornes en entrées et en octets, éviction LRU / LFU
+    - TTL sur horloge monotone
+    - Décorateur @cached et dérivation des clés
+    - Accès concurrents
+    """
+    
+    def test_eviction_lru_bornee(self):
+        """Au-delà de max_entrees, les moins récemment utilisées sont évincées"""
+        cache = CacheManager(max_entrees=3, nb_segments=1)
+        for cle in "abc":
+            cache.set(cle, cle)
+        cache.get("a")
+        cache.set("d", "d")
+        
+        assert "b" not in cache
+        assert all(cle in cache for cle in "acd")
+        assert cache.get_stats()["evictions"] == 1
+        assert "keys" not in cache.get_stats()
+    
+    def test_eviction_lfu(self):
+        """En LFU, l'entrée la moins fréquente est évincée même si récente"""
+        cache = CacheManager(max_entrees=3, politique="lfu", nb_segments=1)
+        for cle in "abc":
+            cache.set(cle, cle)
+        for _ in range(3):
+            cache.get("a")
+            cache.get("c")
+        cache.get("b")
+        cache.get("a")
+        cache.set("d", "d")
+        
+        assert "b" not in cache and "a" in cache
+    
+    def test_borne_octets(self):
+        """Le budget en octets est respecté; une valeur trop grosse n'est pas stockée"""
+        cache = CacheManager(max_octets=10_000, nb_segments=1)
+        for i in range(5):
+            cache.set(i, np.zeros(300))  # 2400 octets
+        
+        assert cache.get_stats()["octets"] <= 10_000
+        assert len(cache) == 4
+        assert not cache.set("gros", np.zeros(5000))
+    
+    def test_budget_octets_global(self):
+        """Une entrée peut occuper tout le budget, quel que soit le nombre de segments"""
+        cache = CacheManager(max_entrees=512, max_octets=32 * 1024 * 1024)
+        for i in range(64):
+            cache.set(("petit", i), np.zeros(1000))
+        
+        assert cache.set("gros", np.zeros(3_000_000))  # 24 Mo > 32 Mo / 16 segments
+        assert cache.get("gros") is not None
+        assert cache.get_stats()["octets"] <= 32 * 1024 * 1024
+        
+        assert cache.set("autre_gros", np.zeros(3_000_000))
+        assert "gros" not in cache and "autre_gros" in cache
+        assert cache.get_stats()["octets"] <= 32 * 1024 * 1024
+    
+    def test_ttl_monotone(self):
+        """Expiration selon l'horloge monotone"""
+        cache = CacheManager(ttl_seconds=10)
+        with patch("utils.cache.time.monotonic", return_value=1000.0):
+            cache.set("cle", 1)
+        with patch("utils.cache.time.monotonic", return_value=1009.0):
+            assert cache.get("cle") == 1
+        with patch("utils.cache.time.monotonic", return_value=1011.0):
+            assert cache.get("cle") is None
+        assert cache.get_stats()["expirations"] == 1
+    
+    def test_decorateur_cached(self):
+        """Clé dérivée des arguments liés (positionnels, nommés, défauts)"""
+        cache = CacheManager()
+        appels = []
+        
+        @cached(cache)
+        def calcul(x, y=2, options=None):
+            appels.append(x)
+            return x * y
+        
+        assert calcul(3) == 6
+        assert calcul(x=3, y=2) == 6
+        assert calcul(3, options={"b": 1, "a": [1, 2]}) == 6
+        assert calcul(3, options={"a": [1, 2], "b": 1}) == 6
+        assert calcul(4) == 8
+        assert appels == [3, 3, 4]
+        assert cle_arguments(calcul.__wrapped__, (3,), {}) == calcul.cache_cle(3)
+    
+    def test_acces_concurrents(self):
+        """Écritures et lectures concurrentes sans dépasser les bornes"""
+        cache = CacheManager(max_entrees=200, nb_segments=8)
+        
+        def travail(decalage):
+            for i in range(2000):
+                cache.set((decalage, i % 300), i)
+                cache.get((decalage, (i * 7) % 300))
+        
+        threads = [threading.Thread(target=travail, args=(k,)) for k in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        stats = cache.get_stats()
+        assert stats["nb_entries"] <= 200
+        assert stats["octets"] <= cache.max_octets
+        assert stats["hits"] + stats["misses"] == 8 * 2000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+import sys
+sys.path.append("backend/src")
+
+import subprocess
+import time
+import pytest
+import numpy as np
+from utils.cache import CacheManager, cached
+from utils.cache_partage import CachePartage, CacheAEtages
+
+
+class TestCachePartage:
+    """
+    Tests du cache partagé entre workers.
+    
+    Vérifie:
+    - Persistance après redémarrage (nouvelle instance sur le même fichier)
+    - Visibilité des écritures d'un autre processus
+    - TTL et budget en octets
+    - Cache à deux étages avec le décorateur @cached
+    - Remontée en mémoire limitée à la durée de vie restante de l'entrée partagée
+    """
+    
+    def test_persistance_redemarrage(self, tmp_path):
+        """Un worker froid relit les résultats écrits avant redémarrage"""
+        chemin = tmp_path / "cache.sqlite"
+        valeur = {"valeurs": np.arange(1000.0), "cagr": 7.1}
+        assert CachePartage(chemin).set("resultat", valeur)
+        
+        relu = CachePartage(chemin).get("resultat")
+        assert relu["cagr"] == 7.1
+        assert np.array_equal(relu["valeurs"], valeur["valeurs"])
+    
+    def test_ecriture_autre_processus(self, tmp_path):
+        """Une valeur écrite par un autre processus est lue sans recalcul"""
+        chemin = tmp_path / "cache.sqlite"
+        script = (
+            "import sys; sys.path.append('backend/src'); "
+            "from utils.cache_partage import CachePartage; "
+            f"CachePartage(r'{chemin}').set('cle', [1, 2, 3])"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True)
+        
+        assert CachePartage(chemin).get("cle") == [1, 2, 3]
+    
+    def test_ttl_et_budget(self, tmp_path):
+        """Entrées expirées ignorées, plus anciennes supprimées au-delà du budget"""
+        cache = CachePartage(tmp_path / "cache.sqlite", max_octets=50_000)
+        cache.set("expiree", 1, ttl_seconds=-1)
+        assert cache.get("expiree", "absente") == "absente"
+        
+        for i in range(10):
+            cache.set(f"tableau_{i}", np.zeros(1000))  # ~8 ko chacun
+        cache.appliquer_budget()
+        
+        stats = cache.get_stats()
+        assert stats["octets"] <= 50_000
+        assert cache.get("tableau_9") is not None and cache.get("tableau_0") is None
+        assert not cache.set("trop_gros", np.zeros(10_000))
+    
+    def test_deux_etages(self, tmp_path):
+        """Le décorateur sert depuis l'étage partagé puis depuis la mémoire"""
+        chemin = tmp_path / "cache.sqlite"
+        appels = []
+        
+        def creer_fonction():
+            @cached(CacheAEtages(CacheManager(), CachePartage(chemin)))
+            def simulation(seed):
+                appels.append(seed)
+                return {"seed": seed}
+            return simulation
+        
+        assert creer_fonction()(42) == {"seed": 42}
+        
+        # Nouveau worker: mémoire vide, étage partagé chaud
+        simulation = creer_fonction()
+        assert simulation(42) == {"seed": 42}
+        assert simulation(42) == {"seed": 42}
+        assert appels == [42]
+    
+    def test_remontee_garde_expiration_partagee(self, tmp_path):
+        """Une entrée remontée en mémoire expire avec l'entrée partagée, pas au TTL local"""
+        partage = CachePartage(tmp_path / "cache.sqlite")
+        cache = CacheAEtages(CacheManager(ttl_seconds=3600), partage)
+        partage.set("resultat", {"cagr": 7.1}, ttl_seconds=1)
+        
+        valeur, expire_a = partage.get_avec_expiration("resultat")
+        assert valeur == {"cagr": 7.1} and expire_a <= time.time() + 1
+        assert partage.get_avec_expiration("absente", "defaut") == ("defaut", None)
+        
+        assert cache.get("resultat") == {"cagr": 7.1}
+        time.sleep(1.1)
+        assert cache.get("resultat", "expiree") == "expiree"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
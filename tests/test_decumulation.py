@@ -0,0 +1,86 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+from analytics.decumulation import SimulateurDecumulation, RegleRetrait, TypeRegleRetrait, AccumulateurDecumulation
+
+
+class TestDecumulation:
+    """
+    Tests du simulateur de décumulation à règles de retrait dynamiques.
+    """
+    
+    def simuler(self, regles, **kwargs):
+        parametres = dict(
+            valeur_initiale=1000000, regles=regles, nb_annees=30,
+            nb_simulations=20000, rendement_moyen_annuel=0.05, volatilite_annuelle=0.12
+        )
+        parametres.update(kwargs)
+        return SimulateurDecumulation(seed=11).simuler(**parametres)["regles"]
+    
+    def test_sans_volatilite_fixe(self):
+        """Test règle fixe déterministe: retrait indexé, capital attendu"""
+        resultats = self.simuler(
+            [RegleRetrait(TypeRegleRetrait.FIXE, taux=0.04)],
+            nb_annees=3, nb_simulations=100, volatilite_annuelle=0.0, inflation=0.02
+        )["fixe_4%"]
+        
+        valeur = 1000000.0
+        for annee in range(3):
+            valeur = (valeur - 40000 * 1.02 ** annee) * 1.05
+        
+        assert resultats["prob_succes"] == 100.0
+        assert resultats["valeur_finale"]["p50"] == pytest.approx(valeur, rel=0.01)
+        assert resultats["retraits_cumules_reels"]["p50"] == pytest.approx(120000, rel=0.01)
+    
+    def test_pourcentage_constant_jamais_epuise(self):
+        """Test pourcentage constant: pas d'épuisement, retrait variable"""
+        resultats = self.simuler([RegleRetrait("pourcentage_constant", taux=0.05)])["pourcentage_constant_5%"]
+        
+        assert resultats["prob_succes"] == 100.0
+        assert resultats["valeur_finale"]["p10"] > 0
+        assert resultats["retrait_reel_minimal"]["p50"] < 50000
+    
+    def test_garde_fous_ameliorent_succes(self):
+        """Test Guyton-Klinger et plancher-plafond plus robustes que le retrait fixe"""
+        resultats = self.simuler([
+            RegleRetrait("fixe", taux=0.05),
+            RegleRetrait("guyton_klinger", taux=0.05),
+            RegleRetrait("plancher_plafond", taux=0.05)
+        ])
+        
+        assert resultats["guyton_klinger_5%"]["prob_succes"] > resultats["fixe_5%"]["prob_succes"]
+        assert resultats["plancher_plafond_5%"]["prob_succes"] > resultats["fixe_5%"]["prob_succes"]
+    
+    def test_regles_independantes_de_l_ordre(self):
+        """Test scénarios communs: résultat d'une règle indépendant des autres règles"""
+        seule = self.simuler([RegleRetrait("guyton_klinger", taux=0.045, nom="gk")])
+        avec_autres = self.simuler([
+            RegleRetrait("plancher_plafond", taux=0.04),
+            RegleRetrait("guyton_klinger", taux=0.045, nom="gk"),
+            RegleRetrait("fixe", taux=0.04)
+        ])
+        
+        assert seule["gk"] == avec_autres["gk"]
+    
+    def test_lots_et_workers(self):
+        """Test résultat identique quel que soit le nombre de workers"""
+        regles = [RegleRetrait("fixe", taux=0.04), RegleRetrait("guyton_klinger", taux=0.05)]
+        
+        un = SimulateurDecumulation(seed=3).simuler(1000000, regles, nb_simulations=9000, taille_lot=2000)
+        deux = SimulateurDecumulation(seed=3).simuler(1000000, regles, nb_simulations=9000, taille_lot=2000, nb_workers=2)
+        
+        assert un == deux
+        
+        with pytest.raises(ValueError):
+            SimulateurDecumulation().simuler(1000000, [])
+    
+    def test_noms_en_double_refuses(self):
+        """Test deux règles de même nom refusées (résultats écrasés sinon)"""
+        with pytest.raises(ValueError, match="double"):
+            SimulateurDecumulation(seed=1).simuler(1000000, [
+                RegleRetrait("fixe", taux=0.04, nom="prudent"),
+                RegleRetrait("pourcentage_constant", taux=0.04, nom="prudent")
+            ], nb_simulations=100)
+        with pytest.raises(ValueError):
+            AccumulateurDecumulation(["a", "b", "a"])
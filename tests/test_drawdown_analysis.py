@@ -0,0 +1,74 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+import pandas as pd
+from analytics.drawdown_analysis import DrawdownAnalyzer, calculer_episodes, memo_episodes
+
+
+def _serie(valeurs, debut="2020-01-01"):
+    return pd.Series(np.asarray(valeurs, dtype=float), index=pd.bdate_range(debut, periods=len(valeurs)))
+
+
+class TestDrawdownAnalyzer:
+    """
+    Tests de la table des épisodes de drawdown.
+    
+    Vérifie:
+    - Pic, creux, récupération et durées de chaque épisode
+    - Cohérence avec le calcul naïf du drawdown
+    - Mémoïsation par empreinte de série
+    """
+    
+    def test_table_episodes(self):
+        """Deux épisodes: le premier récupéré, le second non"""
+        serie = _serie([100, 90, 80, 95, 100, 110, 99, 88, 105])
+        table = DrawdownAnalyzer.tableau_episodes(serie)
+        
+        assert len(table) == 2
+        premier, second = table.iloc[0], table.iloc[1]
+        assert premier["date_pic"] == serie.index[0] and premier["date_creux"] == serie.index[2]
+        assert premier["date_recuperation"] == serie.index[4]
+        assert premier["drawdown_pct"] == pytest.approx(-20.0)
+        assert premier["jours_sous_eau"] == 3
+        assert second["valeur_pic"] == 110 and second["valeur_creux"] == 88
+        assert pd.isna(second["date_recuperation"]) and np.isnan(second["duree_recuperation_jours"])
+        assert second["jours_sous_eau"] == 3
+        
+        max_dd, details = DrawdownAnalyzer.calculer_max_drawdown(serie)
+        assert max_dd == pytest.approx(-20.0)
+        assert details["date_recuperation"] == str(serie.index[4].date())
+        assert [d["drawdown_pct"] for d in DrawdownAnalyzer.identifier_tous_drawdowns(serie)] == [-20.0, -20.0]
+    
+    def test_coherence_calcul_naif(self):
+        """Creux de chaque épisode = minimum du drawdown naïf entre début et récupération"""
+        rng = np.random.default_rng(0)
+        valeurs = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, 5000)))
+        table = calculer_episodes(valeurs)
+        
+        plus_hauts = np.maximum.accumulate(valeurs)
+        naif = (valeurs - plus_hauts) / plus_hauts * 100
+        assert np.array_equal(table["drawdowns"], naif)
+        assert table["profondeurs"].min() == naif.min()
+        
+        for debut, creux, recuperation in zip(table["debuts"], table["creux"], table["recuperations"]):
+            fin = recuperation if recuperation >= 0 else len(valeurs)
+            assert (naif[debut:fin] < 0).all()
+            assert creux == debut + np.argmin(naif[debut:fin])
+    
+    def test_memoisation(self):
+        """Même série: table réutilisée; série modifiée: table recalculée"""
+        memo_episodes.vider()
+        serie = _serie(np.linspace(100, 50, 30))
+        
+        table = memo_episodes.obtenir(serie)
+        assert memo_episodes.obtenir(serie.copy()) is table
+        
+        modifiee = serie.copy()
+        modifiee.iloc[-1] = 10
+        assert memo_episodes.obtenir(modifiee) is not table
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
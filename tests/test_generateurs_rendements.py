@@ -0,0 +1,155 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+import pandas as pd
+from analytics.generateurs_rendements import (
+    GenerateurRendements, GenerateurNormal, GenerateurStudent, GenerateurBootstrap, GenerateurMarkov,
+    loi_stationnaire, rendements_mensuels
+)
+from analytics.monte_carlo import MonteCarloSimulator, MoteurSimulation, SortieSimulation
+
+
+class ProviderFictif:
+    """Fournisseur de prix sans réseau, compte les téléchargements"""
+    
+    def __init__(self, prix):
+        self.prix = prix
+        self.nb_telechargements = 0
+    
+    def telecharger_prix_historiques(self, ticker, periode="max"):
+        self.nb_telechargements += 1
+        return self.prix
+
+
+class StoreFictif:
+    """Stockage local réduit à sa dernière date"""
+    
+    def __init__(self, derniere_date):
+        self.date = derniere_date
+    
+    def derniere_date(self, ticker):
+        return pd.Timestamp(self.date)
+
+
+class TestGenerateursRendements:
+    """
+    Tests des générateurs de rendements interchangeables.
+    """
+    
+    def test_normal_identique_moteur_historique(self):
+        """Test générateur normal explicite = comportement par défaut"""
+        parametres = dict(
+            valeur_initiale=100000, rendement_moyen_annuel=0.06, volatilite_annuelle=0.12,
+            nb_annees=10, nb_simulations=500,
+            moteur=MoteurSimulation.VECTORISE, sortie=SortieSimulation.ANNUELLE
+        )
+        
+        defaut = MonteCarloSimulator(seed=5).simuler_trajectoires(**parametres)
+        explicite = MonteCarloSimulator(seed=5).simuler_trajectoires(
+            **parametres, generateur=GenerateurNormal(0.06, 0.12)
+        )
+        
+        np.testing.assert_array_equal(defaut["trajectoires_annuelles"], explicite["trajectoires_annuelles"])
+    
+    def test_student_volatilite_et_queues(self):
+        """Test Student: volatilité conservée, kurtosis supérieure à la normale"""
+        rendements, _ = GenerateurStudent(0.06, 0.15, degres_liberte=5).tirer_bloc(
+            np.random.default_rng(0), 200000, 12
+        )
+        
+        assert abs(rendements.std() - 0.15 / np.sqrt(12)) < 0.001
+        centres = rendements - rendements.mean()
+        kurtosis = np.mean(centres ** 4) / np.mean(centres ** 2) ** 2
+        assert kurtosis > 4
+    
+    def test_bootstrap_blocs_contigus(self):
+        """Test bootstrap: blocs contigus de l'historique, continuité entre années"""
+        generateur = GenerateurBootstrap(np.arange(50.0), taille_bloc=5)
+        rng = np.random.default_rng(1)
+        
+        blocs, etat = [], None
+        for _ in range(3):
+            bloc, etat = generateur.tirer_bloc(rng, 20, 12, etat)
+            blocs.append(bloc)
+        rendements = np.concatenate(blocs, axis=1)
+        
+        for debut in range(0, 35, 5):
+            bloc = rendements[:, debut:debut + 5]
+            # Indices consécutifs (modulo repli circulaire)
+            assert np.all(np.diff(bloc, axis=1) % 50 == 1)
+    
+    def test_bootstrap_depuis_market_data_cache(self):
+        """Test rendements mensuels calculés une fois par (ticker, période)"""
+        dates = pd.bdate_range("2015-01-01", "2020-12-31")
+        prix = pd.Series(100 * np.exp(np.cumsum(np.full(len(dates), 0.0003))), index=dates)
+        provider = ProviderFictif(prix)
+        GenerateurBootstrap._cache_series.clear()
+        
+        premier = GenerateurBootstrap.depuis_market_data(provider, "TEST.PA")
+        second = GenerateurBootstrap.depuis_market_data(provider, "TEST.PA", taille_bloc=6)
+        
+        assert provider.nb_telechargements == 1
+        assert premier.nb_observations == len(rendements_mensuels(prix)) == 71
+        assert second.taille_bloc == 6
+    
+    def test_bootstrap_relu_si_stockage_etendu(self):
+        """Test historique relu quand la dernière date stockée avance"""
+        dates = pd.bdate_range("2015-01-01", "2020-12-31")
+        prix = pd.Series(100 * np.exp(np.cumsum(np.full(len(dates), 0.0003))), index=dates)
+        provider = ProviderFictif(prix)
+        provider.store = StoreFictif("2020-12-31")
+        GenerateurBootstrap._cache_series.clear()
+        
+        GenerateurBootstrap.depuis_market_data(provider, "TEST.PA")
+        GenerateurBootstrap.depuis_market_data(provider, "TEST.PA")
+        assert provider.nb_telechargements == 1
+        
+        provider.prix = pd.concat([prix, pd.Series(130.0, index=pd.bdate_range("2021-01-01", "2021-03-31"))])
+        provider.store.date = "2021-03-31"
+        etendu = GenerateurBootstrap.depuis_market_data(provider, "TEST.PA")
+        
+        assert provider.nb_telechargements == 2
+        assert etendu.nb_observations == 74
+        assert GenerateurBootstrap._cache_series.max_entrees == 256
+    
+    def test_markov_regimes(self):
+        """Test Markov: loi stationnaire et persistance des régimes"""
+        matrice = [[0.98, 0.02], [0.10, 0.90]]
+        np.testing.assert_allclose(loi_stationnaire(np.array(matrice)), [5 / 6, 1 / 6])
+        
+        generateur = GenerateurMarkov([(0.10, 0.0), (-0.20, 0.0)], matrice)
+        rendements, regime = generateur.tirer_bloc(np.random.default_rng(2), 50000, 12)
+        
+        # Volatilités nulles: le rendement identifie le régime
+        part_crise = np.mean(rendements < 0)
+        assert abs(part_crise - 1 / 6) < 0.01
+        assert regime.shape == (50000,)
+        
+        with pytest.raises(ValueError):
+            GenerateurMarkov([(0.1, 0.1), (0.0, 0.2)], [[0.5, 0.4], [0.1, 0.9]])
+    
+    def test_generateur_incomplet_refuse(self):
+        """Test générateur sans tirer_bloc refusé dès l'instanciation"""
+        class GenerateurIncomplet(GenerateurRendements):
+            pass
+        
+        with pytest.raises(TypeError):
+            GenerateurIncomplet()
+        with pytest.raises(TypeError):
+            GenerateurRendements()
+    
+    def test_generateur_mode_lots(self):
+        """Test générateur transmis aux lots (résultat indépendant des workers)"""
+        generateur = GenerateurStudent(0.06, 0.15, degres_liberte=4)
+        parametres = dict(
+            valeur_initiale=100000, rendement_moyen_annuel=0.06, volatilite_annuelle=0.15,
+            nb_annees=5, nb_simulations=3000, taille_lot=1000, generateur=generateur
+        )
+        
+        un = MonteCarloSimulator(seed=7).analyser_simulation_complete(**parametres, nb_workers=1)
+        deux = MonteCarloSimulator(seed=7).analyser_simulation_complete(**parametres, nb_workers=2)
+        
+        assert un["percentiles"] == deux["percentiles"]
+        assert un["parametres"]["generateur"] == "student"
@@ -0,0 +1,98 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+import pandas as pd
+from analytics.index_metriques import IndexMetriques, RegistreIndexMetriques
+from analytics.drawdown_analysis import DrawdownAnalyzer
+from analytics.performance import PerformanceAnalyzer
+
+
+def _serie(nb_jours=2000, seed=0):
+    """Série de valeurs log-normale sur jours ouvrés"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=nb_jours)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, nb_jours))), index=dates)
+
+
+class TestIndexMetriques:
+    """
+    Tests de l'index incrémental des métriques.
+    
+    Vérifie:
+    - Volatilité, Sharpe et max drawdown identiques aux calculs complets
+    - Ajout incrémental équivalent à une construction complète
+    - Compatibilité avec PerformanceAnalyzer.analyser_periodes
+    - Registre borné (LRU)
+    """
+    
+    def test_fenetres_identiques_calcul_complet(self):
+        """Métriques de fenêtres quelconques égales au recalcul sur la tranche"""
+        serie = _serie()
+        index = IndexMetriques(serie)
+        rng = np.random.default_rng(1)
+        
+        for _ in range(50):
+            debut, fin = sorted(rng.choice(len(serie), 2, replace=False))
+            fenetre = serie.iloc[debut:fin + 1]
+            rendements = fenetre.pct_change().dropna()
+            
+            max_dd, _ = DrawdownAnalyzer.calculer_max_drawdown(fenetre)
+            assert index.max_drawdown(debut, fin) == pytest.approx(max_dd, abs=1e-9)
+            assert index.rendement(debut, fin) == pytest.approx((fenetre.iloc[-1] / fenetre.iloc[0] - 1) * 100)
+            if len(rendements) >= 2:
+                assert index.volatilite(debut, fin) == pytest.approx(rendements.std() * np.sqrt(252) * 100, rel=1e-8)
+    
+    def test_ajout_incremental(self):
+        """Ajouts successifs équivalents à une construction complète"""
+        serie = _serie(1500)
+        incremental = IndexMetriques(serie.iloc[:10])
+        for debut in range(10, len(serie), 97):
+            incremental.ajouter(serie.iloc[debut:debut + 97])
+        
+        complet = IndexMetriques(serie)
+        
+        assert incremental.n == complet.n == len(serie)
+        assert incremental.metriques_periodes() == complet.metriques_periodes()
+        assert incremental.max_drawdown(0) == pytest.approx(complet.max_drawdown(0))
+        assert incremental.dates.equals(serie.index)
+    
+    def test_analyser_periodes_compatible(self):
+        """Même résultat que le calcul historique de PerformanceAnalyzer"""
+        serie = _serie()
+        attendu = PerformanceAnalyzer.analyser_periodes(serie)
+        
+        assert IndexMetriques(serie).analyser_periodes() == attendu
+        assert PerformanceAnalyzer.analyser_periodes(serie, cle="test_periodes") == attendu
+        assert IndexMetriques(serie.iloc[:100]).analyser_periodes()["1Y"] is None
+    
+    def test_registre_prolonge_ou_reconstruit(self):
+        """Le registre prolonge l'index si la série est prolongée, le reconstruit sinon"""
+        serie = _serie(800)
+        registre = RegistreIndexMetriques()
+        
+        index = registre.obtenir("ptf_1", serie.iloc[:500])
+        assert registre.obtenir("ptf_1", serie) is index
+        assert index.n == 800
+        
+        revisee = serie.copy()
+        revisee.iloc[100] *= 1.01
+        assert registre.obtenir("ptf_1", revisee.iloc[:700]) is not index
+    
+    def test_registre_borne_lru(self):
+        """Au-delà de taille_max séries, la moins récemment utilisée est supprimée"""
+        serie = _serie(300)
+        registre = RegistreIndexMetriques(taille_max=2)
+        
+        premier = registre.obtenir("a", serie)
+        registre.obtenir("b", serie)
+        assert registre.obtenir("a", serie) is premier
+        registre.obtenir("c", serie)
+        
+        assert list(registre._index) == ["a", "c"]
+        assert registre.obtenir("a", serie) is premier
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
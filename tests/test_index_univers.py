@@ -0,0 +1,168 @@
+import sys
+sys.path.append("backend/src")
+
+import json
+import random
+import threading
+import time
+import pytest
+from models.enveloppe import EnveloppeType
+from services.eligibility_service import EligibilityService
+from data.index_univers import IndexUnivers
+
+
+CLASSES = ["actions_monde", "actions_europe", "actions_usa", "obligations_gouvernementales", "or"]
+EMETTEURS = ["Amundi", "iShares", "Lyxor", "Vanguard", "Xtrackers"]
+
+
+def _univers(nb, seed=0):
+    """Univers synthétique de dicts au format universe.json"""
+    rng = random.Random(seed)
+    return [
+        {
+            "isin": f"FR{i:010d}",
+            "ticker": f"ETF{i}.PA",
+            "nom": f"ETF synthétique {i}",
+            "classe_actif": rng.choice(CLASSES),
+            "eligible_pea": rng.random() < 0.4,
+            "eligible_opcvm_actions_is": rng.random() < 0.6,
+            "type_distribution": rng.choice(["capitalisant", "distributif"]),
+            "ter": round(rng.uniform(0.05, 0.8), 2),
+            "emetteur": rng.choice(EMETTEURS)
+        }
+        for i in range(nb)
+    ]
+
+
+def _filtre_naif(etfs, classe_actif=None, eligible_pea=None, emetteur=None, min_ter=None, max_ter=None):
+    """Filtres chaînés par compréhensions de liste (référence)"""
+    resultats = list(etfs)
+    if classe_actif:
+        resultats = [e for e in resultats if e["classe_actif"] == classe_actif]
+    if eligible_pea is not None:
+        resultats = [e for e in resultats if e["eligible_pea"] == eligible_pea]
+    if emetteur:
+        resultats = [e for e in resultats if e["emetteur"] == emetteur]
+    if min_ter is not None:
+        resultats = [e for e in resultats if e["ter"] >= min_ter]
+    if max_ter is not None:
+        resultats = [e for e in resultats if e["ter"] <= max_ter]
+    return resultats
+
+
+class TestIndexUnivers:
+    """
+    Tests de l'index compilé de l'univers d'ETFs.
+    
+    Vérifie:
+    - Résultats identiques aux filtres chaînés, ordre de l'univers conservé
+    - Intervalles de TER (bornes incluses, au-delà des points de contrôle)
+    - Valeurs inconnues et champs non indexés
+    - Éligibilité par enveloppe cohérente avec check_eligibility
+    - Reconstruction de l'index quand l'univers change à nombre d'ETFs constant
+    - Filtrage sous la milliseconde sur 2000 ETFs
+    """
+    
+    def test_equivalence_filtres_chaines(self):
+        """Toute combinaison de filtres donne les mêmes ETFs, dans le même ordre"""
+        etfs = _univers(500)
+        index = IndexUnivers(etfs)
+        rng = random.Random(1)
+        
+        for _ in range(200):
+            criteres = {
+                "classe_actif": rng.choice(CLASSES + [None]),
+                "eligible_pea": rng.choice([True, False, None]),
+                "emetteur": rng.choice(EMETTEURS + [None]),
+                "min_ter": rng.choice([None, 0.1, 0.25, 0.4]),
+                "max_ter": rng.choice([None, 0.2, 0.5, 0.8])
+            }
+            attendu = _filtre_naif(etfs, **criteres)
+            assert index.filtrer(**criteres) == attendu
+            assert index.compter(**criteres) == len(attendu)
+    
+    def test_intervalles_ter(self):
+        """Bornes incluses, y compris sur des valeurs répétées et hors points de contrôle"""
+        etfs = _univers(300, seed=3)
+        index = IndexUnivers(etfs)
+        ters = sorted({e["ter"] for e in etfs})
+        
+        for min_ter in ters[::7]:
+            for max_ter in ters[::11]:
+                attendu = _filtre_naif(etfs, min_ter=min_ter, max_ter=max_ter)
+                assert index.filtrer(min_ter=min_ter, max_ter=max_ter) == attendu
+        
+        assert index.filtrer(min_ter=0.9) == []
+        assert index.filtrer(min_ter=0.5, max_ter=0.4) == []
+    
+    def test_valeurs_inconnues(self):
+        """Valeur inconnue: ensemble vide; champ non indexé: ValueError"""
+        index = IndexUnivers(_univers(50))
+        
+        assert index.filtrer(classe_actif="inexistante") == []
+        assert index.compter() == 50
+        with pytest.raises(ValueError):
+            index.filtrer(ticker="ETF1.PA")
+        with pytest.raises(ValueError):
+            index.filtrer(enveloppe=EnveloppeType.PEA)
+    
+    def test_enveloppes_service(self):
+        """L'index du service suit les règles de check_eligibility"""
+        index = EligibilityService.get_index()
+        assert len(index) > 0
+        
+        for env_type in EnveloppeType:
+            attendu = [
+                etf for etf in EligibilityService._etf_cache.values()
+                if EligibilityService.check_eligibility(etf.isin, env_type).eligible
+            ]
+            assert EligibilityService.get_eligible_etfs(env_type) == attendu
+        
+        pea_monde = EligibilityService.get_eligible_etfs(EnveloppeType.PEA, classe_actif="actions_monde")
+        assert all(etf.eligible_pea and etf.classe_actif.value == "actions_monde" for etf in pea_monde)
+    
+    def test_reconstruction_meme_nombre_etfs(self, tmp_path):
+        """Un ETF modifié sans changer le nombre d'ETFs est vu par l'index"""
+        EligibilityService.get_index()
+        isin = next(iter(EligibilityService._etf_cache))
+        etfs = [etf.model_dump(mode="json") for etf in EligibilityService._etf_cache.values()]
+        ter_initial = EligibilityService._etf_cache[isin].ter
+        
+        etfs[0]["ter"] = 1.99
+        chemin = tmp_path / "universe.json"
+        chemin.write_text(json.dumps(etfs), encoding="utf-8")
+        try:
+            # Reconstructions concurrentes: toutes voient le même index à jour
+            threads = [threading.Thread(target=EligibilityService.load_etf_universe, args=(str(chemin),)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            
+            assert [etf.isin for etf in EligibilityService.get_index().filtrer(min_ter=1.9)] == [isin]
+            
+            EligibilityService._etf_cache[isin] = EligibilityService._etf_cache[isin].model_copy(update={"ter": 1.5})
+            EligibilityService.invalider_index()
+            assert [etf.isin for etf in EligibilityService.get_index().filtrer(min_ter=1.4, max_ter=1.6)] == [isin]
+        finally:
+            etfs[0]["ter"] = ter_initial
+            chemin.write_text(json.dumps(etfs), encoding="utf-8")
+            EligibilityService.load_etf_universe(str(chemin))
+        
+        assert EligibilityService.get_index().filtrer(min_ter=1.4) == []
+    
+    def test_filtrage_sous_la_milliseconde(self):
+        """Filtre multi-critères sur 2000 ETFs en moins d'une milliseconde"""
+        index = IndexUnivers(_univers(2000))
+        
+        nb_requetes = 200
+        debut = time.perf_counter()
+        for _ in range(nb_requetes):
+            index.filtrer(classe_actif="actions_monde", eligible_pea=True, min_ter=0.1, max_ter=0.4)
+        duree_ms = (time.perf_counter() - debut) * 1000 / nb_requetes
+        
+        assert duree_ms < 1.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,670 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from analytics.monte_carlo import MonteCarloSimulator, MoteurSimulation, SortieSimulation, ReductionVariance
+from analytics.accumulateurs import SketchQuantiles, AccumulateurTrajectoires
+from analytics.monte_carlo_multi_actifs import MonteCarloMultiActifs
+from analytics.cache_scenarios import CacheScenarios
+from analytics.backtesting import FrequenceReequilibrage
+
+
+class TestMonteCarlo:
+    """
+    Tests du simulateur Monte Carlo.
+
+    Vérifie:
+    - Équivalence des moteurs itératif et vectorisé
+    - Sortie annuelle sans matrice mensuelle
+    - Plancher à zéro et flux annuels
+    """
+
+    def test_moteurs_equivalents_sans_volatilite(self):
+        """Test moteurs itératif et vectorisé identiques à volatilité nulle"""
+        simulator = MonteCarloSimulator(seed=1)
+
+        parametres = dict(
+            valeur_initiale=100000,
+            rendement_moyen_annuel=0.06,
+            volatilite_annuelle=0.0,
+            nb_annees=10,
+            nb_simulations=5,
+            apports_annuels=3000,
+            retraits_annuels=1000
+        )
+
+        iteratif = simulator.simuler_trajectoires(**parametres, moteur=MoteurSimulation.ITERATIF)
+        vectorise = simulator.simuler_trajectoires(**parametres, moteur=MoteurSimulation.VECTORISE)
+
+        np.testing.assert_allclose(
+            vectorise["trajectoires_completes"],
+            iteratif["trajectoires_completes"],
+            rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            vectorise["trajectoires_annuelles"],
+            iteratif["trajectoires_annuelles"],
+            rtol=1e-12
+        )
+
+    def test_sortie_annuelle_identique_sortie_complete(self):
+        """Test sortie annuelle = colonnes annuelles de la sortie complète"""
+        parametres = dict(
+            valeur_initiale=50000,
+            rendement_moyen_annuel=0.07,
+            volatilite_annuelle=0.15,
+            nb_annees=20,
+            nb_simulations=2000,
+            apports_annuels=2000,
+            moteur=MoteurSimulation.VECTORISE
+        )
+
+        complete = MonteCarloSimulator(seed=7).simuler_trajectoires(
+            **parametres, sortie=SortieSimulation.COMPLETE
+        )
+        annuelle = MonteCarloSimulator(seed=7).simuler_trajectoires(
+            **parametres, sortie=SortieSimulation.ANNUELLE
+        )
+
+        assert annuelle["trajectoires_completes"] is None
+        assert complete["trajectoires_completes"].shape == (2000, 20 * 12 + 1)
+        np.testing.assert_allclose(
+            annuelle["trajectoires_annuelles"],
+            complete["trajectoires_annuelles"],
+            rtol=1e-12
+        )
+        np.testing.assert_array_equal(
+            complete["trajectoires_completes"][:, ::12],
+            complete["trajectoires_annuelles"]
+        )
+
+    def test_plancher_zero_avec_retraits(self):
+        """Test aucune valeur négative avec des retraits supérieurs au capital"""
+        simulator = MonteCarloSimulator(seed=3)
+
+        resultats = simulator.simuler_trajectoires(
+            valeur_initiale=10000,
+            rendement_moyen_annuel=0.02,
+            volatilite_annuelle=0.30,
+            nb_annees=15,
+            nb_simulations=1000,
+            retraits_annuels=2000,
+            moteur=MoteurSimulation.VECTORISE,
+            sortie=SortieSimulation.ANNUELLE
+        )
+
+        trajectoires = resultats["trajectoires_annuelles"]
+
+        assert trajectoires.min() >= 0
+        # 15 retraits de 2k sur 10k: la majorité des trajectoires est ruinée
+        assert (trajectoires[:, -1] == 0).mean() > 0.5
+
+    def test_moteurs_statistiquement_proches(self):
+        """Test médianes finales proches entre les deux moteurs"""
+        parametres = dict(
+            valeur_initiale=100000,
+            rendement_moyen_annuel=0.07,
+            volatilite_annuelle=0.15,
+            nb_annees=10,
+            nb_simulations=20000
+        )
+
+        iteratif = MonteCarloSimulator(seed=11).simuler_trajectoires(
+            **parametres, moteur=MoteurSimulation.ITERATIF
+        )
+        vectorise = MonteCarloSimulator(seed=12).simuler_trajectoires(
+            **parametres, moteur=MoteurSimulation.VECTORISE, sortie=SortieSimulation.ANNUELLE
+        )
+
+        mediane_iteratif = np.median(iteratif["trajectoires_annuelles"][:, -1])
+        mediane_vectorise = np.median(vectorise["trajectoires_annuelles"][:, -1])
+
+        assert abs(mediane_vectorise / mediane_iteratif - 1) < 0.02
+
+    def test_sortie_annuelle_refusee_moteur_iteratif(self):
+        """Test sortie annuelle seule non supportée par le moteur itératif"""
+        simulator = MonteCarloSimulator()
+
+        with pytest.raises(ValueError):
+            simulator.simuler_trajectoires(
+                valeur_initiale=1000,
+                rendement_moyen_annuel=0.05,
+                volatilite_annuelle=0.1,
+                nb_annees=2,
+                nb_simulations=10,
+                moteur=MoteurSimulation.ITERATIF,
+                sortie=SortieSimulation.ANNUELLE
+            )
+
+    def test_analyse_complete(self):
+        """Test analyse complète avec moteur vectorisé par défaut"""
+        simulator = MonteCarloSimulator(seed=42)
+
+        resultats = simulator.analyser_simulation_complete(
+            valeur_initiale=100000,
+            rendement_moyen_annuel=0.07,
+            volatilite_annuelle=0.15,
+            nb_annees=30,
+            nb_simulations=5000,
+            apports_annuels=5000
+        )
+
+        assert len(resultats["fan_chart_data"]) == 31
+        assert resultats["percentiles"]["p10"] < resultats["percentiles"]["p50"] < resultats["percentiles"]["p90"]
+        assert 0 <= resultats["probabilites"]["prob_maintien_capital"] <= 100
+
+
+class TestAccumulateurs:
+    """
+    Tests des accumulateurs par lots (sketch de quantiles et compteurs).
+    """
+    
+    def test_sketch_erreur_relative_garantie(self):
+        """Test quantiles du sketch à moins de alpha des quantiles exacts"""
+        np.random.seed(0)
+        valeurs = np.random.lognormal(mean=11, sigma=1.0, size=(50000, 3))
+        valeurs[:5000, 0] = 0  # Trajectoires ruinées
+        
+        sketch = SketchQuantiles(nb_colonnes=3, erreur_relative=0.01)
+        sketch.ajouter(valeurs)
+        
+        for p in [1, 10, 25, 50, 75, 90, 99]:
+            exact = np.percentile(valeurs, p, axis=0, method="lower")
+            estime = sketch.quantiles(p)
+            
+            positifs = exact > 0
+            assert np.all(np.abs(estime[positifs] / exact[positifs] - 1) <= 0.01 + 1e-12)
+            assert np.all(estime[~positifs] == 0)
+    
+    def test_fusion_sketch_identique_ajout_unique(self):
+        """Test fusion de sketches par lots = sketch alimenté en une fois"""
+        np.random.seed(1)
+        valeurs = np.random.lognormal(mean=10, sigma=0.5, size=(9000, 4))
+        
+        global_sketch = SketchQuantiles(nb_colonnes=4)
+        global_sketch.ajouter(valeurs)
+        
+        fusion = SketchQuantiles(nb_colonnes=4)
+        for lot in np.array_split(valeurs, 7):
+            sketch_lot = SketchQuantiles(nb_colonnes=4)
+            sketch_lot.ajouter(lot)
+            fusion.fusionner(sketch_lot)
+        
+        np.testing.assert_array_equal(fusion.comptes, global_sketch.comptes)
+        np.testing.assert_array_equal(fusion.quantiles(50), global_sketch.quantiles(50))
+    
+    def test_accumulateur_moments_et_compteurs(self):
+        """Test moyenne, écart-type et probabilités exacts après agrégation par lots"""
+        np.random.seed(2)
+        trajectoires = np.random.lognormal(mean=11.5, sigma=0.8, size=(10000, 11))
+        trajectoires[:, 0] = 100000
+        
+        accumulateur = AccumulateurTrajectoires(nb_annees=10, valeur_initiale=100000, objectif=150000)
+        for lot in np.array_split(trajectoires, 13):
+            accumulateur.ajouter_lot(lot)
+        
+        np.testing.assert_allclose(accumulateur.moyenne, trajectoires.mean(axis=0), rtol=1e-10)
+        np.testing.assert_allclose(accumulateur.ecart_type(), trajectoires.std(axis=0), rtol=1e-8, atol=1e-6)
+        
+        reference = MonteCarloSimulator().calculer_probabilite_succes(trajectoires, objectif=150000)
+        probabilites = accumulateur.calculer_probabilites()
+        
+        assert probabilites["prob_maintien_capital"] == reference["prob_maintien_capital"]
+        assert probabilites["prob_atteindre_objectif"] == reference["prob_atteindre_objectif"]
+        assert probabilites["prob_ruine"] == reference["prob_ruine"]
+    
+    def test_analyse_par_lots(self):
+        """Test analyse complète par lots proche de l'analyse exacte"""
+        parametres = dict(
+            valeur_initiale=100000,
+            rendement_moyen_annuel=0.06,
+            volatilite_annuelle=0.12,
+            nb_annees=20,
+            nb_simulations=40000,
+            apports_annuels=2000
+        )
+        
+        exacte = MonteCarloSimulator(seed=5).analyser_simulation_complete(**parametres)
+        par_lots = MonteCarloSimulator(seed=6).analyser_simulation_complete(**parametres, taille_lot=7000)
+        
+        assert "precision_percentiles" in par_lots
+        assert "precision_percentiles" not in exacte
+        assert par_lots["precision_percentiles"]["p50"]["erreur_relative_max_pct"] == 0.5
+        assert len(par_lots["fan_chart_data"]) == 21
+        
+        for p in ["p10", "p50", "p90"]:
+            assert abs(par_lots["percentiles"][p] / exacte["percentiles"][p] - 1) < 0.03
+        
+        assert abs(
+            par_lots["probabilites"]["prob_maintien_capital"] -
+            exacte["probabilites"]["prob_maintien_capital"]
+        ) < 2.0
+
+
+class TestMonteCarloParallele:
+    """
+    Tests de l'exécution parallèle avec flux aléatoires indépendants par lot.
+    """
+    
+    PARAMETRES = dict(
+        valeur_initiale=100000,
+        rendement_moyen_annuel=0.06,
+        volatilite_annuelle=0.15,
+        nb_annees=15,
+        nb_simulations=25000,
+        apports_annuels=1000,
+        retraits_annuels=3000,
+        taille_lot=4000
+    )
+    
+    def test_resultat_identique_quel_que_soit_nb_workers(self):
+        """Test résultats bit à bit identiques pour 1, 2 ou 3 workers"""
+        sequentiel = MonteCarloSimulator(seed=2024).analyser_simulation_complete(**self.PARAMETRES)
+        deux_workers = MonteCarloSimulator(seed=2024).analyser_simulation_complete(**self.PARAMETRES, nb_workers=2)
+        trois_workers = MonteCarloSimulator(seed=2024).analyser_simulation_complete(**self.PARAMETRES, nb_workers=3)
+        
+        assert sequentiel == deux_workers
+        assert sequentiel == trois_workers
+    
+    def test_nb_workers_borne_par_nb_coeurs(self, monkeypatch):
+        """Test le pool ne dépasse jamais le nombre de cœurs, même avec des lots minuscules"""
+        import analytics.monte_carlo as module
+        tailles_pool = []
+        
+        class PoolEnregistre(ThreadPoolExecutor):
+            def __init__(self, max_workers):
+                tailles_pool.append(max_workers)
+                super().__init__(max_workers)
+        
+        monkeypatch.setattr(module.os, "cpu_count", lambda: 2)
+        monkeypatch.setattr(module, "ProcessPoolExecutor", PoolEnregistre)
+        parametres = dict(self.PARAMETRES, nb_simulations=2000, taille_lot=10)
+        
+        resultat = MonteCarloSimulator(seed=2024).analyser_simulation_complete(**parametres, nb_workers=10000)
+        
+        assert tailles_pool == [2]
+        assert resultat == MonteCarloSimulator(seed=2024).analyser_simulation_complete(**parametres)
+    
+    def test_seeds_differentes(self):
+        """Test deux seeds différentes donnent des résultats différents"""
+        a = MonteCarloSimulator(seed=1).analyser_simulation_complete(**self.PARAMETRES)
+        b = MonteCarloSimulator(seed=2).analyser_simulation_complete(**self.PARAMETRES)
+        
+        assert a["statistiques_finales"] != b["statistiques_finales"]
+    
+    def test_etat_global_numpy_non_modifie(self):
+        """Test le simulateur ne touche pas à l'état global np.random"""
+        np.random.seed(123)
+        attendu = np.random.random(3)
+        
+        np.random.seed(123)
+        MonteCarloSimulator(seed=99).simuler_trajectoires(
+            valeur_initiale=1000,
+            rendement_moyen_annuel=0.05,
+            volatilite_annuelle=0.1,
+            nb_annees=2,
+            nb_simulations=100
+        )
+        
+        np.testing.assert_array_equal(np.random.random(3), attendu)
+
+
+class TestCacheScenarios:
+    """
+    Tests du cache de scénarios (nombres aléatoires communs).
+    """
+    
+    PARAMETRES = dict(
+        valeur_initiale=100000,
+        rendement_moyen_annuel=0.06,
+        volatilite_annuelle=0.15,
+        nb_annees=20,
+        nb_simulations=3000,
+        moteur=MoteurSimulation.VECTORISE,
+        sortie=SortieSimulation.ANNUELLE
+    )
+    
+    def test_tirages_reutilises_entre_variantes_de_flux(self):
+        """Test mêmes tirages quand seuls les flux changent"""
+        cache = CacheScenarios()
+        
+        sans_apport = MonteCarloSimulator(seed=4, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        avec_apport = MonteCarloSimulator(seed=4, cache_scenarios=cache).simuler_trajectoires(
+            **self.PARAMETRES, apports_annuels=5000
+        )
+        
+        assert not sans_apport["scenario_depuis_cache"]
+        assert avec_apport["scenario_depuis_cache"]
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+        
+        # Nombres aléatoires communs: l'apport augmente chaque trajectoire
+        assert np.all(
+            avec_apport["trajectoires_annuelles"][:, -1] >= sans_apport["trajectoires_annuelles"][:, -1]
+        )
+    
+    def test_resultat_identique_avec_ou_sans_cache(self):
+        """Test tirages en cache = tirages d'un générateur neuf de même seed"""
+        sans_cache = MonteCarloSimulator(seed=8).simuler_trajectoires(**self.PARAMETRES)
+        avec_cache = MonteCarloSimulator(seed=8, cache_scenarios=CacheScenarios()).simuler_trajectoires(
+            **self.PARAMETRES
+        )
+        
+        np.testing.assert_array_equal(
+            avec_cache["trajectoires_annuelles"],
+            sans_cache["trajectoires_annuelles"]
+        )
+    
+    def test_budget_octets_et_eviction_lru(self):
+        """Test éviction LRU au-delà du budget"""
+        taille_matrice = 20 * 3000 * 12 * 8
+        cache = CacheScenarios(budget_octets=2 * taille_matrice)
+        
+        for seed in [1, 2, 3]:
+            MonteCarloSimulator(seed=seed, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["octets"] <= cache.budget_octets
+        
+        # Seed 1 évincée, seed 3 toujours présente
+        MonteCarloSimulator(seed=3, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        assert cache.get_stats()["hits"] == 1
+        MonteCarloSimulator(seed=1, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        assert cache.get_stats()["misses"] == 4
+    
+    def test_etat_compact_si_matrice_trop_grande(self):
+        """Test état du générateur conservé à la place d'une matrice hors budget"""
+        cache = CacheScenarios(budget_octets=1024)
+        
+        premier = MonteCarloSimulator(seed=9, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        second = MonteCarloSimulator(seed=9, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        
+        assert cache.get_stats()["octets"] == CacheScenarios.TAILLE_ETAT_COMPACT
+        assert cache.get_stats()["hits_compacts"] == 1
+        np.testing.assert_array_equal(premier["trajectoires_annuelles"], second["trajectoires_annuelles"])
+    
+    def test_matrice_hors_budget_jamais_construite(self, monkeypatch):
+        """Test hors budget: blocs annuels tirés au fil de l'eau, mêmes tirages que la matrice"""
+        cache = CacheScenarios(budget_octets=1024)
+        dans_budget = MonteCarloSimulator(seed=9, cache_scenarios=CacheScenarios()).simuler_trajectoires(
+            **self.PARAMETRES
+        )
+        
+        def refuser(*args, **kwargs):
+            raise AssertionError("matrice complète construite")
+        monkeypatch.setattr(cache, "obtenir_ou_generer", refuser)
+        
+        hors_budget = MonteCarloSimulator(seed=9, cache_scenarios=cache).simuler_trajectoires(**self.PARAMETRES)
+        assert not hors_budget["scenario_depuis_cache"]
+        assert MonteCarloSimulator(seed=9, cache_scenarios=cache).simuler_trajectoires(
+            **self.PARAMETRES
+        )["scenario_depuis_cache"]
+        np.testing.assert_array_equal(hors_budget["trajectoires_annuelles"], dans_budget["trajectoires_annuelles"])
+
+
+class TestReductionVariance:
+    """
+    Tests des techniques de réduction de variance.
+    """
+    
+    PARAMETRES = dict(
+        valeur_initiale=100000,
+        rendement_moyen_annuel=0.05,
+        volatilite_annuelle=0.15,
+        nb_annees=20,
+        nb_simulations=2000,
+        retraits_annuels=3000
+    )
+    
+    def test_antithetique_chocs_symetriques(self):
+        """Test paires antithétiques: chocs opposés"""
+        chocs, groupes = MonteCarloSimulator(seed=1)._tirer_chocs_reduits(
+            5, 100, ReductionVariance.ANTITHETIQUE
+        )
+        
+        assert chocs.shape == (5, 100, 12)
+        np.testing.assert_array_equal(chocs[:, :50], -chocs[:, 50:])
+        assert np.array_equal(groupes[:50], groupes[50:])
+        
+        with pytest.raises(ValueError):
+            MonteCarloSimulator(seed=1)._tirer_chocs_reduits(5, 101, ReductionVariance.ANTITHETIQUE)
+    
+    def test_quasi_aleatoire_normales(self):
+        """Test Sobol brouillé: chocs normaux centrés réduits, réplications"""
+        chocs, groupes = MonteCarloSimulator(seed=2)._tirer_chocs_reduits(
+            3, 1024, ReductionVariance.SOBOL
+        )
+        
+        assert chocs.shape == (3, 1024, 12)
+        assert abs(chocs.mean()) < 0.01
+        assert abs(chocs.std() - 1) < 0.02
+        assert len(np.unique(groupes)) == MonteCarloSimulator.NB_REPLICATIONS_QMC
+    
+    @pytest.mark.parametrize("reduction", list(ReductionVariance))
+    def test_erreurs_standard_rapportees(self, reduction):
+        """Test erreurs standard et estimations cohérentes pour chaque technique"""
+        resultats = MonteCarloSimulator(seed=3).analyser_simulation_complete(
+            **self.PARAMETRES, reduction_variance=reduction
+        )
+        
+        erreurs = resultats["erreurs_standard"]
+        assert 0 < erreurs["prob_maintien_capital"] < 2
+        assert erreurs["prob_ruine"] >= 0
+        assert resultats["parametres"]["reduction_variance"] == reduction.value
+        # Probabilité de référence (~59.6% sur 40k trajectoires)
+        assert abs(resultats["probabilites"]["prob_maintien_capital"] - 59.6) < 4
+    
+    def test_antithetique_reduit_variance(self):
+        """Test dispersion des estimations réduite par rapport aux tirages indépendants"""
+        def dispersion(reduction):
+            estimations = [
+                MonteCarloSimulator(seed=seed).analyser_simulation_complete(
+                    **self.PARAMETRES, reduction_variance=reduction
+                )["probabilites"]["prob_maintien_capital"]
+                for seed in range(12)
+            ]
+            return np.std(estimations)
+        
+        assert dispersion(ReductionVariance.ANTITHETIQUE) < dispersion(ReductionVariance.AUCUNE)
+    
+    def test_moteur_iteratif_refuse(self):
+        """Test réduction de variance refusée hors moteur vectorisé et en mode lots"""
+        simulator = MonteCarloSimulator(seed=4)
+        
+        with pytest.raises(ValueError):
+            simulator.simuler_trajectoires(
+                100000, 0.05, 0.15, 5, 100,
+                reduction_variance=ReductionVariance.SOBOL
+            )
+        with pytest.raises(ValueError):
+            simulator.analyser_simulation_complete(
+                **self.PARAMETRES, taille_lot=500,
+                reduction_variance=ReductionVariance.ANTITHETIQUE
+            )
+
+
+class TestGrilleSensibilite:
+    """
+    Tests de la grille de sensibilité (sweep) sur tenseur de chocs partagé.
+    """
+    
+    def test_cellule_identique_simulation_unitaire(self):
+        """Test chaque cellule = simulation vectorisée de même seed"""
+        grille = MonteCarloSimulator(seed=21).analyser_grille_sensibilite(
+            valeur_initiale=100000,
+            hypotheses_rendement=[(0.04, 0.08), (0.07, 0.15)],
+            horizons=[10, 20],
+            apports_annuels=[0, 5000],
+            retraits_annuels=[0, 4000],
+            nb_simulations=2000
+        )
+        
+        assert grille["nb_cellules"] == 2 * 2 * 2 * 2
+        
+        for i, (mu, sigma) in enumerate([(0.04, 0.08), (0.07, 0.15)]):
+            for j, apport in enumerate([0, 5000]):
+                for k, retrait in enumerate([0, 4000]):
+                    simulation = MonteCarloSimulator(seed=21).simuler_trajectoires(
+                        valeur_initiale=100000,
+                        rendement_moyen_annuel=mu,
+                        volatilite_annuelle=sigma,
+                        nb_annees=20,
+                        nb_simulations=2000,
+                        apports_annuels=apport,
+                        retraits_annuels=retrait,
+                        moteur=MoteurSimulation.VECTORISE,
+                        sortie=SortieSimulation.ANNUELLE
+                    )
+                    for h, horizon in enumerate([10, 20]):
+                        valeurs = simulation["trajectoires_annuelles"][:, horizon]
+                        assert grille["prob_succes"][i][h][j][k] == round(np.mean(valeurs >= 100000) * 100, 1)
+                        assert grille["valeur_mediane_finale"][i][h][j][k] == round(np.median(valeurs), 2)
+    
+    def test_tenseur_partage_via_cache(self):
+        """Test tenseur de chocs réutilisé par une seconde grille"""
+        cache = CacheScenarios()
+        parametres = dict(
+            valeur_initiale=50000,
+            hypotheses_rendement=[(0.05, 0.10)],
+            horizons=[15],
+            apports_annuels=[0, 1000, 2000],
+            nb_simulations=1000
+        )
+        
+        premiere = MonteCarloSimulator(seed=3, cache_scenarios=cache).analyser_grille_sensibilite(**parametres)
+        seconde = MonteCarloSimulator(seed=3, cache_scenarios=cache).analyser_grille_sensibilite(
+            **parametres, retraits_annuels=[0, 3000]
+        )
+        
+        assert not premiere["scenario_depuis_cache"]
+        assert seconde["scenario_depuis_cache"]
+        assert seconde["prob_succes"][0][0][1][0] == premiere["prob_succes"][0][0][1][0]
+        # Probabilité croissante avec les apports
+        ligne = [cellule[0] for cellule in premiere["prob_succes"][0][0]]
+        assert ligne == sorted(ligne)
+    
+    @pytest.mark.parametrize("horizons", [[0, 10], [-5], []])
+    def test_horizons_invalides(self, horizons):
+        """Test horizon nul, négatif ou absent refusé"""
+        with pytest.raises(ValueError):
+            MonteCarloSimulator(seed=1).analyser_grille_sensibilite(
+                valeur_initiale=10000,
+                hypotheses_rendement=[(0.05, 0.10)],
+                horizons=horizons,
+                nb_simulations=100
+            )
+
+
+class TestMonteCarloMultiActifs:
+    """
+    Tests de la simulation multi-ETFs à rendements corrélés.
+    """
+    
+    ISINS = ["FR0011869353", "LU1681043599", "LU1650490474"]
+    RENDEMENTS = [0.07, 0.08, 0.025]
+    COVARIANCE = np.array([
+        [0.0225, 0.0180, 0.0006],
+        [0.0180, 0.0441, 0.0008],
+        [0.0006, 0.0008, 0.0025]
+    ])
+    
+    def setup_method(self):
+        MonteCarloMultiActifs._cache_rendements = CacheScenarios()
+        MonteCarloMultiActifs.vider_caches()
+    
+    def test_correlations_simulees(self):
+        """Test corrélations des rendements simulés proches de la cible"""
+        simulator = MonteCarloMultiActifs(seed=1)
+        
+        rendements = simulator.tirer_rendements_correles(
+            self.ISINS, self.RENDEMENTS, self.COVARIANCE, nb_annees=5, nb_simulations=4000
+        )
+        
+        assert rendements.shape == (4000, 60, 3)
+        
+        covariance_simulee = np.cov(rendements.reshape(-1, 3), rowvar=False) * 12
+        np.testing.assert_allclose(covariance_simulee, self.COVARIANCE, atol=1e-3)
+    
+    def test_cholesky_et_tirages_reutilises(self):
+        """Test facteur de Cholesky et tirages partagés entre variantes d'allocation"""
+        facteur = MonteCarloMultiActifs.facteur_cholesky(self.ISINS, self.COVARIANCE)
+        assert MonteCarloMultiActifs.facteur_cholesky(self.ISINS, self.COVARIANCE) is facteur
+        
+        a = MonteCarloMultiActifs(seed=3).tirer_rendements_correles(
+            self.ISINS, self.RENDEMENTS, self.COVARIANCE, nb_annees=10, nb_simulations=500
+        )
+        b = MonteCarloMultiActifs(seed=3).tirer_rendements_correles(
+            self.ISINS, self.RENDEMENTS, self.COVARIANCE, nb_annees=10, nb_simulations=500
+        )
+        
+        assert a is b
+        assert not a.flags.writeable
+    
+    def test_variantes_allocation(self):
+        """Test plusieurs allocations sur les mêmes tirages"""
+        simulator = MonteCarloMultiActifs(seed=7)
+        parametres = dict(
+            isins=self.ISINS,
+            rendements_moyens_annuels=self.RENDEMENTS,
+            covariance_annuelle=self.COVARIANCE,
+            valeur_initiale=100000,
+            nb_annees=20,
+            nb_simulations=3000
+        )
+        
+        dynamique = simulator.analyser_portefeuille(
+            allocation={"FR0011869353": 80, "LU1650490474": 20}, **parametres
+        )
+        prudent = simulator.analyser_portefeuille(
+            allocation={"FR0011869353": 30, "LU1650490474": 70}, **parametres
+        )
+        
+        assert MonteCarloMultiActifs._cache_rendements.get_stats()["misses"] == 1
+        assert MonteCarloMultiActifs._cache_rendements.get_stats()["hits"] == 1
+        assert dynamique["percentiles"]["p50"] > prudent["percentiles"]["p50"]
+        assert (
+            dynamique["percentiles"]["p90"] - dynamique["percentiles"]["p10"] >
+            prudent["percentiles"]["p90"] - prudent["percentiles"]["p10"]
+        )
+        assert dynamique["poids_finaux_moyens"]["LU1681043599"] == 0.0
+    
+    def test_reequilibrage_maintient_allocation(self):
+        """Test rééquilibrage mensuel: poids finaux = allocation cible"""
+        simulator = MonteCarloMultiActifs(seed=5)
+        allocation = {"FR0011869353": 60, "LU1681043599": 10, "LU1650490474": 30}
+        parametres = dict(
+            allocation=allocation,
+            isins=self.ISINS,
+            rendements_moyens_annuels=self.RENDEMENTS,
+            covariance_annuelle=self.COVARIANCE,
+            valeur_initiale=100000,
+            nb_annees=12,
+            nb_simulations=2000
+        )
+        
+        mensuel = simulator.simuler_portefeuille(
+            **parametres, frequence_reequilibrage=FrequenceReequilibrage.MENSUEL
+        )
+        jamais = simulator.simuler_portefeuille(
+            **parametres, frequence_reequilibrage=FrequenceReequilibrage.JAMAIS
+        )
+        
+        for isin, poids in allocation.items():
+            assert abs(mensuel["poids_finaux_moyens"][isin] - poids) < 1e-6
+        
+        # Sans rééquilibrage, la poche obligataire (rendement faible) dérive à la baisse
+        assert jamais["poids_finaux_moyens"]["LU1650490474"] < 30
+    
+    def test_covariance_non_definie_positive(self):
+        """Test erreur explicite si covariance non définie positive"""
+        covariance = np.array([[0.04, 0.05], [0.05, 0.04]])
+        
+        with pytest.raises(ValueError):
+            MonteCarloMultiActifs.facteur_cholesky(self.ISINS[:2], covariance)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
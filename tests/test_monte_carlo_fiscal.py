@@ -0,0 +1,114 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+from analytics.monte_carlo_fiscal import MonteCarloFiscal, PocheFiscale
+from legal.fiscal_rules import FiscalRules
+
+
+class TestFiscaliteVectorisee:
+    """
+    Tests des règles fiscales vectorisées (équivalence avec les règles scalaires).
+    """
+    
+    ANCIENNETES = np.array([1, 3.9, 4, 6, 7.9, 8, 12])
+    PLUS_VALUES = np.array([0, 2000, 4600, 9000, 15000, 50000, 120000])
+    
+    def test_pea_identique_scalaire(self):
+        """Test PEA vectorisé = calculer_fiscalite_pea_retrait"""
+        impots = FiscalRules.calculer_impot_pea_retrait_vectorise(self.PLUS_VALUES, self.ANCIENNETES, 30)
+        
+        for pv, anciennete, impot in zip(self.PLUS_VALUES, self.ANCIENNETES, impots):
+            attendu = FiscalRules.calculer_fiscalite_pea_retrait(pv * 2, pv, anciennete, 30)["impot_total"]
+            assert impot == pytest.approx(attendu, abs=0.01)
+    
+    def test_av_identique_scalaire(self):
+        """Test AV vectorisé = calculer_fiscalite_av (seul et en couple)"""
+        for couple in (False, True):
+            impots = FiscalRules.calculer_impot_av_vectorise(self.PLUS_VALUES, self.ANCIENNETES, 41, couple=couple)
+            
+            for pv, anciennete, impot in zip(self.PLUS_VALUES, self.ANCIENNETES, impots):
+                attendu = FiscalRules.calculer_fiscalite_av(pv * 2, pv, anciennete, 0, 41, couple=couple)["impot_total"]
+                assert impot == pytest.approx(attendu, abs=0.01)
+    
+    def test_cto_identique_scalaire(self):
+        """Test CTO vectorisé = calculer_fiscalite_cto (flat tax et barème)"""
+        for option_bareme in (False, True):
+            impots = FiscalRules.calculer_impot_cto_vectorise(self.PLUS_VALUES, 11, option_bareme=option_bareme)
+            
+            for pv, impot in zip(self.PLUS_VALUES, impots):
+                attendu = FiscalRules.calculer_fiscalite_cto(pv, 11, option_bareme=option_bareme)["impot_total"]
+                assert impot == pytest.approx(attendu, abs=0.01)
+    
+    def test_moins_values_non_imposees(self):
+        """Test pas d'impôt négatif"""
+        assert FiscalRules.calculer_impot_cto_vectorise(np.array([-1000.0]), 30)[0] == 0
+        assert FiscalRules.calculer_impot_per_vectorise(np.array([1000.0]), np.array([-200.0]), 30)[0] == 300
+
+
+class TestMonteCarloFiscal:
+    """
+    Tests du Monte Carlo net de fiscalité par enveloppe.
+    """
+    
+    def simuler(self, poches, **kwargs):
+        parametres = dict(rendement_moyen_annuel=0.0, volatilite_annuelle=0.0, nb_annees=1, nb_simulations=4)
+        parametres.update(kwargs)
+        return MonteCarloFiscal(seed=1).simuler_fiscal(poches, **parametres)["net"]
+    
+    @pytest.mark.parametrize("poche", [
+        PocheFiscale("cto", 100000, 50000),
+        PocheFiscale("pea", 100000, 40000, anciennete_annees=6),
+        PocheFiscale("av", 100000, 50000, anciennete_annees=5),
+        PocheFiscale("av", 100000, 50000, anciennete_annees=10),
+        PocheFiscale("per", 100000, 70000)
+    ])
+    def test_retrait_net_exact(self, poche):
+        """Test gross-up: le net perçu couvre exactement le besoin"""
+        resultat = self.simuler([poche], retrait_net_annuel=30000)
+        
+        net = resultat["retraits_bruts_cumules"] - resultat["impots_cumules"]
+        np.testing.assert_allclose(net, 30000)
+        assert resultat["succes"].all()
+    
+    def test_ordre_cout_fiscal(self):
+        """Test retrait prélevé d'abord dans la poche la moins imposée"""
+        resultat = self.simuler(
+            [PocheFiscale("cto", 100000, 20000), PocheFiscale("pea", 100000, 90000, anciennete_annees=6)],
+            retrait_net_annuel=10000
+        )
+        
+        assert resultat["valeurs_finales_par_poche"]["cto"][0] == 100000
+        assert resultat["valeurs_finales_par_poche"]["pea"][0] < 90000
+    
+    def test_cloture_pea_avant_5_ans(self):
+        """Test retrait PEA < 5 ans: clôture, reliquat réinvesti en CTO"""
+        resultat = self.simuler([PocheFiscale("pea", 100000, 50000, anciennete_annees=2)], retrait_net_annuel=10000)
+        
+        assert resultat["valeurs_finales_par_poche"]["pea"][0] == 0
+        # Tout le PEA imposé à TMI 30% + PS sur la plus-value (50%)
+        assert resultat["impots_cumules"][0] == pytest.approx(100000 * 0.5 * (0.30 + 0.172))
+        assert resultat["valeurs_finales_par_poche"]["cto"][0] == pytest.approx(100000 - 10000 - 100000 * 0.5 * 0.472)
+    
+    def test_plafond_pea_apports(self):
+        """Test apports PEA au-delà du plafond redirigés vers le CTO"""
+        resultat = self.simuler(
+            [PocheFiscale("pea", 140000, 140000, part_apports=1.0)],
+            nb_annees=2, apports_annuels=8000
+        )
+        
+        assert resultat["valeurs_finales_par_poche"]["pea"][0] == FiscalRules.PLAFOND_PEA
+        assert resultat["valeurs_finales_par_poche"]["cto"][0] == 6000
+    
+    def test_succes_net_inferieur_avant_impots(self):
+        """Test probabilité nette <= probabilité avant impôts (mêmes scénarios)"""
+        resultats = MonteCarloFiscal(seed=4).analyser_fiscal(
+            [PocheFiscale("cto", 300000, 150000), PocheFiscale("av", 200000, 120000, anciennete_annees=9)],
+            rendement_moyen_annuel=0.05, volatilite_annuelle=0.12,
+            nb_annees=25, nb_simulations=3000, retrait_net_annuel=30000
+        )
+        
+        probabilites = resultats["probabilites"]
+        assert probabilites["prob_succes_net"] < probabilites["prob_succes_avant_impots"]
+        assert resultats["impots_cumules"]["p50"] > 0
@@ -0,0 +1,79 @@
+import sys
+sys.path.append("backend/src")
+
+import pytest
+import numpy as np
+import pandas as pd
+from analytics.noyau_risque import NoyauRisque
+from analytics.risk_metrics import RiskMetrics
+
+
+def _rendements(nb_jours=1500, nb_portefeuilles=5, seed=0):
+    """Rendements à queues épaisses, une colonne par portefeuille"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=nb_jours)
+    return pd.DataFrame(rng.standard_t(4, (nb_jours, nb_portefeuilles)) * 0.01, index=dates)
+
+
+class TestNoyauRisque:
+    """
+    Tests du noyau fusionné des métriques de risque.
+    
+    Vérifie:
+    - Quantiles par sélection partielle identiques à np.percentile
+    - Moments identiques à pandas (skew, kurtosis)
+    - Lot 2-D identique aux analyses individuelles
+    - Lot refusé si un portefeuille a des rendements manquants
+    """
+    
+    def test_quantiles_et_moments(self):
+        """VaR, CVaR, skewness et kurtosis conformes aux calculs de référence"""
+        rendements = _rendements()[0]
+        metriques = NoyauRisque.calculer(rendements.to_numpy())
+        
+        for niveau in (95, 99):
+            seuil = np.percentile(rendements, 100 - niveau)
+            assert metriques[f"var_{niveau}"] == pytest.approx(seuil * 100, rel=1e-12)
+            assert metriques[f"cvar_{niveau}"] == pytest.approx(rendements[rendements <= seuil].mean() * 100, rel=1e-12)
+        assert metriques["skewness"] == pytest.approx(rendements.skew(), rel=1e-9)
+        assert metriques["kurtosis"] == pytest.approx(rendements.kurtosis() + 3, rel=1e-9)
+    
+    def test_co_moments(self):
+        """Beta et tracking error conformes aux covariances pandas"""
+        rendements = _rendements(nb_portefeuilles=2)
+        actif, benchmark = rendements[0], rendements[1] * 0.5 + rendements[0] * 0.5
+        co_moments = NoyauRisque.co_moments(actif.to_numpy(), benchmark.to_numpy())
+        
+        assert co_moments["beta"][0] == pytest.approx(actif.cov(benchmark) / benchmark.var(), rel=1e-12)
+        assert co_moments["tracking_error"][0] == pytest.approx((actif - benchmark).std() * np.sqrt(252) * 100, rel=1e-12)
+        
+        with pytest.raises(ValueError):
+            NoyauRisque.co_moments(actif.to_numpy(), benchmark.to_numpy()[:-1])
+    
+    def test_lot_identique_individuel(self):
+        """analyse_risque_lot = analyse_risque_complete colonne par colonne"""
+        rendements = _rendements(nb_portefeuilles=8)
+        benchmark = _rendements(nb_portefeuilles=1, seed=1)[0]
+        
+        lot = RiskMetrics.analyse_risque_lot(rendements, benchmark)
+        
+        assert list(lot) == list(rendements.columns)
+        for colonne in rendements.columns:
+            assert lot[colonne] == RiskMetrics.analyse_risque_complete(rendements[colonne], benchmark)
+    
+    def test_lot_rendements_manquants(self):
+        """Lignes entièrement vides ignorées, NaN partiels refusés (pas de troncature silencieuse)"""
+        rendements = _rendements(nb_portefeuilles=3)
+        
+        avec_ligne_vide = rendements.copy()
+        avec_ligne_vide.iloc[0] = np.nan
+        assert RiskMetrics.analyse_risque_lot(avec_ligne_vide) == RiskMetrics.analyse_risque_lot(rendements.iloc[1:])
+        
+        partiel = rendements.copy()
+        partiel.iloc[:100, 1] = np.nan
+        with pytest.raises(ValueError, match="1"):
+            RiskMetrics.analyse_risque_lot(partiel)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
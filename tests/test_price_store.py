@@ -0,0 +1,216 @@
+import sys
+sys.path.append("backend/src")
+
+import os
+import subprocess
+from pathlib import Path
+import pytest
+import numpy as np
+import pandas as pd
+from data.price_store import PriceStore, main
+from data.market_data import MarketDataProvider
+from data.price_panel import GestionnairePanneau
+from analytics.backtesting import BacktestEngine
+
+
+def _ecrire_csv(chemin, dates, prix):
+    """Export CSV au format Yahoo Finance"""
+    pd.DataFrame({"Date": dates.strftime("%Y-%m-%d"), "Close": prix, "Volume": 0}).to_csv(chemin, index=False)
+
+
+class TestPriceStore:
+    """
+    Tests du stockage local des prix.
+    
+    Vérifie:
+    - Import CSV hors ligne
+    - Ajout incrémental des seules nouvelles barres
+    - Lecture d'une tranche contiguë en mémoire mappée
+    - Fournisseur en mode hors ligne
+    - Répertoire par défaut indépendant du répertoire courant
+    - Ajouts concurrents de plusieurs processus sur le même ticker
+    """
+    
+    def test_import_csv_et_lecture_tranche(self, tmp_path):
+        """Import d'un CSV puis lecture d'une fenêtre de dates"""
+        dates = pd.bdate_range("2020-01-01", periods=500)
+        prix = 100 + np.arange(len(dates), dtype=float)
+        _ecrire_csv(tmp_path / "EWLD.PA.csv", dates, prix)
+        
+        store = PriceStore(tmp_path / "store")
+        assert store.importer_csv(str(tmp_path / "EWLD.PA.csv")) == 500
+        assert store.tickers() == ["EWLD.PA"]
+        
+        serie = store.lire("EWLD.PA", "2020-03-01", "2020-03-31")
+        attendu = pd.Series(prix, index=dates)["2020-03-01":"2020-03-31"]
+        assert serie.index.equals(attendu.index)
+        assert np.array_equal(serie.to_numpy(), attendu.to_numpy())
+        
+        # Tranche sans copie sur le fichier mappé
+        _, tranche = store.lire_tableaux("EWLD.PA", "2020-03-01", "2020-03-31")
+        assert isinstance(tranche.base, np.memmap) or isinstance(tranche, np.memmap)
+    
+    def test_ajout_incremental(self, tmp_path):
+        """Seules les barres postérieures à la dernière date sont ajoutées"""
+        store = PriceStore(tmp_path)
+        dates = pd.bdate_range("2021-01-01", periods=10)
+        
+        assert store.ajouter("CW8", pd.Series(np.arange(5.0), index=dates[:5])) == 5
+        # Chevauchement: les 5 premières barres sont ignorées
+        assert store.ajouter("CW8", pd.Series(np.arange(10.0) * 10, index=dates)) == 5
+        assert store.ajouter("CW8", pd.Series(np.arange(10.0), index=dates)) == 0
+        
+        serie = store.lire("CW8")
+        assert list(serie.to_numpy()) == [0, 1, 2, 3, 4, 50, 60, 70, 80, 90]
+        assert store.derniere_date("CW8") == dates[-1]
+        
+        # Nouvelle instance: relecture depuis le disque
+        assert len(PriceStore(tmp_path).lire("CW8")) == 10
+    
+    def test_commande_import(self, tmp_path, capsys):
+        """Commande d'import hors ligne"""
+        dates = pd.bdate_range("2022-01-03", periods=20)
+        _ecrire_csv(tmp_path / "dump.csv", dates, np.linspace(50, 60, 20))
+        
+        main([str(tmp_path / "dump.csv"), "--ticker", "AGGH.PA", "--repertoire", str(tmp_path / "store")])
+        
+        assert "AGGH.PA: 20 barres ajoutées" in capsys.readouterr().out
+        assert len(PriceStore(tmp_path / "store").lire("AGGH.PA")) == 20
+    
+    def test_repertoire_defaut_absolu(self, tmp_path, monkeypatch):
+        """Sans PRICE_STORE_DIR: <racine du dépôt>/data/prices, quel que soit le répertoire courant"""
+        monkeypatch.delenv("PRICE_STORE_DIR", raising=False)
+        racine = Path(__file__).resolve().parents[1]
+        
+        monkeypatch.chdir(tmp_path)
+        assert PriceStore().repertoire == racine / "data" / "prices"
+        monkeypatch.chdir(racine / "backend" / "api")
+        assert PriceStore().repertoire == racine / "data" / "prices"
+    
+    def test_ajouts_concurrents_multi_processus(self, tmp_path):
+        """Des processus qui ajoutent des fenêtres chevauchantes ne dupliquent aucune barre"""
+        script = (
+            "import sys; sys.path.append('backend/src'); "
+            "import numpy as np, pandas as pd; "
+            "from data.price_store import PriceStore; "
+            "dates = pd.bdate_range('2020-01-01', periods=400); "
+            f"store = PriceStore(r'{tmp_path}'); "
+            "[store.ajouter('CW8', pd.Series(np.arange(400.0)[:fin], index=dates[:fin])) for fin in range(5, 401, 5)]"
+        )
+        processus = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(4)]
+        assert all(p.wait() == 0 for p in processus)
+        
+        serie = PriceStore(tmp_path).lire("CW8")
+        assert serie.index.equals(pd.bdate_range("2020-01-01", periods=400))
+        assert np.array_equal(serie.to_numpy(), np.arange(400.0))
+    
+    def test_ecriture_interrompue_tronquee(self, tmp_path):
+        """Dates écrites sans prix (processus interrompu): l'ajout suivant reste aligné"""
+        store = PriceStore(tmp_path)
+        dates = pd.bdate_range("2021-01-01", periods=10)
+        store.ajouter("CW8", pd.Series(np.arange(5.0), index=dates[:5]))
+        with open(tmp_path / "CW8.dates", "ab") as f:
+            f.write(np.array([99999], dtype=np.int64).tobytes())
+        
+        assert PriceStore(tmp_path).ajouter("CW8", pd.Series(np.arange(10.0), index=dates)) == 5
+        serie = PriceStore(tmp_path).lire("CW8")
+        assert serie.index.equals(dates) and np.array_equal(serie.to_numpy(), np.arange(10.0))
+    
+    def test_fournisseur_hors_ligne(self, tmp_path):
+        """Le fournisseur hors ligne lit le stockage sans accès réseau"""
+        store = PriceStore(tmp_path)
+        dates = pd.bdate_range("2015-01-01", "2020-12-31")
+        store.ajouter("EWLD.PA", pd.Series(np.linspace(100, 200, len(dates)), index=dates))
+        
+        provider = MarketDataProvider(store=store, hors_ligne=True)
+        
+        assert len(provider.telecharger_prix_historiques("EWLD.PA")) == len(dates)
+        assert provider.telecharger_prix_historiques("EWLD.PA", periode="1y").index[0] >= pd.Timestamp("2019-12-31")
+        assert provider.telecharger_prix_historiques("INCONNU").empty
+        assert list(provider.prix_stockes(["EWLD.PA", "INCONNU"])) == ["EWLD.PA"]
+
+
+class TestPanneauPrix:
+    """Tests du panel de prix aligné partagé"""
+    
+    def _store(self, tmp_path):
+        """Stockage de trois tickers aux historiques décalés"""
+        store = PriceStore(tmp_path)
+        rng = np.random.default_rng(0)
+        for ticker, debut in [("A", "2020-01-01"), ("B", "2020-02-03"), ("C", "2020-01-01")]:
+            dates = pd.bdate_range(debut, "2021-12-31")
+            store.ajouter(ticker, pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), index=dates))
+        return store
+    
+    def test_alignement_et_vues(self, tmp_path):
+        """Fenêtre identique au réalignement pandas, lignes et colonnes contiguës en vue"""
+        store = self._store(tmp_path)
+        panneau = GestionnairePanneau(store).obtenir()
+        
+        fenetre = panneau.dataframe(["A", "B"], "2020-06-01", "2020-12-31")
+        attendu = pd.DataFrame({t: store.lire(t) for t in ["A", "B"]}).loc["2020-06-01":"2020-12-31"]
+        pd.testing.assert_frame_equal(fenetre, attendu, check_freq=False, check_names=False)
+        
+        _, matrice = panneau.extraire(["A", "B"], "2020-06-01", "2020-12-31")
+        assert np.shares_memory(matrice, panneau.prix)
+        
+        with pytest.raises(KeyError):
+            panneau.extraire(["A", "INCONNU"])
+    
+    def test_publication_atomique(self, tmp_path):
+        """Un ajout publie un nouveau panel; l'instantané déjà obtenu reste inchangé"""
+        store = self._store(tmp_path)
+        gestionnaire = GestionnairePanneau(store)
+        ancien = gestionnaire.obtenir()
+        assert gestionnaire.obtenir() is ancien
+        
+        store.ajouter("A", pd.Series([123.0], index=[pd.Timestamp("2022-01-03")]))
+        nouveau = gestionnaire.obtenir()
+        
+        assert nouveau is not ancien
+        assert len(nouveau.calendrier) == len(ancien.calendrier) + 1
+        assert np.isnan(nouveau.prix[-1, nouveau.colonnes["B"]])
+        assert not ancien.prix.flags.writeable
+    
+    def test_ajout_par_un_autre_processus(self, tmp_path):
+        """Un ajout fait hors de ce stockage (import, autre worker) est vu via les fichiers"""
+        store = self._store(tmp_path)
+        gestionnaire = GestionnairePanneau(store, intervalle_controle=0)
+        ancien = gestionnaire.obtenir()
+        assert gestionnaire.obtenir() is ancien
+        
+        # Autre instance sur le même répertoire: la version du stockage local ne change pas
+        PriceStore(tmp_path).ajouter("B", pd.Series([99.0], index=[pd.Timestamp("2022-01-03")]))
+        assert store.version == ancien.version
+        
+        nouveau = gestionnaire.obtenir()
+        assert nouveau is not ancien
+        assert nouveau.prix[-1, nouveau.colonnes["B"]] == 99.0
+        assert gestionnaire.obtenir() is nouveau
+        
+        # Contrôle des fichiers espacé: visible au plus tard à l'échéance, ou sur rafraichir()
+        espace = GestionnairePanneau(store, intervalle_controle=3600)
+        panneau = espace.obtenir()
+        PriceStore(tmp_path).ajouter("C", pd.Series([98.0], index=[pd.Timestamp("2022-01-04")]))
+        assert espace.obtenir() is panneau
+        assert len(espace.rafraichir().calendrier) == len(panneau.calendrier) + 1
+    
+    def test_backtest_sur_fenetre(self, tmp_path):
+        """Backtest identique depuis la fenêtre du panel ou depuis les séries"""
+        store = self._store(tmp_path)
+        panneau = GestionnairePanneau(store).obtenir()
+        allocation = {"A": 50.0, "B": 30.0, "C": 20.0}
+        engine = BacktestEngine()
+        
+        depuis_panneau = engine.backtester_allocation(
+            allocation, panneau.dataframe(["A", "B", "C"]), date_debut="2020-03-01", date_fin="2021-06-30"
+        )
+        depuis_series = engine.backtester_allocation(
+            allocation, {t: store.lire(t) for t in ["A", "B", "C"]}, date_debut="2020-03-01", date_fin="2021-06-30"
+        )
+        
+        assert depuis_panneau["valeur_finale"] == pytest.approx(depuis_series["valeur_finale"], rel=1e-12)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+import sys
+sys.path.append("backend/src")
+
+import random
+import time
+import pytest
+from data.recherche_univers import IndexRecherche, normaliser_texte, trigrammes
+
+
+MOTS = ["Amundi", "iShares", "Xtrackers", "Vanguard", "MSCI", "World", "Europe", "USA", "Emerging",
+        "Markets", "Core", "Small", "Cap", "Gold", "Government", "Bond", "Corporate", "Euro", "Stoxx",
+        "ESG", "Nasdaq", "Japan", "Pacific", "Dividend", "Quality", "Value", "Momentum", "Énergie"]
+
+
+def _univers(nb, seed=0):
+    """Univers synthétique de dicts au format universe.json"""
+    rng = random.Random(seed)
+    return [
+        {
+            "isin": f"{rng.choice(['FR', 'IE', 'LU'])}{i:010d}",
+            "ticker": f"{''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(4))}.PA",
+            "nom": " ".join(rng.sample(MOTS, 4)) + " UCITS ETF"
+        }
+        for i in range(nb)
+    ]
+
+
+UNIVERS = [
+    {"isin": "FR0011869353", "ticker": "EWLD.PA", "nom": "Amundi MSCI World UCITS ETF EUR"},
+    {"isin": "IE00B4L5Y983", "ticker": "IWDA.AS", "nom": "iShares Core MSCI World UCITS ETF"},
+    {"isin": "IE00B5BMR087", "ticker": "CSPX.AS", "nom": "iShares Core S&P 500 UCITS ETF"},
+    {"isin": "FR0013412020", "ticker": "PAEEM.PA", "nom": "Amundi PEA MSCI Emerging Markets"},
+    {"isin": "LU1681043599", "ticker": "CW8.PA", "nom": "Amundi MSCI World UCITS ETF EUR (C)"},
+]
+
+
+class TestIndexRecherche:
+    """
+    Tests de l'index de recherche de l'univers d'ETFs.
+    
+    Vérifie:
+    - Autocomplétion par préfixe d'ISIN et de ticker, correspondance exacte en tête
+    - Noms tolérants aux fautes de frappe, aux accents et à la casse
+    - Classement et pagination (total, décalage, limite)
+    - Restriction à des positions autorisées
+    - Requêtes d'autocomplétion en moins de 2 ms sur 10 000 instruments
+    """
+    
+    def test_prefixes_isin_ticker(self):
+        """Préfixes d'ISIN et de ticker, exact en premier"""
+        index = IndexRecherche(UNIVERS)
+        
+        isins = [r["etf"]["isin"] for r in index.rechercher("ie00b")["resultats"]]
+        assert isins == ["IE00B4L5Y983", "IE00B5BMR087"]
+        
+        resultats = index.rechercher("FR0011869353")["resultats"]
+        assert resultats[0]["etf"]["ticker"] == "EWLD.PA"
+        assert resultats[0]["score"] == 3.0
+        
+        assert index.rechercher("cw")["resultats"][0]["etf"]["ticker"] == "CW8.PA"
+    
+    def test_fautes_de_frappe(self):
+        """Fautes de frappe, accents, casse et mot en cours de saisie"""
+        index = IndexRecherche(UNIVERS)
+        
+        for requete in ["amundi msci wrld", "AMUNDI MSCI WOLRD", "amundi msci wor", "Amùndi  MSCI-World"]:
+            premiers = {r["etf"]["ticker"] for r in index.rechercher(requete, limite=2)["resultats"]}
+            assert premiers == {"EWLD.PA", "CW8.PA"}, requete
+        
+        assert index.rechercher("zzzzqqq")["total"] == 0
+        assert normaliser_texte("Énergie & Matériaux") == "energie materiaux"
+        assert "wor" in trigrammes("wor", saisie=True) and "or " not in trigrammes("wor", saisie=True)
+    
+    def test_classement_et_pagination(self):
+        """Les pages successives reconstituent le classement complet"""
+        index = IndexRecherche(_univers(500))
+        
+        complet = index.rechercher("msci world", limite=None)
+        assert complet["total"] == len(complet["resultats"]) > 20
+        scores = [r["score"] for r in complet["resultats"]]
+        assert scores == sorted(scores, reverse=True)
+        
+        pages = []
+        for decalage in range(0, complet["total"], 20):
+            page = index.rechercher("msci world", limite=20, decalage=decalage)
+            assert page["total"] == complet["total"]
+            pages.extend(page["resultats"])
+        assert pages == complet["resultats"]
+    
+    def test_positions_autorisees(self):
+        """Seules les positions autorisées sont retournées"""
+        index = IndexRecherche(UNIVERS)
+        
+        resultats = index.rechercher("amundi", limite=None, positions=[3, 4])["resultats"]
+        assert {r["etf"]["ticker"] for r in resultats} == {"PAEEM.PA", "CW8.PA"}
+        assert index.rechercher("amundi", positions=[])["total"] == 0
+    
+    def test_autocompletion_sous_2_ms(self):
+        """Frappe par frappe sur 10 000 instruments: moins de 2 ms par requête"""
+        index = IndexRecherche(_univers(10000))
+        requetes = ["a", "am", "amu", "amundi w", "amundi wor", "IE00", "IE000000", "abcd", "msci wrld"]
+        
+        debut = time.perf_counter()
+        for _ in range(20):
+            for requete in requetes:
+                index.rechercher(requete)
+        duree_ms = (time.perf_counter() - debut) * 1000 / (20 * len(requetes))
+        
+        assert duree_ms < 2.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+import sys
+sys.path.append("backend/src")
+sys.path.append("backend")
+
+import pytest
+import numpy as np
+import pandas as pd
+from api.routes import backtests
+from api.routes.backtests import BacktestBatchRequest, BacktestRequest, lancer_backtest, lancer_backtest_batch
+from data.price_store import PriceStore
+from data.price_panel import GestionnairePanneau
+from optimization.asset_allocation import StrategieAllocation
+from utils.cache import CacheManager
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Stockage local peuplé (un ETF par classe) branché sur les routes, cache de résultats isolé"""
+    store = PriceStore(tmp_path)
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2018-01-01", "2022-12-30")
+    for ticker in ["EWLD.PA", "AGGH.PA", "PHAU.PA"]:
+        store.ajouter(ticker, pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, len(dates)))), index=dates))
+    
+    monkeypatch.setattr(backtests.market_data_provider, "store", store)
+    monkeypatch.setattr(backtests, "gestionnaire_panneau", GestionnairePanneau(store, intervalle_controle=3600))
+    monkeypatch.setattr(backtests, "cache_resultats", CacheManager())
+    return store
+
+
+class TestRoutesBacktests:
+    """
+    Tests des routes de backtest sur un stockage local peuplé.
+    
+    Vérifie:
+    - Stratégies prédéfinies traduites en ETFs stockés (aucun prix synthétique)
+    - Stratégie refusée quand une classe n'a aucun ETF stocké
+    - Résultat mis en cache sous l'empreinte du panel effectivement lu
+    - Prix synthétiques sans graine jamais mis en cache
+    """
+    
+    def test_batch_strategies_sur_stockage(self, store):
+        """Les presets sont backtestés sur les prix stockés de leurs ETFs représentatifs"""
+        reponse = lancer_backtest_batch(BacktestBatchRequest(
+            allocations={"perso": {"EWLD.PA": 50.0, "AGGH.PA": 50.0}},
+            strategies=[StrategieAllocation.EQUILIBRE, StrategieAllocation.AGRESSIF],
+            date_debut="2019-01-01",
+            date_fin="2022-12-30"
+        ))
+        
+        assert reponse["success"], reponse
+        assert reponse["allocations"]["equilibre"] == {"EWLD.PA": 60.0, "AGGH.PA": 35.0, "PHAU.PA": 5.0}
+        assert reponse["allocations"]["agressif"] == {"EWLD.PA": 100.0}
+        assert set(reponse["sources_prix"].values()) == {"stockage"}
+        assert {"perso", "equilibre", "agressif"} <= set(reponse["resultats"]["metriques"])
+    
+    def test_batch_strategie_sans_etf_stocke(self, store, tmp_path, monkeypatch):
+        """Sans ETF obligataire stocké, la stratégie est refusée plutôt que simulée"""
+        partiel = PriceStore(tmp_path / "partiel")
+        partiel.ajouter("EWLD.PA", store.lire("EWLD.PA"))
+        monkeypatch.setattr(backtests, "gestionnaire_panneau", GestionnairePanneau(partiel))
+        
+        reponse = lancer_backtest_batch(BacktestBatchRequest(strategies=[StrategieAllocation.DEFENSIF]))
+        
+        assert not reponse["success"]
+        assert "obligations_gouvernementales" in reponse["error"]
+    
+    def test_cache_suit_le_panel_utilise(self, store, tmp_path):
+        """Un panel pas encore rafraîchi ne met pas en cache ses prix sous l'empreinte du stockage étendu"""
+        request = BacktestRequest(allocation={"EWLD.PA": 60.0, "AGGH.PA": 40.0}, format_serie="compact")
+        avant = lancer_backtest(request, accept=None)["resultats"]
+        
+        # Ajout par un autre processus: le panel courant ne le voit qu'à son prochain contrôle
+        for ticker in ["EWLD.PA", "AGGH.PA"]:
+            PriceStore(tmp_path).ajouter(ticker, pd.Series([500.0], index=[pd.Timestamp("2023-01-02")]))
+        assert lancer_backtest(request, accept=None)["resultats"] == avant
+        
+        backtests.gestionnaire_panneau.rafraichir()
+        apres = lancer_backtest(request, accept=None)["resultats"]
+        assert apres["valeur_finale"] != avant["valeur_finale"]
+        assert apres["serie_valeurs"]["nb_points"] == avant["serie_valeurs"]["nb_points"] + 1
+    
+    def test_prix_synthetiques_sans_graine_non_caches(self, store):
+        """Ticker absent du stockage: nouveau tirage à chaque requête sans graine, réponse cachée avec graine"""
+        request = BacktestRequest(
+            allocation={"EWLD.PA": 50.0, "INCONNU": 50.0}, date_debut="2020-01-01", date_fin="2022-12-30"
+        )
+        premier = lancer_backtest(request, accept=None)
+        assert premier["sources_prix"]["INCONNU"] == "synthetique"
+        assert lancer_backtest(request, accept=None)["resultats"]["valeur_finale"] != premier["resultats"]["valeur_finale"]
+        
+        lot = BacktestBatchRequest(allocations={"a": {"INCONNU": 100.0}}, date_fin="2022-12-30", seed=7)
+        assert lancer_backtest_batch(lot)["resultats"] == lancer_backtest_batch(lot)["resultats"]
+        assert backtests.cache_resultats.get_stats()["nb_entries"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+import sys
+sys.path.append("backend/src")
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from utils.series import lttb_indices, sous_echantillonner, encoder_serie_compacte, decoder_serie_compacte, encoder_arrow
+from analytics.backtesting import BacktestEngine
+
+
+def _serie(nb_jours=3000, seed=0):
+    """Courbe de valeur log-normale sur jours ouvrés"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-01", periods=nb_jours)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, nb_jours))), index=dates)
+
+
+class TestEncodageSeries:
+    """
+    Tests de l'encodage compact des courbes de valeur.
+    
+    Vérifie:
+    - Aller-retour base64 float32, index régulier ou non
+    - Aller-retour Arrow IPC (date32/float32, métadonnées JSON du schéma)
+    - Sous-échantillonnage LTTB (extrémités, creux conservés)
+    - Format compact du backtest
+    """
+    
+    def test_aller_retour_base64(self):
+        """Décodage identique à la série en float32, avec ou sans fréquence"""
+        serie = _serie(500)
+        encodage = encoder_serie_compacte(serie)
+        assert encodage["frequence"] == "B"
+        assert "decalages_jours" not in encodage
+        
+        decodee = decoder_serie_compacte(encodage)
+        assert decodee.index.equals(serie.index)
+        assert np.array_equal(decodee.to_numpy(), serie.to_numpy(dtype=np.float32))
+        
+        irreguliere = serie.drop(serie.index[[10, 50, 51]])
+        encodage = encoder_serie_compacte(irreguliere)
+        assert encodage["frequence"] is None
+        assert decoder_serie_compacte(encodage).index.equals(irreguliere.index)
+    
+    def test_aller_retour_arrow(self):
+        """Flux Arrow relu: types de colonnes, valeurs et métadonnées du schéma"""
+        pa = pytest.importorskip("pyarrow")
+        serie = _serie(500)
+        metadonnees = {"resultats": {"max_drawdown": -12.5}, "sources_prix": {"A": "yahoo"}}
+        
+        table = pa.ipc.open_stream(encoder_arrow(serie, metadonnees)).read_all()
+        
+        assert table.schema.field("date").type == pa.date32()
+        assert table.schema.field("valeur").type == pa.float32()
+        dates = pd.DatetimeIndex(table.column("date").to_numpy().astype("datetime64[ns]"))
+        assert dates.equals(serie.index)
+        assert np.array_equal(table.column("valeur").to_numpy(), serie.to_numpy(dtype=np.float32))
+        assert json.loads(table.schema.metadata[b"metadonnees"]) == metadonnees
+        
+        sans_metadonnees = pa.ipc.open_stream(encoder_arrow(serie)).read_all()
+        assert sans_metadonnees.schema.metadata is None
+    
+    def test_lttb(self):
+        """Extrémités et minimum global conservés, nombre de points respecté"""
+        serie = _serie()
+        reduite = sous_echantillonner(serie, 200)
+        
+        assert len(reduite) == 200
+        assert reduite.index.is_monotonic_increasing
+        assert reduite.index[0] == serie.index[0] and reduite.index[-1] == serie.index[-1]
+        assert serie.idxmin() in reduite.index
+        assert sous_echantillonner(serie, None) is serie
+        assert np.array_equal(lttb_indices(np.arange(5), np.arange(5), 10), np.arange(5))
+    
+    def test_backtest_format_compact(self):
+        """Format compact réduit, métriques inchangées"""
+        dates = pd.bdate_range("2015-01-01", "2020-12-31")
+        rng = np.random.default_rng(3)
+        prix = {
+            t: pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates)))), index=dates)
+            for t in ["A", "B"]
+        }
+        engine = BacktestEngine()
+        
+        complet = engine.backtester_allocation({"A": 60.0, "B": 40.0}, prix)
+        compact = engine.backtester_allocation({"A": 60.0, "B": 40.0}, prix, format_serie="compact", nb_points_max=300)
+        
+        assert compact["max_drawdown"] == complet["max_drawdown"]
+        assert compact["serie_valeurs"]["nb_points"] == 300
+        decodee = decoder_serie_compacte(compact["serie_valeurs"])
+        assert decodee.iloc[-1] == pytest.approx(complet["valeur_finale"], rel=1e-6)
+        
+        with pytest.raises(ValueError):
+            engine.backtester_allocation({"A": 100.0}, prix, format_serie="xml")
+        with pytest.raises(ValueError):
+            engine.backtester_allocation({"A": 100.0}, prix, format_serie="compact", nb_points_max=2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+import sys
+sys.path.append("backend/src")
+
+import threading
+import time
+import pytest
+from typing import Dict
+from pydantic import BaseModel
+from utils.cache import CacheManager
+from utils.single_flight import SingleFlight, cle_canonique, coalescer
+
+
+class RequeteExemple(BaseModel):
+    allocation: Dict[str, float]
+    seed: int = 42
+
+
+def _lancer_simultanement(nb_threads, cible):
+    """Lance nb_threads appels de cible() au même instant, retourne les résultats"""
+    barriere = threading.Barrier(nb_threads)
+    resultats = [None] * nb_threads
+    
+    def travail(i):
+        barriere.wait()
+        try:
+            resultats[i] = cible()
+        except Exception as e:
+            resultats[i] = e
+    
+    threads = [threading.Thread(target=travail, args=(i,)) for i in range(nb_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultats
+
+
+class TestSingleFlight:
+    """
+    Tests de la fusion des calculs identiques simultanés.
+    
+    Vérifie:
+    - Un seul calcul pour N appels simultanés, résultat partagé
+    - Propagation de l'exception à tous les appelants
+    - Intégration avec le cache de résultats
+    - Clé canonique indépendante de l'ordre des champs
+    """
+    
+    def test_calcul_unique_partage(self):
+        """N appels simultanés: un calcul, le même objet pour tous"""
+        vol = SingleFlight()
+        appels = []
+        
+        def calcul():
+            appels.append(1)
+            time.sleep(0.2)
+            return {"valeur": 42}
+        
+        resultats = _lancer_simultanement(8, lambda: vol.executer("cle", calcul))
+        
+        assert len(appels) == 1
+        assert all(resultat is resultats[0] for resultat in resultats)
+        assert vol.get_stats()["partages"] == 7
+        assert vol.get_stats()["en_cours"] == 0
+    
+    def test_exception_partagee(self):
+        """L'échec du calcul est remonté à chaque appelant, puis un nouvel appel recalcule"""
+        vol = SingleFlight()
+        
+        def echec():
+            time.sleep(0.1)
+            raise ValueError("données indisponibles")
+        
+        resultats = _lancer_simultanement(4, lambda: vol.executer("cle", echec))
+        
+        assert all(isinstance(resultat, ValueError) for resultat in resultats)
+        assert vol.executer("cle", lambda: "ok") == "ok"
+    
+    def test_integration_cache(self):
+        """Résultat reproductible servi depuis le cache; non reproductible jamais mis en cache"""
+        vol = SingleFlight()
+        cache = CacheManager()
+        appels = []
+        
+        @coalescer(cache, vol=vol)
+        def simulation(seed):
+            appels.append(seed)
+            return seed * 2
+        
+        assert simulation(21) == 42
+        assert simulation(seed=21) == 42
+        assert appels == [21]
+        assert vol.get_stats()["hits_cache"] == 1
+        
+        vol.executer("aleatoire", lambda: 1, cache=cache, cacheable=False)
+        assert "aleatoire" not in cache
+    
+    def test_cle_canonique(self):
+        """Même requête, champs dans un ordre différent: même clé"""
+        a = RequeteExemple(allocation={"CW8.PA": 60, "AGGH.PA": 40})
+        b = RequeteExemple(allocation={"AGGH.PA": 40, "CW8.PA": 60}, seed=42)
+        
+        assert cle_canonique("backtest", a) == cle_canonique("backtest", b)
+        assert cle_canonique("backtest", a) != cle_canonique("monte-carlo", a)
+        assert cle_canonique("backtest", a) != cle_canonique("backtest", RequeteExemple(allocation={"CW8.PA": 100}))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])